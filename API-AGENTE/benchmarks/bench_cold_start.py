@@ -0,0 +1,69 @@
+"""
+Microbenchmark: costo de cold start (imports + inicialización de DAOs)
+
+Lanza N intérpretes nuevos y en cada uno mide:
+- imports: tiempo de importar los módulos indicados (por defecto el
+  handler principal, que necesita requirements.txt instalado)
+- init: tiempo de crear todos los DAOs (sesión, recursos y clientes boto3)
+
+No hace llamadas de red (las tablas están declaradas en Config.TABLA_CLAVES),
+así que puede correrse sin credenciales reales. Para comparar antes/después
+basta con ejecutarlo en cada commit.
+
+Uso:
+    cd API-AGENTE
+    python benchmarks/bench_cold_start.py [--corridas 15] [--modulos config,dao,contextos]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+SCRIPT_HIJO = r"""
+import importlib, json, sys, time
+t0 = time.perf_counter()
+for modulo in sys.argv[1].split(','):
+    importlib.import_module(modulo)
+t1 = time.perf_counter()
+from dao.base import DAOFactory
+for tipo in ('usuarios', 'recetas', 'servicios', 'historial', 'memoria'):
+    DAOFactory.get_dao(tipo)
+t2 = time.perf_counter()
+print(json.dumps({'imports': (t1 - t0) * 1000, 'init': (t2 - t1) * 1000}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--corridas', type=int, default=15)
+    parser.add_argument('--modulos', default='handlers.agente_iniciar',
+                        help='Módulos a importar, separados por coma')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    env.setdefault('AWS_ACCESS_KEY_ID', 'benchmark')
+    env.setdefault('AWS_SECRET_ACCESS_KEY', 'benchmark')
+
+    mediciones = []
+    for _ in range(args.corridas):
+        salida = subprocess.run(
+            [sys.executable, '-c', SCRIPT_HIJO, args.modulos],
+            cwd=RAIZ, env=env, capture_output=True, text=True, check=True
+        )
+        mediciones.append(json.loads(salida.stdout.strip().splitlines()[-1]))
+
+    print(f"\n❄️  Cold start ({args.corridas} corridas, mediana)")
+    for fase in ('imports', 'init'):
+        valores = [m[fase] for m in mediciones]
+        print(f"  {fase:<8} {statistics.median(valores):8.1f} ms  (min {min(valores):.1f}, max {max(valores):.1f})")
+    total = [m['imports'] + m['init'] for m in mediciones]
+    print(f"  {'total':<8} {statistics.median(total):8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
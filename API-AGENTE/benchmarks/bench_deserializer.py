@@ -0,0 +1,102 @@
+"""
+Microbenchmark: deserialización de items DynamoDB
+
+Compara la conversión actual (TypeDeserializer del recurso boto3 ->
+Decimal -> BaseDAO._decimal_to_float / convert_decimal de API-RECETAS)
+con dao.deserializer, que convierte el formato wire en una sola pasada.
+
+Usa los datos de DataGenerator/example-data (historial_medico y recetas)
+serializados a formato wire, tal como los devuelve el cliente.
+
+Uso:
+    cd API-AGENTE
+    python benchmarks/bench_deserializer.py [--repeticiones 200]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from dao.base import BaseDAO
+from dao.deserializer import deserializar_item
+
+EXAMPLE_DATA = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'DataGenerator', 'example-data'
+)
+
+_deserializer = TypeDeserializer()
+_serializer = TypeSerializer()
+
+
+def convert_decimal(obj):
+    """Copia de la conversión que usaban listarRecetas/obtenerReceta/actualizarReceta"""
+    if isinstance(obj, Decimal):
+        if obj % 1 == 0:
+            return int(obj)
+        else:
+            return float(obj)
+    if isinstance(obj, list):
+        return [convert_decimal(i) for i in obj]
+    if isinstance(obj, dict):
+        return {k: convert_decimal(v) for k, v in obj.items()}
+    return obj
+
+
+def cargar_items_wire(archivo: str):
+    """Lee un JSON de ejemplo y lo convierte a formato wire de DynamoDB"""
+    with open(os.path.join(EXAMPLE_DATA, archivo), encoding='utf-8') as f:
+        items = json.load(f, parse_float=Decimal)
+    return [{k: _serializer.serialize(v) for k, v in item.items()} for item in items]
+
+
+def via_recurso_agente(items):
+    return [
+        BaseDAO._decimal_to_float({k: _deserializer.deserialize(v) for k, v in item.items()})
+        for item in items
+    ]
+
+
+def via_recurso_recetas(items):
+    return [
+        convert_decimal({k: _deserializer.deserialize(v) for k, v in item.items()})
+        for item in items
+    ]
+
+
+def via_deserializador(items):
+    return [deserializar_item(item) for item in items]
+
+
+def medir(nombre, funcion, items, repeticiones):
+    segundos = min(timeit.repeat(lambda: funcion(items), number=repeticiones, repeat=5))
+    por_item_us = segundos / (repeticiones * len(items)) * 1e6
+    print(f"  {nombre:<42} {por_item_us:8.2f} µs/item")
+    return por_item_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--repeticiones', type=int, default=200)
+    args = parser.parse_args()
+
+    casos = [
+        ('historial_medico', 'historial_medico.json', via_recurso_agente, 'TypeDeserializer + _decimal_to_float'),
+        ('recetas', 'recetas.json', via_recurso_recetas, 'TypeDeserializer + convert_decimal'),
+    ]
+
+    for tabla, archivo, actual, descripcion in casos:
+        items = cargar_items_wire(archivo)
+        print(f"\n📊 {tabla} ({len(items)} items)")
+        base = medir(descripcion, actual, items, args.repeticiones)
+        nuevo = medir('dao.deserializer.deserializar_item', via_deserializador, items, args.repeticiones)
+        print(f"  Speedup: {base / nuevo:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark: estadísticas del historial, bucle de Python vs. NumPy
+
+Compara el cálculo actual (utils/agregados_historial.agregar_por_dia +
+estadisticas, registro por registro y usuario por usuario) con
+utils/estadisticas_historial, que además calcula percentiles, promedio
+móvil, tendencia, perfil semanal y días faltantes.
+
+Los datos son sintéticos: un registro por usuario y día durante --dias
+días, con ~10% de días sin registro y ~30% de registros sin ritmo
+cardíaco. Arriba de --max-dicts filas no se arman los dicts (ocuparían
+decenas de GB): el tiempo del bucle se extrapola linealmente desde el
+mayor tamaño medido y se marca con '~'.
+
+Uso:
+    cd API-AGENTE
+    python benchmarks/bench_estadisticas.py [--filas 1000 100000 10000000] [--dias 90] [--max-dicts 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from utils import agregados_historial, estadisticas_historial
+
+INICIO = estadisticas_historial.dia_epoch('2024-01-01')
+
+
+def generar_arrays(filas: int, dias: int, semilla: int = 7):
+    """Columnas sintéticas: usuario, día y valores (pasos, sueño, fc)"""
+    rng = np.random.default_rng(semilla)
+    usuarios = max(1, filas // dias)
+    usuario = np.arange(filas, dtype=np.int32) % usuarios
+    dia = (INICIO + np.arange(filas) // usuarios).astype(np.int32)
+    valores = np.column_stack([
+        rng.normal(7000, 2500, filas).clip(0),
+        rng.normal(7.2, 1.1, filas).clip(3, 11),
+        rng.normal(70, 8, filas)
+    ])
+    valores[rng.random(filas) < 0.3, 2] = np.nan
+    conservar = rng.random(filas) >= 0.1
+    correos = [f"usuario{i}@example.com" for i in range(usuarios)]
+    return correos, usuario[conservar], dia[conservar], valores[conservar]
+
+
+def como_registros(correos, usuario, dia, valores):
+    """Los mismos datos como registros de DynamoDB (dicts)"""
+    fechas = np.datetime_as_string(dia.astype('datetime64[D]'))
+    registros = []
+    for u, fecha, (pasos, sueno, fc) in zip(usuario.tolist(), fechas.tolist(), valores.tolist()):
+        wearables = {'pasos': int(pasos), 'horas_de_sueno': round(sueno, 1)}
+        if fc == fc:
+            wearables['ritmo_cardiaco'] = int(fc)
+        registros.append({'correo': correos[u], 'fecha': f"{fecha}T08:00:00", 'wearables': wearables})
+    return registros
+
+
+def bucle_actual(registros):
+    """Cálculo actual: agrupar por usuario y recorrer sus registros"""
+    por_usuario = defaultdict(list)
+    for registro in registros:
+        por_usuario[registro['correo']].append(registro)
+    return {
+        correo: agregados_historial.estadisticas(agregados_historial.agregar_por_dia(propios))
+        for correo, propios in por_usuario.items()
+    }
+
+
+def numpy_desde(columnas):
+    return estadisticas_historial.analizar(estadisticas_historial.matriz_diaria(columnas))
+
+
+def medir(funcion, *args, repeticiones: int = 3) -> float:
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(*args)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def formatear(segundos: float, extrapolado: bool = False) -> str:
+    texto = f"{segundos * 1000:,.1f} ms" if segundos < 1 else f"{segundos:,.2f} s"
+    return f"~{texto}" if extrapolado else texto
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--filas', type=int, nargs='+', default=[1_000, 100_000, 10_000_000])
+    parser.add_argument('--dias', type=int, default=90)
+    parser.add_argument('--max-dicts', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    print(f"{'filas':>12} {'usuarios':>9} {'bucle actual':>14} {'NumPy (dicts)':>14} {'NumPy (arrays)':>15} {'speedup':>8}")
+    bucle_por_fila = None
+    for filas in args.filas:
+        correos, usuario, dia, valores = generar_arrays(filas, args.dias)
+        repeticiones = 3 if filas <= 100_000 else 1
+
+        arrays = medir(
+            lambda: numpy_desde(estadisticas_historial.columnas_arrays(correos, usuario, dia, valores)),
+            repeticiones=repeticiones
+        )
+
+        if filas <= args.max_dicts:
+            registros = como_registros(correos, usuario, dia, valores)
+            bucle = medir(bucle_actual, registros, repeticiones=repeticiones)
+            dicts = medir(
+                lambda: numpy_desde(estadisticas_historial.columnas_registros(registros)),
+                repeticiones=repeticiones
+            )
+            bucle_por_fila = bucle / len(registros)
+            del registros
+            extrapolado = False
+        else:
+            bucle = bucle_por_fila * len(usuario) if bucle_por_fila else float('nan')
+            dicts = float('nan')
+            extrapolado = True
+
+        print(
+            f"{len(usuario):>12,} {len(correos):>9,} {formatear(bucle, extrapolado):>14} "
+            f"{formatear(dicts) if dicts == dicts else '-':>14} {formatear(arrays):>15} "
+            f"{bucle / arrays:>7.0f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: ventana del historial como dicts vs. HistorialSeries
+
+Para --usuarios usuarios con --registros registros cada uno (p. ej. 30
+días de lecturas horarias) mide, a partir de las páginas en formato wire
+que devuelve el cliente de bajo nivel:
+
+    - recurso: TypeDeserializer + BaseDAO._decimal_to_float
+    - bajo nivel: dao.deserializer.deserializar_item
+    - serie: HistorialSeries.desde_paginas
+
+el tiempo de construcción, la memoria que queda retenida (tracemalloc) y
+el tiempo de los agregados diarios (agregar_por_dia vs. diarios()).
+
+Uso:
+    cd API-AGENTE
+    python benchmarks/bench_historial_series.py [--usuarios 200] [--registros 720]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from boto3.dynamodb.types import TypeDeserializer
+
+from dao.base import BaseDAO
+from dao.deserializer import deserializar_item
+from dao.historial_series import HistorialSeries
+from utils import agregados_historial
+
+_deserializer = TypeDeserializer()
+
+PAGINA = 100
+
+
+def paginas_wire(correo: str, registros: int, semilla: int):
+    """Páginas de un usuario como las devuelve Query (ascendente, 1 registro por hora)"""
+    aleatorio = random.Random(semilla)
+    inicio = datetime(2024, 11, 1)
+    items = []
+    for i in range(registros):
+        item = {
+            'correo': {'S': correo},
+            'fecha': {'S': (inicio + timedelta(hours=i)).isoformat()},
+            'sensores': {'M': {
+                'pasos': {'N': str(aleatorio.randint(0, 800))},
+                'horas_de_sueno': {'N': str(aleatorio.randint(0, 1))}
+            }}
+        }
+        if aleatorio.random() < 0.5:
+            item['wearables'] = {'M': {
+                'pasos': {'N': str(aleatorio.randint(0, 900))},
+                'ritmo_cardiaco': {'N': str(aleatorio.randint(55, 110))},
+                'horas_de_sueno': {'N': str(aleatorio.randint(0, 1))}
+            }}
+        items.append(item)
+    return [items[i:i + PAGINA] for i in range(0, len(items), PAGINA)]
+
+
+def via_recurso(correo, paginas):
+    return [
+        BaseDAO._decimal_to_float({k: _deserializer.deserialize(v) for k, v in item.items()})
+        for items in paginas for item in items
+    ]
+
+
+def via_bajo_nivel(correo, paginas):
+    return [deserializar_item(item) for items in paginas for item in items]
+
+
+def via_serie(correo, paginas):
+    return HistorialSeries.desde_paginas(correo, paginas)
+
+
+def diarios(ventana):
+    if isinstance(ventana, HistorialSeries):
+        return ventana.diarios()
+    return agregados_historial.agregar_por_dia(ventana)
+
+
+def medir(nombre, construir, usuarios):
+    gc.collect()
+    inicio = time.perf_counter()
+    ventanas = [construir(correo, paginas) for correo, paginas in usuarios]
+    construccion = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for ventana in ventanas:
+        diarios(ventana)
+    agregados = time.perf_counter() - inicio
+    registros = sum(len(ventana) for ventana in ventanas)
+    del ventanas
+
+    # Memoria en una pasada aparte: tracemalloc hace más lenta la construcción
+    gc.collect()
+    tracemalloc.start()
+    ventanas = [construir(correo, paginas) for correo, paginas in usuarios]
+    retenida = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del ventanas
+
+    print(
+        f"  {nombre:<12} {construccion * 1000:9.1f} ms {retenida / 2 ** 20:9.1f} MiB "
+        f"{retenida / registros:8.0f} B/registro {agregados * 1000:10.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--usuarios', type=int, default=200)
+    parser.add_argument('--registros', type=int, default=720)
+    args = parser.parse_args()
+
+    usuarios = [
+        (f"usuario{i}@example.com", paginas_wire(f"usuario{i}@example.com", args.registros, i))
+        for i in range(args.usuarios)
+    ]
+    print(f"\n📊 {args.usuarios} usuarios × {args.registros} registros")
+    print(f"  {'':<12} {'construir':>12} {'retenida':>13} {'':>19} {'diarios':>13}")
+    medir('recurso', via_recurso, usuarios)
+    medir('bajo nivel', via_bajo_nivel, usuarios)
+    medir('serie', via_serie, usuarios)
+
+
+if __name__ == '__main__':
+    main()
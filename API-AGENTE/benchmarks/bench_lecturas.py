@@ -0,0 +1,124 @@
+"""
+Benchmark: lecturas de alta frecuencia, un item por lectura vs. bloques
+
+Para --dias días de lecturas cada --cada segundos de una métrica (ritmo
+cardíaco sintético: paseo aleatorio entre 50 y 150) compara:
+
+    - un item por lectura en historial_medico ({correo, fecha, wearables})
+    - bloques por hora y por día de dao/historial_lecturas_dao.py
+
+en cantidad de items, bytes almacenados (tamaño de item según las reglas
+de DynamoDB: nombres de atributo + valores) y WCU para escribirlo todo una
+vez; además el tiempo de codificar y decodificar con utils/codec_lecturas.py.
+
+Uso:
+    cd API-AGENTE
+    python benchmarks/bench_lecturas.py [--dias 30] [--cada 60]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from utils import codec_lecturas
+
+CORREO = 'usuario@example.com'
+
+
+def tamano_numero(valor) -> int:
+    """Bytes de un N de DynamoDB: ~1 byte por cada 2 dígitos significativos + 1"""
+    digitos = len(str(abs(valor)).replace('.', '').strip('0')) or 1
+    return (digitos + 1) // 2 + 1
+
+
+def tamano_item(item) -> int:
+    total = 0
+    for nombre, valor in item.items():
+        total += len(nombre.encode())
+        if isinstance(valor, str):
+            total += len(valor.encode())
+        elif isinstance(valor, (bytes, bytearray)):
+            total += len(valor)
+        elif isinstance(valor, dict):
+            total += 3 + tamano_item(valor) + len(valor)
+        else:
+            total += tamano_numero(valor)
+    return total
+
+
+def generar(dias: int, cada: int, semilla: int = 7):
+    aleatorio = random.Random(semilla)
+    valor = 75
+    segundos = list(range(0, dias * 86400, cada))
+    valores = []
+    for _ in segundos:
+        valor = min(150, max(50, valor + aleatorio.randint(-3, 3)))
+        valores.append(valor)
+    return segundos, valores
+
+
+def por_lectura(segundos, valores):
+    inicio = datetime(2024, 11, 1)
+    return [
+        {'correo': CORREO, 'fecha': (inicio + timedelta(seconds=s)).isoformat(), 'wearables': {'ritmo_cardiaco': v}}
+        for s, v in zip(segundos, valores)
+    ]
+
+
+def por_bloque(segundos, valores, duracion: int):
+    bloques = {}
+    for s, v in zip(segundos, valores):
+        bloques.setdefault(s - s % duracion, ([], []))
+        bloques[s - s % duracion][0].append(s % duracion)
+        bloques[s - s % duracion][1].append(v)
+    items = []
+    for inicio, (offsets, vals) in bloques.items():
+        items.append({
+            'correo': CORREO, 'bloque': 'fc#2024-11-01T00', 'inicio': '2024-11-01T00:00:00',
+            'inicio_s': 1730419200 + inicio, 'duracion': duracion, 'escala': 1,
+            'n': len(vals), 'suma': sum(vals), 'min': min(vals), 'max': max(vals),
+            'ultimo': offsets[-1], 'ultimo_valor': vals[-1],
+            'datos': codec_lecturas.codificar(offsets, vals), 'escrituras': 1
+        })
+    return items
+
+
+def reportar(nombre, items):
+    tamanos = [tamano_item(item) for item in items]
+    wcu = sum(math.ceil(t / 1024) for t in tamanos)
+    print(f"  {nombre:<16} {len(items):>9,} items {sum(tamanos) / 2 ** 20:9.2f} MiB {wcu:>10,} WCU {max(tamanos):>8,} B máx")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--dias', type=int, default=30)
+    parser.add_argument('--cada', type=int, default=60, help='Segundos entre lecturas')
+    args = parser.parse_args()
+
+    segundos, valores = generar(args.dias, args.cada)
+    print(f"\n📊 {len(segundos):,} lecturas ({args.dias} días, una cada {args.cada} s)")
+    reportar('item por lectura', por_lectura(segundos, valores))
+    reportar('bloque por hora', por_bloque(segundos, valores, 3600))
+    reportar('bloque por día', por_bloque(segundos, valores, 86400))
+
+    inicio = time.perf_counter()
+    bloques = [codec_lecturas.codificar(list(range(0, 86400, args.cada)), valores[i:i + 86400 // args.cada])
+               for i in range(0, len(valores), 86400 // args.cada)]
+    codificar = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for bloque in bloques:
+        codec_lecturas.decodificar(bloque)
+    decodificar = time.perf_counter() - inicio
+    print(
+        f"  codec: codificar {codificar * 1e9 / len(segundos):.0f} ns/lectura, "
+        f"decodificar {decodificar * 1e9 / len(segundos):.0f} ns/lectura"
+    )
+
+
+if __name__ == '__main__':
+    main()
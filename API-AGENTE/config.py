@@ -2,7 +2,7 @@
 Configuración centralizada para el microservicio API-AGENTE
 """
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 class Config:
     """Configuración centralizada del microservicio"""
@@ -13,16 +13,165 @@ class Config:
     TABLE_SERVICIOS = os.getenv('TABLE_SERVICIOS', 'servicios')
     TABLE_HISTORIAL = os.getenv('TABLE_HISTORIAL_MEDICO', 'historial_medico')
     TABLE_MEMORIA = os.getenv('TABLE_MEMORIA_CONTEXTUAL', 'memoria_contextual')
+    # Capa compartida de la caché de respuestas del LLM (vacío = solo caché local)
+    TABLE_CACHE_RESPUESTAS = os.getenv('TABLE_CACHE_RESPUESTAS', '')
+    # Documento de contexto materializado por usuario (vacío = sin documento)
+    TABLE_CONTEXTO_USUARIO = os.getenv('TABLE_CONTEXTO_USUARIO', '')
+    # Agregados del historial por día/semana/mes (vacío = sin agregados)
+    TABLE_HISTORIAL_AGREGADOS = os.getenv('TABLE_HISTORIAL_AGREGADOS', '')
+    # Lecturas de alta frecuencia en bloques por hora/día (vacío = sin lecturas)
+    TABLE_HISTORIAL_LECTURAS = os.getenv('TABLE_HISTORIAL_LECTURAS', '')
+    
+    # Esquema de claves (partition_key, sort_key) de cada tabla.
+    # Debe coincidir con DataGenerator/create_tables.py y schemas-validation/
+    TABLA_CLAVES: Dict[str, Tuple[str, Optional[str]]] = {
+        TABLE_USUARIOS: ('correo', None),
+        TABLE_RECETAS: ('correo', 'receta_id'),
+        TABLE_SERVICIOS: ('nombre', None),
+        TABLE_HISTORIAL: ('correo', 'fecha'),
+        TABLE_MEMORIA: ('correo', 'context_id'),
+        TABLE_CACHE_RESPUESTAS or 'cache_respuestas': ('clave', None),
+        TABLE_CONTEXTO_USUARIO or 'contexto_usuario': ('correo', None),
+        TABLE_HISTORIAL_AGREGADOS or 'historial_agregados': ('correo', 'periodo'),
+        TABLE_HISTORIAL_LECTURAS or 'historial_lecturas': ('correo', 'bloque')
+    }
+    
+    # Lecturas con el cliente de bajo nivel y deserializador propio (sin Decimal)
+    DYNAMODB_LOW_LEVEL = os.getenv('DYNAMODB_LOW_LEVEL', 'false').lower() == 'true'
+    
+    # Clave HMAC de los cursores de paginación (dao/pagination.py); vacía =
+    # una clave por contenedor y los cursores no sirven en otro contenedor
+    CURSOR_SECRETO = os.getenv('CURSOR_SECRETO', '')
+    
+    # Estadísticas por request en los logs (cachés, identity map, herramientas);
+    # las métricas EMF ya las reportan, así que solo para depurar
+    LOG_DEBUG = os.getenv('LOG_DEBUG', 'false').lower() == 'true'
     
     # API Configuration
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.0-flash')
+    # Si se define, Gemini se consume por REST en esta URL (stand-in local)
+    GEMINI_BASE_URL = os.getenv('GEMINI_BASE_URL')
+    
+    # Caché explícita de Gemini para el prefijo estático de cada contexto.
+    # Requiere un modelo con versión fija (p. ej. 'gemini-2.0-flash-001')
+    GEMINI_CACHE_CONTEXTO = os.getenv('GEMINI_CACHE_CONTEXTO', 'false').lower() == 'true'
+    GEMINI_CACHE_TTL = float(os.getenv('GEMINI_CACHE_TTL', '3600'))  # segundos
+    GEMINI_CACHE_MARGEN = float(os.getenv('GEMINI_CACHE_MARGEN', '300'))  # renovar antes de vencer
+    GEMINI_CACHE_MIN_TOKENS = int(os.getenv('GEMINI_CACHE_MIN_TOKENS', '1024'))
+    GEMINI_CACHE_REINTENTO = float(os.getenv('GEMINI_CACHE_REINTENTO', '300'))  # tras un fallo
+    
+    # Cliente resiliente del LLM (services/cliente_llm.py). El plazo de cada
+    # invocación sale de context.get_remaining_time_in_millis()
+    GEMINI_MODEL_RAPIDO = os.getenv('GEMINI_MODEL_RAPIDO', 'gemini-2.0-flash-lite')  # '' = sin degradar
+    LLM_RESERVA_SEGUNDOS = float(os.getenv('LLM_RESERVA_SEGUNDOS', '2'))  # para guardar memoria y responder
+    LLM_PLAZO_DEFECTO = float(os.getenv('LLM_PLAZO_DEFECTO', '25'))  # sin context de Lambda
+    LLM_TIMEOUT_INTENTO = float(os.getenv('LLM_TIMEOUT_INTENTO', '20'))  # segundos por intento
+    LLM_TIMEOUT_MINIMO = float(os.getenv('LLM_TIMEOUT_MINIMO', '1.5'))  # no se intenta con menos
+    LLM_MAX_REINTENTOS = int(os.getenv('LLM_MAX_REINTENTOS', '2'))
+    LLM_BACKOFF_BASE = float(os.getenv('LLM_BACKOFF_BASE', '0.25'))  # segundos
+    LLM_BACKOFF_MAX = float(os.getenv('LLM_BACKOFF_MAX', '2.0'))  # segundos
+    LLM_UMBRAL_DEGRADAR = float(os.getenv('LLM_UMBRAL_DEGRADAR', '8'))  # segundos restantes
+    # Segunda request si la primera supera el p95 observado (duplica costo)
+    LLM_HEDGING = os.getenv('LLM_HEDGING', 'false').lower() == 'true'
+    LLM_HEDGING_MIN_MUESTRAS = int(os.getenv('LLM_HEDGING_MIN_MUESTRAS', '20'))
+    LLM_HEDGING_WORKERS = int(os.getenv('LLM_HEDGING_WORKERS', '4'))  # pool propio, no el de lecturas
+    LLM_CIRCUITO_FALLOS = int(os.getenv('LLM_CIRCUITO_FALLOS', '5'))  # fallos seguidos para abrir
+    LLM_CIRCUITO_ESPERA = float(os.getenv('LLM_CIRCUITO_ESPERA', '30'))  # segundos abierto
+    
+    # Clasificador local de intención (services/clasificador_intencion.py)
+    INTENCION_RESPUESTAS_DIRECTAS = os.getenv('INTENCION_RESPUESTAS_DIRECTAS', 'true').lower() == 'true'
+    INTENCION_UMBRAL = float(os.getenv('INTENCION_UMBRAL', '0.55'))  # por debajo: consulta_general
+    INTENCION_UMBRAL_PLANTILLA = float(os.getenv('INTENCION_UMBRAL_PLANTILLA', '0.8'))
+    INTENCION_MAX_PALABRAS_PLANTILLA = int(os.getenv('INTENCION_MAX_PALABRAS_PLANTILLA', '8'))
+    INTENCION_MODELO_PATH = os.getenv(
+        'INTENCION_MODELO_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'services', 'intenciones_modelo.json')
+    )
+    
+    # Motor del agente: 'precargado' (tablas del contexto en el prompt) o
+    # 'herramientas' (el modelo pide los datos vía function calling)
+    AGENTE_MODO = os.getenv('AGENTE_MODO', 'precargado')
+    MAX_RONDAS_HERRAMIENTAS = int(os.getenv('MAX_RONDAS_HERRAMIENTAS', '3'))
+    LIMITE_ITEMS_HERRAMIENTA = int(os.getenv('LIMITE_ITEMS_HERRAMIENTA', '20'))
+    
+    # Tokens máximos de la parte variable del prompt (usuario, memoria, datos);
+    # el prefijo estático no cuenta. Presupuestos por sección en BaseContexto
+    PRESUPUESTO_TOKENS_PROMPT = int(os.getenv('PRESUPUESTO_TOKENS_PROMPT', '2500'))
     
     # Límites de consulta
     LIMITE_HISTORIAL = int(os.getenv('LIMITE_HISTORIAL', '30'))
     LIMITE_MEMORIA = int(os.getenv('LIMITE_MEMORIA', '10'))
     LIMITE_SERVICIOS = int(os.getenv('LIMITE_SERVICIOS', '20'))
     
+    # Caché de catálogos (segundos); sobrevive entre invocaciones calientes
+    CACHE_TTL_SERVICIOS = float(os.getenv('CACHE_TTL_SERVICIOS', '300'))
+    CACHE_STALE_SERVICIOS = float(os.getenv('CACHE_STALE_SERVICIOS', '900'))
+    CACHE_MAX_ENTRADAS = int(os.getenv('CACHE_MAX_ENTRADAS', '128'))
+    
+    # Caché de respuestas del LLM: solo contextos cuya respuesta depende de
+    # datos que cambian poco; la clave incluye un digest de esos datos
+    CACHE_TTL_RESPUESTAS = float(os.getenv('CACHE_TTL_RESPUESTAS', '600'))  # segundos
+    CACHE_MAX_RESPUESTAS = int(os.getenv('CACHE_MAX_RESPUESTAS', '256'))
+    CACHE_RESPUESTAS_CONTEXTOS = [
+        c.strip() for c in os.getenv('CACHE_RESPUESTAS_CONTEXTOS', 'Servicios,Estadisticas').split(',') if c.strip()
+    ]
+    
+    # Snapshot de los datos de contexto por (usuario, contexto). Se invalida
+    # con los contadores version_* del usuario; el TTL acota lo que no tiene
+    # versión (servicios). 0 = sin snapshot
+    CACHE_TTL_CONTEXTO = float(os.getenv('CACHE_TTL_CONTEXTO', '60'))  # segundos
+    CACHE_MAX_CONTEXTOS = int(os.getenv('CACHE_MAX_CONTEXTOS', '256'))
+    
+    # Contenido del documento de contexto (services/documento_contexto.py)
+    DOCUMENTO_MAX_RECETAS = int(os.getenv('DOCUMENTO_MAX_RECETAS', '20'))
+    DOCUMENTO_DIAS_HISTORIAL = int(os.getenv('DOCUMENTO_DIAS_HISTORIAL', '30'))  # agregados diarios
+    DOCUMENTO_LECTURAS_RECIENTES = int(os.getenv('DOCUMENTO_LECTURAS_RECIENTES', '5'))  # registros crudos
+    
+    # Ingesta en lote del historial (handlers/agregar_historial_lote.py)
+    HISTORIAL_LOTE_MAX_REGISTROS = int(os.getenv('HISTORIAL_LOTE_MAX_REGISTROS', '10000'))
+    
+    # Series para gráficos (handlers/series_historial.py): registros crudos
+    # si el rango tiene a lo sumo SERIES_MAX_CRUDOS (sin tabla de agregados,
+    # si abarca a lo sumo SERIES_DIAS_CRUDOS días); si no, agregados por día,
+    # semana o mes, el más fino con a lo sumo SERIES_MAX_PERIODOS periodos.
+    # Sin agregados los periodos salen de los totales de los bloques de
+    # lecturas (TABLE_HISTORIAL_LECTURAS) o, sin esa tabla, de los registros
+    # crudos, y entonces el rango no puede pasar de SERIES_DIAS_SIN_AGREGADOS
+    SERIES_MAX_PUNTOS = int(os.getenv('SERIES_MAX_PUNTOS', '1000'))
+    SERIES_MAX_CRUDOS = int(os.getenv('SERIES_MAX_CRUDOS', '2000'))
+    SERIES_DIAS_CRUDOS = int(os.getenv('SERIES_DIAS_CRUDOS', '7'))
+    SERIES_MAX_PERIODOS = int(os.getenv('SERIES_MAX_PERIODOS', '731'))
+    SERIES_DIAS_SIN_AGREGADOS = int(os.getenv('SERIES_DIAS_SIN_AGREGADOS', '92'))
+    
+    # Duración de los bloques de lecturas: 'hora' o 'dia'. No cambiarla con
+    # datos cargados: dos bloques de distinta duración se solaparían
+    LECTURAS_BLOQUE = os.getenv('LECTURAS_BLOQUE', 'hora')
+    
+    # Transacción registro + agregados (y bloques de lecturas): reintentos si
+    # otro escritor los cambió
+    AGREGADOS_MAX_INTENTOS = int(os.getenv('AGREGADOS_MAX_INTENTOS', '5'))
+    
+    # BatchGetItem / BatchWriteItem: reintentos de UnprocessedKeys / UnprocessedItems
+    BATCH_MAX_INTENTOS = int(os.getenv('BATCH_MAX_INTENTOS', '5'))
+    BATCH_BACKOFF_BASE = float(os.getenv('BATCH_BACKOFF_BASE', '0.05'))  # segundos
+    BATCH_BACKOFF_MAX = float(os.getenv('BATCH_BACKOFF_MAX', '1.0'))  # segundos
+    
+    # Lecturas concurrentes de contexto
+    MAX_LECTURAS_CONCURRENTES = int(os.getenv('MAX_LECTURAS_CONCURRENTES', '8'))
+    TIMEOUT_LECTURAS_CONTEXTO = float(os.getenv('TIMEOUT_LECTURAS_CONTEXTO', '3.0'))  # segundos
+    
+    # Clientes AWS compartidos (botocore): un slot de pool por lectura
+    # concurrente más el hilo del handler y un refresco en segundo plano
+    AWS_MAX_POOL_CONNECTIONS = int(os.getenv('AWS_MAX_POOL_CONNECTIONS', str(max(10, MAX_LECTURAS_CONCURRENTES + 2))))
+    AWS_CONNECT_TIMEOUT = float(os.getenv('AWS_CONNECT_TIMEOUT', '2'))  # segundos
+    AWS_READ_TIMEOUT = float(os.getenv('AWS_READ_TIMEOUT', '5'))  # segundos
+    AWS_MAX_INTENTOS = int(os.getenv('AWS_MAX_INTENTOS', '3'))
+    
+    # Scan paralelo (lecturas de tabla completa)
+    SCAN_TOTAL_SEGMENTS = int(os.getenv('SCAN_TOTAL_SEGMENTS', '0')) or None  # None = 2 por núcleo
+    SCAN_MAX_RCU = float(os.getenv('SCAN_MAX_RCU', '0')) or None  # None = sin límite
+    
     # Configuración de contextos
     CONTEXTOS_DISPONIBLES = ['General', 'Servicios', 'Estadisticas', 'Recetas']
     
@@ -2,17 +2,66 @@
 Clase base abstracta para todos los contextos del agente
 """
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Type
 from dao.base import DAOFactory
+from utils.concurrencia import ejecutar_en_paralelo
+from utils.metricas import registrar_metrica
+from utils import agregados_historial
+from contextos.ensamblador_prompt import EnsambladorPrompt, Seccion
+from promts.base_prompt import BasePrompt
+from config import Config
+
+
+class Lectura(NamedTuple):
+    """
+    Lectura declarada por un contexto y su valor si no llega a tiempo
+    
+    `documento` obtiene el mismo valor del documento de contexto del usuario
+    (services/documento_contexto.py); lanza KeyError si la sección que usa
+    no está en el documento y entonces se ejecuta `cargar`. Una lectura sin
+    `cargar` solo existe en el documento y sin él queda en `default`.
+    """
+    cargar: Optional[Callable[[], Any]]
+    default: Any = None
+    documento: Optional[Callable[[Dict], Any]] = None
 
 
 class BaseContexto(ABC):
     """Clase base para procesadores de contexto"""
     
+    # Atributos que el prompt renderiza por lectura (ProjectionExpression).
+    # 'usuario' no se proyecta: se comparte completo vía identity map.
+    ATRIBUTOS: Dict[str, List[str]] = {
+        # 'origen' lo usa la caché de respuestas para ignorar la memoria del propio agente
+        'memoria': ['fecha', 'resumen_conversacion', 'intencion_detectada', 'origen']
+    }
+    
+    # Máximo de items por lectura (Limit en servidor)
+    LIMITES: Dict[str, int] = {
+        'memoria': 5  # _formatear_memoria muestra las últimas 5
+    }
+    
+    # Tokens máximos por sección del prompt (ver contextos/ensamblador_prompt.py)
+    PRESUPUESTOS: Dict[str, int] = {
+        'usuario': 100,
+        'memoria': 400,
+        'datos': 1500
+    }
+    
+    # Plantilla de promts/ con principios, formato y ejemplos del contexto
+    PROMPT: Optional[Type[BasePrompt]] = None
+    
+    RECORDATORIO = (
+        "Recuerda: Eres un asistente de acompañamiento médico. NO hagas diagnósticos ni prescripciones.\n"
+        "Analiza los datos disponibles y ofrece información contextual, apoyo emocional y orientación general."
+    )
+    
     def __init__(self):
         # Inicializar DAOs necesarios
         self.usuarios_dao = DAOFactory.get_dao('usuarios')
         self.memoria_dao = DAOFactory.get_dao('memoria')
+        self.documento_dao = DAOFactory.get_dao('documento_contexto') if Config.TABLE_CONTEXTO_USUARIO else None
     
     @abstractmethod
     def get_tablas_requeridas(self) -> List[str]:
@@ -24,6 +73,174 @@ class BaseContexto(ABC):
         """
         pass
     
+    def get_lecturas(self, correo: str) -> Dict[str, Lectura]:
+        """
+        Declara las lecturas que necesita el contexto
+        
+        Las subclases extienden este diccionario con sus propias lecturas;
+        todas se ejecutan concurrentemente en cargar_lecturas.
+        
+        Args:
+            correo: Email del usuario
+        
+        Returns:
+            Diccionario clave_en_datos -> Lectura
+        """
+        return {
+            'usuario': Lectura(
+                lambda: self.usuarios_dao.get_usuario(correo),
+                documento=lambda documento: documento['perfil']
+            ),
+            'memoria': Lectura(
+                lambda: self.memoria_dao.get_memoria_reciente(
+                    correo,
+                    limite=self.LIMITES.get('memoria'),
+                    atributos=self.ATRIBUTOS.get('memoria')
+                ),
+                [],
+                documento=lambda documento: documento['memoria'][:self.LIMITES.get('memoria')]
+            )
+        }
+    
+    def cargar_lecturas(
+        self,
+        correo: str,
+        timeout: Optional[float] = None,
+        lecturas: Optional[Dict[str, Lectura]] = None
+    ) -> Dict:
+        """
+        Ejecuta concurrentemente las lecturas declaradas
+        
+        Si el documento de contexto del usuario está disponible, las
+        lecturas que lo admiten salen de él (un solo GetItem) y solo las
+        demás van a sus tablas. Si alguna lectura falla o excede el timeout
+        se usa su valor por defecto y su nombre queda en
+        'lecturas_incompletas', de modo que el agente responde con contexto
+        parcial en lugar de fallar.
+        
+        Args:
+            correo: Email del usuario
+            timeout: Segundos máximos (default: Config.TIMEOUT_LECTURAS_CONTEXTO)
+            lecturas: Lecturas a ejecutar (default: get_lecturas)
+        
+        Returns:
+            Diccionario con el resultado de cada lectura
+        """
+        if lecturas is None:
+            lecturas = self.get_lecturas(correo)
+        
+        desde_documento = self._lecturas_desde_documento(correo, lecturas)
+        resultados, fallidas = ejecutar_en_paralelo(
+            {
+                nombre: lectura.cargar for nombre, lectura in lecturas.items()
+                if nombre not in desde_documento and lectura.cargar is not None
+            },
+            timeout=timeout or Config.TIMEOUT_LECTURAS_CONTEXTO
+        )
+        resultados.update(desde_documento)
+        
+        datos = {
+            nombre: resultados.get(nombre, lectura.default)
+            for nombre, lectura in lecturas.items()
+        }
+        if fallidas:
+            datos['lecturas_incompletas'] = fallidas
+        
+        return datos
+    
+    def _lecturas_desde_documento(self, correo: str, lecturas: Dict[str, Lectura]) -> Dict[str, Any]:
+        """
+        Valores de las lecturas que se resuelven con el documento de contexto
+        
+        Solo se usan las secciones al día con los contadores version_* del
+        usuario. El documento y el usuario se piden en un solo BatchGetItem
+        (el usuario sale del identity map si la request ya lo leyó).
+        
+        Returns:
+            Diccionario nombre -> valor; vacío si no hay documento
+        """
+        if self.documento_dao is None or not any(l.documento for l in lecturas.values()):
+            return {}
+        
+        leidos = DAOFactory.batch_get({
+            self.documento_dao: [(correo, None)],
+            self.usuarios_dao: [(correo, None)]
+        })
+        documento = leidos[self.documento_dao][0]
+        documento = self.documento_dao.vigente(
+            documento if self.documento_dao.completo(documento) else None,
+            leidos[self.usuarios_dao][0]
+        )
+        if documento is None:
+            return {}
+        
+        valores = {}
+        for nombre, lectura in lecturas.items():
+            if lectura.documento is None:
+                continue
+            try:
+                valores[nombre] = lectura.documento(documento)
+            except KeyError:
+                pass  # Sección atrasada: se lee de la tabla
+        return valores
+    
+    @staticmethod
+    def _historial_documento(documento: Dict, dias: int, limite: Optional[int] = None) -> List[Dict]:
+        """Últimos registros crudos del documento dentro de los `dias` días"""
+        fecha_limite = (datetime.now() - timedelta(days=dias)).isoformat()
+        registros = [r for r in documento['historial_ultimos'] if r.get('fecha', '') >= fecha_limite]
+        return registros[:limite] if limite else registros
+    
+    @staticmethod
+    def _filas_historial(historial, cantidad: int) -> List[Tuple[str, Optional[float], Optional[float], Optional[float]]]:
+        """
+        (fecha, pasos, sueño, fc) de los registros más recientes
+        
+        Acepta una lista de registros (más reciente primero) o una
+        HistorialSeries; en la serie solo se leen las filas pedidas.
+        """
+        if hasattr(historial, 'filas_recientes'):
+            return list(historial.filas_recientes(cantidad))
+        filas = []
+        for registro in (historial or [])[:cantidad]:
+            valores = agregados_historial.valores_registro(registro)
+            filas.append((
+                str(registro.get('fecha', 'Desconocida')),
+                valores.get('pasos'),
+                valores.get('sueno'),
+                valores.get('fc')
+            ))
+        return filas
+    
+    def agregar_memoria(self, datos: Dict, memoria: Dict) -> Dict:
+        """
+        Copia de los datos del contexto con una memoria recién guardada
+        
+        Reproduce la lectura 'memoria' de get_lecturas (mismos atributos,
+        orden por context_id descendente y límite) para actualizar un
+        snapshot sin volver a consultar la tabla.
+        
+        Args:
+            datos: Resultado de build_context_data
+            memoria: Registro completo que se acaba de escribir
+        
+        Returns:
+            Diccionario nuevo (no modifica `datos`)
+        """
+        atributos = self.ATRIBUTOS.get('memoria')
+        if atributos:
+            # La proyección siempre incluye las claves (ver BaseDAO._build_projection)
+            atributos = set(atributos) | set(self.memoria_dao.key_schema.attribute_names)
+        nueva = {k: v for k, v in memoria.items() if not atributos or k in atributos}
+        memorias = [
+            m for m in datos.get('memoria') or []
+            if m.get('context_id') != memoria.get('context_id')
+        ]
+        memorias.append(nueva)
+        memorias.sort(key=lambda m: m.get('context_id', ''), reverse=True)
+        limite = self.LIMITES.get('memoria') or Config.LIMITE_MEMORIA
+        return {**datos, 'memoria': memorias[:limite]}
+    
     @abstractmethod
     def build_context_data(self, correo: str) -> Dict:
         """
@@ -51,47 +268,113 @@ class BaseContexto(ABC):
         self, 
         usuario: Dict, 
         memoria: List[Dict], 
-        datos_contexto: Dict
+        datos_contexto: Dict,
+        incluir_estatico: bool = True
     ) -> str:
         """
         Construye las instrucciones completas del prompt incluyendo datos del usuario
         
+        La parte estática (get_prompt_estatico) va primero y sin recortes;
+        usuario, memoria y datos se ajustan a PRESUPUESTOS y a
+        Config.PRESUPUESTO_TOKENS_PROMPT. Los tokens por sección se emiten
+        como métrica en cada llamada.
+        
         Args:
             usuario: Datos del usuario
             memoria: Historial de conversaciones
             datos_contexto: Datos específicos del contexto
+            incluir_estatico: False para devolver solo la parte variable,
+                cuando la estática viaja como contenido cacheado en Gemini
         
         Returns:
             Prompt completo formateado
         """
-        system_prompt = self.get_system_prompt()
+        secciones = [
+            Seccion('sistema', [self.get_prompt_estatico()] if incluir_estatico else [], fija=True),
+            Seccion(
+                'usuario',
+                [self._formatear_contexto_usuario(usuario).strip()],
+                encabezado='--- INFORMACIÓN DEL USUARIO ---',
+                presupuesto=self.PRESUPUESTOS.get('usuario'),
+                prioridad=1
+            ),
+            Seccion(
+                'memoria',
+                self._items_memoria(memoria) or ["No hay conversaciones previas registradas."],
+                encabezado='--- MEMORIA DE CONVERSACIONES ANTERIORES ---',
+                presupuesto=self.PRESUPUESTOS.get('memoria'),
+                prioridad=3,
+                resumen=lambda n: f"(+{n} conversaciones anteriores omitidas)"
+            ),
+            Seccion(
+                'datos',
+                self._items_datos_contexto(datos_contexto),
+                encabezado='--- DATOS DEL CONTEXTO ACTUAL ---',
+                presupuesto=self.PRESUPUESTOS.get('datos'),
+                prioridad=2,
+                resumen=self._resumen_datos_omitidos
+            )
+        ]
         
-        # Construir contexto del usuario
-        contexto_usuario = self._formatear_contexto_usuario(usuario)
+        prompt_completo, reporte = EnsambladorPrompt(Config.PRESUPUESTO_TOKENS_PROMPT).ensamblar(secciones)
+        registrar_metrica(
+            'TokensPrompt',
+            reporte['tokens_total'],
+            unidad='Count',
+            dimensiones={'Contexto': type(self).__name__.replace('Contexto', '')},
+            propiedades=reporte
+        )
+        return prompt_completo
+    
+    def get_prompt_estatico(self, extendido: bool = False) -> str:
+        """
+        Prefijo estático del prompt: idéntico en todas las requests del contexto
         
-        # Construir memoria contextual
-        contexto_memoria = self._formatear_memoria(memoria)
+        Args:
+            extendido: Incluir también los principios, el formato y los
+                ejemplos de la plantilla de promts/. Se usa con la caché
+                explícita de Gemini, donde el prefijo largo casi no cuesta
         
-        # Construir datos específicos del contexto  
-        contexto_datos = self._formatear_datos_contexto(datos_contexto)
+        Returns:
+            Texto del prefijo
+        """
+        partes = []
+        if extendido and self.PROMPT is not None:
+            plantilla = self.PROMPT()
+            partes.extend([
+                plantilla.prompt_sistema.strip(),
+                plantilla.get_instrucciones_formato().strip(),
+                plantilla.get_ejemplos_interaccion().strip()
+            ])
+        partes.extend([self.get_system_prompt().strip(), self.RECORDATORIO])
+        return "\n\n".join(partes)
+    
+    def get_prompt_herramientas(self, usuario: Dict) -> str:
+        """
+        Instrucciones del modo herramientas: sin datos precargados
+        
+        Los datos del usuario no se serializan en el prompt; el modelo los
+        pide con las funciones declaradas solo si la pregunta los necesita.
+        
+        Args:
+            usuario: Datos del usuario
         
-        # Ensamblar prompt completo
-        prompt_completo = f"""
-{system_prompt}
+        Returns:
+            Prompt del sistema
+        """
+        return f"""
+{self.get_system_prompt()}
 
 --- INFORMACIÓN DEL USUARIO ---
-{contexto_usuario}
-
---- MEMORIA DE CONVERSACIONES ANTERIORES ---
-{contexto_memoria}
+{self._formatear_contexto_usuario(usuario)}
 
---- DATOS DEL CONTEXTO ACTUAL ---
-{contexto_datos}
+--- DATOS DEL USUARIO ---
+No vienen incluidos. Si la pregunta necesita recetas, historial, conversaciones anteriores
+o servicios, consúltalos con las funciones disponibles; si no, responde directamente.
+Fecha de hoy: {date.today().isoformat()}
 
 Recuerda: Eres un asistente de acompañamiento médico. NO hagas diagnósticos ni prescripciones.
-Analiza los datos disponibles y ofrece información contextual, apoyo emocional y orientación general.
 """
-        return prompt_completo
     
     def _formatear_contexto_usuario(self, usuario: Dict) -> str:
         """Formatea la información básica del usuario"""
@@ -109,8 +392,12 @@ Rol: {usuario.get('role', 'USER')}
         if not memoria:
             return "No hay conversaciones previas registradas."
         
+        return "\n".join(self._items_memoria(memoria))
+    
+    def _items_memoria(self, memoria: List[Dict]) -> List[str]:
+        """Una entrada del prompt por conversación (las últimas 5)"""
         memorias_formateadas = []
-        for idx, mem in enumerate(memoria[:5], 1):  # Últimas 5 conversaciones
+        for idx, mem in enumerate((memoria or [])[:5], 1):  # Últimas 5 conversaciones
             fecha = mem.get('fecha', 'Fecha desconocida')
             resumen = mem.get('resumen_conversacion', 'Sin resumen')
             intencion = mem.get('intencion_detectada', 'No detectada')
@@ -119,7 +406,20 @@ Rol: {usuario.get('role', 'USER')}
                 f"{idx}. [{fecha}] - Intención: {intencion}\n   Resumen: {resumen}"
             )
         
-        return "\n".join(memorias_formateadas)
+        return memorias_formateadas
+    
+    def _items_datos_contexto(self, datos: Dict) -> List[str]:
+        """
+        Datos del contexto como items recortables por el ensamblador
+        
+        Por defecto un solo item con _formatear_datos_contexto; los contextos
+        con listas largas lo sobrescriben para recortar por elemento.
+        """
+        return [self._formatear_datos_contexto(datos).strip()]
+    
+    def _resumen_datos_omitidos(self, omitidos: int) -> str:
+        """Línea que reemplaza a los items de datos que no entraron"""
+        return f"(+{omitidos} elementos más no incluidos por longitud)"
     
     @abstractmethod
     def _formatear_datos_contexto(self, datos: Dict) -> str:
@@ -145,13 +445,7 @@ Rol: {usuario.get('role', 'USER')}
         Returns:
             Diccionario con usuario y memoria
         """
-        usuario = self.usuarios_dao.get_usuario(correo)
-        memoria = self.memoria_dao.get_memoria_reciente(correo)
-        
-        return {
-            'usuario': usuario,
-            'memoria': memoria
-        }
+        return self.cargar_lecturas(correo, lecturas=BaseContexto.get_lecturas(self, correo))
     
     def validar_usuario(self, correo: str) -> bool:
         """
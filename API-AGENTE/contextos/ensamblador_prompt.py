@@ -0,0 +1,147 @@
+"""
+Ensamblado del prompt con presupuesto de tokens por sección
+
+Cada sección se arma con items (una receta, una conversación, una
+categoría de servicios) que se recortan enteros: primero contra el
+presupuesto propio de la sección y, si el total aún excede el presupuesto
+global, quitando items de las secciones de mayor `prioridad` (las menos
+importantes). Las secciones fijas (el prompt estático del sistema) no se
+recortan ni cuentan para el presupuesto global, y van primero: el prefijo
+es idéntico entre requests y el caché de prefijos del proveedor lo
+aprovecha.
+"""
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+_PIEZAS = re.compile(r"\w+|[^\w\s]")
+
+
+def estimar_tokens(texto: str) -> int:
+    """
+    Estimación local del número de tokens (sin llamar al tokenizer)
+
+    Cuenta palabras y signos; las palabras largas suman un token extra por
+    cada 4 caracteres, que es como se parten en subpalabras. Sobreestima
+    ligeramente, lo que es preferible para un presupuesto.
+
+    Args:
+        texto: Texto a medir
+
+    Returns:
+        Tokens estimados
+    """
+    return sum(1 + (len(pieza) - 1) // 4 for pieza in _PIEZAS.findall(texto))
+
+
+class Seccion(NamedTuple):
+    """Parte del prompt con su presupuesto y prioridad de recorte"""
+    nombre: str
+    items: List[str]
+    encabezado: str = ''
+    presupuesto: Optional[int] = None  # tokens; None = sin límite propio
+    prioridad: int = 0  # mayor = se recorta antes al exceder el total
+    fija: bool = False  # nunca se recorta
+    resumen: Optional[Callable[[int], str]] = None  # línea para N items omitidos
+
+
+class _Render(NamedTuple):
+    texto: str
+    tokens: int
+    omitidos: int
+
+
+class EnsambladorPrompt:
+    """Arma el prompt respetando presupuestos de tokens"""
+
+    def __init__(self, presupuesto_total: int):
+        """
+        Args:
+            presupuesto_total: Tokens máximos de las secciones no fijas
+        """
+        self.presupuesto_total = presupuesto_total
+
+    def ensamblar(self, secciones: List[Seccion]) -> Tuple[str, Dict]:
+        """
+        Ensambla las secciones en el orden dado
+
+        Args:
+            secciones: Secciones del prompt (las fijas primero)
+
+        Returns:
+            Tupla (prompt, reporte) con el reporte
+            {'tokens_total', 'tokens_secciones': {nombre: tokens},
+             'omitidos': {nombre: items omitidos}}
+        """
+        tokens_items = [[estimar_tokens(item) for item in seccion.items] for seccion in secciones]
+        renders = [
+            self._render(seccion, tokens, seccion.presupuesto)
+            for seccion, tokens in zip(secciones, tokens_items)
+        ]
+
+        # Exceso global: se recortan primero las secciones menos prioritarias
+        recortables = sorted(
+            (i for i, seccion in enumerate(secciones) if not seccion.fija),
+            key=lambda i: secciones[i].prioridad,
+            reverse=True
+        )
+        for i in recortables:
+            exceso = sum(renders[j].tokens for j in recortables) - self.presupuesto_total
+            if exceso <= 0:
+                break
+            renders[i] = self._render(secciones[i], tokens_items[i], max(0, renders[i].tokens - exceso))
+
+        prompt = "\n\n".join(render.texto for render in renders if render.texto)
+        reporte = {
+            'tokens_total': sum(render.tokens for render in renders),
+            'tokens_secciones': {s.nombre: r.tokens for s, r in zip(secciones, renders)},
+            'omitidos': {s.nombre: r.omitidos for s, r in zip(secciones, renders) if r.omitidos}
+        }
+        return prompt, reporte
+
+    @staticmethod
+    def _render(seccion: Seccion, tokens_items: List[int], limite: Optional[int]) -> _Render:
+        """Texto de la sección con los items que caben en `limite` tokens"""
+        if seccion.fija or limite is None:
+            limite = float('inf')
+
+        tokens_encabezado = estimar_tokens(seccion.encabezado)
+        if not seccion.items or tokens_encabezado >= limite:
+            omitidos = len(seccion.items)
+            return _Render('', 0, omitidos)
+
+        partes = [seccion.encabezado] if seccion.encabezado else []
+        usados = tokens_encabezado
+        incluidos = 0
+
+        for item, tokens in zip(seccion.items, tokens_items):
+            # Se reserva espacio para la línea de resumen si quedarán omitidos
+            reserva = 0
+            if seccion.resumen and incluidos + 1 < len(seccion.items):
+                reserva = estimar_tokens(seccion.resumen(len(seccion.items) - incluidos - 1))
+            if usados + tokens + reserva > limite:
+                break
+            partes.append(item)
+            usados += tokens
+            incluidos += 1
+
+        # Ni el primer item cabe: se corta por caracteres en proporción
+        if incluidos == 0:
+            reserva = 1  # el '…'
+            if seccion.resumen and len(seccion.items) > 1:
+                reserva += estimar_tokens(seccion.resumen(len(seccion.items) - 1))
+            disponible = limite - usados - reserva
+            primero = seccion.items[0]
+            corte = int(len(primero) * disponible / max(tokens_items[0], 1))
+            if corte <= 0:
+                return _Render('', 0, len(seccion.items))
+            partes.append(primero[:corte].rstrip() + '…')
+            usados += estimar_tokens(partes[-1])
+            incluidos = 1
+
+        omitidos = len(seccion.items) - incluidos
+        if omitidos and seccion.resumen:
+            linea = seccion.resumen(omitidos)
+            partes.append(linea)
+            usados += estimar_tokens(linea)
+
+        return _Render("\n".join(partes), usados, omitidos)
@@ -1,36 +1,84 @@
 """
 Implementaciones específicas de cada contexto
 """
+from datetime import datetime, timedelta
 from typing import Dict, List
-from .base_contexto import BaseContexto
+from .base_contexto import BaseContexto, Lectura
 from dao.base import DAOFactory
+from promts.estadisticas_prompt import EstadisticasPrompt
+from utils import agregados_historial
+from config import Config
 
 # ===== CONTEXTO ESTADÍSTICAS =====
 class EstadisticasContexto(BaseContexto):
     """Contexto para la pestaña de Estadísticas"""
     
+    PROMPT = EstadisticasPrompt
+    
+    ATRIBUTOS = {
+        **BaseContexto.ATRIBUTOS,
+        'historial': ['fecha', 'sensores', 'wearables']
+    }
+    
+    LIMITES = {
+        **BaseContexto.LIMITES,
+        # Con agregados los registros crudos ya no se usan para las estadísticas
+        'historial_con_agregados': 5
+    }
+    
     def __init__(self):
         super().__init__()
         self.historial_dao = DAOFactory.get_dao('historial')
+        self.agregados_dao = DAOFactory.get_dao('historial_agregados') if Config.TABLE_HISTORIAL_AGREGADOS else None
     
     def get_tablas_requeridas(self) -> List[str]:
         return ['usuarios', 'memoria', 'historial']
     
+    def get_lecturas(self, correo: str) -> Dict[str, Lectura]:
+        lecturas = super().get_lecturas(correo)
+        # Historial del último mes: con agregados solo los últimos registros;
+        # sin ellos el mes completo como serie columnar (dao/historial_series.py)
+        if self.agregados_dao:
+            cargar_historial = lambda: self.historial_dao.get_historial_reciente(
+                correo,
+                dias=30,
+                atributos=self.ATRIBUTOS['historial'],
+                limite=self.LIMITES['historial_con_agregados']
+            )
+        else:
+            cargar_historial = lambda: self.historial_dao.get_series(
+                correo,
+                (datetime.now() - timedelta(days=30)).isoformat()
+            )
+        lecturas['historial'] = Lectura(
+            cargar_historial,
+            [],
+            documento=lambda documento: self._historial_documento(documento, dias=30)
+        )
+        # Agregados diarios del mes: de la tabla de agregados o del documento
+        lecturas['historial_diario'] = Lectura(
+            (lambda: self.agregados_dao.get_agregados(correo, 'dia', dias=30)) if self.agregados_dao else None,
+            documento=lambda documento: agregados_historial.en_ventana(documento['historial_diario'], dias=30)
+        )
+        return lecturas
+    
     def build_context_data(self, correo: str) -> Dict:
         """Construye datos para contexto de estadísticas"""
-        datos_base = self.cargar_datos_base(correo)
+        # NumPy se importa solo en este contexto (no suma al cold start de los demás)
+        from dao.historial_series import HistorialSeries
+        from utils import estadisticas_historial
         
-        # Cargar historial del último mes
-        historial = self.historial_dao.get_historial_reciente(correo, dias=30)
+        datos = self.cargar_lecturas(correo)
         
-        # Calcular estadísticas básicas
-        estadisticas = self._calcular_estadisticas(historial)
+        # Estadísticas desde los agregados diarios (o calculados con los registros crudos)
+        diario = datos.pop('historial_diario', None)
+        if diario is None:
+            diario = HistorialSeries.como_serie(correo, datos['historial']).diarios()
+        datos['estadisticas'] = agregados_historial.estadisticas(diario)
+        datos['comparacion_semanal'] = agregados_historial.comparar_semanas(diario)
+        datos['tendencias'] = estadisticas_historial.resumen_diarios(correo, diario, dias=30)
         
-        return {
-            **datos_base,
-            'historial': historial,
-            'estadisticas': estadisticas
-        }
+        return datos
     
     def get_system_prompt(self) -> str:
         return """
@@ -72,45 +120,53 @@ Ritmo Cardíaco (cuando disponible):
   • Promedio: {estadisticas.get('fc_promedio', 'N/A')} bpm
   
 Registros totales: {estadisticas.get('total_registros', 0)} días
-"""
+{self._formatear_comparacion(datos.get('comparacion_semanal'))}{self._formatear_tendencias(datos.get('tendencias'))}"""
     
-    def _calcular_estadisticas(self, historial: List[Dict]) -> Dict:
-        """Calcula estadísticas del historial"""
-        if not historial:
-            return {}
-        
-        pasos_list = []
-        sueno_list = []
-        fc_list = []
+    def _formatear_comparacion(self, comparacion: Dict) -> str:
+        """Últimos 7 días frente a los 7 anteriores"""
+        if not comparacion:
+            return ""
         
-        for registro in historial:
-            wearables = registro.get('wearables', {})
-            sensores = registro.get('sensores', {})
-            
-            # Pasos
-            pasos = wearables.get('pasos') or sensores.get('pasos')
-            if pasos:
-                pasos_list.append(pasos)
-            
-            # Sueño
-            sueno = wearables.get('horas_de_sueno') or sensores.get('horas_de_sueno')
-            if sueno:
-                sueno_list.append(sueno)
-            
-            # Ritmo cardíaco
-            fc = wearables.get('ritmo_cardiaco')
-            if fc:
-                fc_list.append(fc)
+        etiquetas = {'pasos_promedio': 'Pasos', 'sueno_promedio': 'Sueño', 'fc_promedio': 'Ritmo cardíaco'}
+        lineas = [
+            f"  • {etiquetas[clave]}: {variacion:+.0%}"
+            for clave, variacion in comparacion.get('variacion', {}).items()
+        ]
+        if not lineas:
+            return ""
+        return "\nÚLTIMOS 7 DÍAS VS. LOS 7 ANTERIORES (promedios):\n" + "\n".join(lineas) + "\n"
+    
+    def _formatear_tendencias(self, tendencias: Dict) -> str:
+        """Tendencia, rango habitual y perfil semanal del mes"""
+        if not tendencias:
+            return ""
         
-        estadisticas = {
-            'total_registros': len(historial),
-            'pasos_promedio': sum(pasos_list) / len(pasos_list) if pasos_list else 0,
-            'pasos_max': max(pasos_list) if pasos_list else 0,
-            'pasos_min': min(pasos_list) if pasos_list else 0,
-            'sueno_promedio': sum(sueno_list) / len(sueno_list) if sueno_list else 0,
-            'sueno_max': max(sueno_list) if sueno_list else 0,
-            'sueno_min': min(sueno_list) if sueno_list else 0,
-            'fc_promedio': sum(fc_list) / len(fc_list) if fc_list else None
-        }
+        metricas = tendencias['metricas']
+        lineas = []
+        for metrica, etiqueta, formato, formato_tendencia in (
+            ('pasos', 'Pasos', '{:,.0f}', '{:+,.0f}'),
+            ('sueno', 'Sueño', '{:.1f}h', '{:+.1f}h')
+        ):
+            detalle = metricas[metrica]
+            p = detalle['percentiles']
+            if p['p10'] is None:
+                continue
+            semanal = (detalle['tendencia_diaria'] or 0) * 7
+            lineas.append(
+                f"  • {etiqueta}: tendencia {formato_tendencia.format(semanal)}/semana, "
+                f"días típicos entre {formato.format(p['p10'])} y {formato.format(p['p90'])} "
+                f"(mediana {formato.format(p['p50'])})"
+            )
+            perfil = {dia: valor for dia, valor in detalle['perfil_semanal'].items() if valor is not None}
+            if len(perfil) > 1 and max(perfil.values()) > min(perfil.values()):
+                lineas.append(
+                    f"    Mejor día: {max(perfil, key=perfil.get)}, "
+                    f"peor día: {min(perfil, key=perfil.get)}"
+                )
         
-        return estadisticas
+        sin_registros = len(tendencias['dias_sin_registros'])
+        if sin_registros:
+            lineas.append(f"  • Días sin registros: {sin_registros} de {tendencias['dias']}")
+        if not lineas:
+            return ""
+        return "\nTENDENCIAS DEL MES:\n" + "\n".join(lineas) + "\n"
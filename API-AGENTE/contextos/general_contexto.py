@@ -2,13 +2,28 @@
 Implementaciones específicas de cada contexto
 """
 from typing import Dict, List
-from .base_contexto import BaseContexto
+from .base_contexto import BaseContexto, Lectura
 from dao.base import DAOFactory
+from promts.general_prompt import GeneralPrompt
 
 # ===== CONTEXTO GENERAL =====
 class GeneralContexto(BaseContexto):
     """Contexto para la pestaña General"""
     
+    PROMPT = GeneralPrompt
+    
+    ATRIBUTOS = {
+        **BaseContexto.ATRIBUTOS,
+        'recetas': ['institucion', 'recetas[0].producto', 'recetas[1].producto', 'recetas[2].producto'],
+        'historial_reciente': ['fecha', 'sensores', 'wearables']
+    }
+    
+    LIMITES = {
+        **BaseContexto.LIMITES,
+        'recetas': 3,
+        'historial_reciente': 3
+    }
+    
     def __init__(self):
         super().__init__()
         self.recetas_dao = DAOFactory.get_dao('recetas')
@@ -17,19 +32,47 @@ class GeneralContexto(BaseContexto):
     def get_tablas_requeridas(self) -> List[str]:
         return ['usuarios', 'recetas', 'memoria', 'historial']
     
+    def get_lecturas(self, correo: str) -> Dict[str, Lectura]:
+        lecturas = super().get_lecturas(correo)
+        lecturas['recetas'] = Lectura(
+            lambda: self.recetas_dao.get_recetas_usuario(
+                correo,
+                atributos=self.ATRIBUTOS['recetas'],
+                limite=self.LIMITES['recetas']
+            ),
+            [],
+            documento=lambda documento: [
+                self._resumen_receta(receta) for receta in documento['recetas'][:self.LIMITES['recetas']]
+            ]
+        )
+        lecturas['historial_reciente'] = Lectura(
+            lambda: self.historial_dao.get_historial_reciente(
+                correo,
+                dias=7,
+                atributos=self.ATRIBUTOS['historial_reciente'],
+                limite=self.LIMITES['historial_reciente']
+            ),
+            [],
+            documento=lambda documento: self._historial_documento(
+                documento, dias=7, limite=self.LIMITES['historial_reciente']
+            )
+        )
+        return lecturas
+    
+    @staticmethod
+    def _resumen_receta(receta: Dict) -> Dict:
+        """Receta del documento con la misma forma que ATRIBUTOS['recetas']"""
+        resumen = {k: v for k, v in receta.items() if k in ('correo', 'receta_id', 'institucion')}
+        if 'recetas' in receta:
+            resumen['recetas'] = [
+                {'producto': medicamento['producto']}
+                for medicamento in receta['recetas'][:3] if 'producto' in medicamento
+            ]
+        return resumen
+    
     def build_context_data(self, correo: str) -> Dict:
         """Construye datos para contexto general"""
-        datos_base = self.cargar_datos_base(correo)
-        
-        # Cargar datos adicionales
-        recetas = self.recetas_dao.get_recetas_usuario(correo)
-        historial = self.historial_dao.get_historial_reciente(correo, dias=7)
-        
-        return {
-            **datos_base,
-            'recetas': recetas,
-            'historial_reciente': historial
-        }
+        return self.cargar_lecturas(correo)
     
     def get_system_prompt(self) -> str:
         return """
@@ -65,17 +108,10 @@ Tu objetivo es acompañar al usuario en su proceso de salud, no reemplazar atenc
         historial_texto = "No hay registros recientes de actividad."
         if historial:
             historial_lista = []
-            for registro in historial[:3]:
-                fecha = registro.get('fecha', 'Desconocida')[:10]
-                wearables = registro.get('wearables', {})
-                sensores = registro.get('sensores', {})
-                
-                pasos = wearables.get('pasos') or sensores.get('pasos', 0)
-                ritmo = wearables.get('ritmo_cardiaco', 'N/A')
-                sueno = wearables.get('horas_de_sueno') or sensores.get('horas_de_sueno', 0)
-                
+            for fecha, pasos, sueno, ritmo in self._filas_historial(historial, 3):
+                ritmo_texto = f"{ritmo:.0f}" if ritmo else 'N/A'
                 historial_lista.append(
-                    f"  • {fecha}: {pasos} pasos, {sueno}h sueño, FC: {ritmo}"
+                    f"  • {fecha[:10]}: {pasos or 0:.0f} pasos, {sueno or 0:g}h sueño, FC: {ritmo_texto}"
                 )
             historial_texto = "\n".join(historial_lista)
         
@@ -2,13 +2,27 @@
 Implementaciones específicas de cada contexto
 """
 from typing import Dict, List
-from .base_contexto import BaseContexto
+from .base_contexto import BaseContexto, Lectura
 from dao.base import DAOFactory
+from promts.recetas_prompt import RecetasPrompt
 
 # ===== CONTEXTO RECETAS =====
 class RecetasContexto(BaseContexto):
     """Contexto para la pestaña de Recetas"""
     
+    PROMPT = RecetasPrompt
+    
+    ATRIBUTOS = {
+        **BaseContexto.ATRIBUTOS,
+        'recetas': ['institucion', 'paciente', 'recetas'],
+        'historial_reciente': ['fecha', 'sensores', 'wearables']
+    }
+    
+    LIMITES = {
+        **BaseContexto.LIMITES,
+        'historial_reciente': 3
+    }
+    
     def __init__(self):
         super().__init__()
         self.recetas_dao = DAOFactory.get_dao('recetas')
@@ -17,18 +31,30 @@ class RecetasContexto(BaseContexto):
     def get_tablas_requeridas(self) -> List[str]:
         return ['usuarios', 'memoria', 'historial', 'recetas']
     
+    def get_lecturas(self, correo: str) -> Dict[str, Lectura]:
+        lecturas = super().get_lecturas(correo)
+        lecturas['recetas'] = Lectura(
+            lambda: self.recetas_dao.get_recetas_usuario(correo, atributos=self.ATRIBUTOS['recetas']),
+            [],
+            documento=lambda documento: documento['recetas']
+        )
+        lecturas['historial_reciente'] = Lectura(
+            lambda: self.historial_dao.get_historial_reciente(
+                correo,
+                dias=7,
+                atributos=self.ATRIBUTOS['historial_reciente'],
+                limite=self.LIMITES['historial_reciente']
+            ),
+            [],
+            documento=lambda documento: self._historial_documento(
+                documento, dias=7, limite=self.LIMITES['historial_reciente']
+            )
+        )
+        return lecturas
+    
     def build_context_data(self, correo: str) -> Dict:
         """Construye datos para contexto de recetas"""
-        datos_base = self.cargar_datos_base(correo)
-        
-        recetas = self.recetas_dao.get_recetas_usuario(correo)
-        historial = self.historial_dao.get_historial_reciente(correo, dias=7)
-        
-        return {
-            **datos_base,
-            'recetas': recetas,
-            'historial_reciente': historial
-        }
+        return self.cargar_lecturas(correo)
     
     def get_system_prompt(self) -> str:
         return """
@@ -50,17 +76,21 @@ Usa un tono amable, cercano y de acompañamiento.
     
     def _formatear_datos_contexto(self, datos: Dict) -> str:
         """Formatea datos del contexto de recetas"""
+        return "\n\n".join(self._items_datos_contexto(datos))
+    
+    def _items_datos_contexto(self, datos: Dict) -> List[str]:
+        """Un item por receta, con todos sus medicamentos"""
         recetas = datos.get('recetas', [])
         
         if not recetas:
-            return "No hay recetas registradas en el sistema."
+            return ["No hay recetas registradas en el sistema."]
         
-        recetas_detalle = []
+        items = []
         for idx, receta in enumerate(recetas, 1):
             institucion = receta.get('institucion', 'Desconocida')
             paciente = receta.get('paciente', 'No especificado')
             
-            recetas_detalle.append(f"\nRECETA #{idx} - {institucion}")
+            recetas_detalle = [f"RECETA #{idx} - {institucion}"]
             if paciente:
                 recetas_detalle.append(f"Paciente: {paciente}")
             
@@ -74,5 +104,9 @@ Usa un tono amable, cercano y de acompañamiento.
                 recetas_detalle.append(
                     f"  • {producto}: {dosis}, cada {frecuencia}, por {duracion}"
                 )
+            items.append("\n".join(recetas_detalle))
         
-        return "\n".join(recetas_detalle)
\ No newline at end of file
+        return items
+    
+    def _resumen_datos_omitidos(self, omitidos: int) -> str:
+        return f"(+{omitidos} recetas más registradas; no se detallan por longitud)"
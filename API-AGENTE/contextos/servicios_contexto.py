@@ -2,13 +2,21 @@
 Implementaciones específicas de cada contexto
 """
 from typing import Dict, List
-from .base_contexto import BaseContexto
+from .base_contexto import BaseContexto, Lectura
 from dao.base import DAOFactory
+from promts.servicios_prompt import ServiciosPrompt
 
 # ===== CONTEXTO SERVICIOS =====
 class ServiciosContexto(BaseContexto):
     """Contexto para la pestaña de Servicios"""
     
+    PROMPT = ServiciosPrompt
+    
+    ATRIBUTOS = {
+        **BaseContexto.ATRIBUTOS,
+        'servicios': ['nombre', 'descripcion', 'categoria']
+    }
+    
     def __init__(self):
         super().__init__()
         self.servicios_dao = DAOFactory.get_dao('servicios')
@@ -16,17 +24,18 @@ class ServiciosContexto(BaseContexto):
     def get_tablas_requeridas(self) -> List[str]:
         return ['usuarios', 'memoria', 'servicios']
     
+    def get_lecturas(self, correo: str) -> Dict[str, Lectura]:
+        lecturas = super().get_lecturas(correo)
+        # Cargar todos los servicios disponibles
+        lecturas['servicios'] = Lectura(
+            lambda: self.servicios_dao.get_todos_servicios(atributos=self.ATRIBUTOS['servicios']),
+            []
+        )
+        return lecturas
+    
     def build_context_data(self, correo: str) -> Dict:
         """Construye datos para contexto de servicios"""
-        datos_base = self.cargar_datos_base(correo)
-        
-        # Cargar todos los servicios disponibles
-        servicios = self.servicios_dao.get_todos_servicios()
-        
-        return {
-            **datos_base,
-            'servicios': servicios
-        }
+        return self.cargar_lecturas(correo)
     
     def get_system_prompt(self) -> str:
         return """
@@ -45,10 +54,14 @@ la calidad de vida del usuario de manera concreta.
     
     def _formatear_datos_contexto(self, datos: Dict) -> str:
         """Formatea datos del contexto de servicios"""
+        return "\n\n".join(self._items_datos_contexto(datos))
+    
+    def _items_datos_contexto(self, datos: Dict) -> List[str]:
+        """Un item por categoría de servicios"""
         servicios = datos.get('servicios', [])
         
         if not servicios:
-            return "No hay servicios disponibles actualmente."
+            return ["No hay servicios disponibles actualmente."]
         
         # Agrupar por categoría
         por_categoria = {}
@@ -59,13 +72,16 @@ la calidad de vida del usuario de manera concreta.
             por_categoria[cat].append(servicio)
         
         # Formatear salida
-        texto_servicios = []
+        items = []
         for categoria, lista_servicios in por_categoria.items():
-            texto_servicios.append(f"\n{categoria.upper()}:")
+            texto_servicios = [f"{categoria.upper()}:"]
             for serv in lista_servicios[:5]:  # Máximo 5 por categoría
                 nombre = serv.get('nombre', 'Sin nombre')
                 desc = serv.get('descripcion', 'Sin descripción')
                 texto_servicios.append(f"  • {nombre}: {desc[:100]}...")
+            items.append("\n".join(texto_servicios))
         
-        return "\n".join(texto_servicios)
-
+        return items
+    
+    def _resumen_datos_omitidos(self, omitidos: int) -> str:
+        return f"(+{omitidos} categorías de servicios más)"
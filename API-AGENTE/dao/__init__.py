@@ -2,5 +2,7 @@
 Inicialización del módulo DAO
 """
 from dao.base import BaseDAO, DAOFactory
+from dao.table_registry import TableRegistry, KeySchema
+from dao.identity_map import IdentityMap, UnidadDeTrabajo
 
-__all__ = ['BaseDAO', 'DAOFactory']
+__all__ = ['BaseDAO', 'DAOFactory', 'TableRegistry', 'KeySchema', 'IdentityMap', 'UnidadDeTrabajo']
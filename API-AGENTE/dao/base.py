@@ -1,24 +1,75 @@
 """
 Clase base para todos los DAOs con operaciones comunes de DynamoDB
 """
-import boto3
-from typing import Dict, List, Optional, Any
+import threading
+from typing import Dict, List, Optional, Any, Iterator, Tuple
 from boto3.dynamodb.conditions import Key, Attr
 from decimal import Decimal
 import json
 
+from dao.table_registry import TableRegistry, KeySchema
+from dao.pagination import encode_cursor, decode_cursor
+from dao.parallel_scan import ParallelScanner
+from dao.identity_map import AUSENTE, IdentityMap, UnidadDeTrabajo
+from dao.batch_loader import BatchLoader
+from dao.batch_writer import BatchWriter
+from dao.low_level import LowLevelTable
+from config import Config
+from utils.aws_clients import AWSClientFactory
+
 class BaseDAO:
     """Clase base para acceso a datos en DynamoDB"""
     
     def __init__(self, table_name: str):
-        self.dynamodb = boto3.resource('dynamodb')
-        self.table = self.dynamodb.Table(table_name)
         self.table_name = table_name
+        # Los DAOs son singletons usados desde el pool de hilos: recurso y
+        # Table son por hilo (ver AWSClientFactory.get_resource)
+        self._hilo = threading.local()
+        self.key_schema: KeySchema = TableRegistry.get_key_schema(table_name, self.table)
+        
+        # Modo bajo nivel: las lecturas usan el cliente y un deserializador
+        # de una sola pasada (sin Decimal); las escrituras siguen en self.table
+        self.bajo_nivel = Config.DYNAMODB_LOW_LEVEL
+        self._tabla_cliente: Optional[LowLevelTable] = LowLevelTable(table_name) if self.bajo_nivel else None
+    
+    @property
+    def dynamodb(self):
+        """Recurso DynamoDB del hilo actual"""
+        return AWSClientFactory.get_resource('dynamodb')
+    
+    @property
+    def table(self):
+        """Table del recurso del hilo actual"""
+        recurso = self.dynamodb
+        hilo = self._hilo
+        if getattr(hilo, 'recurso', None) is not recurso:
+            hilo.recurso = recurso
+            hilo.table = recurso.Table(self.table_name)
+        return hilo.table
+    
+    @property
+    def lecturas(self):
+        """Tabla para leer: la del cliente en modo bajo nivel, si no self.table"""
+        return self._tabla_cliente if self.bajo_nivel else self.table
+    
+    def tabla_cliente(self) -> LowLevelTable:
+        """
+        Lecturas sobre el cliente compartido (thread-safe), creadas en el primer uso
+        
+        Para operaciones que leen desde varios hilos a la vez, como el scan
+        paralelo.
+        """
+        if self._tabla_cliente is None:
+            self._tabla_cliente = LowLevelTable(self.table_name)
+        return self._tabla_cliente
     
     def get_by_key(self, partition_key: str, sort_key: Optional[str] = None) -> Optional[Dict]:
         """
         Obtiene un registro por clave primaria
         
+        Dentro de una unidad de trabajo activa, lecturas repetidas de la misma
+        clave se sirven desde el identity map de la request.
+        
         Args:
             partition_key: Valor de la partition key
             sort_key: Valor de la sort key (opcional)
@@ -27,13 +78,11 @@ class BaseDAO:
             Diccionario con el registro o None si no existe
         """
         try:
-            key = {'correo': partition_key} if 'correo' in self._get_key_schema() else {self._get_partition_key_name(): partition_key}
-            
-            if sort_key and self._has_sort_key():
-                key[self._get_sort_key_name()] = sort_key
-            
-            response = self.table.get_item(Key=key)
-            return self._decimal_to_float(response.get('Item'))
+            key = self._build_key(partition_key, sort_key)
+            identity_map = IdentityMap.actual()
+            if identity_map is not None:
+                return identity_map.obtener(self.table_name, key, lambda: self._get_item(key))
+            return self._get_item(key)
         except Exception as e:
             print(f"Error en get_by_key: {str(e)}")
             return None
@@ -43,7 +92,8 @@ class BaseDAO:
         partition_value: str, 
         limit: Optional[int] = None,
         sort_key_condition: Optional[Any] = None,
-        scan_index_forward: bool = False
+        scan_index_forward: bool = False,
+        projection: Optional[List[str]] = None
     ) -> List[Dict]:
         """
         Query por partition key con opciones adicionales
@@ -53,6 +103,8 @@ class BaseDAO:
             limit: Límite de registros a retornar
             sort_key_condition: Condición adicional para sort key
             scan_index_forward: True para orden ascendente, False para descendente
+            projection: Atributos a leer (rutas como 'recetas[0].producto');
+                None para el item completo
         
         Returns:
             Lista de registros
@@ -72,19 +124,28 @@ class BaseDAO:
             if limit:
                 query_params['Limit'] = limit
             
-            response = self.table.query(**query_params)
-            return [self._decimal_to_float(item) for item in response.get('Items', [])]
+            if projection:
+                query_params.update(self._build_projection(projection))
+            
+            response = self.lecturas.query(**query_params)
+            return [self._desde_dynamodb(item) for item in response.get('Items', [])]
         except Exception as e:
             print(f"Error en query_by_partition: {str(e)}")
             return []
     
-    def scan_all(self, limit: Optional[int] = None, filter_expression: Optional[Any] = None) -> List[Dict]:
+    def scan_all(
+        self,
+        limit: Optional[int] = None,
+        filter_expression: Optional[Any] = None,
+        projection: Optional[List[str]] = None
+    ) -> List[Dict]:
         """
         Escanea toda la tabla (usar con cuidado)
         
         Args:
             limit: Límite de registros
             filter_expression: Expresión de filtro
+            projection: Atributos a leer; None para el item completo
         
         Returns:
             Lista de registros
@@ -98,12 +159,235 @@ class BaseDAO:
             if filter_expression:
                 scan_params['FilterExpression'] = filter_expression
             
-            response = self.table.scan(**scan_params)
-            return [self._decimal_to_float(item) for item in response.get('Items', [])]
+            if projection:
+                scan_params.update(self._build_projection(projection))
+            
+            response = self.lecturas.scan(**scan_params)
+            return [self._desde_dynamodb(item) for item in response.get('Items', [])]
         except Exception as e:
             print(f"Error en scan_all: {str(e)}")
             return []
     
+    def iter_query_pages(
+        self,
+        partition_value: str,
+        sort_key_condition: Optional[Any] = None,
+        scan_index_forward: bool = False,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
+        max_items: Optional[int] = None,
+        projection: Optional[List[str]] = None
+    ) -> Iterator[Tuple[List[Dict], Optional[str]]]:
+        """
+        Query paginado por partition key, página por página
+        
+        Args:
+            partition_value: Valor de la partition key
+            sort_key_condition: Condición adicional para sort key
+            scan_index_forward: True para orden ascendente, False para descendente
+            page_size: Máximo de items por página (Limit de DynamoDB)
+            cursor: Cursor firmado (dao/pagination.py) de una consulta previa
+                a la misma partición
+            max_items: Máximo total de items a retornar
+            projection: Atributos a leer; None para el item completo
+        
+        Yields:
+            Tuplas (items de la página, cursor para reanudar o None si terminó)
+        
+        Raises:
+            ValueError: Si el cursor no es válido
+            ClientError: Si falla la lectura de una página
+        """
+        key_condition = Key(self._get_partition_key_name()).eq(partition_value)
+        
+        if sort_key_condition:
+            key_condition = key_condition & sort_key_condition
+        
+        params = {
+            'KeyConditionExpression': key_condition,
+            'ScanIndexForward': scan_index_forward
+        }
+        
+        if projection:
+            params.update(self._build_projection(projection))
+        
+        ambito = f"{self.table_name}#{partition_value}"
+        yield from self._paginar(self.lecturas.query, params, page_size, cursor, max_items, ambito)
+    
+    def iter_query(self, partition_value: str, **kwargs) -> Iterator[Dict]:
+        """
+        Query paginado por partition key, item por item
+        
+        Acepta los mismos argumentos que iter_query_pages. Mantiene en memoria
+        solo la página actual.
+        
+        Yields:
+            Registros de la partición
+        """
+        for items, _ in self.iter_query_pages(partition_value, **kwargs):
+            yield from items
+    
+    def iter_scan_pages(
+        self,
+        filter_expression: Optional[Any] = None,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
+        max_items: Optional[int] = None,
+        projection: Optional[List[str]] = None
+    ) -> Iterator[Tuple[List[Dict], Optional[str]]]:
+        """
+        Scan paginado de toda la tabla, página por página
+        
+        Args:
+            filter_expression: Expresión de filtro
+            page_size: Máximo de items evaluados por página (Limit de DynamoDB)
+            cursor: Cursor firmado (dao/pagination.py) de un scan previo
+            max_items: Máximo total de items a retornar
+            projection: Atributos a leer; None para el item completo
+        
+        Yields:
+            Tuplas (items de la página, cursor para reanudar o None si terminó)
+        
+        Raises:
+            ValueError: Si el cursor no es válido
+            ClientError: Si falla la lectura de una página
+        """
+        params = {}
+        
+        if filter_expression:
+            params['FilterExpression'] = filter_expression
+        
+        if projection:
+            params.update(self._build_projection(projection))
+        
+        yield from self._paginar(self.lecturas.scan, params, page_size, cursor, max_items, self.table_name)
+    
+    def iter_scan(self, **kwargs) -> Iterator[Dict]:
+        """
+        Scan paginado de toda la tabla, item por item
+        
+        Acepta los mismos argumentos que iter_scan_pages.
+        
+        Yields:
+            Registros de la tabla
+        """
+        for items, _ in self.iter_scan_pages(**kwargs):
+            yield from items
+    
+    def iter_parallel_scan(
+        self,
+        filter_expression: Optional[Any] = None,
+        total_segments: Optional[int] = None,
+        max_rcu_por_segundo: Optional[float] = None,
+        page_size: Optional[int] = None
+    ) -> Iterator[Dict]:
+        """
+        Scan de toda la tabla en paralelo (Segment/TotalSegments)
+        
+        Pensado para lecturas completas de administración o analítica. Los
+        items llegan sin orden definido a medida que terminan los segmentos.
+        Los segmentos leen con el cliente (tabla_cliente), no con el recurso.
+        
+        Args:
+            filter_expression: Expresión de filtro
+            total_segments: Segmentos paralelos (default: Config.SCAN_TOTAL_SEGMENTS)
+            max_rcu_por_segundo: Presupuesto de lectura (default: Config.SCAN_MAX_RCU)
+            page_size: Limit por página de cada segmento
+        
+        Yields:
+            Registros de la tabla
+        
+        Raises:
+            Exception: El primer error de un segmento; el recorrido se detiene
+        """
+        scan_kwargs = {}
+        if filter_expression:
+            scan_kwargs['FilterExpression'] = filter_expression
+        
+        scanner = ParallelScanner(
+            self.tabla_cliente(),
+            total_segments=total_segments or Config.SCAN_TOTAL_SEGMENTS,
+            max_rcu_por_segundo=max_rcu_por_segundo or Config.SCAN_MAX_RCU,
+            page_size=page_size,
+            **scan_kwargs
+        )
+        
+        for items in scanner.iter_pages():
+            for item in items:
+                yield self._desde_dynamodb(item)
+    
+    def get_consistente(self, partition_key: str, sort_key: Optional[str] = None) -> Optional[Dict]:
+        """
+        GetItem con lectura fuerte que propaga los errores
+        
+        Para procesos que reemplazan datos derivados con lo leído: un error
+        no debe confundirse con un registro inexistente. No usa el identity map.
+        
+        Raises:
+            Exception: El error de DynamoDB
+        """
+        response = self.lecturas.get_item(Key=self._build_key(partition_key, sort_key), ConsistentRead=True)
+        return self._desde_dynamodb(response.get('Item'))
+    
+    def query_consistente(
+        self,
+        partition_value: str,
+        sort_key_condition: Optional[Any] = None,
+        scan_index_forward: bool = False,
+        max_items: Optional[int] = None,
+        projection: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """
+        Query con lectura fuerte de todas las páginas que propaga los errores
+        
+        A diferencia de query_by_partition / iter_query, que devuelven lo
+        leído hasta el error, falla si alguna página falla.
+        
+        Args:
+            partition_value: Valor de la partition key
+            sort_key_condition: Condición adicional para sort key
+            scan_index_forward: True para orden ascendente, False para descendente
+            max_items: Máximo total de items
+            projection: Atributos a leer; None para el item completo
+        
+        Raises:
+            Exception: El error de DynamoDB
+        """
+        key_condition = Key(self._get_partition_key_name()).eq(partition_value)
+        if sort_key_condition:
+            key_condition = key_condition & sort_key_condition
+    
+        params = {
+            'KeyConditionExpression': key_condition,
+            'ScanIndexForward': scan_index_forward,
+            'ConsistentRead': True
+        }
+        if projection:
+            params.update(self._build_projection(projection))
+    
+        items: List[Dict] = []
+        while max_items is None or len(items) < max_items:
+            if max_items is not None:
+                params['Limit'] = max_items - len(items)
+            response = self.lecturas.query(**params)
+            items.extend(self._desde_dynamodb(item) for item in response.get('Items', []))
+            if not response.get('LastEvaluatedKey'):
+                break
+            params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        return items
+    
+    def batch_get_by_keys(self, keys: List[Tuple[str, Optional[str]]]) -> List[Optional[Dict]]:
+        """
+        Obtiene varios registros de esta tabla con BatchGetItem
+        
+        Args:
+            keys: Lista de tuplas (partition_key, sort_key o None)
+        
+        Returns:
+            Registros en el mismo orden que `keys` (None si no existe)
+        """
+        return DAOFactory.batch_get({self: keys})[self]
+    
     def put_item(self, item: Dict) -> bool:
         """
         Inserta o actualiza un registro
@@ -116,11 +400,34 @@ class BaseDAO:
         """
         try:
             self.table.put_item(Item=self._float_to_decimal(item))
+            self._invalidar_identity_map(self._key_from_item(item))
             return True
         except Exception as e:
             print(f"Error en put_item: {str(e)}")
             return False
     
+    def put_items_lote(self, items: List[Dict]) -> List[Dict]:
+        """
+        Inserta o reemplaza varios registros con BatchWriteItem
+        
+        Args:
+            items: Registros sin claves primarias repetidas
+        
+        Returns:
+            Claves primarias de los registros que no se escribieron
+        """
+        no_escritos = BatchWriter(self.dynamodb).escribir(
+            self.table_name, [self._float_to_decimal(item) for item in items]
+        )
+        fallidas = [self._key_from_item(item) for item in no_escritos]
+        
+        firmas_fallidas = {IdentityMap.firma(self.table_name, clave) for clave in fallidas}
+        for item in items:
+            clave = self._key_from_item(item)
+            if IdentityMap.firma(self.table_name, clave) not in firmas_fallidas:
+                self._invalidar_identity_map(clave)
+        return [self._decimal_to_float(clave) for clave in fallidas]
+    
     def delete_item(self, partition_key: str, sort_key: Optional[str] = None) -> bool:
         """
         Elimina un registro
@@ -133,41 +440,135 @@ class BaseDAO:
             True si fue exitoso, False en caso contrario
         """
         try:
-            key = {self._get_partition_key_name(): partition_key}
-            
-            if sort_key and self._has_sort_key():
-                key[self._get_sort_key_name()] = sort_key
-            
+            key = self._build_key(partition_key, sort_key)
             self.table.delete_item(Key=key)
+            self._invalidar_identity_map(key)
             return True
         except Exception as e:
             print(f"Error en delete_item: {str(e)}")
             return False
     
     # Métodos auxiliares
+    def _get_item(self, key: Dict) -> Optional[Dict]:
+        """GetItem directo contra DynamoDB"""
+        response = self.lecturas.get_item(Key=key)
+        return self._desde_dynamodb(response.get('Item'))
+    
+    def _invalidar_identity_map(self, key: Dict):
+        """Descarta la clave del identity map de la request tras una escritura"""
+        identity_map = IdentityMap.actual()
+        if identity_map is not None:
+            identity_map.invalidar(self.table_name, key)
+    
+    def _build_key(self, partition_key: str, sort_key: Optional[str] = None) -> Dict:
+        """Construye el diccionario Key a partir del esquema registrado"""
+        key = {self.key_schema.partition_key: partition_key}
+        if sort_key and self.key_schema.has_sort_key:
+            key[self.key_schema.sort_key] = sort_key
+        return key
+    
+    def _paginar(
+        self,
+        operacion,
+        params: Dict,
+        page_size: Optional[int],
+        cursor: Optional[str],
+        max_items: Optional[int],
+        ambito: str
+    ) -> Iterator[Tuple[List[Dict], Optional[str]]]:
+        """
+        Recorre LastEvaluatedKey de Query/Scan emitiendo una página a la vez
+        
+        Los cursores se firman con `ambito` (tabla y partición): uno de otra
+        tabla o de otro usuario no se acepta.
+        
+        Raises:
+            ValueError: Si el cursor no es válido
+            ClientError: Si falla la lectura de una página
+        """
+        exclusive_start_key = decode_cursor(cursor, ambito)
+        restantes = max_items
+        
+        while restantes is None or restantes > 0:
+            if exclusive_start_key:
+                params['ExclusiveStartKey'] = exclusive_start_key
+            
+            limite = page_size
+            if restantes is not None:
+                limite = min(limite, restantes) if limite else restantes
+            if limite:
+                params['Limit'] = limite
+            
+            # Un error a mitad de camino se propaga: cortar aquí dejaría un
+            # resultado truncado que el llamador tomaría por completo
+            response = operacion(**params)
+            
+            items = response.get('Items', [])
+            exclusive_start_key = response.get('LastEvaluatedKey')
+            
+            if restantes is not None:
+                if len(items) > restantes:
+                    items = items[:restantes]
+                    exclusive_start_key = self._key_from_item(items[-1])
+                restantes -= len(items)
+            
+            siguiente = encode_cursor(exclusive_start_key, ambito)
+            
+            if items or not siguiente:
+                yield [self._desde_dynamodb(item) for item in items], siguiente
+            
+            if not siguiente:
+                return
+    
+    def _build_projection(self, attributes: List[str]) -> Dict:
+        """
+        Construye ProjectionExpression + ExpressionAttributeNames
+        
+        Acepta rutas anidadas ('wearables.pasos') e índices de lista
+        ('recetas[0].producto'). Los atributos clave se incluyen siempre para
+        que la paginación pueda reanudar desde cualquier item.
+        """
+        aliases: Dict[str, str] = {}
+        rutas: List[str] = []
+        
+        for attribute in list(self.key_schema.attribute_names) + list(attributes):
+            partes = []
+            for segmento in attribute.split('.'):
+                nombre, corchete, indices = segmento.partition('[')
+                alias = aliases.setdefault(nombre, f"#p{len(aliases)}")
+                partes.append(alias + corchete + indices)
+            ruta = '.'.join(partes)
+            if ruta not in rutas:
+                rutas.append(ruta)
+        
+        return {
+            'ProjectionExpression': ', '.join(rutas),
+            'ExpressionAttributeNames': {alias: nombre for nombre, alias in aliases.items()}
+        }
+    
+    def _key_from_item(self, item: Dict) -> Dict:
+        """Extrae la clave primaria de un item (sirve como ExclusiveStartKey)"""
+        return {name: item[name] for name in self.key_schema.attribute_names if name in item}
+    
     def _get_partition_key_name(self) -> str:
-        """Obtiene el nombre de la partition key desde el esquema de la tabla"""
-        key_schema = self.table.key_schema
-        for key in key_schema:
-            if key['KeyType'] == 'HASH':
-                return key['AttributeName']
-        return 'correo'  # Default
+        """Obtiene el nombre de la partition key desde el registro de tablas"""
+        return self.key_schema.partition_key
     
     def _get_sort_key_name(self) -> Optional[str]:
         """Obtiene el nombre de la sort key si existe"""
-        key_schema = self.table.key_schema
-        for key in key_schema:
-            if key['KeyType'] == 'RANGE':
-                return key['AttributeName']
-        return None
+        return self.key_schema.sort_key
     
     def _has_sort_key(self) -> bool:
         """Verifica si la tabla tiene sort key"""
-        return self._get_sort_key_name() is not None
+        return self.key_schema.has_sort_key
     
     def _get_key_schema(self) -> List[str]:
         """Retorna lista de nombres de atributos clave"""
-        return [key['AttributeName'] for key in self.table.key_schema]
+        return list(self.key_schema.attribute_names)
+    
+    def _desde_dynamodb(self, item):
+        """Convierte un item leído a tipos JSON (en modo bajo nivel ya lo está)"""
+        return item if self.bajo_nivel else self._decimal_to_float(item)
     
     @staticmethod
     def _decimal_to_float(obj):
@@ -204,7 +605,9 @@ class DAOFactory:
         Obtiene una instancia singleton de un DAO
         
         Args:
-            dao_type: Tipo de DAO ('usuarios', 'recetas', 'servicios', 'historial', 'memoria')
+            dao_type: Tipo de DAO ('usuarios', 'recetas', 'servicios', 'historial', 'memoria',
+                'cache_respuestas', 'documento_contexto', 'historial_agregados',
+                'historial_lecturas')
         
         Returns:
             Instancia del DAO solicitado
@@ -220,6 +623,101 @@ class DAOFactory:
         
         return cls._instances[dao_type]
     
+    @classmethod
+    def batch_get(cls, solicitudes: Dict[Any, List[Tuple[str, Optional[str]]]]) -> Dict[Any, List[Optional[Dict]]]:
+        """
+        Resuelve lecturas puntuales de varias tablas en llamadas BatchGetItem
+        
+        Las claves ya presentes en el identity map de la request se sirven
+        desde ahí, y las leídas se publican en él para los siguientes
+        get_by_key.
+        
+        Uso:
+            DAOFactory.batch_get({
+                'usuarios': [(correo, None)],
+                'recetas': [(correo, 'rec-1'), (correo, 'rec-2')]
+            })
+        
+        Args:
+            solicitudes: Diccionario tipo de DAO (o instancia) -> lista de
+                tuplas (partition_key, sort_key o None)
+        
+        Returns:
+            Diccionario con la misma clave -> registros en el orden pedido
+            (None si no existe o si la lectura falló)
+        """
+        identity_map = IdentityMap.actual()
+        daos = {
+            solicitud: cls.get_dao(solicitud) if isinstance(solicitud, str) else solicitud
+            for solicitud in solicitudes
+        }
+        
+        claves_dao = {
+            solicitud: [daos[solicitud]._build_key(pk, sk) for pk, sk in claves]
+            for solicitud, claves in solicitudes.items()
+        }
+        
+        claves_por_tabla: Dict[str, List[Dict]] = {}
+        en_mapa: Dict[Tuple, Optional[Dict]] = {}
+        pedidas = set()
+        for solicitud, claves in claves_dao.items():
+            tabla = daos[solicitud].table_name
+            for clave in claves:
+                firma = IdentityMap.firma(tabla, clave)
+                if firma in en_mapa or firma in pedidas:
+                    continue
+                valor = AUSENTE if identity_map is None else identity_map.buscar(tabla, clave)
+                if valor is AUSENTE:
+                    claves_por_tabla.setdefault(tabla, []).append(clave)
+                    pedidas.add(firma)
+                else:
+                    en_mapa[firma] = valor
+        
+        encontrados: Dict[Tuple, Dict] = {}
+        if claves_por_tabla:
+            try:
+                dynamodb = next(iter(daos.values())).dynamodb
+                items_por_tabla = BatchLoader(dynamodb).cargar(claves_por_tabla)
+            except Exception as e:
+                print(f"Error en batch_get: {str(e)}")
+                items_por_tabla = {}
+            
+            for solicitud, dao in daos.items():
+                for item in items_por_tabla.get(dao.table_name, []):
+                    firma = IdentityMap.firma(dao.table_name, dao._key_from_item(item))
+                    encontrados[firma] = dao._decimal_to_float(item)
+            
+            if identity_map is not None and items_por_tabla:
+                for tabla, claves in claves_por_tabla.items():
+                    for clave in claves:
+                        identity_map.publicar(tabla, clave, encontrados.get(IdentityMap.firma(tabla, clave)))
+        
+        resultados = {}
+        for solicitud, claves in claves_dao.items():
+            dao = daos[solicitud]
+            registros = []
+            for clave in claves:
+                firma = IdentityMap.firma(dao.table_name, clave)
+                registros.append(en_mapa[firma] if firma in en_mapa else encontrados.get(firma))
+            resultados[solicitud] = registros
+        
+        return resultados
+    
+    @classmethod
+    def unidad_de_trabajo(cls) -> UnidadDeTrabajo:
+        """
+        Abre una unidad de trabajo para la request en curso
+        
+        Uso:
+            with DAOFactory.unidad_de_trabajo() as identity_map:
+                ...
+                identity_map.reporte()
+        
+        Returns:
+            Context manager que activa un IdentityMap por invocación
+        """
+        return UnidadDeTrabajo()
+    
     @classmethod
     def _get_dao_map(cls):
         """
@@ -231,11 +729,19 @@ class DAOFactory:
         from dao.servicios_dao import ServiciosDAO
         from dao.historial_dao import HistorialDAO
         from dao.memoria_dao import MemoriaDAO
+        from dao.cache_respuestas_dao import CacheRespuestasDAO
+        from dao.documento_contexto_dao import DocumentoContextoDAO
+        from dao.historial_agregados_dao import HistorialAgregadosDAO
+        from dao.historial_lecturas_dao import HistorialLecturasDAO
         
         return {
             'usuarios': UsuariosDAO,
             'recetas': RecetasDAO,
             'servicios': ServiciosDAO,
             'historial': HistorialDAO,
-            'memoria': MemoriaDAO
+            'memoria': MemoriaDAO,
+            'cache_respuestas': CacheRespuestasDAO,
+            'documento_contexto': DocumentoContextoDAO,
+            'historial_agregados': HistorialAgregadosDAO,
+            'historial_lecturas': HistorialLecturasDAO
         }
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+Lecturas por clave en lote (BatchGetItem) sobre varias tablas
+
+Agrupa lecturas puntuales de distintas tablas en llamadas BatchGetItem de
+hasta 100 claves y reintenta las UnprocessedKeys con backoff exponencial
+con jitter.
+"""
+import random
+import time
+from typing import Dict, List, Tuple
+
+from config import Config
+
+MAX_CLAVES_POR_LOTE = 100
+
+
+class BatchLoader:
+    """Cliente de BatchGetItem con reintentos"""
+
+    def __init__(self, dynamodb_resource):
+        """
+        Args:
+            dynamodb_resource: Recurso boto3 de DynamoDB
+        """
+        self.dynamodb = dynamodb_resource
+
+    def cargar(self, claves_por_tabla: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+        """
+        Lee todas las claves solicitadas
+
+        Args:
+            claves_por_tabla: Diccionario tabla -> lista de claves primarias
+
+        Returns:
+            Diccionario tabla -> items encontrados (sin orden garantizado;
+            las claves inexistentes simplemente no aparecen)
+
+        Raises:
+            RuntimeError: Si quedan claves sin procesar tras agotar los reintentos
+        """
+        resultados: Dict[str, List[Dict]] = {tabla: [] for tabla in claves_por_tabla}
+
+        pendientes = [
+            (tabla, clave)
+            for tabla, claves in claves_por_tabla.items()
+            for clave in self._sin_duplicados(claves)
+        ]
+
+        for inicio in range(0, len(pendientes), MAX_CLAVES_POR_LOTE):
+            lote = pendientes[inicio:inicio + MAX_CLAVES_POR_LOTE]
+            request_items: Dict[str, Dict] = {}
+            for tabla, clave in lote:
+                request_items.setdefault(tabla, {'Keys': []})['Keys'].append(clave)
+
+            self._ejecutar_lote(request_items, resultados)
+
+        return resultados
+
+    def _ejecutar_lote(self, request_items: Dict[str, Dict], resultados: Dict[str, List[Dict]]):
+        """Ejecuta un BatchGetItem reintentando las claves no procesadas"""
+        intento = 0
+
+        while request_items:
+            response = self.dynamodb.batch_get_item(RequestItems=request_items)
+
+            for tabla, items in response.get('Responses', {}).items():
+                resultados.setdefault(tabla, []).extend(items)
+
+            request_items = response.get('UnprocessedKeys') or {}
+            if not request_items:
+                return
+
+            intento += 1
+            if intento >= Config.BATCH_MAX_INTENTOS:
+                sin_procesar = sum(len(r.get('Keys', [])) for r in request_items.values())
+                raise RuntimeError(
+                    f"BatchGetItem: {sin_procesar} claves sin procesar tras {intento} intentos"
+                )
+
+            # Backoff exponencial con full jitter
+            espera = random.uniform(0, min(
+                Config.BATCH_BACKOFF_MAX,
+                Config.BATCH_BACKOFF_BASE * (2 ** intento)
+            ))
+            time.sleep(espera)
+
+    @staticmethod
+    def _sin_duplicados(claves: List[Dict]) -> List[Dict]:
+        """BatchGetItem rechaza claves repetidas en una misma solicitud"""
+        vistas = set()
+        unicas = []
+        for clave in claves:
+            firma: Tuple = tuple(sorted(clave.items()))
+            if firma not in vistas:
+                vistas.add(firma)
+                unicas.append(clave)
+        return unicas
@@ -0,0 +1,87 @@
+"""
+Escrituras en lote (BatchWriteItem) sobre una tabla
+
+Divide los items en lotes de hasta 25 puts, los envía en paralelo sobre el
+pool de hilos compartido y reintenta los UnprocessedItems de cada lote con
+backoff exponencial con jitter. Lo que no se pudo escribir se devuelve al
+llamador en lugar de abortar el resto.
+"""
+import contextvars
+import random
+import time
+from typing import Dict, List
+
+from config import Config
+from utils.concurrencia import get_executor
+
+MAX_ITEMS_POR_LOTE = 25
+
+
+class BatchWriter:
+    """Cliente de BatchWriteItem con reintentos"""
+
+    def __init__(self, dynamodb_resource):
+        """
+        Args:
+            dynamodb_resource: Recurso boto3 de DynamoDB
+        """
+        self.dynamodb = dynamodb_resource
+
+    def escribir(self, tabla: str, items: List[Dict]) -> List[Dict]:
+        """
+        Escribe todos los items (PutRequest)
+
+        Los items no deben repetir clave primaria: BatchWriteItem rechaza
+        el lote completo.
+
+        Args:
+            tabla: Nombre de la tabla
+            items: Items ya convertidos a tipos de DynamoDB (Decimal)
+
+        Returns:
+            Items que no se escribieron (lote rechazado o UnprocessedItems
+            tras agotar los reintentos); vacío si se escribieron todos
+        """
+        lotes = [
+            items[inicio:inicio + MAX_ITEMS_POR_LOTE]
+            for inicio in range(0, len(items), MAX_ITEMS_POR_LOTE)
+        ]
+        if len(lotes) <= 1:
+            return [item for lote in lotes for item in self._ejecutar_lote(tabla, lote)]
+
+        executor = get_executor()
+        futures = [
+            executor.submit(contextvars.copy_context().run, self._ejecutar_lote, tabla, lote)
+            for lote in lotes
+        ]
+        return [item for future in futures for item in future.result()]
+
+    def _ejecutar_lote(self, tabla: str, lote: List[Dict]) -> List[Dict]:
+        """Ejecuta un BatchWriteItem reintentando los items no procesados"""
+        pendientes = [{'PutRequest': {'Item': item}} for item in lote]
+        intento = 0
+
+        while pendientes:
+            try:
+                response = self.dynamodb.batch_write_item(RequestItems={tabla: pendientes})
+            except Exception as e:
+                print(f"Error en batch_write ({len(pendientes)} items): {str(e)}")
+                break
+
+            pendientes = (response.get('UnprocessedItems') or {}).get(tabla) or []
+            if not pendientes:
+                return []
+
+            intento += 1
+            if intento >= Config.BATCH_MAX_INTENTOS:
+                print(f"⚠️ BatchWriteItem: {len(pendientes)} items sin procesar tras {intento} intentos")
+                break
+
+            # Backoff exponencial con full jitter
+            espera = random.uniform(0, min(
+                Config.BATCH_BACKOFF_MAX,
+                Config.BATCH_BACKOFF_BASE * (2 ** intento)
+            ))
+            time.sleep(espera)
+
+        return [solicitud['PutRequest']['Item'] for solicitud in pendientes]
@@ -0,0 +1,55 @@
+"""
+DAOs específicos para cada tabla
+"""
+import time
+from typing import Dict, Optional
+from .base import BaseDAO
+from config import Config
+
+# ===== CACHE DE RESPUESTAS DAO =====
+class CacheRespuestasDAO(BaseDAO):
+    """
+    DAO para la caché compartida de respuestas del LLM
+
+    Cada item es una respuesta ya generada, indexada por la clave de
+    contenido que arma services/respuesta_cache.py. El atributo 'expira'
+    (epoch en segundos) es el TTL de la tabla: DynamoDB borra los items
+    vencidos, pero el borrado no es inmediato y por eso se revisa al leer.
+    """
+
+    def __init__(self):
+        super().__init__(Config.TABLE_CACHE_RESPUESTAS)
+
+    def get_respuesta(self, clave: str) -> Optional[Dict]:
+        """
+        Obtiene una respuesta cacheada vigente
+
+        Args:
+            clave: Clave de contenido de la consulta
+
+        Returns:
+            Item con 'respuesta' y 'tokens', o None si no existe o venció
+        """
+        item = self.get_by_key(clave)
+        if item and float(item.get('expira', 0)) > time.time():
+            return item
+        return None
+
+    def guardar_respuesta(self, clave: str, contexto: str, respuesta: str, tokens: int, ttl: float) -> bool:
+        """
+        Guarda una respuesta con vencimiento
+
+        Args:
+            clave: Clave de contenido de la consulta
+            contexto: Contexto de la consulta (para diagnóstico)
+            respuesta: Texto generado
+            tokens: Tokens totales que costó generarla
+            ttl: Segundos de vigencia
+        """
+        return self.put_item({
+            'clave': clave,
+            'contexto': contexto,
+            'respuesta': respuesta,
+            'tokens': int(tokens),
+            'expira': int(time.time() + ttl)
+        })
@@ -0,0 +1,212 @@
+"""
+Caché de lectura para catálogos que cambian poco (servicios, reglas...)
+
+Vive a nivel de proceso, por lo que sobrevive entre invocaciones de un
+contenedor Lambda caliente. Cada caché tiene:
+- TTL de frescura y ventana stale-while-revalidate
+- Tamaño máximo con desalojo LRU
+- Refresco single-flight: un solo hilo consulta DynamoDB por clave
+- Contadores de hits/misses para ajustar los TTL
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from utils.concurrencia import get_executor
+
+
+class _Entrada:
+    __slots__ = ('valor', 'creado')
+
+    def __init__(self, valor: Any):
+        self.valor = valor
+        self.creado = time.monotonic()
+
+
+class CatalogCache:
+    """Caché read-through con TTL, LRU y stale-while-revalidate"""
+
+    _registro: Dict[str, 'CatalogCache'] = {}
+    _registro_lock = threading.Lock()
+
+    def __init__(self, nombre: str, ttl: float, stale_ttl: float = 0, max_entradas: int = 128):
+        """
+        Args:
+            nombre: Identificador de la caché (para métricas)
+            ttl: Segundos durante los que una entrada es fresca
+            stale_ttl: Segundos adicionales en que se sirve la entrada vencida
+                mientras se refresca en segundo plano
+            max_entradas: Máximo de claves antes de desalojar por LRU
+        """
+        self.nombre = nombre
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entradas = max_entradas
+
+        self._entradas: 'OrderedDict[Hashable, _Entrada]' = OrderedDict()
+        self._en_vuelo: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refrescos = 0
+        self.errores = 0
+        self.desalojos = 0
+
+        with CatalogCache._registro_lock:
+            CatalogCache._registro[nombre] = self
+
+    def get(self, clave: Hashable, cargar: Callable[[], Any]) -> Any:
+        """
+        Obtiene un valor de la caché o lo carga
+
+        Args:
+            clave: Clave de la consulta
+            cargar: Función que consulta DynamoDB
+
+        Returns:
+            Valor cacheado o recién cargado
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None:
+                edad = time.monotonic() - entrada.creado
+                if edad < self.ttl:
+                    self._entradas.move_to_end(clave)
+                    self.hits += 1
+                    return entrada.valor
+                if edad < self.ttl + self.stale_ttl:
+                    self._entradas.move_to_end(clave)
+                    self.stale_hits += 1
+                    if clave not in self._en_vuelo:
+                        future = Future()
+                        self._en_vuelo[clave] = future
+                        get_executor().submit(self._refrescar, clave, cargar, future)
+                    return entrada.valor
+
+            self.misses += 1
+            future = self._en_vuelo.get(clave)
+            propietario = future is None
+            if propietario:
+                future = Future()
+                self._en_vuelo[clave] = future
+
+        if not propietario:
+            return future.result()
+
+        return self._refrescar(clave, cargar, future)
+
+    def consultar(self, clave: Hashable) -> Optional[Any]:
+        """
+        Busca una entrada fresca sin cargarla si falta
+
+        Para consumidores que producen el valor por su cuenta (p. ej. una
+        respuesta en streaming) y lo publican después con guardar().
+
+        Returns:
+            Valor cacheado o None
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and time.monotonic() - entrada.creado < self.ttl:
+                self._entradas.move_to_end(clave)
+                self.hits += 1
+                return entrada.valor
+            self.misses += 1
+            return None
+
+    def guardar(self, clave: Hashable, valor: Any):
+        """Publica un valor producido fuera de get()"""
+        with self._lock:
+            self._insertar(clave, valor)
+
+    def reemplazar(self, clave: Hashable, nueva_clave: Hashable, actualizar: Callable[[Any], Any]) -> bool:
+        """
+        Sustituye una entrada fresca por su versión actualizada (write-through)
+
+        La entrada nueva conserva la antigüedad de la original: actualizar
+        un valor no renueva su TTL.
+
+        Args:
+            clave: Clave de la entrada actual
+            nueva_clave: Clave bajo la que se publica el valor actualizado
+            actualizar: Función valor -> valor nuevo (se ejecuta con el lock
+                tomado, debe ser barata)
+
+        Returns:
+            True si la entrada existía y seguía fresca
+        """
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or time.monotonic() - entrada.creado >= self.ttl:
+                return False
+            nueva = _Entrada(actualizar(entrada.valor))
+            nueva.creado = entrada.creado
+            self._entradas.pop(clave, None)
+            self._entradas[nueva_clave] = nueva
+            self._entradas.move_to_end(nueva_clave)
+            return True
+
+    def invalidar(self, clave: Optional[Hashable] = None):
+        """Descarta una clave (o toda la caché si no se indica)"""
+        with self._lock:
+            if clave is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(clave, None)
+
+    def estadisticas(self) -> Dict:
+        """Contadores de uso de la caché"""
+        with self._lock:
+            total = self.hits + self.stale_hits + self.misses
+            return {
+                'nombre': self.nombre,
+                'entradas': len(self._entradas),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'refrescos': self.refrescos,
+                'errores': self.errores,
+                'desalojos': self.desalojos,
+                'hit_rate': round((self.hits + self.stale_hits) / total, 3) if total else 0.0
+            }
+
+    @classmethod
+    def estadisticas_globales(cls) -> Dict[str, Dict]:
+        """Contadores de todas las cachés del proceso"""
+        with cls._registro_lock:
+            caches = list(cls._registro.values())
+        return {cache.nombre: cache.estadisticas() for cache in caches}
+
+    def _refrescar(self, clave: Hashable, cargar: Callable[[], Any], future: Future) -> Any:
+        """Carga la clave y publica el resultado a los hilos en espera"""
+        try:
+            valor = cargar()
+        except BaseException as e:
+            print(f"Error refrescando caché '{self.nombre}': {str(e)}")
+            with self._lock:
+                self.errores += 1
+                self._en_vuelo.pop(clave, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self.refrescos += 1
+            # Resultados vacíos suelen ser errores ya capturados por el DAO: no se cachean
+            if valor:
+                self._insertar(clave, valor)
+            self._en_vuelo.pop(clave, None)
+
+        future.set_result(valor)
+        return valor
+
+    def _insertar(self, clave: Hashable, valor: Any):
+        """Inserta con desalojo LRU (llamar con el lock tomado)"""
+        self._entradas[clave] = _Entrada(valor)
+        self._entradas.move_to_end(clave)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+            self.desalojos += 1
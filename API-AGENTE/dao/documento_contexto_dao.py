@@ -0,0 +1,120 @@
+"""
+DAOs específicos para cada tabla
+"""
+from typing import Dict, Optional
+from botocore.exceptions import ClientError
+from .base import BaseDAO
+from .usuarios_dao import UsuariosDAO
+from config import Config
+
+# ===== DOCUMENTO DE CONTEXTO DAO =====
+class DocumentoContextoDAO(BaseDAO):
+    """
+    DAO para el documento de contexto materializado por usuario
+
+    Un item por usuario con una sección por tabla de origen. Cada sección
+    guarda junto a sus atributos '<seccion>_leido_en': el instante (epoch en
+    ms) en que empezó la lectura de origen que la produjo. Una escritura con
+    una lectura más vieja que la guardada se descarta, así que los eventos
+    repetidos o desordenados del stream no pisan datos más nuevos.
+
+    Las secciones de datos versionados (UsuariosDAO.TIPOS_VERSIONADOS)
+    guardan también '<seccion>_version': el contador version_<tipo> del
+    usuario leído antes que la tabla de origen.
+    """
+
+    # Sección -> atributos del documento que la forman
+    SECCIONES = {
+        'perfil': ('perfil',),
+        'recetas': ('recetas',),
+        'memoria': ('memoria',),
+        'historial': ('historial_diario', 'historial_ultimos')
+    }
+
+    def __init__(self):
+        super().__init__(Config.TABLE_CONTEXTO_USUARIO)
+
+    @staticmethod
+    def completo(documento: Optional[Dict]) -> bool:
+        """Indica si el documento tiene todas las secciones y un perfil"""
+        if not documento or not documento.get('perfil'):
+            return False
+        return all(f'{seccion}_leido_en' in documento for seccion in DocumentoContextoDAO.SECCIONES)
+
+    def get_documento(self, correo: str) -> Optional[Dict]:
+        """
+        Obtiene el documento del usuario
+
+        Returns:
+            Documento completo, o None si no existe o le falta alguna sección
+            (el backfill aún no lo construyó)
+        """
+        documento = self.get_by_key(correo)
+        return documento if self.completo(documento) else None
+
+    @staticmethod
+    def vigente(documento: Optional[Dict], usuario: Optional[Dict]) -> Optional[Dict]:
+        """
+        Copia del documento sin las secciones atrasadas
+
+        Una sección está atrasada si su versión es menor que el contador
+        version_<tipo> actual del usuario: hubo una escritura que el stream
+        todavía no procesó.
+
+        Args:
+            documento: Documento completo
+            usuario: Registro actual del usuario
+
+        Returns:
+            Documento con solo los atributos de secciones al día, o None si
+            falta el documento o el usuario
+        """
+        if not documento or not usuario:
+            return None
+        atrasados = set()
+        for tipo in UsuariosDAO.TIPOS_VERSIONADOS:
+            if int(documento.get(f'{tipo}_version') or 0) < UsuariosDAO.versiones(usuario, [tipo])[0]:
+                atrasados.update(DocumentoContextoDAO.SECCIONES[tipo])
+        return {k: v for k, v in documento.items() if k not in atrasados}
+
+    def guardar_seccion(self, correo: str, seccion: str, atributos: Dict, leido_en: int) -> bool:
+        """
+        Reemplaza una sección del documento si no hay una más reciente
+
+        Args:
+            correo: Email del usuario
+            seccion: Una de SECCIONES
+            atributos: Atributos de la sección (se reemplazan completos)
+            leido_en: Epoch en ms en que empezó la lectura de origen
+
+        Returns:
+            True si se escribió, False si ya había una lectura más reciente
+
+        Raises:
+            ClientError: Si la escritura falló por otro motivo (throttling,
+                error interno): el lote del stream debe reintentarse
+        """
+        key = self._build_key(correo)
+        nombres = {'#leido': f'{seccion}_leido_en'}
+        valores = {':leido': leido_en}
+        asignaciones = ['#leido = :leido']
+        for idx, (nombre, valor) in enumerate(atributos.items()):
+            nombres[f'#a{idx}'] = nombre
+            valores[f':a{idx}'] = self._float_to_decimal(valor)
+            asignaciones.append(f'#a{idx} = :a{idx}')
+
+        try:
+            self.table.update_item(
+                Key=key,
+                UpdateExpression='SET ' + ', '.join(asignaciones),
+                ConditionExpression='attribute_not_exists(#leido) OR #leido <= :leido',
+                ExpressionAttributeNames=nombres,
+                ExpressionAttributeValues=valores
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+
+        self._invalidar_identity_map(key)
+        return True
@@ -0,0 +1,126 @@
+"""
+DAOs específicos para cada tabla
+"""
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from boto3.dynamodb.conditions import Key
+from .base import BaseDAO
+from config import Config
+from utils import agregados_historial
+
+# ===== AGREGADOS DEL HISTORIAL DAO =====
+class HistorialAgregadosDAO(BaseDAO):
+    """
+    DAO para los agregados del historial médico por periodo
+
+    Un item por (correo, periodo) con 'registros' y el resumen de cada
+    métrica (n, suma, min, max, cuadrados; ver utils/agregados_historial.py).
+    El periodo es 'D#<día>', 'S#<semana ISO>' o 'M#<mes>'. 'escrituras'
+    cuenta las actualizaciones del item y sirve de bloqueo optimista: los
+    escribe HistorialDAO.agregar_registro en la misma transacción que el
+    registro crudo.
+    """
+
+    def __init__(self):
+        super().__init__(Config.TABLE_HISTORIAL_AGREGADOS)
+
+    def get_agregados(
+        self,
+        correo: str,
+        granularidad: str = 'dia',
+        desde: Optional[str] = None,
+        hasta: Optional[str] = None,
+        dias: int = 30
+    ) -> List[Dict]:
+        """
+        Obtiene los agregados de un rango
+
+        Args:
+            correo: Email del usuario
+            granularidad: 'dia', 'semana' o 'mes'
+            desde: Fecha ISO inicial (default: hace `dias` días)
+            hasta: Fecha ISO final (default: hoy)
+            dias: Días hacia atrás si no se indica `desde`
+
+        Returns:
+            Agregados ordenados por periodo descendente; los diarios traen
+            además 'dia' (como utils.agregados_historial.agregar_por_dia)
+        """
+        hoy = date.today()
+        desde = desde or (hoy - timedelta(days=dias)).isoformat()
+        hasta = hasta or hoy.isoformat()
+        items = self.iter_query(
+            correo,
+            sort_key_condition=Key('periodo').between(
+                agregados_historial.periodo(granularidad, desde[:10]),
+                agregados_historial.periodo(granularidad, hasta[:10])
+            )
+        )
+        return [self._como_agregado(item) for item in items]
+
+    def get_periodos(self, correo: str, dia: str) -> Dict[str, Optional[Dict]]:
+        """
+        Agregados de día, semana y mes que contienen al día (lectura fuerte)
+
+        Returns:
+            Diccionario granularidad -> item, o None si aún no existe
+
+        Raises:
+            Exception: El error de DynamoDB
+        """
+        return {
+            granularidad: self.get_consistente(correo, agregados_historial.periodo(granularidad, dia))
+            for granularidad in agregados_historial.GRANULARIDADES
+        }
+
+    def get_diarios_consistente(self, correo: str, desde: str, hasta: str) -> List[Dict]:
+        """
+        Agregados diarios entre dos fechas ISO, inclusive (lectura fuerte)
+
+        Raises:
+            Exception: El error de DynamoDB
+        """
+        items = self.query_consistente(
+            correo,
+            sort_key_condition=Key('periodo').between(
+                agregados_historial.periodo('dia', desde[:10]),
+                agregados_historial.periodo('dia', hasta[:10])
+            )
+        )
+        return [self._como_agregado(item) for item in items]
+
+    def get_diarios_del_periodo(self, correo: str, granularidad: str, dia: str) -> List[Dict]:
+        """
+        Agregados diarios de la semana o el mes que contiene al día (lectura fuerte)
+
+        Raises:
+            Exception: El error de DynamoDB
+        """
+        inicio = date.fromisoformat(dia)
+        if granularidad == 'semana':
+            inicio -= timedelta(days=inicio.weekday())
+            fin = inicio + timedelta(days=6)
+        else:
+            inicio = inicio.replace(day=1)
+            fin = (inicio + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        return self.get_diarios_consistente(correo, inicio.isoformat(), fin.isoformat())
+
+    def nuevo_item(self, correo: str, periodo: str, agregado: Dict, anterior: Optional[Dict]) -> Dict:
+        """Item del periodo con el agregado y el contador de escrituras incrementado"""
+        item = {
+            'correo': correo,
+            'periodo': periodo,
+            'registros': int(agregado.get('registros', 0)),
+            'escrituras': int((anterior or {}).get('escrituras', 0)) + 1
+        }
+        for metrica in agregados_historial.METRICAS:
+            if agregado.get(metrica):
+                item[metrica] = agregado[metrica]
+        return item
+
+    @staticmethod
+    def _como_agregado(item: Dict) -> Dict:
+        """Item leído con la forma de los agregados de utils.agregados_historial"""
+        if item.get('periodo', '').startswith('D#'):
+            return {**item, 'dia': item['periodo'][2:]}
+        return item
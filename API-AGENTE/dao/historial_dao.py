@@ -1,11 +1,29 @@
 """
 DAOs específicos para cada tabla
 """
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+import random
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+from datetime import date, datetime, timedelta
 from boto3.dynamodb.conditions import Key
-from .base import BaseDAO
+from botocore.exceptions import ClientError
+from .base import BaseDAO, DAOFactory
+from .low_level import LowLevelTable
+from .historial_lecturas_dao import ESCALAS, resumir, segundos_epoca
 from config import Config
+from utils import agregados_historial
+
+if TYPE_CHECKING:
+    # NumPy se importa recién en get_series
+    from .historial_series import HistorialSeries
+
+class ResultadoLote(NamedTuple):
+    """Resultado de HistorialDAO.agregar_lote"""
+    # fecha -> 'creado' | 'actualizado' | 'sin_cambios' | 'error'
+    estados: Dict[str, str]
+    # None sin tabla de agregados; False si no se pudieron recalcular
+    agregados: Optional[bool]
+
 
 # ===== HISTORIAL MÉDICO DAO =====
 class HistorialDAO(BaseDAO):
@@ -13,14 +31,24 @@ class HistorialDAO(BaseDAO):
     
     def __init__(self):
         super().__init__(Config.TABLE_HISTORIAL)
+        # Cliente de bajo nivel para get_series (en modo bajo nivel es self.lecturas)
+        self._lecturas_wire: Optional[LowLevelTable] = None
     
-    def get_historial_reciente(self, correo: str, dias: int = 30) -> List[Dict]:
+    def get_historial_reciente(
+        self,
+        correo: str,
+        dias: int = 30,
+        atributos: Optional[List[str]] = None,
+        limite: Optional[int] = None
+    ) -> List[Dict]:
         """
         Obtiene el historial médico reciente del usuario
         
         Args:
             correo: Email del usuario
             dias: Número de días hacia atrás
+            atributos: Atributos a leer (None para el registro completo)
+            limite: Número máximo de registros (default: Config.LIMITE_HISTORIAL)
         
         Returns:
             Lista de registros ordenados por fecha descendente
@@ -31,17 +59,78 @@ class HistorialDAO(BaseDAO):
             correo,
             sort_key_condition=Key('fecha').gte(fecha_limite),
             scan_index_forward=False,
-            limit=Config.LIMITE_HISTORIAL
+            limit=limite or Config.LIMITE_HISTORIAL,
+            projection=atributos
         )
     
     def get_historial_rango(self, correo: str, fecha_inicio: str, fecha_fin: str) -> List[Dict]:
-        """Obtiene historial en un rango de fechas específico"""
-        return self.query_by_partition(
+        """Obtiene historial en un rango de fechas específico (todas las páginas)"""
+        return list(self.iter_historial_rango(correo, fecha_inicio, fecha_fin))
+    
+    def iter_historial_rango(
+        self,
+        correo: str,
+        fecha_inicio: str,
+        fecha_fin: str,
+        cursor: Optional[str] = None,
+        page_size: Optional[int] = None
+    ) -> Iterator[Dict]:
+        """
+        Recorre el historial de un rango de fechas sin cortar en 1 MB
+        
+        Args:
+            correo: Email del usuario
+            fecha_inicio: Fecha inicial (ISO)
+            fecha_fin: Fecha final (ISO)
+            cursor: Cursor firmado de una página anterior del mismo rango
+            page_size: Registros por página
+        
+        Yields:
+            Registros ordenados por fecha descendente
+        """
+        return self.iter_query(
             correo,
             sort_key_condition=Key('fecha').between(fecha_inicio, fecha_fin),
-            scan_index_forward=False
+            scan_index_forward=False,
+            cursor=cursor,
+            page_size=page_size
         )
-    
+
+    def get_historial_pagina(
+        self,
+        correo: str,
+        fecha_inicio: str,
+        fecha_fin: str,
+        limite: int,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Una página del historial de un rango, para reanudar desde HTTP
+
+        Args:
+            correo: Email del usuario
+            fecha_inicio: Fecha inicial (ISO)
+            fecha_fin: Fecha final (ISO)
+            limite: Registros de la página
+            cursor: Cursor devuelto por la página anterior
+
+        Returns:
+            Tupla (registros por fecha descendente, cursor de la siguiente
+            página o None si no hay más)
+
+        Raises:
+            ValueError: Si el cursor no es válido para este usuario
+        """
+        paginas = self.iter_query_pages(
+            correo,
+            sort_key_condition=Key('fecha').between(fecha_inicio, fecha_fin),
+            scan_index_forward=False,
+            page_size=limite,
+            cursor=cursor,
+            max_items=limite
+        )
+        return next(paginas, ([], None))
+
     def get_ultimo_registro(self, correo: str) -> Optional[Dict]:
         """Obtiene el registro más reciente"""
         registros = self.query_by_partition(
@@ -51,8 +140,515 @@ class HistorialDAO(BaseDAO):
         )
         return registros[0] if registros else None
     
+    def get_series(
+        self,
+        correo: str,
+        desde: str,
+        hasta: Optional[str] = None,
+        page_size: Optional[int] = None
+    ) -> 'HistorialSeries':
+        """
+        Historial de un rango como serie columnar (dao/historial_series.py)
+        
+        Lee con el cliente de bajo nivel y arma las columnas desde las
+        páginas en formato wire, sin un dict por registro, sea cual sea
+        Config.DYNAMODB_LOW_LEVEL.
+        
+        Args:
+            correo: Email del usuario
+            desde: Fecha ISO inicial
+            hasta: Fecha ISO final; si es solo día incluye el día completo
+                (default: sin límite)
+            page_size: Registros por página
+        
+        Returns:
+            HistorialSeries ascendente por fecha
+        
+        Raises:
+            ClientError: Si falla la lectura de una página
+        """
+        from .historial_series import HistorialSeries
+        
+        if hasta is None:
+            condicion = Key('fecha').gte(desde)
+        else:
+            condicion = Key('fecha').between(desde, f"{hasta}T23:59:59.999999" if len(hasta) == 10 else hasta)
+        params = {
+            'KeyConditionExpression': Key(self._get_partition_key_name()).eq(correo) & condicion,
+            'ScanIndexForward': True,
+            **self._build_projection(['fecha', 'sensores', 'wearables'])
+        }
+        if page_size:
+            params['Limit'] = page_size
+        return HistorialSeries.desde_paginas(correo, self._paginas_wire(params))
+    
+    def _paginas_wire(self, params: Dict) -> Iterator[List[Dict]]:
+        """Páginas de un Query en formato wire, siguiendo LastEvaluatedKey"""
+        if self._lecturas_wire is None:
+            self._lecturas_wire = self.tabla_cliente()
+        while True:
+            response = self._lecturas_wire.query_wire(**params)
+            yield response.get('Items', [])
+            if not response.get('LastEvaluatedKey'):
+                return
+            params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
+    def get_diarios(self, correo: str, desde: str, hasta: str) -> List[Dict]:
+        """
+        Agregados diarios entre dos fechas ISO, inclusive
+        
+        De la tabla de agregados si está configurada; si no, agregando los
+        registros crudos del rango.
+        
+        Returns:
+            Agregados {'dia', 'registros', 'pasos', 'sueno', 'fc'} ordenados
+            por día descendente
+        """
+        if Config.TABLE_HISTORIAL_AGREGADOS:
+            return DAOFactory.get_dao('historial_agregados').get_agregados(
+                correo, 'dia', desde=desde, hasta=hasta
+            )
+        return self.get_series(correo, desde[:10], hasta[:10]).diarios()
+    
+    def get_agregados_rango(self, correo: str, granularidad: str, desde: str, hasta: str) -> List[Dict]:
+        """
+        Agregados por día, semana o mes de un rango
+        
+        Con Config.TABLE_HISTORIAL_AGREGADOS lee los agregados persistidos;
+        si no, los calcula desde los registros crudos (get_diarios).
+        
+        Args:
+            correo: Email del usuario
+            granularidad: 'dia', 'semana' o 'mes'
+            desde: Fecha ISO inicial
+            hasta: Fecha ISO final
+        
+        Returns:
+            Agregados ordenados por periodo descendente (los diarios con 'dia',
+            los demás con 'periodo')
+        """
+        if Config.TABLE_HISTORIAL_AGREGADOS:
+            return DAOFactory.get_dao('historial_agregados').get_agregados(
+                correo, granularidad, desde=desde, hasta=hasta
+            )
+        diarios = self.get_diarios(correo, desde, hasta)
+        if granularidad == 'dia':
+            return diarios
+        return agregados_historial.agrupar(diarios, granularidad)
+    
+    def agregar_lecturas(self, correo: str, metrica: str, lecturas: Iterable[Tuple[str, float]]) -> List[str]:
+        """
+        Agrega lecturas de alta frecuencia de una métrica
+        
+        Se guardan en bloques por hora o día (dao/historial_lecturas_dao.py),
+        no como registros: dos lecturas del mismo día no se pisan.
+        
+        Args:
+            correo: Email del usuario
+            metrica: 'pasos', 'sueno' o 'fc'
+            lecturas: Pares (fecha ISO, valor)
+        
+        Returns:
+            Bloques que no se pudieron escribir
+        
+        Raises:
+            ValueError: Si la métrica no existe o no hay tabla de lecturas
+        """
+        if not Config.TABLE_HISTORIAL_LECTURAS:
+            raise ValueError("TABLE_HISTORIAL_LECTURAS no está configurada")
+        return DAOFactory.get_dao('historial_lecturas').agregar(correo, metrica, lecturas)
+    
+    def iter_lecturas(self, correo: str, metrica: str, desde: str, hasta: str) -> Iterator[Tuple[str, float]]:
+        """
+        Lecturas crudas de una métrica en un rango, en orden ascendente
+        
+        Con Config.TABLE_HISTORIAL_LECTURAS decodifica los bloques de a uno
+        a medida que se consumen; sin ella, toma la métrica de los registros
+        del historial (como utils/agregados_historial.valores_registro).
+        
+        Args:
+            correo: Email del usuario
+            metrica: 'pasos', 'sueno' o 'fc'
+            desde: Fecha ISO inicial, inclusive
+            hasta: Fecha ISO final, inclusive (solo día = el día completo)
+        
+        Yields:
+            Pares (fecha ISO, valor)
+        
+        Raises:
+            ValueError: Si la métrica no existe
+        """
+        if metrica not in ESCALAS:
+            raise ValueError(f"Métrica '{metrica}' no existe")
+        if Config.TABLE_HISTORIAL_LECTURAS:
+            return DAOFactory.get_dao('historial_lecturas').iter_lecturas(correo, metrica, desde, hasta)
+        return self._iter_lecturas_registros(correo, metrica, desde, hasta)
+    
+    def get_lecturas_resumidas(
+        self,
+        correo: str,
+        metrica: str,
+        desde: str,
+        hasta: str,
+        intervalo: int
+    ) -> List[Dict]:
+        """
+        Lecturas de una métrica agrupadas en intervalos de `intervalo` segundos
+        
+        Con bloques de lecturas, los que caben completos en un intervalo se
+        resumen sin decodificarlos.
+        
+        Returns:
+            [{'inicio', 'n', 'promedio', 'min', 'max'}] por intervalo ascendente
+        
+        Raises:
+            ValueError: Si la métrica no existe o el intervalo no es positivo
+        """
+        if intervalo <= 0:
+            raise ValueError("El intervalo debe ser positivo")
+        if metrica not in ESCALAS:
+            raise ValueError(f"Métrica '{metrica}' no existe")
+        if Config.TABLE_HISTORIAL_LECTURAS:
+            return DAOFactory.get_dao('historial_lecturas').get_resumen(correo, metrica, desde, hasta, intervalo)
+        return resumir(
+            ((segundos_epoca(fecha), valor) for fecha, valor in self._iter_lecturas_registros(correo, metrica, desde, hasta)),
+            intervalo
+        )
+    
+    def _iter_lecturas_registros(self, correo: str, metrica: str, desde: str, hasta: str) -> Iterator[Tuple[str, float]]:
+        """Valores de una métrica tomados de los registros del historial"""
+        if len(hasta) == 10:
+            hasta = f"{hasta}T23:59:59.999999"
+        for registro in self.iter_query(
+            correo,
+            sort_key_condition=Key('fecha').between(desde, hasta),
+            scan_index_forward=True,
+            projection=['fecha', 'sensores', 'wearables']
+        ):
+            valor = agregados_historial.valores_registro(registro).get(metrica)
+            if valor is not None:
+                yield str(registro['fecha']), valor
+    
     def agregar_registro(self, registro: Dict) -> bool:
-        """Agrega un nuevo registro de historial"""
+        """
+        Agrega un nuevo registro de historial
+        
+        Con Config.TABLE_HISTORIAL_AGREGADOS el registro y los agregados de
+        su día, semana y mes se escriben en una sola transacción.
+        """
         if 'fecha' not in registro:
             registro['fecha'] = datetime.now().isoformat()
-        return self.put_item(registro)
+        if not Config.TABLE_HISTORIAL_AGREGADOS:
+            return self.put_item(registro)
+        
+        try:
+            return self._agregar_con_agregados(registro)
+        except Exception as e:
+            print(f"Error en agregar_registro: {str(e)}")
+            return False
+    
+    def _agregar_con_agregados(self, registro: Dict) -> bool:
+        """
+        Escribe el registro y actualiza sus agregados (TransactWriteItems)
+        
+        Cada agregado se escribe condicionado a su contador 'escrituras'
+        leído: si otra escritura lo cambió entre medias la transacción se
+        cancela completa y se reintenta con los valores nuevos. Un registro
+        que reemplaza a otro de la misma fecha recalcula los agregados
+        (el día desde sus registros crudos, semana y mes desde los días),
+        porque un mínimo o máximo no se puede restar.
+        """
+        agregados_dao = DAOFactory.get_dao('historial_agregados')
+        correo, fecha = registro['correo'], str(registro['fecha'])
+        dia = fecha[:10]
+        
+        for intento in range(Config.AGREGADOS_MAX_INTENTOS):
+            anterior = self.get_consistente(correo, fecha)
+            actuales = agregados_dao.get_periodos(correo, dia)
+            if anterior is None:
+                nuevos = {
+                    granularidad: agregados_historial.sumar_registro(actuales[granularidad], registro)
+                    for granularidad in agregados_historial.GRANULARIDADES
+                }
+            else:
+                nuevos = self._recalcular_agregados(agregados_dao, registro)
+            
+            transaccion = [self._put_condicionado(
+                self.table_name, registro, 'fecha', existe=anterior is not None
+            )]
+            for granularidad, agregado in nuevos.items():
+                item = agregados_dao.nuevo_item(
+                    correo,
+                    agregados_historial.periodo(granularidad, dia),
+                    agregado,
+                    actuales[granularidad]
+                )
+                transaccion.append(self._put_condicionado(
+                    agregados_dao.table_name, item, 'periodo',
+                    existe=actuales[granularidad] is not None,
+                    escrituras=item['escrituras'] - 1
+                ))
+            
+            try:
+                self.dynamodb.meta.client.transact_write_items(TransactItems=transaccion)
+            except ClientError as e:
+                motivos = e.response.get('CancellationReasons') or []
+                if not any(m.get('Code') == 'ConditionalCheckFailed' for m in motivos):
+                    raise
+                # Backoff exponencial con full jitter
+                time.sleep(random.uniform(0, min(
+                    Config.BATCH_BACKOFF_MAX,
+                    Config.BATCH_BACKOFF_BASE * (2 ** (intento + 1))
+                )))
+                continue
+            
+            self._invalidar_identity_map(self._key_from_item(registro))
+            return True
+        
+        print(f"⚠️ agregar_registro: agregados de {correo} {dia} en conflicto tras {Config.AGREGADOS_MAX_INTENTOS} intentos")
+        return False
+    
+    def agregar_lote(self, correo: str, registros: List[Dict]) -> ResultadoLote:
+        """
+        Escribe varios registros de un usuario con BatchWriteItem
+        
+        Antes de escribir lee los registros existentes del rango (lectura
+        fuerte) y omite los que no cambian, así reenviar el mismo lote no
+        escribe nada. Con Config.TABLE_HISTORIAL_AGREGADOS recalcula después
+        los agregados de los días escritos desde los registros crudos, y los
+        de sus semanas y meses desde los días: recalcular en lugar de sumar
+        evita contar dos veces un lote reintentado. A diferencia de
+        agregar_registro no es atómico; si el recálculo falla, los registros
+        quedan escritos y sus agregados se corrigen con la siguiente
+        escritura del día o con reconstruir_agregados.
+        
+        Args:
+            correo: Email del usuario
+            registros: Registros del usuario con 'fecha', sin fechas repetidas
+        
+        Returns:
+            ResultadoLote con el estado de cada fecha
+        
+        Raises:
+            Exception: Si falla la lectura de los registros existentes
+        """
+        if not registros:
+            return ResultadoLote({}, True if Config.TABLE_HISTORIAL_AGREGADOS else None)
+        
+        fechas = sorted(str(registro['fecha']) for registro in registros)
+        existentes = {
+            item['fecha']: item
+            for item in self.query_consistente(
+                correo,
+                sort_key_condition=Key('fecha').between(fechas[0], fechas[-1]),
+                projection=['fecha', 'sensores', 'wearables']
+            )
+        }
+        
+        estados: Dict[str, str] = {}
+        a_escribir = []
+        for registro in registros:
+            fecha = str(registro['fecha'])
+            anterior = existentes.get(fecha)
+            if anterior is None:
+                estados[fecha] = 'creado'
+            elif self._mismos_valores(anterior, registro):
+                estados[fecha] = 'sin_cambios'
+                continue
+            else:
+                estados[fecha] = 'actualizado'
+            a_escribir.append(registro)
+        
+        for clave in self.put_items_lote(a_escribir):
+            estados[clave['fecha']] = 'error'
+        
+        if not Config.TABLE_HISTORIAL_AGREGADOS:
+            return ResultadoLote(estados, None)
+        
+        # También los días de los lotes fallidos: un timeout no garantiza
+        # que no se hayan escrito, y recalcular desde los crudos es idempotente
+        dias = {str(registro['fecha'])[:10] for registro in a_escribir}
+        if not dias:
+            return ResultadoLote(estados, True)
+        try:
+            self._recalcular_agregados_dias(correo, dias)
+            return ResultadoLote(estados, True)
+        except Exception as e:
+            print(f"⚠️ agregar_lote: agregados de {correo} sin recalcular: {str(e)}")
+            return ResultadoLote(estados, False)
+    
+    def reconstruir_agregados(self, correo: str) -> int:
+        """
+        Recalcula todos los agregados del usuario desde sus registros crudos
+        
+        Para cargar la tabla de agregados con el historial existente. Cada
+        agregado se escribe condicionado a su contador 'escrituras' leído
+        antes que los registros; si una escritura concurrente lo cambió, se
+        vuelve a calcular el usuario completo.
+        
+        Returns:
+            Número de agregados escritos
+        
+        Raises:
+            Exception: Si falla una lectura o una escritura no condicional
+        """
+        agregados_dao = DAOFactory.get_dao('historial_agregados')
+        
+        for _ in range(Config.AGREGADOS_MAX_INTENTOS):
+            existentes = {item['periodo']: item for item in agregados_dao.query_consistente(correo)}
+            diarios = agregados_historial.agregar_por_dia(
+                self.query_consistente(correo, projection=['fecha', 'sensores', 'wearables'])
+            )
+            nuevos = {agregados_historial.periodo('dia', d['dia']): d for d in diarios}
+            for granularidad in ('semana', 'mes'):
+                nuevos.update((a['periodo'], a) for a in agregados_historial.agrupar(diarios, granularidad))
+            
+            if not self._escribir_agregados(agregados_dao, correo, nuevos, existentes):
+                return len(nuevos)
+        
+        raise RuntimeError(f"Agregados de {correo} en conflicto tras {Config.AGREGADOS_MAX_INTENTOS} intentos")
+    
+    def _recalcular_agregados_dias(self, correo: str, dias: Set[str]) -> int:
+        """
+        Recalcula los agregados de los días indicados y de sus semanas y meses
+        
+        Como reconstruir_agregados, pero solo para la ventana que cubre esas
+        semanas y meses: los agregados se leen antes que los registros y se
+        escriben condicionados a su contador 'escrituras'.
+        
+        Returns:
+            Número de agregados escritos
+        
+        Raises:
+            Exception: Si falla una lectura o una escritura no condicional
+        """
+        agregados_dao = DAOFactory.get_dao('historial_agregados')
+        primero, ultimo = date.fromisoformat(min(dias)), date.fromisoformat(max(dias))
+        inicio = min(primero.replace(day=1), primero - timedelta(days=primero.weekday()))
+        fin_mes = (ultimo.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        fin = max(fin_mes, ultimo + timedelta(days=6 - ultimo.weekday()))
+        periodos = {
+            agregados_historial.periodo(granularidad, dia)
+            for dia in dias for granularidad in ('semana', 'mes')
+        }
+        
+        for _ in range(Config.AGREGADOS_MAX_INTENTOS):
+            diarios = {
+                diario['dia']: diario
+                for diario in agregados_dao.get_diarios_consistente(correo, inicio.isoformat(), fin.isoformat())
+            }
+            existentes = {diario['periodo']: diario for diario in diarios.values()}
+            existentes.update(
+                (periodo, agregados_dao.get_consistente(correo, periodo)) for periodo in periodos
+            )
+            
+            siguiente = (ultimo + timedelta(days=1)).isoformat()
+            crudos = [
+                registro for registro in self.query_consistente(
+                    correo,
+                    sort_key_condition=Key('fecha').between(primero.isoformat(), siguiente),
+                    projection=['fecha', 'sensores', 'wearables']
+                )
+                if registro['fecha'][:10] in dias
+            ]
+            recalculados = {diario['dia']: diario for diario in agregados_historial.agregar_por_dia(crudos)}
+            diarios.update(recalculados)
+            
+            nuevos = {agregados_historial.periodo('dia', dia): diario for dia, diario in recalculados.items()}
+            for granularidad in ('semana', 'mes'):
+                nuevos.update(
+                    (agregado['periodo'], agregado)
+                    for agregado in agregados_historial.agrupar(diarios.values(), granularidad)
+                    if agregado['periodo'] in periodos
+                )
+            
+            if not self._escribir_agregados(agregados_dao, correo, nuevos, existentes):
+                return len(nuevos)
+        
+        raise RuntimeError(f"Agregados de {correo} en conflicto tras {Config.AGREGADOS_MAX_INTENTOS} intentos")
+    
+    def _escribir_agregados(
+        self,
+        agregados_dao,
+        correo: str,
+        nuevos: Dict[str, Dict],
+        existentes: Dict[str, Optional[Dict]]
+    ) -> int:
+        """
+        Escribe agregados recalculados, cada uno condicionado a lo leído
+        
+        Args:
+            nuevos: Periodo -> agregado
+            existentes: Periodo -> item leído antes de los registros crudos
+        
+        Returns:
+            Número de agregados que otra escritura cambió entre medias
+        """
+        conflictos = 0
+        for periodo, agregado in nuevos.items():
+            anterior = existentes.get(periodo)
+            item = agregados_dao.nuevo_item(correo, periodo, agregado, anterior)
+            put = self._put_condicionado(
+                agregados_dao.table_name, item, 'periodo',
+                existe=anterior is not None,
+                escrituras=item['escrituras'] - 1
+            )['Put']
+            try:
+                self.dynamodb.meta.client.put_item(**put)
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+                conflictos += 1
+        return conflictos
+    
+    def _recalcular_agregados(self, agregados_dao, registro: Dict) -> Dict[str, Dict]:
+        """Agregados de día, semana y mes con `registro` reemplazando al de su fecha"""
+        correo, fecha = registro['correo'], str(registro['fecha'])
+        dia = fecha[:10]
+        
+        registros_dia = [
+            r for r in self.query_consistente(correo, sort_key_condition=Key('fecha').begins_with(dia))
+            if r.get('fecha') != fecha
+        ]
+        diario = agregados_historial.agregar_por_dia(registros_dia + [registro])[0]
+        
+        nuevos = {'dia': diario}
+        for granularidad in ('semana', 'mes'):
+            otros_dias = [
+                d for d in agregados_dao.get_diarios_del_periodo(correo, granularidad, dia)
+                if d['dia'] != dia
+            ]
+            nuevos[granularidad] = agregados_historial.combinar(otros_dias + [diario])
+        return nuevos
+    
+    @staticmethod
+    def _mismos_valores(anterior: Dict, registro: Dict) -> bool:
+        """True si el registro trae los mismos sensores y wearables que el guardado"""
+        return all(
+            (anterior.get(fuente) or {}) == (registro.get(fuente) or {})
+            for fuente in ('sensores', 'wearables')
+        )
+    
+    def _put_condicionado(
+        self,
+        tabla: str,
+        item: Dict,
+        sort_key: str,
+        existe: bool,
+        escrituras: Optional[int] = None
+    ) -> Dict:
+        """
+        Put de una transacción condicionado a lo leído
+        
+        Si el item no existía exige que siga sin existir; si existía y trae
+        contador, que 'escrituras' no haya cambiado.
+        """
+        put = {'TableName': tabla, 'Item': self._float_to_decimal(item)}
+        if not existe:
+            put['ConditionExpression'] = f'attribute_not_exists({sort_key})'
+        elif escrituras is not None:
+            put['ConditionExpression'] = 'escrituras = :escrituras'
+            put['ExpressionAttributeValues'] = {':escrituras': escrituras}
+        else:
+            put['ConditionExpression'] = f'attribute_exists({sort_key})'
+        return {'Put': put}
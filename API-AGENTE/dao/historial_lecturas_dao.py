@@ -0,0 +1,317 @@
+"""
+DAOs específicos para cada tabla
+"""
+import contextvars
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from .base import BaseDAO
+from config import Config
+from utils import codec_lecturas
+from utils.agregados_historial import hora_local
+from utils.concurrencia import get_executor
+
+# Métrica -> factor con que se guarda como entero (sueño: centésimas de hora)
+ESCALAS = {'pasos': 1, 'sueno': 100, 'fc': 1}
+
+# Duración de cada bloque en segundos (Config.LECTURAS_BLOQUE)
+DURACIONES = {'hora': 3600, 'dia': 86400}
+
+_EPOCA = datetime(1970, 1, 1)
+
+
+def segundos_epoca(fecha: str) -> int:
+    """
+    Segundos desde 1970 de la hora local de una fecha ISO
+
+    La zona horaria se descarta como en agregar_por_dia (ver
+    agregados_historial.hora_local): '2024-11-23T23:30:00-05:00' cae en el
+    bloque del 23 a las 23 h, igual que en el historial y sus agregados.
+    """
+    return int((datetime.fromisoformat(hora_local(fecha)) - _EPOCA).total_seconds())
+
+
+def fecha_iso(segundos: int) -> str:
+    """Fecha ISO (sin zona) de unos segundos desde 1970"""
+    return (_EPOCA + timedelta(seconds=segundos)).isoformat()
+
+
+def resumir(lecturas: Iterable[Tuple[int, float]], intervalo: int) -> List[Dict]:
+    """
+    Agrupa lecturas (segundos, valor) en intervalos alineados de `intervalo` segundos
+
+    Returns:
+        [{'inicio', 'n', 'promedio', 'min', 'max'}] por intervalo ascendente
+    """
+    grupos: Dict[int, List[float]] = {}
+    for segundo, valor in lecturas:
+        _acumular(grupos, segundo - segundo % intervalo, 1, valor, valor, valor)
+    return _como_resumen(grupos)
+
+
+def _acumular(grupos: Dict[int, List[float]], grupo: int, n: int, suma: float, minimo: float, maximo: float):
+    actual = grupos.get(grupo)
+    if actual is None:
+        grupos[grupo] = [n, suma, minimo, maximo]
+    else:
+        actual[0] += n
+        actual[1] += suma
+        actual[2] = min(actual[2], minimo)
+        actual[3] = max(actual[3], maximo)
+
+
+def _como_resumen(grupos: Dict[int, List[float]]) -> List[Dict]:
+    return [
+        {'inicio': fecha_iso(grupo), 'n': int(n), 'promedio': suma / n, 'min': minimo, 'max': maximo}
+        for grupo, (n, suma, minimo, maximo) in sorted(grupos.items())
+    ]
+
+
+# ===== LECTURAS DEL HISTORIAL DAO =====
+class HistorialLecturasDAO(BaseDAO):
+    """
+    DAO para las lecturas de alta frecuencia del historial (sensores y wearables)
+
+    Un item por (correo, bloque), donde el bloque es '<métrica>#<hora>'
+    ('fc#2024-11-23T08') o '<métrica>#<día>' según Config.LECTURAS_BLOQUE.
+    'datos' guarda las lecturas del bloque codificadas con
+    utils/codec_lecturas.py; 'n', 'suma', 'min' y 'max' (enteros escalados
+    por 'escala') resumen el bloque sin decodificarlo, y 'ultimo' /
+    'ultimo_valor' permiten agregar al final sin decodificar. 'escrituras'
+    sirve de bloqueo optimista, como en los agregados.
+    """
+
+    def __init__(self):
+        super().__init__(Config.TABLE_HISTORIAL_LECTURAS)
+
+    def agregar(self, correo: str, metrica: str, lecturas: Iterable[Tuple[str, float]]) -> List[str]:
+        """
+        Agrega lecturas de una métrica a sus bloques
+
+        Una lectura con el mismo segundo que otra ya guardada la reemplaza.
+        Los bloques se escriben en paralelo sobre el pool compartido.
+
+        Args:
+            correo: Email del usuario
+            metrica: 'pasos', 'sueno' o 'fc'
+            lecturas: Pares (fecha ISO, valor)
+
+        Returns:
+            Bloques que no se pudieron escribir (vacío si se escribieron todos)
+
+        Raises:
+            ValueError: Si la métrica no existe
+        """
+        if metrica not in ESCALAS:
+            raise ValueError(f"Métrica '{metrica}' no existe")
+        escala = ESCALAS[metrica]
+        duracion = DURACIONES[Config.LECTURAS_BLOQUE]
+
+        por_bloque: Dict[int, Dict[int, int]] = {}
+        for fecha, valor in lecturas:
+            segundo = segundos_epoca(fecha)
+            inicio = segundo - segundo % duracion
+            por_bloque.setdefault(inicio, {})[segundo - inicio] = round(valor * escala)
+        if not por_bloque:
+            return []
+
+        claves = {inicio: self._clave_bloque(metrica, inicio, duracion) for inicio in por_bloque}
+        actuales = dict(zip(
+            claves.values(),
+            self.batch_get_by_keys([(correo, bloque) for bloque in claves.values()])
+        ))
+
+        executor = get_executor()
+        futures = {
+            claves[inicio]: executor.submit(
+                contextvars.copy_context().run,
+                self._escribir_bloque, correo, metrica, inicio, duracion, nuevas, actuales[claves[inicio]]
+            )
+            for inicio, nuevas in por_bloque.items()
+        }
+
+        fallidos = []
+        for bloque, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                print(f"⚠️ Bloque {bloque} de {correo} sin escribir: {str(e)}")
+                fallidos.append(bloque)
+        return fallidos
+
+    def iter_lecturas(self, correo: str, metrica: str, desde: str, hasta: str) -> Iterator[Tuple[str, float]]:
+        """
+        Lecturas crudas de un rango, decodificando un bloque a la vez
+
+        Args:
+            correo: Email del usuario
+            metrica: 'pasos', 'sueno' o 'fc'
+            desde: Fecha ISO inicial, inclusive
+            hasta: Fecha ISO final, inclusive (solo día = el día completo)
+
+        Yields:
+            Pares (fecha ISO, valor) en orden ascendente
+        """
+        for segundo, valor in self.iter_segundos(correo, metrica, desde, hasta):
+            yield fecha_iso(segundo), valor
+
+    def iter_segundos(self, correo: str, metrica: str, desde: str, hasta: str) -> Iterator[Tuple[int, float]]:
+        """Como iter_lecturas, con la fecha en segundos desde 1970"""
+        inicio_rango, fin_rango = self._rango(desde, hasta)
+        for item in self._iter_bloques(correo, metrica, inicio_rango, fin_rango):
+            inicio, escala = int(item['inicio_s']), int(item['escala'])
+            segundos, valores = codec_lecturas.decodificar(bytes(item['datos']))
+            for segundo, valor in zip(segundos, valores):
+                segundo += inicio
+                if inicio_rango <= segundo <= fin_rango:
+                    yield segundo, valor / escala
+
+    def get_resumen(self, correo: str, metrica: str, desde: str, hasta: str, intervalo: int) -> List[Dict]:
+        """
+        Lecturas de un rango agrupadas en intervalos de `intervalo` segundos
+
+        Los bloques que caen completos dentro del rango y de un intervalo
+        (intervalo múltiplo de la duración del bloque) se resumen con sus
+        totales guardados, sin decodificarlos; solo se decodifican los de
+        los bordes o si el intervalo es más corto que el bloque.
+
+        Returns:
+            [{'inicio', 'n', 'promedio', 'min', 'max'}] por intervalo ascendente
+        """
+        inicio_rango, fin_rango = self._rango(desde, hasta)
+        grupos: Dict[int, List[float]] = {}
+        for item in self._iter_bloques(correo, metrica, inicio_rango, fin_rango):
+            inicio, duracion, escala = int(item['inicio_s']), int(item['duracion']), int(item['escala'])
+            if intervalo % duracion == 0 and inicio_rango <= inicio and inicio + duracion - 1 <= fin_rango:
+                _acumular(
+                    grupos, inicio - inicio % intervalo, int(item['n']),
+                    item['suma'] / escala, item['min'] / escala, item['max'] / escala
+                )
+                continue
+            segundos, valores = codec_lecturas.decodificar(bytes(item['datos']))
+            for segundo, valor in zip(segundos, valores):
+                segundo += inicio
+                if inicio_rango <= segundo <= fin_rango:
+                    valor /= escala
+                    _acumular(grupos, segundo - segundo % intervalo, 1, valor, valor, valor)
+        return _como_resumen(grupos)
+
+    def _iter_bloques(self, correo: str, metrica: str, inicio_rango: int, fin_rango: int) -> Iterator[Dict]:
+        """Bloques que se solapan con el rango, página por página"""
+        # Desde el día de inicio: también cubre un bloque diario que empieza antes
+        desde = f"{metrica}#{fecha_iso(inicio_rango)[:10]}"
+        hasta = f"{metrica}#{fecha_iso(fin_rango)[:13]}"
+        for item in self.iter_query(
+            correo,
+            sort_key_condition=Key('bloque').between(desde, hasta),
+            scan_index_forward=True
+        ):
+            inicio = int(item['inicio_s'])
+            if inicio + int(item['duracion']) > inicio_rango and inicio <= fin_rango:
+                yield item
+
+    def _escribir_bloque(
+        self,
+        correo: str,
+        metrica: str,
+        inicio: int,
+        duracion: int,
+        nuevas: Dict[int, int],
+        actual: Optional[Dict]
+    ):
+        """
+        Combina las lecturas con el bloque y lo escribe condicionado a lo leído
+
+        Raises:
+            RuntimeError: Si el bloque sigue en conflicto tras los reintentos
+        """
+        bloque = self._clave_bloque(metrica, inicio, duracion)
+        for intento in range(Config.AGREGADOS_MAX_INTENTOS):
+            item = self._combinar(correo, metrica, bloque, inicio, duracion, nuevas, actual)
+            if actual is None:
+                condicion = {'ConditionExpression': 'attribute_not_exists(bloque)'}
+            else:
+                condicion = {
+                    'ConditionExpression': 'escrituras = :escrituras',
+                    'ExpressionAttributeValues': {':escrituras': int(actual['escrituras'])}
+                }
+            try:
+                self.table.put_item(Item=item, **condicion)
+                self._invalidar_identity_map(self._build_key(correo, bloque))
+                return
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+            # Backoff exponencial con full jitter
+            time.sleep(random.uniform(0, min(
+                Config.BATCH_BACKOFF_MAX,
+                Config.BATCH_BACKOFF_BASE * (2 ** (intento + 1))
+            )))
+            actual = self.get_consistente(correo, bloque)
+        raise RuntimeError(f"Bloque {bloque} en conflicto tras {Config.AGREGADOS_MAX_INTENTOS} intentos")
+
+    @staticmethod
+    def _combinar(
+        correo: str,
+        metrica: str,
+        bloque: str,
+        inicio: int,
+        duracion: int,
+        nuevas: Dict[int, int],
+        actual: Optional[Dict]
+    ) -> Dict:
+        """Item del bloque con las lecturas nuevas (valores ya escalados)"""
+        segundos = sorted(nuevas)
+        valores = [nuevas[segundo] for segundo in segundos]
+
+        if actual is not None and segundos[0] > int(actual['ultimo']):
+            # Al final del bloque: sin decodificar lo guardado
+            datos = codec_lecturas.agregar_al_final(
+                bytes(actual['datos']), int(actual['ultimo']), int(actual['ultimo_valor']), segundos, valores
+            )
+            n = int(actual['n']) + len(valores)
+            suma = int(actual['suma']) + sum(valores)
+            minimo = min(int(actual['min']), min(valores))
+            maximo = max(int(actual['max']), max(valores))
+        else:
+            if actual is not None:
+                guardadas = dict(zip(*codec_lecturas.decodificar(bytes(actual['datos']))))
+                guardadas.update(nuevas)
+                segundos = sorted(guardadas)
+                valores = [guardadas[segundo] for segundo in segundos]
+            datos = codec_lecturas.codificar(segundos, valores)
+            n, suma, minimo, maximo = len(valores), sum(valores), min(valores), max(valores)
+
+        return {
+            'correo': correo,
+            'bloque': bloque,
+            'inicio': fecha_iso(inicio),
+            'inicio_s': inicio,
+            'duracion': duracion,
+            'escala': ESCALAS[metrica],
+            'n': n,
+            'suma': suma,
+            'min': minimo,
+            'max': maximo,
+            'ultimo': segundos[-1],
+            'ultimo_valor': valores[-1],
+            'datos': datos,
+            'escrituras': int((actual or {}).get('escrituras', 0)) + 1
+        }
+
+    @staticmethod
+    def _clave_bloque(metrica: str, inicio: int, duracion: int) -> str:
+        """'fc#2024-11-23T08' (bloque por hora) o 'fc#2024-11-23' (por día)"""
+        fecha = fecha_iso(inicio)
+        return f"{metrica}#{fecha[:13] if duracion < 86400 else fecha[:10]}"
+
+    @staticmethod
+    def _rango(desde: str, hasta: str) -> Tuple[int, int]:
+        """Segundos inicial y final (inclusive) de un rango de fechas ISO"""
+        fin = segundos_epoca(hasta)
+        if len(hasta) == 10:
+            fin += 86400 - 1
+        return segundos_epoca(desde), fin
@@ -0,0 +1,256 @@
+"""
+Serie columnar del historial médico
+
+HistorialSeries guarda los registros de un usuario ordenados por fecha
+ascendente en arrays NumPy: las fechas como datetime64[us] y los valores
+de sensores y wearables como una matriz float64 (registros × CAMPOS, NaN
+donde el registro no trae el valor). Se arma directamente desde las
+páginas en formato wire del cliente de bajo nivel, sin un dict por
+registro, y los recortes por fecha o cantidad son vistas sobre los mismos
+arrays.
+
+Las fechas son hora local tal como se registraron, sin zona horaria
+(agregados_historial.hora_local): diarios() agrupa igual que
+agregados_historial.agregar_por_dia.
+
+Los arrays son de solo lectura, así una serie y sus vistas se pueden
+compartir (snapshot de contexto, identity map) sin copiarlas.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from utils.agregados_historial import hora_local
+
+# Columnas de la matriz de valores, por fuente
+CAMPOS_POR_FUENTE = (
+    ('sensores', ('pasos', 'horas_de_sueno')),
+    ('wearables', ('pasos', 'ritmo_cardiaco', 'horas_de_sueno')),
+)
+CAMPOS = tuple(f"{fuente}.{campo}" for fuente, campos in CAMPOS_POR_FUENTE for campo in campos)
+_INDICE = {campo: i for i, campo in enumerate(CAMPOS)}
+
+# Métrica -> campos en orden de prioridad (como agregados_historial.valores_registro)
+FUSION = {
+    'pasos': ('wearables.pasos', 'sensores.pasos'),
+    'sueno': ('wearables.horas_de_sueno', 'sensores.horas_de_sueno'),
+    'fc': ('wearables.ritmo_cardiaco',),
+}
+
+_NAN = float('nan')
+
+
+class HistorialSeries:
+    """Registros del historial de un usuario en columnas"""
+
+    __slots__ = ('correo', 'fechas', 'valores')
+
+    def __init__(self, correo: str, fechas: np.ndarray, valores: np.ndarray):
+        """
+        Args:
+            correo: Email del usuario
+            fechas: datetime64[us] ascendente (solo lectura)
+            valores: float64 (registros, len(CAMPOS)) (solo lectura)
+        """
+        self.correo = correo
+        self.fechas = fechas
+        self.valores = valores
+
+    @classmethod
+    def desde_paginas(cls, correo: str, paginas: Iterable[List[Dict]]) -> 'HistorialSeries':
+        """
+        Serie a partir de páginas de items en formato wire
+
+        Args:
+            correo: Email del usuario
+            paginas: Listas de items tal como los devuelve el cliente de bajo
+                nivel ({'fecha': {'S': ...}, 'wearables': {'M': {...}}})
+        """
+        fechas: List[str] = []
+        valores: List[float] = []
+        for items in paginas:
+            for item in items:
+                fechas.append(item['fecha']['S'])
+                for fuente, campos in CAMPOS_POR_FUENTE:
+                    mapa = (item.get(fuente) or {}).get('M') or {}
+                    for campo in campos:
+                        valor = mapa.get(campo)
+                        valores.append(float(valor['N']) if valor and 'N' in valor else _NAN)
+        return cls._construir(correo, fechas, valores)
+
+    @classmethod
+    def desde_registros(cls, correo: str, registros: Iterable[Dict]) -> 'HistorialSeries':
+        """Serie a partir de registros ya deserializados (documento, modo recurso)"""
+        fechas: List[str] = []
+        valores: List[float] = []
+        for registro in registros:
+            fechas.append(str(registro['fecha']))
+            for fuente, campos in CAMPOS_POR_FUENTE:
+                mapa = registro.get(fuente) or {}
+                for campo in campos:
+                    valor = mapa.get(campo)
+                    valores.append(float(valor) if valor is not None else _NAN)
+        return cls._construir(correo, fechas, valores)
+
+    @classmethod
+    def como_serie(cls, correo: str, historial) -> 'HistorialSeries':
+        """La serie tal cual, o una serie armada desde una lista de registros"""
+        if isinstance(historial, HistorialSeries):
+            return historial
+        return cls.desde_registros(correo, historial or [])
+
+    @classmethod
+    def _construir(cls, correo: str, fechas: List[str], valores: List[float]) -> 'HistorialSeries':
+        # NumPy pasaría las fechas con zona a UTC; solo se recorren si alguna la trae
+        texto = ''.join(fechas)
+        if 'Z' in texto or 'z' in texto or '+' in texto or texto.count('-') > 2 * len(fechas):
+            fechas = [hora_local(fecha) for fecha in fechas]
+        fechas_np = np.array(fechas, dtype='datetime64[us]')
+        valores_np = np.array(valores, dtype=np.float64).reshape(len(fechas), len(CAMPOS))
+        if len(fechas_np) > 1 and not (fechas_np[1:] >= fechas_np[:-1]).all():
+            orden = np.argsort(fechas_np, kind='stable')
+            fechas_np, valores_np = fechas_np[orden], valores_np[orden]
+        fechas_np.flags.writeable = False
+        valores_np.flags.writeable = False
+        return cls(correo, fechas_np, valores_np)
+
+    def __len__(self) -> int:
+        return len(self.fechas)
+
+    def __getitem__(self, indice: slice) -> 'HistorialSeries':
+        """Vista de un rango de registros (sin copiar)"""
+        if not isinstance(indice, slice):
+            raise TypeError("HistorialSeries solo admite slices")
+        return HistorialSeries(self.correo, self.fechas[indice], self.valores[indice])
+
+    def __repr__(self) -> str:
+        if not len(self):
+            return f"HistorialSeries({self.correo}, 0 registros)"
+        return f"HistorialSeries({self.correo}, {len(self)} registros, {self.fechas[0]}..{self.fechas[-1]})"
+
+    def entre(self, desde: Optional[str] = None, hasta: Optional[str] = None) -> 'HistorialSeries':
+        """
+        Vista de los registros entre dos fechas ISO
+
+        Args:
+            desde: Fecha inicial, inclusive
+            hasta: Fecha final, inclusive; si es solo día (YYYY-MM-DD) incluye
+                el día completo
+        """
+        desde = None if desde is None else hora_local(desde)
+        hasta = None if hasta is None else hora_local(hasta)
+        inicio = 0 if desde is None else int(np.searchsorted(self.fechas, np.datetime64(desde, 'us'), 'left'))
+        if hasta is None:
+            fin = len(self)
+        elif len(hasta) == 10:
+            siguiente = np.datetime64(hasta, 'D') + np.timedelta64(1, 'D')
+            fin = int(np.searchsorted(self.fechas, siguiente.astype('datetime64[us]'), 'left'))
+        else:
+            fin = int(np.searchsorted(self.fechas, np.datetime64(hasta, 'us'), 'right'))
+        return self[inicio:max(inicio, fin)]
+
+    def ultimos_dias(self, dias: int) -> 'HistorialSeries':
+        """Vista de los registros de los últimos `dias` días"""
+        return self.entre((datetime.now() - timedelta(days=dias)).isoformat())
+
+    def ultimos(self, cantidad: int) -> 'HistorialSeries':
+        """Vista de los `cantidad` registros más recientes"""
+        return self[max(len(self) - cantidad, 0):] if cantidad > 0 else self[0:0]
+
+    def columna(self, campo: str) -> np.ndarray:
+        """Vista de una columna ('sensores.pasos', 'wearables.ritmo_cardiaco', ...)"""
+        return self.valores[:, _INDICE[campo]]
+
+    def metrica(self, nombre: str) -> np.ndarray:
+        """
+        Métrica fusionada de sensores y wearables ('pasos', 'sueno', 'fc')
+
+        Toma el primer campo de FUSION con valor distinto de cero, como
+        utils/agregados_historial.valores_registro; NaN si ninguno lo tiene.
+        """
+        resultado = np.full(len(self), np.nan)
+        for campo in reversed(FUSION[nombre]):
+            valores = self.columna(campo)
+            resultado = np.where(np.isnan(valores) | (valores == 0), resultado, valores)
+        return resultado
+
+    def diarios(self) -> List[Dict]:
+        """
+        Agregados por día, vectorizados
+
+        Returns:
+            Lo mismo que utils.agregados_historial.agregar_por_dia sobre los
+            registros: {'dia', 'registros', 'pasos', 'sueno', 'fc'} ordenados
+            por día descendente
+        """
+        if not len(self):
+            return []
+        dias = self.fechas.astype('datetime64[D]')
+        inicios = np.flatnonzero(np.concatenate(([True], dias[1:] != dias[:-1])))
+        registros = np.diff(np.append(inicios, len(self)))
+
+        resumenes = {}
+        for nombre in FUSION:
+            valores = self.metrica(nombre)
+            validos = ~np.isnan(valores)
+            ceros = np.where(validos, valores, 0.0)
+            resumenes[nombre] = (
+                np.add.reduceat(validos.astype(np.int64), inicios),
+                np.add.reduceat(ceros, inicios),
+                np.minimum.reduceat(np.where(validos, valores, np.inf), inicios),
+                np.maximum.reduceat(np.where(validos, valores, -np.inf), inicios),
+                np.add.reduceat(ceros * ceros, inicios)
+            )
+
+        resultado = []
+        for g, dia in enumerate(np.datetime_as_string(dias[inicios]).tolist()):
+            agregado = {'dia': dia, 'registros': int(registros[g])}
+            for nombre, (n, suma, minimo, maximo, cuadrados) in resumenes.items():
+                if n[g]:
+                    agregado[nombre] = {
+                        'n': int(n[g]),
+                        'suma': float(suma[g]),
+                        'min': float(minimo[g]),
+                        'max': float(maximo[g]),
+                        'cuadrados': float(cuadrados[g])
+                    }
+            resultado.append(agregado)
+        resultado.reverse()
+        return resultado
+
+    def filas_recientes(self, cantidad: int) -> Iterator[Tuple[str, Optional[float], Optional[float], Optional[float]]]:
+        """
+        Los `cantidad` registros más recientes como (fecha, pasos, sueño, fc)
+
+        Para formatear unas pocas líneas sin armar los registros completos.
+        """
+        vista = self.ultimos(cantidad)
+        fechas = np.datetime_as_string(vista.fechas[::-1], unit='s').tolist()
+        metricas = [vista.metrica(nombre)[::-1].tolist() for nombre in FUSION]
+        for i, fecha in enumerate(fechas):
+            yield (fecha,) + tuple(None if valor != valor else valor for valor in (m[i] for m in metricas))
+
+    def a_registros(self) -> List[Dict]:
+        """
+        Registros como dicts, del más reciente al más antiguo
+
+        Solo para los bordes que necesitan JSON (respuestas, digest de caché).
+        """
+        fechas = np.datetime_as_string(self.fechas[::-1]).tolist()
+        filas = self.valores[::-1].tolist()
+        registros = []
+        for fecha, fila in zip(fechas, filas):
+            registro: Dict = {'correo': self.correo, 'fecha': fecha}
+            posicion = 0
+            for fuente, campos in CAMPOS_POR_FUENTE:
+                mapa = {}
+                for campo in campos:
+                    valor = fila[posicion]
+                    posicion += 1
+                    if valor == valor:
+                        mapa[campo] = int(valor) if valor.is_integer() else valor
+                if mapa:
+                    registro[fuente] = mapa
+            registros.append(registro)
+        return registros
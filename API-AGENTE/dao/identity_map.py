@@ -0,0 +1,154 @@
+"""
+Identity map por invocación (unidad de trabajo)
+
+Dentro de una misma request, las lecturas por clave primaria a la misma
+tabla se resuelven una sola vez contra DynamoDB y el resultado se comparte
+con todos los consumidores (AuthService, AgenteService, contextos...).
+El mapa vive en un ContextVar, así que no se filtra entre invocaciones de
+un contenedor reutilizado.
+"""
+import threading
+from concurrent.futures import Future
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import Config
+
+_mapa_actual: ContextVar[Optional['IdentityMap']] = ContextVar('identity_map', default=None)
+
+# Valor de IdentityMap.buscar para una clave que no está en el mapa
+AUSENTE = object()
+
+
+class IdentityMap:
+    """Mapa (tabla, clave) -> registro con estadísticas de uso"""
+
+    def __init__(self):
+        self._registros: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+        self.desde_mapa = 0
+        self.desde_dynamodb = 0
+        self.por_tabla: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def actual() -> Optional['IdentityMap']:
+        """Retorna el identity map de la request en curso (o None)"""
+        return _mapa_actual.get()
+
+    def obtener(self, table_name: str, key: Dict, cargar: Callable[[], Any]) -> Any:
+        """
+        Retorna el registro desde el mapa o lo carga una única vez
+
+        Si otro hilo ya está leyendo la misma clave, espera su resultado en
+        lugar de lanzar una segunda lectura.
+
+        Args:
+            table_name: Nombre de la tabla
+            key: Clave primaria
+            cargar: Función que lee el registro desde DynamoDB
+
+        Returns:
+            El registro (o None si no existe)
+        """
+        clave = self.firma(table_name, key)
+
+        with self._lock:
+            future = self._registros.get(clave)
+            propietario = future is None
+            if propietario:
+                future = Future()
+                self._registros[clave] = future
+            self._contar(table_name, 'dynamodb' if propietario else 'mapa')
+
+        if not propietario:
+            return future.result()
+
+        try:
+            resultado = cargar()
+        except BaseException as e:
+            with self._lock:
+                self._registros.pop(clave, None)
+            future.set_exception(e)
+            raise
+
+        future.set_result(resultado)
+        return resultado
+
+    def buscar(self, table_name: str, key: Dict, defecto: Any = AUSENTE) -> Any:
+        """
+        Retorna el registro si ya fue leído en esta request, sin cargarlo
+
+        Si otro hilo lo está leyendo, espera su resultado. Comprobar y leer
+        es una sola operación: un registro invalidado entre medio no se
+        confunde con uno inexistente.
+
+        Returns:
+            El registro (o None si no existe), o `defecto` si la clave no
+            está en el mapa o su lectura falló
+        """
+        with self._lock:
+            future = self._registros.get(self.firma(table_name, key))
+            if future is None:
+                return defecto
+            self._contar(table_name, 'mapa')
+
+        try:
+            return future.result()
+        except Exception:
+            return defecto
+
+    def publicar(self, table_name: str, key: Dict, valor: Any):
+        """Registra un valor leído por otra vía (p. ej. BatchGetItem)"""
+        future = Future()
+        future.set_result(valor)
+        with self._lock:
+            self._registros.setdefault(self.firma(table_name, key), future)
+            self._contar(table_name, 'dynamodb')
+
+    def invalidar(self, table_name: str, key: Dict):
+        """Descarta un registro tras una escritura"""
+        with self._lock:
+            self._registros.pop(self.firma(table_name, key), None)
+
+    def reporte(self) -> Dict:
+        """Resumen de lecturas servidas desde el mapa vs DynamoDB"""
+        return {
+            'lecturas_desde_mapa': self.desde_mapa,
+            'lecturas_dynamodb': self.desde_dynamodb,
+            'por_tabla': {tabla: dict(conteo) for tabla, conteo in self.por_tabla.items()}
+        }
+
+    def _contar(self, table_name: str, origen: str):
+        conteo = self.por_tabla.setdefault(table_name, {'mapa': 0, 'dynamodb': 0})
+        conteo[origen] += 1
+        if origen == 'mapa':
+            self.desde_mapa += 1
+        else:
+            self.desde_dynamodb += 1
+
+    @staticmethod
+    def firma(table_name: str, key: Dict) -> Tuple:
+        """Identificador hashable de (tabla, clave primaria)"""
+        return (table_name,) + tuple(sorted(key.items()))
+
+
+class UnidadDeTrabajo:
+    """Context manager que activa un IdentityMap durante una request"""
+
+    def __init__(self):
+        self.identity_map = IdentityMap()
+        self._token = None
+
+    def __enter__(self) -> IdentityMap:
+        self._token = _mapa_actual.set(self.identity_map)
+        return self.identity_map
+
+    def __exit__(self, exc_type, exc, tb):
+        _mapa_actual.reset(self._token)
+        if Config.LOG_DEBUG:
+            reporte = self.identity_map.reporte()
+            print(
+                f"📊 Identity map: {reporte['lecturas_desde_mapa']} desde mapa, "
+                f"{reporte['lecturas_dynamodb']} desde DynamoDB {reporte['por_tabla']}"
+            )
+        return False
@@ -0,0 +1,101 @@
+"""
+Adaptador de lectura sobre el cliente de bajo nivel de DynamoDB
+
+Expone get_item/query/scan con la misma firma que `Table` del recurso
+boto3 (acepta condiciones Key/Attr y claves con valores Python), pero
+deserializa la respuesta con `dao.deserializer` en lugar de pasar por
+TypeDeserializer + Decimal. Los items que devuelve ya son JSON-friendly.
+"""
+from typing import Any, Dict, Optional
+
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from boto3.dynamodb.types import TypeDeserializer
+
+from dao.deserializer import deserializar_item, serializar_valor
+from utils.aws_clients import AWSClientFactory
+
+_deserializer_claves = TypeDeserializer()
+
+
+class LowLevelTable:
+    """Lecturas de una tabla usando el cliente DynamoDB directamente"""
+
+    def __init__(self, table_name: str, client=None):
+        """
+        Args:
+            table_name: Nombre de la tabla
+            client: Cliente boto3 de DynamoDB. Por defecto el compartido; no
+                sirve `resource.meta.client`, que trae los transformadores del
+                recurso y volvería a serializar los valores en formato wire
+        """
+        self.client = client or AWSClientFactory.get_client('dynamodb')
+        self.table_name = table_name
+
+    def get_item(self, Key: Dict, **kwargs) -> Dict:
+        params = self._preparar(dict(kwargs, Key=Key))
+        response = self.client.get_item(**params)
+        return self._convertir_respuesta(response)
+
+    def query(self, **kwargs) -> Dict:
+        response = self.client.query(**self._preparar(kwargs))
+        return self._convertir_respuesta(response)
+
+    def query_wire(self, **kwargs) -> Dict:
+        """
+        Query que deja los items en formato wire
+
+        Para lectores que convierten los items por su cuenta (ver
+        dao/historial_series.py). Solo LastEvaluatedKey se convierte, para
+        poder pasarla de vuelta como ExclusiveStartKey.
+        """
+        response = self.client.query(**self._preparar(kwargs))
+        ultima: Optional[Dict] = response.get('LastEvaluatedKey')
+        if ultima:
+            response['LastEvaluatedKey'] = {
+                k: _deserializer_claves.deserialize(v) for k, v in ultima.items()
+            }
+        return response
+
+    def scan(self, **kwargs) -> Dict:
+        response = self.client.scan(**self._preparar(kwargs))
+        return self._convertir_respuesta(response)
+
+    def _preparar(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Traduce parámetros estilo recurso a formato wire"""
+        params = dict(params, TableName=self.table_name)
+        builder = ConditionExpressionBuilder()
+        nombres: Dict[str, str] = dict(params.pop('ExpressionAttributeNames', None) or {})
+        valores: Dict[str, Any] = dict(params.pop('ExpressionAttributeValues', None) or {})
+
+        for campo, es_clave in (('KeyConditionExpression', True), ('FilterExpression', False)):
+            condicion = params.get(campo)
+            if isinstance(condicion, ConditionBase):
+                expresion = builder.build_expression(condicion, is_key_condition=es_clave)
+                params[campo] = expresion.condition_expression
+                nombres.update(expresion.attribute_name_placeholders)
+                valores.update(expresion.attribute_value_placeholders)
+
+        if nombres:
+            params['ExpressionAttributeNames'] = nombres
+        if valores:
+            params['ExpressionAttributeValues'] = {k: serializar_valor(v) for k, v in valores.items()}
+
+        for campo in ('Key', 'ExclusiveStartKey'):
+            if params.get(campo):
+                params[campo] = {k: serializar_valor(v) for k, v in params[campo].items()}
+
+        return params
+
+    @staticmethod
+    def _convertir_respuesta(response: Dict) -> Dict:
+        if 'Item' in response:
+            response['Item'] = deserializar_item(response['Item'])
+        if 'Items' in response:
+            response['Items'] = [deserializar_item(item) for item in response['Items']]
+        # La clave de paginación conserva Decimal para poder re-serializarla sin pérdida
+        ultima: Optional[Dict] = response.get('LastEvaluatedKey')
+        if ultima:
+            response['LastEvaluatedKey'] = {
+                k: _deserializer_claves.deserialize(v) for k, v in ultima.items()
+            }
+        return response
@@ -1,9 +1,9 @@
 """
 DAOs específicos para cada tabla
 """
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 from datetime import datetime, timedelta
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr, Key
 from .base import BaseDAO
 from config import Config
 
@@ -14,13 +14,19 @@ class MemoriaDAO(BaseDAO):
     def __init__(self):
         super().__init__(Config.TABLE_MEMORIA)
     
-    def get_memoria_reciente(self, correo: str, limite: Optional[int] = None) -> List[Dict]:
+    def get_memoria_reciente(
+        self,
+        correo: str,
+        limite: Optional[int] = None,
+        atributos: Optional[List[str]] = None
+    ) -> List[Dict]:
         """
         Obtiene las conversaciones más recientes
         
         Args:
             correo: Email del usuario
             limite: Número máximo de registros
+            atributos: Atributos a leer (None para la memoria completa)
         
         Returns:
             Lista de memorias contextuales ordenadas por fecha descendente
@@ -28,7 +34,8 @@ class MemoriaDAO(BaseDAO):
         return self.query_by_partition(
             correo,
             limit=limite or Config.LIMITE_MEMORIA,
-            scan_index_forward=False
+            scan_index_forward=False,
+            projection=atributos
         )
     
     def get_memoria_por_contexto(self, correo: str, context_id: str) -> Optional[Dict]:
@@ -45,4 +52,15 @@ class MemoriaDAO(BaseDAO):
         """Obtiene las últimas intenciones detectadas del usuario"""
         memorias = self.get_memoria_reciente(correo, limite)
         return [m.get('intencion_detectada') for m in memorias if m.get('intencion_detectada')]
-
+    
+    def iter_corpus_intenciones(self) -> Iterator[Dict]:
+        """
+        Memorias etiquetadas con intención que no escribió el agente
+        
+        Corpus de entrenamiento del clasificador de intención (scan paralelo
+        de toda la tabla; uso offline).
+        """
+        filtro = Attr('intencion_detectada').exists() & (
+            Attr('origen').not_exists() | Attr('origen').ne('agente')
+        )
+        return self.iter_parallel_scan(filter_expression=filtro)
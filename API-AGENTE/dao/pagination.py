@@ -0,0 +1,98 @@
+"""
+Cursores de paginación firmados para DynamoDB
+
+Un cursor es el LastEvaluatedKey serializado en formato wire de DynamoDB,
+como JSON en base64 url-safe, seguido de una firma HMAC-SHA256 con
+Config.CURSOR_SECRETO. La firma cubre también el ámbito del cursor (tabla
+y partition key), así que un cliente no puede fabricar un ExclusiveStartKey
+ni usar el cursor de un usuario en la partición de otro.
+
+El cursor no está cifrado: quien lo decodifique ve los atributos clave del
+último item leído, que son los mismos que ya recibió en la página.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+from typing import Dict, Optional
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from config import Config
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+# Sin CURSOR_SECRETO la firma usa una clave del contenedor: los cursores
+# solo sirven mientras viva ese contenedor
+_SECRETO_CONTENEDOR = secrets.token_bytes(32)
+
+# Bytes de la firma HMAC que viajan en el cursor
+_BYTES_FIRMA = 16
+
+
+def encode_cursor(last_evaluated_key: Optional[Dict], ambito: str = '') -> Optional[str]:
+    """
+    Codifica y firma un LastEvaluatedKey como cursor
+
+    Args:
+        last_evaluated_key: Clave devuelta por Query/Scan (o None)
+        ambito: Lo que el cursor puede reanudar (p. ej. tabla y partición)
+
+    Returns:
+        Cursor url-safe o None si no hay más páginas
+    """
+    if not last_evaluated_key:
+        return None
+
+    wire = {k: _serializer.serialize(v) for k, v in last_evaluated_key.items()}
+    raw = json.dumps(wire, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return f"{_b64(raw)}.{_b64(_firma(raw, ambito))}"
+
+
+def decode_cursor(cursor: Optional[str], ambito: str = '') -> Optional[Dict]:
+    """
+    Verifica y decodifica un cursor a ExclusiveStartKey
+
+    Args:
+        cursor: Cursor devuelto previamente por encode_cursor
+        ambito: El mismo ámbito con que se codificó
+
+    Returns:
+        Diccionario para ExclusiveStartKey o None
+
+    Raises:
+        ValueError: Si el cursor no es válido, fue modificado o es de otro ámbito
+    """
+    if not cursor:
+        return None
+
+    try:
+        datos, firma = cursor.split('.')
+        raw = _desde_b64(datos)
+        valida = hmac.compare_digest(_desde_b64(firma), _firma(raw, ambito))
+    except Exception as e:
+        raise ValueError(f"Cursor de paginación inválido: {str(e)}")
+    if not valida:
+        raise ValueError("Cursor de paginación inválido: la firma no coincide")
+
+    try:
+        wire = json.loads(raw.decode('utf-8'))
+        return {k: _deserializer.deserialize(v) for k, v in wire.items()}
+    except Exception as e:
+        raise ValueError(f"Cursor de paginación inválido: {str(e)}")
+
+
+def _firma(raw: bytes, ambito: str) -> bytes:
+    secreto = Config.CURSOR_SECRETO.encode('utf-8') if Config.CURSOR_SECRETO else _SECRETO_CONTENEDOR
+    mensaje = ambito.encode('utf-8') + b'\x00' + raw
+    return hmac.new(secreto, mensaje, hashlib.sha256).digest()[:_BYTES_FIRMA]
+
+
+def _b64(datos: bytes) -> str:
+    return base64.urlsafe_b64encode(datos).decode('ascii').rstrip('=')
+
+
+def _desde_b64(texto: str) -> bytes:
+    return base64.urlsafe_b64decode(texto + '=' * (-len(texto) % 4))
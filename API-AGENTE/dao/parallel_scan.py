@@ -0,0 +1,175 @@
+"""
+Motor de Scan paralelo por segmentos (Segment/TotalSegments)
+
+Cada segmento se recorre en un hilo del pool y las páginas se entregan al
+consumidor a medida que llegan, a través de una cola acotada. Un limitador
+de capacidad compartido mantiene el consumo por debajo de un presupuesto
+de RCU por segundo.
+
+Solo depende de boto3 y la librería estándar. DataGenerator no lo usa: sus
+scripts de carga borran tablas con un scan por segmento, sin cola ni
+limitador de capacidad.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+_FIN_SEGMENTO = object()
+
+
+class CapacityLimiter:
+    """
+    Token bucket de unidades de capacidad de lectura (RCU) por segundo
+
+    El consumo se descuenta después de cada página (DynamoDB solo informa la
+    capacidad consumida al responder), por lo que el bucket puede quedar en
+    negativo y el siguiente `acquire` espera hasta recuperarse.
+    """
+
+    def __init__(self, rcu_por_segundo: float):
+        self.rcu_por_segundo = float(rcu_por_segundo)
+        self._tokens = self.rcu_por_segundo
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _recargar(self):
+        ahora = time.monotonic()
+        self._tokens = min(
+            self.rcu_por_segundo,
+            self._tokens + (ahora - self._ultimo) * self.rcu_por_segundo
+        )
+        self._ultimo = ahora
+
+    def acquire(self, stop_event: Optional[threading.Event] = None):
+        """Bloquea hasta que haya capacidad disponible"""
+        while True:
+            with self._lock:
+                self._recargar()
+                if self._tokens > 0:
+                    return
+                espera = -self._tokens / self.rcu_por_segundo
+            if stop_event is not None and stop_event.wait(min(espera, 1.0)):
+                return
+            if stop_event is None:
+                time.sleep(min(espera, 1.0))
+
+    def consume(self, unidades: float):
+        """Descuenta la capacidad consumida por una página"""
+        with self._lock:
+            self._recargar()
+            self._tokens -= unidades
+
+
+class ParallelScanner:
+    """Scan paralelo de una tabla DynamoDB con fusión en streaming"""
+
+    def __init__(
+        self,
+        table,
+        total_segments: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        max_rcu_por_segundo: Optional[float] = None,
+        page_size: Optional[int] = None,
+        **scan_kwargs: Any
+    ):
+        """
+        Args:
+            table: Tabla con scan(**params) que usan todos los hilos, p. ej.
+                LowLevelTable: un Table de boto3 no es thread-safe
+            total_segments: Número de segmentos (default: 2 por núcleo)
+            max_workers: Hilos del pool (default: total_segments)
+            max_rcu_por_segundo: Presupuesto de lectura; None = sin límite
+            page_size: Limit por página de cada segmento
+            **scan_kwargs: Parámetros extra de Scan (FilterExpression,
+                ProjectionExpression, ExpressionAttributeNames...)
+        """
+        self.table = table
+        self.total_segments = total_segments or max(2, (os.cpu_count() or 1) * 2)
+        self.max_workers = max_workers or self.total_segments
+        self.page_size = page_size
+        self.scan_kwargs = scan_kwargs
+        self.limiter = CapacityLimiter(max_rcu_por_segundo) if max_rcu_por_segundo else None
+        self.capacidad_consumida = 0.0
+
+    def iter_pages(self) -> Iterator[List[Dict]]:
+        """
+        Recorre la tabla en paralelo
+
+        Yields:
+            Páginas de items en el orden en que terminan los segmentos
+
+        Raises:
+            Exception: La primera excepción ocurrida en un segmento
+        """
+        cola: queue.Queue = queue.Queue(maxsize=self.max_workers * 2)
+        stop_event = threading.Event()
+        lock_capacidad = threading.Lock()
+
+        def poner(elemento) -> bool:
+            while not stop_event.is_set():
+                try:
+                    cola.put(elemento, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def recorrer_segmento(segmento: int):
+            params = dict(self.scan_kwargs)
+            params['Segment'] = segmento
+            params['TotalSegments'] = self.total_segments
+            if self.page_size:
+                params['Limit'] = self.page_size
+            if self.limiter:
+                params['ReturnConsumedCapacity'] = 'TOTAL'
+
+            try:
+                while not stop_event.is_set():
+                    if self.limiter:
+                        self.limiter.acquire(stop_event)
+
+                    response = self.table.scan(**params)
+
+                    unidades = response.get('ConsumedCapacity', {}).get('CapacityUnits', 0)
+                    if unidades:
+                        with lock_capacidad:
+                            self.capacidad_consumida += unidades
+                        if self.limiter:
+                            self.limiter.consume(unidades)
+
+                    items = response.get('Items', [])
+                    if items and not poner(items):
+                        return
+
+                    if 'LastEvaluatedKey' not in response:
+                        break
+                    params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            except Exception as e:
+                poner(e)
+            finally:
+                poner(_FIN_SEGMENTO)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for segmento in range(self.total_segments):
+                executor.submit(recorrer_segmento, segmento)
+
+            pendientes = self.total_segments
+            while pendientes:
+                elemento = cola.get()
+                if elemento is _FIN_SEGMENTO:
+                    pendientes -= 1
+                elif isinstance(elemento, Exception):
+                    raise elemento
+                else:
+                    yield elemento
+        finally:
+            stop_event.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for items in self.iter_pages():
+            yield from items
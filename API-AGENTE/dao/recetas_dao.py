@@ -14,9 +14,26 @@ class RecetasDAO(BaseDAO):
     def __init__(self):
         super().__init__(Config.TABLE_RECETAS)
     
-    def get_recetas_usuario(self, correo: str) -> List[Dict]:
-        """Obtiene todas las recetas de un usuario"""
-        return self.query_by_partition(correo)
+    def get_recetas_usuario(
+        self,
+        correo: str,
+        atributos: Optional[List[str]] = None,
+        limite: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Obtiene las recetas de un usuario
+        
+        Args:
+            correo: Email del usuario
+            atributos: Atributos a leer (None para la receta completa)
+            limite: Número máximo de recetas (None para todas)
+        
+        Returns:
+            Lista de recetas
+        """
+        if limite:
+            return self.query_by_partition(correo, limit=limite, projection=atributos)
+        return list(self.iter_query(correo, projection=atributos))
     
     def get_receta(self, correo: str, receta_id: str) -> Optional[Dict]:
         """Obtiene una receta específica"""
@@ -1,31 +1,57 @@
 """
 DAOs específicos para cada tabla
 """
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 from datetime import datetime, timedelta
 from boto3.dynamodb.conditions import Key
 from .base import BaseDAO
+from .catalog_cache import CatalogCache
 from config import Config
 
 # ===== SERVICIOS DAO =====
 class ServiciosDAO(BaseDAO):
     """DAO para la tabla de servicios"""
     
+    # Catálogo que cambia poco: caché compartida por el contenedor
+    _cache = CatalogCache(
+        'servicios',
+        ttl=Config.CACHE_TTL_SERVICIOS,
+        stale_ttl=Config.CACHE_STALE_SERVICIOS,
+        max_entradas=Config.CACHE_MAX_ENTRADAS
+    )
+    
     def __init__(self):
         super().__init__(Config.TABLE_SERVICIOS)
     
-    def get_todos_servicios(self, limit: Optional[int] = None) -> List[Dict]:
-        """Obtiene todos los servicios disponibles"""
-        return self.scan_all(limit=limit or Config.LIMITE_SERVICIOS)
+    def get_todos_servicios(
+        self,
+        limit: Optional[int] = None,
+        atributos: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """Obtiene los servicios disponibles (hasta `limit`, recorriendo páginas)"""
+        limit = limit or Config.LIMITE_SERVICIOS
+        return self._cache.get(
+            ('todos', limit, tuple(atributos or ())),
+            lambda: list(self.iter_scan(max_items=limit, projection=atributos))
+        )
+    
+    def iter_servicios(self, cursor: Optional[str] = None, page_size: Optional[int] = None) -> Iterator[Dict]:
+        """Recorre el catálogo completo de servicios página por página"""
+        return self.iter_scan(cursor=cursor, page_size=page_size)
     
     def get_servicios_por_categoria(self, categoria: str, limit: Optional[int] = None) -> List[Dict]:
         """Obtiene servicios filtrados por categoría"""
         from boto3.dynamodb.conditions import Attr
-        return self.scan_all(
-            limit=limit or Config.LIMITE_SERVICIOS,
-            filter_expression=Attr('categoria').eq(categoria)
+        limit = limit or Config.LIMITE_SERVICIOS
+        return self._cache.get(
+            ('categoria', categoria, limit),
+            lambda: self.scan_all(limit=limit, filter_expression=Attr('categoria').eq(categoria))
         )
     
     def get_servicio(self, nombre: str) -> Optional[Dict]:
         """Obtiene un servicio específico por nombre"""
-        return self.get_by_key(nombre)
+        return self._cache.get(('servicio', nombre), lambda: self.get_by_key(nombre))
+    
+    def invalidar_cache(self):
+        """Descarta el catálogo cacheado (tras altas o cambios de servicios)"""
+        self._cache.invalidar()
@@ -0,0 +1,89 @@
+"""
+Registro de metadatos de tablas (esquema de claves)
+
+Evita que los DAOs lean `table.key_schema`, que en boto3 dispara un
+DescribeTable perezoso contra el plano de control de DynamoDB.
+"""
+import threading
+from typing import Dict, NamedTuple, Optional
+
+from config import Config
+
+
+class KeySchema(NamedTuple):
+    """Esquema de claves inmutable de una tabla"""
+    partition_key: str
+    sort_key: Optional[str] = None
+
+    @property
+    def has_sort_key(self) -> bool:
+        return self.sort_key is not None
+
+    @property
+    def attribute_names(self) -> tuple:
+        if self.sort_key:
+            return (self.partition_key, self.sort_key)
+        return (self.partition_key,)
+
+
+class TableRegistry:
+    """
+    Registro por contenedor de los esquemas de claves
+
+    Los esquemas se toman de `Config.TABLA_CLAVES`. Si una tabla no está
+    declarada se resuelve una única vez con DescribeTable y queda congelada
+    para el resto de la vida del contenedor.
+    """
+
+    _esquemas: Dict[str, KeySchema] = {
+        nombre: KeySchema(pk, sk) for nombre, (pk, sk) in Config.TABLA_CLAVES.items()
+    }
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_key_schema(cls, table_name: str, table=None) -> KeySchema:
+        """
+        Obtiene el esquema de claves de una tabla
+
+        Args:
+            table_name: Nombre de la tabla
+            table: Recurso Table de boto3, usado solo si la tabla no está declarada
+
+        Returns:
+            KeySchema de la tabla
+        """
+        esquema = cls._esquemas.get(table_name)
+        if esquema is not None:
+            return esquema
+
+        with cls._lock:
+            esquema = cls._esquemas.get(table_name)
+            if esquema is None:
+                esquema = cls._describir(table_name, table)
+                cls._esquemas[table_name] = esquema
+        return esquema
+
+    @classmethod
+    def registrar(cls, table_name: str, partition_key: str, sort_key: Optional[str] = None) -> KeySchema:
+        """Declara explícitamente el esquema de una tabla"""
+        esquema = KeySchema(partition_key, sort_key)
+        with cls._lock:
+            cls._esquemas[table_name] = esquema
+        return esquema
+
+    @staticmethod
+    def _describir(table_name: str, table=None) -> KeySchema:
+        """Resuelve el esquema desde DynamoDB (una sola vez por contenedor)"""
+        if table is None:
+            from utils.aws_clients import AWSClientFactory
+            table = AWSClientFactory.get_resource('dynamodb').Table(table_name)
+
+        print(f"⚠️  Esquema de '{table_name}' no declarado en Config.TABLA_CLAVES, usando DescribeTable")
+        partition_key = 'correo'  # Default
+        sort_key = None
+        for key in table.key_schema:
+            if key['KeyType'] == 'HASH':
+                partition_key = key['AttributeName']
+            elif key['KeyType'] == 'RANGE':
+                sort_key = key['AttributeName']
+        return KeySchema(partition_key, sort_key)
@@ -1,9 +1,10 @@
 """
 DAOs específicos para cada tabla
 """
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime, timedelta
 from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
 from .base import BaseDAO
 from config import Config
 
@@ -11,6 +12,9 @@ from config import Config
 class UsuariosDAO(BaseDAO):
     """DAO para la tabla de usuarios"""
     
+    # Datos del usuario con contador version_<tipo> (ver incrementar_version)
+    TIPOS_VERSIONADOS = ('historial', 'memoria', 'recetas')
+    
     def __init__(self):
         super().__init__(Config.TABLE_USUARIOS)
     
@@ -21,3 +25,46 @@ class UsuariosDAO(BaseDAO):
     def existe_usuario(self, correo: str) -> bool:
         """Verifica si un usuario existe"""
         return self.get_usuario(correo) is not None
+    
+    def incrementar_version(self, correo: str, tipo: str) -> Optional[Dict]:
+        """
+        Marca que cambiaron los datos `tipo` del usuario
+
+        Incrementa el contador version_<tipo> del registro del usuario
+        (ADD atómico). Quien escribe historial, memoria o recetas lo llama
+        después de su escritura; los snapshots de contexto construidos con
+        la versión anterior dejan de usarse.
+
+        Args:
+            correo: Email del usuario
+            tipo: 'historial', 'memoria' o 'recetas'
+
+        Returns:
+            Usuario actualizado, o None si no existe o la escritura falló
+        """
+        key = self._build_key(correo)
+        try:
+            response = self.table.update_item(
+                Key=key,
+                UpdateExpression='ADD #version :uno',
+                ConditionExpression='attribute_exists(correo)',
+                ExpressionAttributeNames={'#version': f'version_{tipo}'},
+                ExpressionAttributeValues={':uno': 1},
+                ReturnValues='ALL_NEW'
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                print(f"Error incrementando version_{tipo}: {str(e)}")
+            return None
+        except Exception as e:
+            print(f"Error incrementando version_{tipo}: {str(e)}")
+            return None
+
+        self._invalidar_identity_map(key)
+        return self._decimal_to_float(response.get('Attributes'))
+    
+    @staticmethod
+    def versiones(usuario: Optional[Dict], tipos: Iterable[str]) -> Tuple[int, ...]:
+        """Contadores version_<tipo> del usuario (0 si nunca se escribió)"""
+        usuario = usuario or {}
+        return tuple(int(usuario.get(f'version_{tipo}') or 0) for tipo in tipos)
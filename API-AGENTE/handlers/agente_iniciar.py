@@ -1,12 +1,24 @@
 """
 Handler principal para iniciar conversación con el agente
 """
+import time
+_INICIO_IMPORTS = time.perf_counter()
+
 import json
 import traceback
+from config import Config
 from services.agente_service import AgenteService
 from services.auth_service import AuthService
+from dao.base import DAOFactory
+from dao.catalog_cache import CatalogCache
 from utils.exceptions import UsuarioNoEncontradoError, ContextoInvalidoError
 from utils.formatters import formatear_respuesta_exitosa, formatear_respuesta_error
+from utils.aws_clients import AWSClientFactory
+from utils.plazo import Plazo
+
+# Tiempo de imports del módulo (parte del Init Duration del cold start)
+IMPORTS_MS = (time.perf_counter() - _INICIO_IMPORTS) * 1000
+_primera_invocacion = True
 
 # Instancia global del servicio (reutilizada entre invocaciones Lambda)
 agente_service = None
@@ -19,6 +31,17 @@ def get_agente_service():
     return agente_service
 
 
+def reportar_cold_start():
+    """Imprime, solo en la primera invocación del contenedor, el costo de inicialización"""
+    global _primera_invocacion
+    if _primera_invocacion:
+        _primera_invocacion = False
+        print(
+            f"❄️  Cold start: imports {IMPORTS_MS:.0f} ms, "
+            f"clientes AWS {AWSClientFactory.tiempos_inicializacion()}"
+        )
+
+
 def handler(event, context):
     """
     Handler Lambda para procesar consultas del agente
@@ -35,60 +58,73 @@ def handler(event, context):
         Response JSON con la respuesta del agente
     """
     try:
-        # 1. Obtener usuario desde token (igual que API-REGISTRO)
-        usuario = AuthService.get_user_from_token(event)
-        
-        if not usuario:
-            return formatear_respuesta_error(
-                401,
-                'No autorizado',
-                'Token inválido o usuario no encontrado'
-            )
-        
-        correo = usuario['correo']
-        print(f"✅ Usuario autenticado: {correo}")
-        
-        # 2. Parsear body
-        body = json.loads(event.get('body', '{}'))
-        
-        # 3. Validar campos requeridos
-        mensaje = body.get('mensaje')
-        contexto = body.get('contexto', 'General')
-        
-        if not mensaje:
-            return formatear_respuesta_error(
-                400,
-                'Campo requerido',
-                'El campo "mensaje" es obligatorio'
+        # Identity map de la request: el usuario se lee una sola vez.
+        # El plazo acota las llamadas a Gemini al tiempo que le queda a la Lambda
+        with DAOFactory.unidad_de_trabajo(), Plazo.desde_contexto(context):
+            # 1. Obtener usuario desde token (igual que API-REGISTRO)
+            usuario = AuthService.get_user_from_token(event)
+            
+            if not usuario:
+                return formatear_respuesta_error(
+                    401,
+                    'No autorizado',
+                    'Token inválido o usuario no encontrado'
+                )
+            
+            correo = usuario['correo']
+            print(f"✅ Usuario autenticado: {correo}")
+            
+            # 2. Parsear body
+            body = json.loads(event.get('body', '{}'))
+            
+            # 3. Validar campos requeridos
+            mensaje = body.get('mensaje')
+            contexto = body.get('contexto', 'General')
+            
+            if not mensaje:
+                return formatear_respuesta_error(
+                    400,
+                    'Campo requerido',
+                    'El campo "mensaje" es obligatorio'
+                )
+            
+            # Validar contexto
+            contextos_validos = ['General', 'Servicios', 'Estadisticas', 'Recetas']
+            if contexto not in contextos_validos:
+                return formatear_respuesta_error(
+                    400,
+                    'Contexto inválido',
+                    f'El contexto debe ser uno de: {", ".join(contextos_validos)}'
+                )
+            
+            # 4. Procesar consulta
+            service = get_agente_service()
+            resultado = service.procesar_consulta(
+                correo=correo,
+                contexto=contexto,
+                mensaje_usuario=mensaje,
+                historial_conversacion=None  # Por ahora sin historial
             )
-        
-        # Validar contexto
-        contextos_validos = ['General', 'Servicios', 'Estadisticas', 'Recetas']
-        if contexto not in contextos_validos:
-            return formatear_respuesta_error(
-                400,
-                'Contexto inválido',
-                f'El contexto debe ser uno de: {", ".join(contextos_validos)}'
+            
+            # 5. Guardar en memoria automáticamente
+            service.guardar_memoria_conversacion(
+                correo=correo,
+                mensaje_usuario=mensaje,
+                respuesta_agente=resultado['respuesta'],
+                intencion_detectada=resultado.get('intencion')
             )
-        
-        # 4. Procesar consulta
-        service = get_agente_service()
-        resultado = service.procesar_consulta(
-            correo=correo,
-            contexto=contexto,
-            mensaje_usuario=mensaje,
-            historial_conversacion=None  # Por ahora sin historial
-        )
-        
-        # 5. Guardar en memoria automáticamente
-        service.guardar_memoria_conversacion(
-            correo=correo,
-            mensaje_usuario=mensaje,
-            respuesta_agente=resultado['respuesta']
-        )
-        
-        # 6. Retornar respuesta exitosa
-        return formatear_respuesta_exitosa(resultado)
+            
+            if Config.LOG_DEBUG:
+                print(f"📊 Cachés de catálogo: {CatalogCache.estadisticas_globales()}")
+                print(f"💬 Caché de respuestas: {service.respuesta_cache.estadisticas()}")
+                print(f"🗂️  Snapshot de contexto: {service.snapshot_contexto.estadisticas()}")
+                if Config.GEMINI_CACHE_CONTEXTO:
+                    print(f"🧊 Caché de contexto: {service.gemini_service.cache_contexto.estadisticas()}")
+                print(f"🛡️  Cliente LLM: {service.gemini_service.cliente_llm.estadisticas()}")
+            reportar_cold_start()
+            
+            # 6. Retornar respuesta exitosa
+            return formatear_respuesta_exitosa(resultado)
     
     except UsuarioNoEncontradoError as e:
         return formatear_respuesta_error(404, 'Usuario no encontrado', str(e))
@@ -0,0 +1,196 @@
+"""
+Handler de consultas al agente con respuesta en streaming
+
+La respuesta se envía como NDJSON (application/x-ndjson, por defecto) o
+SSE (text/event-stream, si el cliente lo pide en Accept), con un evento
+por fragmento de Gemini. La memoria se guarda recién cuando el stream se
+cerró hacia el cliente.
+
+El streaming real lo hace handlers/servidor_stream.py detrás de una
+Function URL en modo RESPONSE_STREAM; `handler` es la variante con
+buffer para API Gateway, con el mismo formato de salida.
+"""
+import json
+import traceback
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from handlers.agente_iniciar import get_agente_service
+from services.auth_service import AuthService
+from dao.base import DAOFactory
+from utils.exceptions import UsuarioNoEncontradoError, ContextoInvalidoError
+from utils.formatters import formatear_respuesta_error, CustomJSONEncoder
+from utils.plazo import Plazo
+
+TIPOS_CONTENIDO = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream'
+}
+
+
+def detectar_formato(event: Dict) -> str:
+    """Elige SSE si el cliente lo acepta explícitamente, NDJSON si no"""
+    headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+    return 'sse' if 'text/event-stream' in headers.get('accept', '') else 'ndjson'
+
+
+def serializar_evento(evento: Dict, formato: str) -> bytes:
+    """
+    Convierte un evento del agente a bytes del formato de salida
+
+    Args:
+        evento: Evento {'tipo': ..., ...}
+        formato: 'ndjson' o 'sse'
+
+    Returns:
+        Línea NDJSON o bloque SSE codificado en UTF-8
+    """
+    data = json.dumps(evento, cls=CustomJSONEncoder, ensure_ascii=False)
+    if formato == 'sse':
+        return f"event: {evento['tipo']}\ndata: {data}\n\n".encode('utf-8')
+    return (data + '\n').encode('utf-8')
+
+
+def iniciar_consulta(event: Dict) -> Tuple[Optional[Dict], Optional[Dict], Optional[Iterator[Dict]]]:
+    """
+    Autentica, valida y carga el contexto antes de abrir el stream
+
+    Todo lo que puede fallar con un código HTTP distinto de 200 ocurre aquí,
+    antes de enviar cabeceras.
+
+    Args:
+        event: Evento estilo API Gateway (headers + body)
+
+    Returns:
+        Tupla (respuesta de error o None, datos de la consulta, eventos).
+        Si hay error, los dos últimos son None.
+    """
+    try:
+        with DAOFactory.unidad_de_trabajo():
+            usuario = AuthService.get_user_from_token(event)
+
+            if not usuario:
+                return formatear_respuesta_error(
+                    401,
+                    'No autorizado',
+                    'Token inválido o usuario no encontrado'
+                ), None, None
+
+            correo = usuario['correo']
+            body = json.loads(event.get('body') or '{}')
+            mensaje = body.get('mensaje')
+            contexto = body.get('contexto', 'General')
+
+            if not mensaje:
+                return formatear_respuesta_error(
+                    400,
+                    'Campo requerido',
+                    'El campo "mensaje" es obligatorio'
+                ), None, None
+
+            eventos = get_agente_service().procesar_consulta_streaming(
+                correo=correo,
+                contexto=contexto,
+                mensaje_usuario=mensaje
+            )
+            # El primer evento carga el contexto dentro de la unidad de trabajo
+            primero = next(eventos)
+
+        consulta = {'correo': correo, 'mensaje': mensaje, 'contexto': contexto}
+        return None, consulta, _con_primero(primero, eventos)
+
+    except UsuarioNoEncontradoError as e:
+        return formatear_respuesta_error(404, 'Usuario no encontrado', str(e)), None, None
+
+    except ContextoInvalidoError as e:
+        return formatear_respuesta_error(400, 'Contexto inválido', str(e)), None, None
+
+    except json.JSONDecodeError:
+        return formatear_respuesta_error(400, 'JSON inválido', 'El body debe ser JSON válido'), None, None
+
+    except Exception as e:
+        print(f"Error inesperado: {str(e)}")
+        print(traceback.format_exc())
+        return formatear_respuesta_error(
+            500,
+            'Error interno del servidor',
+            'Ocurrió un error procesando tu solicitud'
+        ), None, None
+
+
+def _con_primero(primero: Dict, eventos: Iterator[Dict]) -> Iterator[Dict]:
+    """Reinserta el evento ya consumido; close() se propaga al generador original"""
+    yield primero
+    yield from eventos
+
+
+def transmitir(
+    consulta: Dict,
+    eventos: Iterator[Dict],
+    formato: str,
+    escribir: Callable[[bytes], None],
+    cerrar: Callable[[], None]
+) -> bool:
+    """
+    Envía los eventos al cliente y, cerrado el stream, guarda la memoria
+
+    Si el cliente se desconecta se corta la generación en Gemini y no se
+    guarda memoria de una respuesta que el usuario no recibió completa;
+    tampoco si el stream terminó con un evento 'error' (sin 'fin').
+
+    Args:
+        consulta: Datos devueltos por iniciar_consulta
+        eventos: Eventos del agente
+        formato: 'ndjson' o 'sse'
+        escribir: Función que envía bytes al cliente
+        cerrar: Función que termina la respuesta
+
+    Returns:
+        True si el stream se completó
+    """
+    respuesta = intencion = None
+    try:
+        for evento in eventos:
+            escribir(serializar_evento(evento, formato))
+            if evento['tipo'] == 'fin':
+                respuesta = evento['respuesta']
+                intencion = evento.get('intencion')
+        cerrar()
+    except (BrokenPipeError, ConnectionResetError):
+        print("⚠️  Cliente desconectado, se corta el stream")
+        eventos.close()
+        return False
+
+    if respuesta is not None:
+        get_agente_service().guardar_memoria_conversacion(
+            correo=consulta['correo'],
+            mensaje_usuario=consulta['mensaje'],
+            respuesta_agente=respuesta,
+            intencion_detectada=intencion
+        )
+    return True
+
+
+def handler(event, context):
+    """
+    Variante con buffer para API Gateway (REST no soporta streaming)
+
+    Devuelve los mismos eventos NDJSON/SSE concatenados en el body.
+    """
+    with Plazo.desde_contexto(context):
+        error, consulta, eventos = iniciar_consulta(event)
+        if error:
+            return error
+
+        formato = detectar_formato(event)
+        partes = []
+        transmitir(consulta, eventos, formato, partes.append, lambda: None)
+
+    return {
+        'statusCode': 200,
+        'headers': {
+            'Content-Type': TIPOS_CONTENIDO[formato],
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Allow-Credentials': True
+        },
+        'body': b''.join(partes).decode('utf-8')
+    }
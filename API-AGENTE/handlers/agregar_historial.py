@@ -73,7 +73,10 @@ def handler(event, context):
                 'No se pudo guardar el registro'
             )
         
-        # 6. Retornar éxito
+        # 6. Invalidar los snapshots de contexto del usuario
+        DAOFactory.get_dao('usuarios').incrementar_version(correo, 'historial')
+        
+        # 7. Retornar éxito
         return formatear_respuesta_exitosa({
             'message': 'Historial actualizado correctamente',
             'correo': correo,
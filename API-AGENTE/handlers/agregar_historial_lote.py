@@ -0,0 +1,181 @@
+"""
+Handler para agregar registros del historial médico en lote
+"""
+import base64
+import json
+import traceback
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import Config
+from dao.base import DAOFactory
+from services.auth_service import AuthService
+from utils.formatters import formatear_respuesta_exitosa, formatear_respuesta_error
+from utils.validators import validar_registro_historial
+
+# Estados que escriben en la tabla
+ESTADOS_ESCRITOS = ('creado', 'actualizado')
+
+
+def handler(event, context):
+    """
+    Handler Lambda para agregar muchas lecturas del historial en una llamada
+
+    Acepta un body JSON con una lista de registros (o {"registros": [...]}),
+    o NDJSON (un registro por línea) con Content-Type application/x-ndjson:
+    [
+        {"fecha": "2024-11-23T08:00:00", "sensores": {...}, "wearables": {...}},
+        ...
+    ]
+
+    El correo se extrae del token de Authorization. Los registros se
+    validan en una pasada; si una fecha se repite vale la última. Los que
+    ya están guardados con los mismos valores no se reescriben, así que
+    reenviar un lote es idempotente.
+
+    Returns:
+        Response JSON con el resumen por estado y el estado de cada registro
+        ('creado', 'actualizado', 'sin_cambios', 'duplicado', 'invalido' o
+        'error'). 200 si no hubo inválidos ni errores, 207 si los hubo.
+    """
+    try:
+        with DAOFactory.unidad_de_trabajo():
+            usuario = AuthService.get_user_from_token(event)
+            if not usuario:
+                return formatear_respuesta_error(
+                    401,
+                    'No autorizado',
+                    'Token inválido o usuario no encontrado'
+                )
+            correo = usuario['correo']
+
+            try:
+                entradas = _leer_entradas(event)
+            except (ValueError, UnicodeDecodeError):
+                return formatear_respuesta_error(
+                    400,
+                    'JSON inválido',
+                    'El body debe ser una lista JSON, {"registros": [...]} o NDJSON'
+                )
+
+            if not entradas:
+                return formatear_respuesta_error(
+                    400,
+                    'Datos faltantes',
+                    'Se requiere al menos un registro'
+                )
+            if len(entradas) > Config.HISTORIAL_LOTE_MAX_REGISTROS:
+                return formatear_respuesta_error(
+                    413,
+                    'Lote demasiado grande',
+                    f'Máximo {Config.HISTORIAL_LOTE_MAX_REGISTROS} registros por llamada'
+                )
+
+            # 1. Validar y deduplicar por fecha en una pasada
+            estados: List[Dict] = []
+            por_fecha: Dict[str, int] = {}
+            for indice, (entrada, error) in enumerate(entradas):
+                errores = [error] if error else validar_registro_historial(entrada)
+                if not errores and entrada.get('correo', correo) != correo:
+                    errores = ["El correo no coincide con el del token"]
+                if errores:
+                    estados.append({'indice': indice, 'estado': 'invalido', 'errores': errores})
+                    continue
+
+                fecha = entrada['fecha']
+                estados.append({'indice': indice, 'fecha': fecha})
+                if fecha in por_fecha:
+                    anterior = estados[por_fecha[fecha]]
+                    anterior['estado'] = 'duplicado'
+                    anterior['errores'] = [f"Reemplazado por el registro {indice}"]
+                por_fecha[fecha] = indice
+
+            if not por_fecha:
+                return formatear_respuesta_error(
+                    400,
+                    'Registros inválidos',
+                    estados
+                )
+
+            # 2. Escribir los registros únicos
+            registros = [
+                _como_registro(correo, entradas[indice][0])
+                for indice in por_fecha.values()
+            ]
+            resultado = DAOFactory.get_dao('historial').agregar_lote(correo, registros)
+            for fecha, indice in por_fecha.items():
+                estados[indice]['estado'] = resultado.estados[fecha]
+
+            # 3. Invalidar los snapshots de contexto del usuario
+            if any(estado in ESTADOS_ESCRITOS for estado in resultado.estados.values()):
+                DAOFactory.get_dao('usuarios').incrementar_version(correo, 'historial')
+
+            resumen: Dict[str, int] = {}
+            for estado in estados:
+                resumen[estado['estado']] = resumen.get(estado['estado'], 0) + 1
+
+            respuesta = {
+                'correo': correo,
+                'recibidos': len(entradas),
+                'resumen': resumen,
+                'registros': estados
+            }
+            if resultado.agregados is not None:
+                respuesta['agregados_actualizados'] = resultado.agregados
+
+            completo = not resumen.get('invalido') and not resumen.get('error')
+            return formatear_respuesta_exitosa(respuesta, 200 if completo else 207)
+
+    except Exception as e:
+        print(f"Error agregando historial en lote: {str(e)}")
+        print(traceback.format_exc())
+        return formatear_respuesta_error(
+            500,
+            'Error interno',
+            'Ocurrió un error procesando la solicitud'
+        )
+
+
+def _leer_entradas(event: Dict) -> List[Tuple[Any, Optional[str]]]:
+    """
+    Registros del body como (registro, error de parseo)
+
+    En NDJSON una línea que no es JSON se reporta como error de ese
+    registro sin descartar el resto; las líneas vacías se ignoran.
+
+    Raises:
+        ValueError: Si el body JSON no es válido o no es una lista
+    """
+    body = event.get('body') or ''
+    if event.get('isBase64Encoded'):
+        body = base64.b64decode(body).decode('utf-8')
+
+    headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+    tipo = (headers.get('content-type') or '').lower()
+
+    if 'ndjson' in tipo or 'jsonl' in tipo or 'json-seq' in tipo:
+        entradas = []
+        for numero, linea in enumerate(body.splitlines(), start=1):
+            linea = linea.strip().lstrip('\x1e')
+            if not linea:
+                continue
+            try:
+                entradas.append((json.loads(linea), None))
+            except json.JSONDecodeError:
+                entradas.append((None, f"La línea {numero} no es JSON válido"))
+        return entradas
+
+    datos = json.loads(body or '[]')
+    if isinstance(datos, dict):
+        datos = datos.get('registros')
+    if not isinstance(datos, list):
+        raise ValueError("Se esperaba una lista de registros")
+    return [(registro, None) for registro in datos]
+
+
+def _como_registro(correo: str, entrada: Dict) -> Dict:
+    """Registro a guardar: correo del token, fecha y las fuentes presentes"""
+    registro = {'correo': correo, 'fecha': entrada['fecha']}
+    for fuente in ('sensores', 'wearables'):
+        if entrada.get(fuente):
+            registro[fuente] = entrada[fuente]
+    return registro
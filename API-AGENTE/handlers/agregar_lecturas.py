@@ -0,0 +1,126 @@
+"""
+Handler para agregar lecturas de alta frecuencia (sensores y wearables)
+"""
+import json
+import traceback
+
+from config import Config
+from dao.base import DAOFactory
+from dao.historial_lecturas_dao import ESCALAS
+from services.auth_service import AuthService
+from utils.formatters import formatear_respuesta_exitosa, formatear_respuesta_error
+from utils.validators import validar_fecha_iso
+
+# Errores de validación que se devuelven como máximo
+MAX_ERRORES = 20
+
+
+def handler(event, context):
+    """
+    Handler Lambda para agregar lecturas por minuto (o por segundo) del usuario
+
+    Espera un body JSON con una lista de pares [fecha ISO, valor] por métrica:
+    {
+        "fc": [["2024-11-23T08:01:00", 72], ["2024-11-23T08:02:00", 75]],
+        "pasos": [["2024-11-23T08:01:00", 40]]
+    }
+
+    El correo se extrae del token de Authorization. Las lecturas se guardan
+    en bloques por hora o día (TABLE_HISTORIAL_LECTURAS); una lectura con
+    la misma fecha que otra ya guardada la reemplaza.
+
+    Returns:
+        Response JSON con las lecturas recibidas y los bloques escritos;
+        207 si algún bloque no se pudo escribir
+    """
+    try:
+        if not Config.TABLE_HISTORIAL_LECTURAS:
+            return formatear_respuesta_error(
+                501,
+                'No disponible',
+                'El almacenamiento de lecturas no está configurado'
+            )
+
+        with DAOFactory.unidad_de_trabajo():
+            usuario = AuthService.get_user_from_token(event)
+            if not usuario:
+                return formatear_respuesta_error(
+                    401,
+                    'No autorizado',
+                    'Token inválido o usuario no encontrado'
+                )
+            correo = usuario['correo']
+
+            body = json.loads(event.get('body') or '{}')
+            if not isinstance(body, dict) or not body:
+                return formatear_respuesta_error(
+                    400,
+                    'Datos faltantes',
+                    f'Se requiere al menos una métrica: {sorted(ESCALAS)}'
+                )
+
+            errores = []
+            total = 0
+            for metrica, lecturas in body.items():
+                if metrica not in ESCALAS:
+                    errores.append(f"Métrica '{metrica}' no existe; debe ser una de {sorted(ESCALAS)}")
+                    continue
+                if not isinstance(lecturas, list):
+                    errores.append(f"'{metrica}' debe ser una lista de [fecha, valor]")
+                    continue
+                for indice, lectura in enumerate(lecturas):
+                    if not _lectura_valida(lectura):
+                        errores.append(f"{metrica}[{indice}] debe ser [fecha ISO, número no negativo]")
+                total += len(lecturas)
+
+            if errores:
+                return formatear_respuesta_error(
+                    400,
+                    'Lecturas inválidas',
+                    errores[:MAX_ERRORES]
+                )
+            if total > Config.HISTORIAL_LOTE_MAX_REGISTROS:
+                return formatear_respuesta_error(
+                    413,
+                    'Lote demasiado grande',
+                    f'Máximo {Config.HISTORIAL_LOTE_MAX_REGISTROS} lecturas por llamada'
+                )
+
+            historial_dao = DAOFactory.get_dao('historial')
+            fallidos = []
+            for metrica, lecturas in body.items():
+                fallidos.extend(historial_dao.agregar_lecturas(correo, metrica, lecturas))
+
+            return formatear_respuesta_exitosa({
+                'correo': correo,
+                'lecturas': total,
+                'bloques_fallidos': fallidos
+            }, 207 if fallidos else 200)
+
+    except json.JSONDecodeError:
+        return formatear_respuesta_error(
+            400,
+            'JSON inválido',
+            'El body debe ser JSON válido'
+        )
+
+    except Exception as e:
+        print(f"Error agregando lecturas: {str(e)}")
+        print(traceback.format_exc())
+        return formatear_respuesta_error(
+            500,
+            'Error interno',
+            'Ocurrió un error procesando la solicitud'
+        )
+
+
+def _lectura_valida(lectura) -> bool:
+    """[fecha ISO, número no negativo]"""
+    if not isinstance(lectura, list) or len(lectura) != 2:
+        return False
+    fecha, valor = lectura
+    return (
+        isinstance(fecha, str) and validar_fecha_iso(fecha)
+        and not isinstance(valor, bool) and isinstance(valor, (int, float))
+        and 0 <= valor < float('inf')
+    )
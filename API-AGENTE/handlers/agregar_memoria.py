@@ -65,7 +65,8 @@ def handler(event, context):
             'fecha': fecha,
             'resumen_conversacion': resumen,
             'intencion_detectada': intencion,
-            'datos_extraidos': datos_extraidos
+            'datos_extraidos': datos_extraidos,
+            'origen': 'usuario'
         }
         
         # 5. Guardar en DynamoDB
@@ -78,7 +79,10 @@ def handler(event, context):
                 'No se pudo guardar la memoria'
             )
         
-        # 6. Retornar éxito
+        # 6. Invalidar los snapshots de contexto del usuario
+        DAOFactory.get_dao('usuarios').incrementar_version(correo, 'memoria')
+        
+        # 7. Retornar éxito
         return formatear_respuesta_exitosa({
             'message': 'Memoria actualizada correctamente',
             'correo': correo,
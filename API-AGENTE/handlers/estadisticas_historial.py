@@ -0,0 +1,74 @@
+"""
+Handler para consultar las estadísticas del historial médico
+"""
+import traceback
+from datetime import date, timedelta
+
+from dao.base import DAOFactory
+from services.auth_service import AuthService
+from utils import agregados_historial, estadisticas_historial
+from utils.formatters import formatear_respuesta_exitosa, formatear_respuesta_error
+
+# Ventana máxima que se puede pedir (días)
+DIAS_MAXIMOS = 366
+
+
+def handler(event, context):
+    """
+    Handler Lambda para las estadísticas del historial del usuario
+
+    Query string (opcional):
+        dias: Días hacia atrás, hoy incluido (default: 30, máximo 366)
+        serie: 'false' para omitir el promedio móvil día por día
+
+    El correo del usuario se extrae del token de Authorization. Con
+    TABLE_HISTORIAL_AGREGADOS se leen los agregados diarios en lugar de
+    los registros crudos.
+
+    Returns:
+        Response JSON con 'resumen' (utils/agregados_historial.estadisticas)
+        y 'tendencias' (utils/estadisticas_historial.como_dict)
+    """
+    try:
+        with DAOFactory.unidad_de_trabajo():
+            usuario = AuthService.get_user_from_token(event)
+            if not usuario:
+                return formatear_respuesta_error(
+                    401,
+                    'No autorizado',
+                    'Token inválido o usuario no encontrado'
+                )
+            correo = usuario['correo']
+
+            parametros = event.get('queryStringParameters') or {}
+            try:
+                dias = int(parametros.get('dias', 30))
+            except ValueError:
+                dias = 0
+            if not 1 <= dias <= DIAS_MAXIMOS:
+                return formatear_respuesta_error(
+                    400,
+                    'Parámetro inválido',
+                    f'"dias" debe ser un entero entre 1 y {DIAS_MAXIMOS}'
+                )
+            serie = str(parametros.get('serie', 'true')).lower() != 'false'
+
+            hoy = date.today()
+            desde = (hoy - timedelta(days=dias)).isoformat()
+            diarios = DAOFactory.get_dao('historial').get_diarios(correo, desde, hoy.isoformat())
+
+            return formatear_respuesta_exitosa({
+                'correo': correo,
+                'dias': dias,
+                'resumen': agregados_historial.estadisticas(diarios),
+                'tendencias': estadisticas_historial.resumen_diarios(correo, diarios, dias=dias, hoy=hoy, serie=serie)
+            })
+
+    except Exception as e:
+        print(f"Error calculando estadísticas: {str(e)}")
+        print(traceback.format_exc())
+        return formatear_respuesta_error(
+            500,
+            'Error interno',
+            'Ocurrió un error procesando la solicitud'
+        )
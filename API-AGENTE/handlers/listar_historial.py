@@ -0,0 +1,94 @@
+"""
+Handler para listar los registros del historial médico página por página
+"""
+import traceback
+from datetime import date, timedelta
+
+from dao.base import DAOFactory
+from services.auth_service import AuthService
+from utils.formatters import formatear_respuesta_exitosa, formatear_respuesta_error
+from utils.validators import validar_fecha_iso
+
+LIMITE_DEFECTO = 50
+LIMITE_MAXIMO = 200
+DIAS_DEFECTO = 30
+
+
+def handler(event, context):
+    """
+    Handler Lambda para listar los registros del historial del usuario
+
+    Query string (opcional):
+        desde: Fecha ISO inicial (default: 30 días antes de `hasta`)
+        hasta: Fecha ISO final, inclusive (default: hoy)
+        limite: Registros por página (default: 50, máximo 200)
+        cursor: 'siguiente' de la respuesta anterior, con el mismo rango
+
+    Los registros van del más reciente al más antiguo. El cursor está
+    firmado (dao/pagination.py) y solo sirve para el usuario del token.
+
+    Returns:
+        Response JSON con 'registros' y 'siguiente' (None en la última página)
+    """
+    try:
+        with DAOFactory.unidad_de_trabajo():
+            usuario = AuthService.get_user_from_token(event)
+            if not usuario:
+                return formatear_respuesta_error(
+                    401,
+                    'No autorizado',
+                    'Token inválido o usuario no encontrado'
+                )
+            correo = usuario['correo']
+
+            parametros = event.get('queryStringParameters') or {}
+            hasta = parametros.get('hasta') or date.today().isoformat()
+            desde = parametros.get('desde')
+            if validar_fecha_iso(hasta) and not desde:
+                desde = (date.fromisoformat(hasta[:10]) - timedelta(days=DIAS_DEFECTO)).isoformat()
+            if not validar_fecha_iso(hasta) or not validar_fecha_iso(desde or '') or desde[:10] > hasta[:10]:
+                return formatear_respuesta_error(
+                    400,
+                    'Parámetro inválido',
+                    '"desde" y "hasta" deben ser fechas ISO con desde <= hasta'
+                )
+
+            try:
+                limite = int(parametros.get('limite', LIMITE_DEFECTO))
+            except ValueError:
+                limite = 0
+            if not 1 <= limite <= LIMITE_MAXIMO:
+                return formatear_respuesta_error(
+                    400,
+                    'Parámetro inválido',
+                    f'"limite" debe ser un entero entre 1 y {LIMITE_MAXIMO}'
+                )
+
+            fin = f"{hasta}T23:59:59.999999" if len(hasta) == 10 else hasta
+            try:
+                registros, siguiente = DAOFactory.get_dao('historial').get_historial_pagina(
+                    correo, desde, fin, limite, parametros.get('cursor')
+                )
+            except ValueError:
+                return formatear_respuesta_error(
+                    400,
+                    'Parámetro inválido',
+                    '"cursor" no es válido para esta consulta'
+                )
+
+            return formatear_respuesta_exitosa({
+                'correo': correo,
+                'desde': desde,
+                'hasta': hasta,
+                'registros': registros,
+                'siguiente': siguiente
+            })
+
+    except Exception as e:
+        print(f"Error listando historial: {str(e)}")
+        print(traceback.format_exc())
+        return formatear_respuesta_error(
+            500,
+            'Error interno',
+            'Ocurrió un error procesando la solicitud'
+        )
@@ -0,0 +1,138 @@
+"""
+Handler de DynamoDB Streams que mantiene el documento de contexto por usuario
+"""
+import traceback
+from typing import Dict, List, Optional, Set, Tuple
+
+from dao.deserializer import deserializar_item
+from dao.usuarios_dao import UsuariosDAO
+from services.documento_contexto import DocumentoContexto, SECCION_POR_TABLA, atributos_perfil
+from utils.metricas import registrar_metrica
+
+# Instancia global del servicio (reutilizada entre invocaciones Lambda)
+documento_contexto = None
+
+def get_documento_contexto():
+    """Lazy loading del servicio para reutilizar conexiones"""
+    global documento_contexto
+    if documento_contexto is None:
+        documento_contexto = DocumentoContexto()
+    return documento_contexto
+
+
+def tabla_del_registro(record: Dict) -> str:
+    """Nombre de la tabla de origen (eventSourceARN: .../table/<nombre>/stream/...)"""
+    return record.get('eventSourceARN', '').split(':table/', 1)[-1].split('/', 1)[0]
+
+
+def secciones_afectadas(record: Dict) -> Tuple[Optional[str], Set[str]]:
+    """
+    Usuario y secciones del documento que hay que recalcular por un registro
+
+    En la tabla de usuarios, un MODIFY que solo cambió contadores o la
+    contraseña no toca el perfil; un contador version_<tipo> que cambió
+    recalcula esa sección para que su versión alcance la del usuario.
+
+    Args:
+        record: Registro del stream (StreamViewType NEW_AND_OLD_IMAGES)
+
+    Returns:
+        Tupla (correo, secciones); correo None si el registro no aplica
+    """
+    seccion = SECCION_POR_TABLA.get(tabla_del_registro(record))
+    cambio = record.get('dynamodb', {})
+    correo = (deserializar_item(cambio.get('Keys')) or {}).get('correo')
+    if seccion is None or not correo:
+        return None, set()
+
+    if seccion != 'perfil':
+        return correo, {seccion}
+
+    evento = record.get('eventName')
+    if evento == 'INSERT':
+        # Usuario nuevo: el documento se arma completo
+        return correo, {'perfil', *UsuariosDAO.TIPOS_VERSIONADOS}
+    if evento != 'MODIFY' or 'OldImage' not in cambio or 'NewImage' not in cambio:
+        return correo, {'perfil'}
+
+    anterior = deserializar_item(cambio['OldImage'])
+    nuevo = deserializar_item(cambio['NewImage'])
+    secciones = {
+        tipo for tipo in UsuariosDAO.TIPOS_VERSIONADOS
+        if UsuariosDAO.versiones(anterior, [tipo]) != UsuariosDAO.versiones(nuevo, [tipo])
+    }
+    if atributos_perfil(anterior) != atributos_perfil(nuevo):
+        secciones.add('perfil')
+    return correo, secciones
+
+
+def agrupar_por_usuario(records: List[Dict]) -> Dict[str, Tuple[Set[str], str]]:
+    """
+    Junta los registros del lote por usuario
+
+    Varios cambios del mismo usuario en un lote se resuelven con una sola
+    reconstrucción de cada sección afectada.
+
+    Returns:
+        Diccionario correo -> (secciones, SequenceNumber del primer registro)
+        en el orden del lote
+    """
+    usuarios: Dict[str, Tuple[Set[str], str]] = {}
+    for record in records:
+        correo, secciones = secciones_afectadas(record)
+        if not secciones:
+            continue
+        secuencia = record.get('dynamodb', {}).get('SequenceNumber', '')
+        if correo not in usuarios:
+            usuarios[correo] = (set(), secuencia)
+        usuarios[correo][0].update(secciones)
+    return usuarios
+
+
+def handler(event, context):
+    """
+    Handler Lambda para los streams de usuarios, recetas, memoria e historial
+
+    Cada sección se recalcula desde su tabla, así que los reintentos y los
+    eventos repetidos no cambian el resultado. Si falla un usuario se
+    reporta el primer registro suyo como batchItemFailure: Lambda reintenta
+    el lote desde ahí (requiere FunctionResponseTypes ReportBatchItemFailures).
+
+    Returns:
+        {'batchItemFailures': [{'itemIdentifier': SequenceNumber}]}
+    """
+    if not DocumentoContexto.activo():
+        print("⚠️ TABLE_CONTEXTO_USUARIO no configurada; se ignoran los cambios")
+        return {'batchItemFailures': []}
+
+    servicio = get_documento_contexto()
+    usuarios = agrupar_por_usuario(event.get('Records', []))
+
+    escritas = descartadas = 0
+    fallidas: List[str] = []
+    for correo, (secciones, secuencia) in usuarios.items():
+        try:
+            resultado = servicio.actualizar(correo, secciones)
+            escritas += sum(1 for ok in resultado.values() if ok)
+            descartadas += sum(1 for ok in resultado.values() if not ok)
+        except Exception as e:
+            print(f"Error actualizando documento de {correo}: {str(e)}")
+            print(traceback.format_exc())
+            fallidas.append(secuencia)
+
+    registrar_metrica(
+        'DocumentoContextoSecciones',
+        escritas,
+        unidad='Count',
+        propiedades={
+            'registros': len(event.get('Records', [])),
+            'usuarios': len(usuarios),
+            'descartadas': descartadas,
+            'usuarios_fallidos': len(fallidas)
+        }
+    )
+
+    # Lambda reanuda desde el menor número de secuencia reportado
+    if fallidas:
+        return {'batchItemFailures': [{'itemIdentifier': min(fallidas, key=int)}]}
+    return {'batchItemFailures': []}
@@ -0,0 +1,246 @@
+"""
+Handler para las series del historial médico reducidas para gráficos
+"""
+import traceback
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+from config import Config
+from dao.base import DAOFactory
+from dao.historial_lecturas_dao import segundos_epoca
+from services.auth_service import AuthService
+from utils import agregados_historial
+from utils.downsampling import lttb
+from utils.formatters import formatear_respuesta_exitosa, formatear_respuesta_error
+from utils.validators import validar_fecha_iso
+
+PUNTOS_DEFECTO = 200
+DIAS_DEFECTO = 30
+
+# Días por periodo de cada granularidad, para elegir la más fina que entra
+DIAS_POR_PERIODO = (('dia', 1), ('semana', 7), ('mes', 31))
+
+
+def handler(event, context):
+    """
+    Handler Lambda para graficar pasos, sueño y ritmo cardíaco del usuario
+
+    Query string (opcional):
+        desde: Fecha ISO inicial (default: 30 días antes de `hasta`)
+        hasta: Fecha ISO final, inclusive (default: hoy)
+        puntos: Máximo de puntos por serie (default: 200, máximo SERIES_MAX_PUNTOS)
+        metricas: Lista separada por comas (default: 'pasos,sueno,fc')
+
+    Cada serie se reduce a `puntos` con LTTB. Si el rango tiene pocos
+    registros se grafican los crudos; si no, los agregados por día, semana
+    o mes (promedio, con 'min' y 'max' de cada periodo), así el tamaño y
+    la latencia de la respuesta no crecen con la cantidad de registros.
+    Sin tabla de agregados ni de lecturas los periodos se calculan desde
+    los registros crudos, y un rango de más de SERIES_DIAS_SIN_AGREGADOS
+    días responde 400.
+
+    Returns:
+        Response JSON con 'fuente' ('registros', 'dia', 'semana' o 'mes') y
+        'series': {metrica: [{'fecha', 'valor'[, 'min', 'max']}]}
+    """
+    try:
+        with DAOFactory.unidad_de_trabajo():
+            usuario = AuthService.get_user_from_token(event)
+            if not usuario:
+                return formatear_respuesta_error(
+                    401,
+                    'No autorizado',
+                    'Token inválido o usuario no encontrado'
+                )
+            correo = usuario['correo']
+
+            parametros = event.get('queryStringParameters') or {}
+            hasta = parametros.get('hasta') or date.today().isoformat()
+            desde = parametros.get('desde')
+            if validar_fecha_iso(hasta) and not desde:
+                desde = (date.fromisoformat(hasta[:10]) - timedelta(days=DIAS_DEFECTO)).isoformat()
+            if not validar_fecha_iso(hasta) or not validar_fecha_iso(desde or '') or desde[:10] > hasta[:10]:
+                return formatear_respuesta_error(
+                    400,
+                    'Parámetro inválido',
+                    '"desde" y "hasta" deben ser fechas ISO con desde <= hasta'
+                )
+
+            try:
+                puntos = int(parametros.get('puntos', PUNTOS_DEFECTO))
+            except ValueError:
+                puntos = 0
+            if not 3 <= puntos <= Config.SERIES_MAX_PUNTOS:
+                return formatear_respuesta_error(
+                    400,
+                    'Parámetro inválido',
+                    f'"puntos" debe ser un entero entre 3 y {Config.SERIES_MAX_PUNTOS}'
+                )
+
+            metricas = [
+                metrica.strip()
+                for metrica in parametros.get('metricas', ','.join(agregados_historial.METRICAS)).split(',')
+                if metrica.strip()
+            ]
+            if not metricas or any(m not in agregados_historial.METRICAS for m in metricas):
+                return formatear_respuesta_error(
+                    400,
+                    'Parámetro inválido',
+                    f'"metricas" debe ser una lista de {list(agregados_historial.METRICAS)}'
+                )
+
+            dias = (date.fromisoformat(hasta[:10]) - date.fromisoformat(desde[:10])).days + 1
+            if (
+                not Config.TABLE_HISTORIAL_AGREGADOS
+                and not Config.TABLE_HISTORIAL_LECTURAS
+                and dias > Config.SERIES_DIAS_SIN_AGREGADOS
+            ):
+                return formatear_respuesta_error(
+                    400,
+                    'Rango demasiado largo',
+                    f'Sin agregados el rango puede abarcar a lo sumo {Config.SERIES_DIAS_SIN_AGREGADOS} días'
+                )
+
+            fuente, filas = _leer_filas(correo, desde, hasta, dias, metricas)
+
+            return formatear_respuesta_exitosa({
+                'correo': correo,
+                'desde': desde,
+                'hasta': hasta,
+                'puntos': puntos,
+                'fuente': fuente,
+                'series': {metrica: _serie(filas, metrica, puntos) for metrica in metricas}
+            })
+
+    except Exception as e:
+        print(f"Error calculando series: {str(e)}")
+        print(traceback.format_exc())
+        return formatear_respuesta_error(
+            500,
+            'Error interno',
+            'Ocurrió un error procesando la solicitud'
+        )
+
+
+def _leer_filas(
+    correo: str,
+    desde: str,
+    hasta: str,
+    dias: int,
+    metricas: List[str]
+) -> Tuple[str, List[Tuple[str, Dict]]]:
+    """
+    Filas del rango en orden ascendente, de la fuente más fina que entra
+
+    Con tabla de agregados, los diarios del rango dicen cuántos registros
+    crudos hay antes de leerlos. Sin ella, un rango largo se resume con los
+    totales de los bloques de lecturas si hay tabla de lecturas. Las filas
+    crudas traen el valor de cada métrica; las de agregados, su resumen
+    (n, suma, min, max).
+
+    Returns:
+        Tupla (fuente, [(fecha ISO, {metrica: valor o resumen})])
+    """
+    historial_dao = DAOFactory.get_dao('historial')
+
+    diarios = None
+    if Config.TABLE_HISTORIAL_AGREGADOS:
+        if dias <= Config.SERIES_MAX_PERIODOS:
+            diarios = historial_dao.get_agregados_rango(correo, 'dia', desde, hasta)
+            crudos = sum(int(diario.get('registros', 0)) for diario in diarios) <= Config.SERIES_MAX_CRUDOS
+        else:
+            crudos = False
+    else:
+        crudos = dias <= Config.SERIES_DIAS_CRUDOS
+
+    if crudos:
+        fin = f"{hasta}T23:59:59.999999" if len(hasta) == 10 else hasta
+        registros = historial_dao.get_historial_rango(correo, desde, fin)
+        return 'registros', [
+            (str(registro['fecha']), agregados_historial.valores_registro(registro))
+            for registro in reversed(registros)
+        ]
+
+    granularidad = next(
+        (nombre for nombre, dias_periodo in DIAS_POR_PERIODO if dias <= Config.SERIES_MAX_PERIODOS * dias_periodo),
+        'mes'
+    )
+    if not Config.TABLE_HISTORIAL_AGREGADOS and Config.TABLE_HISTORIAL_LECTURAS:
+        return granularidad, _filas_de_lecturas(historial_dao, correo, desde, hasta, granularidad, metricas)
+    if granularidad != 'dia' or diarios is None:
+        agregados = historial_dao.get_agregados_rango(correo, granularidad, desde, hasta)
+    else:
+        agregados = diarios
+    return granularidad, [
+        (
+            agregado.get('dia') or agregados_historial.inicio_periodo(agregado['periodo']),
+            {metrica: agregado[metrica] for metrica in agregados_historial.METRICAS if agregado.get(metrica)}
+        )
+        for agregado in reversed(agregados)
+    ]
+
+
+def _filas_de_lecturas(
+    historial_dao,
+    correo: str,
+    desde: str,
+    hasta: str,
+    granularidad: str,
+    metricas: List[str]
+) -> List[Tuple[str, Dict]]:
+    """
+    Resúmenes por periodo desde los bloques de lecturas
+
+    Los resúmenes diarios salen de los totales guardados en cada bloque
+    (get_lecturas_resumidas no decodifica los bloques completos del día);
+    luego se combinan por semana o mes.
+    """
+    periodos: Dict[str, Dict[str, Dict]] = {}
+    for metrica in metricas:
+        for resumen in historial_dao.get_lecturas_resumidas(correo, metrica, desde, hasta, 86400):
+            dia = resumen['inicio'][:10]
+            fecha = agregados_historial.inicio_periodo(agregados_historial.periodo(granularidad, dia))
+            actual = periodos.setdefault(fecha, {}).get(metrica)
+            suma = resumen['promedio'] * resumen['n']
+            if actual is None:
+                periodos[fecha][metrica] = {
+                    'n': resumen['n'], 'suma': suma, 'min': resumen['min'], 'max': resumen['max']
+                }
+            else:
+                actual['n'] += resumen['n']
+                actual['suma'] += suma
+                actual['min'] = min(actual['min'], resumen['min'])
+                actual['max'] = max(actual['max'], resumen['max'])
+    return sorted(periodos.items())
+
+
+def _serie(filas: List[Tuple[str, Dict]], metrica: str, puntos: int) -> List[Dict]:
+    """
+    Serie de una métrica reducida a `puntos` con LTTB
+
+    Con agregados, 'min' y 'max' de cada punto cubren todos los periodos
+    hasta la mitad del camino a los puntos vecinos: un pico de un periodo
+    que LTTB descartó sigue en la banda.
+    """
+    fechas, valores, resumenes = [], [], []
+    for fecha, metricas in filas:
+        valor = metricas.get(metrica)
+        if valor is None:
+            continue
+        fechas.append(fecha)
+        if isinstance(valor, dict):
+            resumenes.append(valor)
+            valor = valor['suma'] / valor['n']
+        valores.append(float(valor))
+
+    indices = lttb([segundos_epoca(fecha) for fecha in fechas], valores, puntos)
+    cortes = [0] + [(a + b + 1) // 2 for a, b in zip(indices, indices[1:])] + [len(fechas)]
+    serie = []
+    for k, i in enumerate(indices):
+        punto = {'fecha': fechas[i], 'valor': valores[i]}
+        if resumenes:
+            banda = resumenes[cortes[k]:cortes[k + 1]]
+            punto['min'] = min(resumen['min'] for resumen in banda)
+            punto['max'] = max(resumen['max'] for resumen in banda)
+        serie.append(punto)
+    return serie
@@ -0,0 +1,107 @@
+"""
+Servidor HTTP de streaming para agente/consultar
+
+En Lambda corre detrás de AWS Lambda Web Adapter (Function URL con
+invokeMode RESPONSE_STREAM, ver serverless.yml y run.sh): cada fragmento
+de Gemini se escribe como un chunk HTTP y llega al cliente de inmediato.
+Localmente se levanta igual:
+
+    cd API-AGENTE
+    PORT=8080 python -m handlers.servidor_stream
+
+    curl -N -X POST localhost:8080/agente/consultar \\
+         -H "Authorization: Bearer <token>" \\
+         -d '{"mensaje": "¿Cómo estoy?", "contexto": "General"}'
+"""
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from handlers.agente_stream import iniciar_consulta, transmitir, detectar_formato, TIPOS_CONTENIDO
+
+RUTAS = ('/agente/consultar', '/agente/consultar/stream')
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Authorization, Content-Type, Accept',
+    'Access-Control-Allow-Methods': 'POST, OPTIONS'
+}
+
+
+class StreamHandler(BaseHTTPRequestHandler):
+    """Atiende POST agente/consultar con Transfer-Encoding: chunked"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        for nombre, valor in CORS_HEADERS.items():
+            self.send_header(nombre, valor)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        # Health check de Lambda Web Adapter
+        self._responder(200, 'application/json', b'{"ok": true}')
+
+    def do_POST(self):
+        if self.path.split('?')[0] not in RUTAS:
+            self._responder(404, 'application/json', b'{"error": true, "mensaje": "Ruta no encontrada"}')
+            return
+
+        longitud = int(self.headers.get('Content-Length') or 0)
+        event = {
+            'headers': dict(self.headers.items()),
+            'body': self.rfile.read(longitud).decode('utf-8') if longitud else '{}'
+        }
+
+        error, consulta, eventos = iniciar_consulta(event)
+        if error:
+            self._responder(error['statusCode'], 'application/json', error['body'].encode('utf-8'))
+            return
+
+        formato = detectar_formato(event)
+        self.send_response(200)
+        self.send_header('Content-Type', TIPOS_CONTENIDO[formato])
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Transfer-Encoding', 'chunked')
+        for nombre, valor in CORS_HEADERS.items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+
+        transmitir(consulta, eventos, formato, self._escribir_chunk, self._cerrar_chunks)
+
+    def _escribir_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def _cerrar_chunks(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _responder(self, codigo: int, tipo: str, cuerpo: bytes):
+        self.send_response(codigo)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(cuerpo)))
+        for nombre, valor in CORS_HEADERS.items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        print(f"🌐 {self.address_string()} {formato % args}")
+
+
+def crear_servidor(puerto: int = None) -> ThreadingHTTPServer:
+    """Crea el servidor (puerto 0 = cualquiera libre, útil en pruebas)"""
+    puerto = int(os.getenv('PORT', '8080')) if puerto is None else puerto
+    return ThreadingHTTPServer(('0.0.0.0', puerto), StreamHandler)
+
+
+def main():
+    servidor = crear_servidor()
+    print(f"🚀 Servidor de streaming escuchando en :{servidor.server_address[1]}")
+    servidor.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Carga la tabla de agregados del historial con los registros existentes
+
+HistorialDAO.agregar_registro mantiene los agregados desde que se
+configura TABLE_HISTORIAL_AGREGADOS; este comando calcula los de todo el
+historial previo de cada usuario. Se puede correr con escrituras en
+curso (ver HistorialDAO.reconstruir_agregados) y repetir sin efectos.
+
+Uso:
+    cd API-AGENTE
+    TABLE_HISTORIAL_AGREGADOS=historial_agregados python local/backfill_agregados.py [--correo x@y.com] [--hilos 8]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from dao.base import DAOFactory
+
+
+def correos_usuarios():
+    """Correos de todos los usuarios (scan paralelo)"""
+    for usuario in DAOFactory.get_dao('usuarios').iter_parallel_scan():
+        yield usuario['correo']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill de los agregados del historial')
+    parser.add_argument('--correo', action='append', help='Solo estos usuarios (repetible)')
+    parser.add_argument('--hilos', type=int, default=8)
+    args = parser.parse_args()
+
+    if not Config.TABLE_HISTORIAL_AGREGADOS:
+        print("❌ Define TABLE_HISTORIAL_AGREGADOS")
+        sys.exit(1)
+
+    historial_dao = DAOFactory.get_dao('historial')
+    correos = args.correo or correos_usuarios()
+    inicio = time.perf_counter()
+    usuarios = escritos = 0
+    fallidos = []
+
+    with ThreadPoolExecutor(max_workers=args.hilos) as executor:
+        futures = {executor.submit(historial_dao.reconstruir_agregados, correo): correo for correo in correos}
+        for future in as_completed(futures):
+            correo = futures[future]
+            try:
+                escritos += future.result()
+                usuarios += 1
+            except Exception as e:
+                print(f"   ❌ {correo}: {str(e)}")
+                fallidos.append(correo)
+
+    print(
+        f"📈 {escritos} agregados de {usuarios} usuarios en {time.perf_counter() - inicio:.1f}s "
+        f"({len(fallidos)} fallidos)"
+    )
+    if fallidos:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Construye el documento de contexto de los usuarios existentes
+
+El stream solo ve los cambios posteriores a su activación: este comando
+arma el documento completo (todas las secciones) de cada usuario. Se puede
+correr con el stream ya activo; una sección leída antes que la escrita por
+el stream se descarta (ver DocumentoContextoDAO.guardar_seccion).
+
+Uso:
+    cd API-AGENTE
+    TABLE_CONTEXTO_USUARIO=contexto_usuario python local/backfill_documentos.py [--correo x@y.com] [--hilos 8]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from dao.base import DAOFactory
+from services.documento_contexto import DocumentoContexto
+
+
+def correos_usuarios():
+    """Correos de todos los usuarios (scan paralelo)"""
+    for usuario in DAOFactory.get_dao('usuarios').iter_parallel_scan():
+        yield usuario['correo']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill del documento de contexto por usuario')
+    parser.add_argument('--correo', action='append', help='Solo estos usuarios (repetible)')
+    parser.add_argument('--hilos', type=int, default=8)
+    args = parser.parse_args()
+
+    if not Config.TABLE_CONTEXTO_USUARIO:
+        print("❌ Define TABLE_CONTEXTO_USUARIO")
+        sys.exit(1)
+
+    servicio = DocumentoContexto()
+    correos = args.correo or correos_usuarios()
+    inicio = time.perf_counter()
+    construidos = descartadas = 0
+    fallidos = []
+
+    with ThreadPoolExecutor(max_workers=args.hilos) as executor:
+        futures = {executor.submit(servicio.reconstruir, correo): correo for correo in correos}
+        for future in as_completed(futures):
+            correo = futures[future]
+            try:
+                resultado = future.result()
+                construidos += 1
+                descartadas += sum(1 for ok in resultado.values() if not ok)
+            except Exception as e:
+                print(f"   ❌ {correo}: {str(e)}")
+                fallidos.append(correo)
+
+    print(
+        f"📄 {construidos} documentos en {time.perf_counter() - inicio:.1f}s "
+        f"({descartadas} secciones ya más recientes, {len(fallidos)} fallidos)"
+    )
+    if fallidos:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
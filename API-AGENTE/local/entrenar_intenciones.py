@@ -0,0 +1,84 @@
+"""
+Entrena el clasificador de intención con el corpus de la tabla de memoria
+
+Suma a las frases semilla las memorias etiquetadas (las que no escribió
+el agente), compara la exactitud por validación cruzada con y sin el
+corpus, mide la latencia por mensaje y guarda el modelo en
+Config.INTENCION_MODELO_PATH, que el agente carga al iniciar el contenedor.
+Si el corpus empeora la exactitud no se guarda nada.
+
+Uso:
+    cd API-AGENTE
+    python local/entrenar_intenciones.py [--salida services/intenciones_modelo.json] [--solo-semilla]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from dao.base import DAOFactory
+from services.clasificador_intencion import ClasificadorIntencion, ejemplos_semilla
+
+
+def validar(semilla, corpus, pliegues: int = 5) -> float:
+    """
+    Exactitud por validación cruzada sobre las frases semilla
+
+    Las semillas son el conjunto curado: cada pliegue se evalúa con ellas
+    y se entrena con el resto de semillas más todo el corpus.
+    """
+    mezcladas = list(semilla)
+    random.Random(7).shuffle(mezcladas)
+    aciertos = 0
+    for k in range(pliegues):
+        prueba = mezcladas[k::pliegues]
+        entrenamiento = [e for i, e in enumerate(mezcladas) if i % pliegues != k] + list(corpus)
+        clasificador = ClasificadorIntencion().entrenar(entrenamiento)
+        aciertos += sum(clasificador.clasificar(texto).intencion == intencion for texto, intencion in prueba)
+    return aciertos / len(mezcladas) if mezcladas else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Entrena el clasificador de intención')
+    parser.add_argument('--salida', default=Config.INTENCION_MODELO_PATH)
+    parser.add_argument('--solo-semilla', action='store_true', help='No leer la tabla de memoria')
+    parser.add_argument('--forzar', action='store_true', help='Guardar aunque el corpus empeore la exactitud')
+    args = parser.parse_args()
+
+    semilla = list(ejemplos_semilla())
+    corpus = []
+    if not args.solo_semilla:
+        memorias = DAOFactory.get_dao('memoria').iter_corpus_intenciones()
+        corpus = list(ClasificadorIntencion.ejemplos_desde_memoria(memorias))
+        print(f"📚 Corpus de memoria: {len(corpus)} ejemplos {dict(Counter(i for _, i in corpus))}")
+
+    base = validar(semilla, [])
+    print(f"🎯 Exactitud solo semilla (validación cruzada): {base:.1%}")
+    if corpus:
+        con_corpus = validar(semilla, corpus)
+        print(f"🎯 Exactitud semilla + corpus: {con_corpus:.1%}")
+        if con_corpus < base - 0.05 and not args.forzar:
+            # Etiquetas ruidosas (p. ej. datos sintéticos) degradan las intenciones con plantilla
+            print("⚠️  El corpus empeora la exactitud; no se guarda el modelo (usa --forzar o --solo-semilla)")
+            sys.exit(1)
+
+    clasificador = ClasificadorIntencion().entrenar(semilla + corpus)
+    mensajes = [texto for texto, _ in semilla + corpus]
+    inicio = time.perf_counter()
+    for texto in mensajes:
+        clasificador.clasificar(texto)
+    print(f"⏱️  {(time.perf_counter() - inicio) * 1_000_000 / len(mensajes):.0f} µs por mensaje")
+
+    with open(args.salida, 'w', encoding='utf-8') as archivo:
+        json.dump(clasificador.a_dict(), archivo, ensure_ascii=False, sort_keys=True)
+    print(f"💾 Modelo guardado en {args.salida}")
+
+
+if __name__ == '__main__':
+    main()
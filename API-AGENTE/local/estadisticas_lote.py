@@ -0,0 +1,85 @@
+"""
+Estadísticas del historial de todos los usuarios en un solo cálculo
+
+Lee la ventana de todos los usuarios con un scan paralelo (de la tabla de
+agregados si TABLE_HISTORIAL_AGREGADOS está definida, de los registros
+crudos si no), arma una sola matriz usuario × día y calcula las
+estadísticas de utils/estadisticas_historial.py para todos a la vez.
+Escribe una línea JSON por usuario.
+
+Uso:
+    cd API-AGENTE
+    python local/estadisticas_lote.py [--dias 90] [--hasta 2024-11-30] [--salida estadisticas.ndjson] [--serie]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from boto3.dynamodb.conditions import Attr
+
+from config import Config
+from dao.base import DAOFactory
+from utils import estadisticas_historial
+
+
+def leer_columnas(desde: str, hasta: str) -> estadisticas_historial.Columnas:
+    """Filas de la ventana de todos los usuarios (scan paralelo)"""
+    if Config.TABLE_HISTORIAL_AGREGADOS:
+        items = DAOFactory.get_dao('historial_agregados').iter_parallel_scan(
+            filter_expression=Attr('periodo').between(f"D#{desde}", f"D#{hasta}")
+        )
+        diarios = ({**item, 'dia': item['periodo'][2:]} for item in items)
+        return estadisticas_historial.columnas_diarios(diarios)
+
+    registros = DAOFactory.get_dao('historial').iter_parallel_scan(
+        filter_expression=Attr('fecha').between(desde, f"{hasta}T23:59:59.999999")
+    )
+    return estadisticas_historial.columnas_registros(registros)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Estadísticas del historial por lotes')
+    parser.add_argument('--dias', type=int, default=90, help='Días hacia atrás desde --hasta')
+    parser.add_argument('--hasta', default=date.today().isoformat(), help='Último día (ISO)')
+    parser.add_argument('--salida', help='Archivo NDJSON (default: stdout)')
+    parser.add_argument('--serie', action='store_true', help='Incluir el promedio móvil día por día')
+    args = parser.parse_args()
+
+    hasta = date.fromisoformat(args.hasta)
+    desde = hasta - timedelta(days=args.dias)
+
+    inicio = time.perf_counter()
+    columnas = leer_columnas(desde.isoformat(), hasta.isoformat())
+    lectura = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    analisis = estadisticas_historial.analizar(estadisticas_historial.matriz_diaria(
+        columnas,
+        desde=estadisticas_historial.dia_epoch(desde.isoformat()),
+        hasta=estadisticas_historial.dia_epoch(hasta.isoformat())
+    ))
+    calculo = time.perf_counter() - inicio
+
+    salida = open(args.salida, 'w', encoding='utf-8') if args.salida else sys.stdout
+    try:
+        for usuario in range(len(columnas.correos)):
+            resultado = estadisticas_historial.como_dict(analisis, usuario, serie=args.serie)
+            salida.write(json.dumps(resultado, ensure_ascii=False) + '\n')
+    finally:
+        if args.salida:
+            salida.close()
+
+    print(
+        f"📈 {len(columnas.correos)} usuarios, {len(columnas.dia)} filas: "
+        f"lectura {lectura:.1f}s, cálculo {calculo * 1000:.0f} ms",
+        file=sys.stderr
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+"""
+Stand-in local de la API REST de Gemini
+
+Responde `:generateContent` y `:streamGenerateContent?alt=sse` con el
+mismo formato JSON que la API real, con latencias configurables, para
+probar el agente (y el streaming) sin red ni API key. También implementa
+`cachedContents` (crear y renovar TTL) y reporta cachedContentTokenCount
+cuando una request usa un contenido cacheado. Puede inyectar 503 y
+latencia de cola para probar los reintentos y el hedging del cliente, y
+cortar los streams a mitad de respuesta.
+
+Uso:
+    cd API-AGENTE
+    python local/gemini_stub_server.py --puerto 8765 --ttft-ms 400 --chunk-ms 60
+
+    # en otra terminal
+    GEMINI_BASE_URL=http://localhost:8765 PORT=8080 python -m handlers.servidor_stream
+"""
+import argparse
+import json
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESPUESTA_DEFAULT = (
+    "Hola, revisé tu información reciente. Tus pasos de esta semana están "
+    "dentro de lo esperado y tu ritmo cardiaco se mantiene estable. "
+    "Recuerda tomar tus medicamentos según la receta y mantenerte hidratado."
+)
+
+# Modo herramientas: palabras del mensaje del usuario que disparan cada función
+PALABRAS_HERRAMIENTAS = {
+    'get_recetas_usuario': ('receta', 'medicament', 'pastilla', 'dosis'),
+    'get_historial_rango': ('paso', 'sueño', 'dormi', 'ritmo', 'actividad', 'semana'),
+    'get_memoria_reciente': ('hablamos', 'conversa', 'antes', 'dije'),
+    'get_todos_servicios': ('servicio', 'taller', 'evento')
+}
+
+
+def elegir_llamadas(peticion: dict, prompt: str) -> list:
+    """
+    Decide qué funciones "pide" el stub, imitando a un modelo con tools
+
+    Solo en el primer turno (sin functionResponse previas) y según
+    palabras clave del último mensaje del usuario.
+    """
+    declaradas = {
+        declaracion['name']
+        for tool in peticion.get('tools', [])
+        for declaracion in tool.get('functionDeclarations', [])
+    }
+    ya_respondidas = any(
+        'functionResponse' in parte
+        for contenido in peticion.get('contents', [])
+        for parte in contenido.get('parts', [])
+    )
+    if not declaradas or ya_respondidas:
+        return []
+
+    mensaje = prompt.rsplit('Usuario:', 1)[-1].lower()
+    hoy = date.today()
+    argumentos = {
+        'get_historial_rango': {
+            'fecha_inicio': (hoy - timedelta(days=7)).isoformat(),
+            'fecha_fin': hoy.isoformat()
+        }
+    }
+    return [
+        {'functionCall': {'name': nombre, 'args': argumentos.get(nombre, {})}}
+        for nombre, palabras in PALABRAS_HERRAMIENTAS.items()
+        if nombre in declaradas and any(palabra in mensaje for palabra in palabras)
+    ]
+
+
+def crear_handler(
+    respuesta: str,
+    ttft_ms: float,
+    chunk_ms: float,
+    palabras_por_chunk: int,
+    min_tokens_cache: int = 1024,
+    tasa_error: float = 0.0,
+    tasa_lenta: float = 0.0,
+    lenta_ms: float = 0.0,
+    cortar_tras: int = 0
+):
+    """Construye la clase handler con la configuración del stub"""
+
+    # Contenidos cacheados (cachedContents) creados contra este stub
+    caches = {}
+
+    palabras = respuesta.split(' ')
+    fragmentos = [
+        ' '.join(palabras[i:i + palabras_por_chunk]) + ' '
+        for i in range(0, len(palabras), palabras_por_chunk)
+    ]
+
+    class GeminiStubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            peticion = self._leer_json()
+
+            if self.path.startswith('/v1beta/cachedContents'):
+                self._crear_cache(peticion)
+                return
+
+            # Fallas inyectadas: 503 transitorio y latencia de cola
+            if random.random() < tasa_error:
+                self._json(503, {'error': {'code': 503, 'status': 'UNAVAILABLE',
+                                           'message': 'The model is overloaded. Please try again later.'}})
+                return
+            if random.random() < tasa_lenta:
+                time.sleep(lenta_ms / 1000)
+
+            prompt = ''.join(
+                parte.get('text', '')
+                for contenido in peticion.get('contents', [])
+                for parte in contenido.get('parts', [])
+            )
+            tokens_cacheados = 0
+            if peticion.get('cachedContent'):
+                cache = caches.get(peticion['cachedContent'])
+                if cache is None or cache['expira'] < time.time():
+                    self._json(404, {'error': {'code': 404, 'status': 'NOT_FOUND',
+                                               'message': 'CachedContent not found (or expired)'}})
+                    return
+                tokens_cacheados = cache['tokens']
+                prompt = cache['texto'] + prompt
+
+            tokens_prompt = max(1, len(prompt) // 4)
+            llamadas = elegir_llamadas(peticion, prompt)
+
+            if llamadas and ':generateContent' in self.path:
+                self._json(200, self._respuesta('', tokens_prompt, llamadas, tokens_cacheados))
+            elif ':streamGenerateContent' in self.path:
+                self._stream(tokens_prompt, tokens_cacheados)
+            elif ':generateContent' in self.path:
+                time.sleep((ttft_ms + chunk_ms * len(fragmentos)) / 1000)
+                self._json(200, self._respuesta(respuesta, tokens_prompt, None, tokens_cacheados))
+            else:
+                self._json(404, {'error': {'code': 404, 'message': 'Ruta no encontrada'}})
+
+        def do_PATCH(self):
+            # Renovar TTL: PATCH /v1beta/cachedContents/<id>?updateMask=ttl
+            peticion = self._leer_json()
+            nombre = self.path.split('?')[0][len('/v1beta/'):]
+            cache = caches.get(nombre)
+            if cache is None:
+                self._json(404, {'error': {'code': 404, 'status': 'NOT_FOUND'}})
+                return
+            cache['expira'] = time.time() + float(peticion.get('ttl', '3600s').rstrip('s'))
+            self._json(200, {'name': nombre, 'model': cache['modelo']})
+
+        def _crear_cache(self, peticion: dict):
+            texto = ''.join(
+                parte.get('text', '')
+                for parte in (peticion.get('systemInstruction') or {}).get('parts', [])
+            )
+            tokens = max(1, len(texto) // 4)
+            if tokens < min_tokens_cache:
+                self._json(400, {'error': {'code': 400, 'status': 'INVALID_ARGUMENT', 'message':
+                                           f'Cached content is too small: {tokens} < {min_tokens_cache}'}})
+                return
+            nombre = f"cachedContents/{uuid.uuid4().hex[:12]}"
+            caches[nombre] = {
+                'texto': texto,
+                'tokens': tokens,
+                'modelo': peticion.get('model'),
+                'expira': time.time() + float(peticion.get('ttl', '3600s').rstrip('s'))
+            }
+            print(f"🤖 stub: caché {nombre} creada ({tokens} tokens)")
+            self._json(200, {'name': nombre, 'model': peticion.get('model'),
+                             'usageMetadata': {'totalTokenCount': tokens}})
+
+        def _leer_json(self) -> dict:
+            longitud = int(self.headers.get('Content-Length') or 0)
+            return json.loads(self.rfile.read(longitud) or b'{}')
+
+        def _json(self, codigo: int, data: dict):
+            cuerpo = json.dumps(data).encode('utf-8')
+            try:
+                self.send_response(codigo)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+            except (BrokenPipeError, ConnectionResetError):
+                # El cliente abandonó la request (timeout o cobertura perdedora)
+                pass
+
+        def _stream(self, tokens_prompt: int, tokens_cacheados: int = 0):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+
+            try:
+                time.sleep(ttft_ms / 1000)
+                for i, fragmento in enumerate(fragmentos):
+                    if i:
+                        time.sleep(chunk_ms / 1000)
+                    evento = self._respuesta(
+                        fragmento, tokens_prompt, None, tokens_cacheados, ultimo=i == len(fragmentos) - 1
+                    )
+                    data = f"data: {json.dumps(evento)}\r\n\r\n".encode('utf-8')
+                    self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+                    self.wfile.flush()
+                    if i + 1 == cortar_tras:
+                        # Falla inyectada: la conexión se cierra sin terminar el stream
+                        print(f"🤖 stub: stream cortado tras {cortar_tras} fragmentos")
+                        self.close_connection = True
+                        return
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                print(f"🤖 stub: el cliente cortó el stream tras {i + 1} fragmentos")
+                self.close_connection = True
+
+        @staticmethod
+        def _respuesta(
+            texto: str,
+            tokens_prompt: int,
+            llamadas: list = None,
+            tokens_cacheados: int = 0,
+            ultimo: bool = True
+        ):
+            # En un stream solo el último fragmento trae finishReason
+            tokens_salida = max(1, len(texto) // 4)
+            candidato = {'content': {'role': 'model', 'parts': llamadas or [{'text': texto}]}}
+            if ultimo:
+                candidato['finishReason'] = 'STOP'
+            return {
+                'candidates': [candidato],
+                'usageMetadata': {
+                    'promptTokenCount': tokens_prompt,
+                    'cachedContentTokenCount': tokens_cacheados,
+                    'candidatesTokenCount': tokens_salida,
+                    'totalTokenCount': tokens_prompt + tokens_salida
+                }
+            }
+
+        def log_message(self, formato, *args):
+            print(f"🤖 stub {formato % args}")
+
+    return GeminiStubHandler
+
+
+def crear_servidor(
+    puerto: int = 8765,
+    respuesta: str = RESPUESTA_DEFAULT,
+    ttft_ms: float = 400,
+    chunk_ms: float = 60,
+    palabras_por_chunk: int = 4,
+    min_tokens_cache: int = 1024,
+    tasa_error: float = 0.0,
+    tasa_lenta: float = 0.0,
+    lenta_ms: float = 0.0,
+    cortar_tras: int = 0
+) -> ThreadingHTTPServer:
+    """Crea el servidor stub (puerto 0 = cualquiera libre)"""
+    handler = crear_handler(
+        respuesta, ttft_ms, chunk_ms, palabras_por_chunk, min_tokens_cache,
+        tasa_error, tasa_lenta, lenta_ms, cortar_tras
+    )
+    return ThreadingHTTPServer(('127.0.0.1', puerto), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stand-in local de la API de Gemini')
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--ttft-ms', type=float, default=400, help='Latencia hasta el primer fragmento')
+    parser.add_argument('--chunk-ms', type=float, default=60, help='Latencia entre fragmentos')
+    parser.add_argument('--palabras-por-chunk', type=int, default=4)
+    parser.add_argument('--respuesta', default=RESPUESTA_DEFAULT)
+    parser.add_argument('--min-tokens-cache', type=int, default=1024,
+                        help='Tamaño mínimo de un contenido cacheado (como la API real)')
+    parser.add_argument('--tasa-error', type=float, default=0.0, help='Fracción de requests que responden 503')
+    parser.add_argument('--tasa-lenta', type=float, default=0.0, help='Fracción de requests con latencia de cola')
+    parser.add_argument('--lenta-ms', type=float, default=0.0, help='Latencia extra de las requests lentas')
+    parser.add_argument('--cortar-tras', type=int, default=0,
+                        help='Cortar cada stream tras N fragmentos (0: nunca)')
+    args = parser.parse_args()
+
+    servidor = crear_servidor(
+        args.puerto, args.respuesta, args.ttft_ms, args.chunk_ms,
+        args.palabras_por_chunk, args.min_tokens_cache,
+        args.tasa_error, args.tasa_lenta, args.lenta_ms, args.cortar_tras
+    )
+    print(f"🤖 Gemini stub escuchando en http://127.0.0.1:{servidor.server_address[1]}")
+    servidor.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Stand-in local del disparador de DynamoDB Streams
+
+Lee los registros de los streams de usuarios, recetas, memoria e
+historial (desde TRIM_HORIZON) o de un archivo JSON con registros
+capturados, y se los pasa a handlers/procesar_cambios.handler en lotes,
+como lo haría Lambda. Con --desordenar los lotes llegan mezclados y con
+registros repetidos, para comprobar que el documento resultante es el
+mismo.
+
+Funciona contra DynamoDB Local o AWS (tablas con StreamSpecification
+NEW_AND_OLD_IMAGES, ver DataGenerator/create_tables.py).
+
+Uso:
+    cd API-AGENTE
+    TABLE_CONTEXTO_USUARIO=contexto_usuario python local/replay_cambios.py [--archivo registros.json] [--lote 100] [--desordenar]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from typing import Dict, Iterator, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from handlers.procesar_cambios import handler
+from utils.aws_clients import AWSClientFactory
+
+TABLAS_ORIGEN = [Config.TABLE_USUARIOS, Config.TABLE_RECETAS, Config.TABLE_MEMORIA, Config.TABLE_HISTORIAL]
+
+
+def registros_stream(tabla: str) -> Iterator[Dict]:
+    """
+    Registros disponibles en el stream de una tabla, shard por shard
+
+    Agrega eventSourceARN, que GetRecords no incluye y Lambda sí.
+    """
+    dynamodb = AWSClientFactory.get_client('dynamodb')
+    streams = AWSClientFactory.get_client('dynamodbstreams')
+    stream_arn = dynamodb.describe_table(TableName=tabla)['Table'].get('LatestStreamArn')
+    if not stream_arn:
+        print(f"⚠️  {tabla} no tiene stream")
+        return
+
+    descripcion = streams.describe_stream(StreamArn=stream_arn)['StreamDescription']
+    for shard in descripcion.get('Shards', []):
+        iterador = streams.get_shard_iterator(
+            StreamArn=stream_arn,
+            ShardId=shard['ShardId'],
+            ShardIteratorType='TRIM_HORIZON'
+        )['ShardIterator']
+        while iterador:
+            respuesta = streams.get_records(ShardIterator=iterador, Limit=1000)
+            for registro in respuesta.get('Records', []):
+                yield {**registro, 'eventSourceARN': stream_arn}
+            # Un shard abierto siempre devuelve iterador: se corta al vaciarse
+            if not respuesta.get('Records'):
+                break
+            iterador = respuesta.get('NextShardIterator')
+
+
+def lotes(registros: List[Dict], tamano: int) -> Iterator[List[Dict]]:
+    for i in range(0, len(registros), tamano):
+        yield registros[i:i + tamano]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reproduce los streams sobre procesar_cambios')
+    parser.add_argument('--archivo', help='JSON con una lista de registros de stream')
+    parser.add_argument('--lote', type=int, default=100)
+    parser.add_argument('--desordenar', action='store_true', help='Mezclar y repetir registros')
+    parser.add_argument('--semilla', type=int, default=7)
+    args = parser.parse_args()
+
+    if args.archivo:
+        with open(args.archivo, 'r', encoding='utf-8') as archivo:
+            registros = json.load(archivo)
+    else:
+        registros = [registro for tabla in TABLAS_ORIGEN for registro in registros_stream(tabla)]
+    print(f"🌊 {len(registros)} registros")
+
+    if args.desordenar:
+        aleatorio = random.Random(args.semilla)
+        registros = registros + aleatorio.sample(registros, len(registros) // 2)
+        aleatorio.shuffle(registros)
+
+    fallidos = 0
+    for lote in lotes(registros, args.lote):
+        respuesta = handler({'Records': lote}, None)
+        fallidos += len(respuesta['batchItemFailures'])
+    print(f"✅ Reproducidos en lotes de {args.lote} ({fallidos} lotes con fallos)")
+    if fallidos:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
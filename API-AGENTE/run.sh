@@ -0,0 +1,5 @@
+#!/bin/bash
+# Entrada de la función agenteStream: AWS Lambda Web Adapter reenvía la
+# invocación (Function URL en modo RESPONSE_STREAM) a este servidor HTTP
+export PYTHONPATH="${LAMBDA_TASK_ROOT:-.}:${PYTHONPATH}"
+exec python -m handlers.servidor_stream
@@ -1,14 +1,22 @@
 """
 Servicio principal del agente - Orquestador
 """
+import time
 import uuid
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 
 from dao.base import DAOFactory
 from contextos.base_contexto import ContextoFactory
 from services.gemini_service import GeminiService
-from utils.exceptions import UsuarioNoEncontradoError, ContextoInvalidoError
+from services.respuesta_cache import RespuestaCache
+from services.herramientas import HerramientasAgente
+from services.clasificador_intencion import Prediccion, get_clasificador
+from services.respuestas_directas import RespuestasDirectas
+from services.snapshot_contexto import SnapshotContexto
+from utils.exceptions import UsuarioNoEncontradoError, ContextoInvalidoError, StreamInterrumpidoError
+from utils.metricas import registrar_metrica
+from utils.concurrencia import ejecutar_en_paralelo
 from config import Config
 
 
@@ -20,6 +28,11 @@ class AgenteService:
         self.gemini_service = GeminiService()
         self.usuarios_dao = DAOFactory.get_dao('usuarios')
         self.memoria_dao = DAOFactory.get_dao('memoria')
+        self.respuesta_cache = RespuestaCache()
+        self.herramientas = HerramientasAgente()
+        self.clasificador = get_clasificador()
+        self.respuestas_directas = RespuestasDirectas()
+        self.snapshot_contexto = SnapshotContexto()
     
     def procesar_consulta(
         self,
@@ -44,59 +57,114 @@ class AgenteService:
             UsuarioNoEncontradoError: Si el usuario no existe
             ContextoInvalidoError: Si el contexto no es válido
         """
-        # 1. Validar contexto
-        if contexto not in Config.CONTEXTOS_DISPONIBLES:
-            raise ContextoInvalidoError(
-                f"Contexto '{contexto}' no válido. "
-                f"Disponibles: {Config.CONTEXTOS_DISPONIBLES}"
+        # Intenciones deterministas: plantilla con datos de los DAOs, sin LLM
+        prediccion = self._detectar_intencion(contexto, mensaje_usuario)
+        if self.respuestas_directas.aplica(prediccion, mensaje_usuario):
+            usuario = self._validar_consulta(correo, contexto)
+            return {
+                'respuesta': self.respuestas_directas.responder(prediccion.intencion, correo, usuario, contexto),
+                'desde_cache': False,
+                'desde_plantilla': True,
+                'intencion': prediccion.intencion,
+                'contexto': contexto,
+                'timestamp': datetime.now().isoformat(),
+                'usuario': {
+                    'correo': correo,
+                    'nombre': usuario.get('nombre', 'Usuario')
+                }
+            }
+        
+        if Config.AGENTE_MODO == 'herramientas':
+            resultado = self._procesar_con_herramientas(
+                correo, contexto, mensaje_usuario, historial_conversacion
             )
+            resultado['intencion'] = prediccion.intencion
+            return resultado
         
-        # 2. Validar usuario existe
-        usuario = self.usuarios_dao.get_usuario(correo)
-        if not usuario:
-            raise UsuarioNoEncontradoError(f"Usuario con correo '{correo}' no encontrado")
+        mensajes, usuario, datos_contexto = self._construir_mensajes(
+            correo, contexto, mensaje_usuario, historial_conversacion
+        )
         
-        # 3. Obtener procesador de contexto
-        procesador = ContextoFactory.get_contexto(contexto)
+        # 7. Buscar en caché o generar respuesta con Gemini (con el modelo
+        # rápido si la intención es una consulta simple)
+        rapido = prediccion.nivel == 'rapido'
+        clave = self._clave_cache(contexto, mensaje_usuario, datos_contexto, historial_conversacion)
+        respuesta_agente = self.respuesta_cache.obtener(
+            clave, contexto, self.gemini_service.cliente_llm.modelo_preferido(rapido)
+        )
+        desde_cache = respuesta_agente is not None
         
-        # 4. Construir datos del contexto
-        datos_contexto = procesador.build_context_data(correo)
+        if not desde_cache:
+            respuesta_agente, uso = self.gemini_service.generar_respuesta_con_uso(mensajes, rapido=rapido)
+            if uso is not None:
+                self.respuesta_cache.guardar(clave, contexto, respuesta_agente, uso['tokens_total'], uso['modelo'])
         
-        # 5. Construir prompt completo
-        usuario_data = datos_contexto.get('usuario', usuario)
-        memoria_data = datos_contexto.get('memoria', [])
+        # 8. Retornar resultado
+        return {
+            'respuesta': respuesta_agente,
+            'desde_cache': desde_cache,
+            'desde_plantilla': False,
+            'intencion': prediccion.intencion,
+            'contexto': contexto,
+            'timestamp': datetime.now().isoformat(),
+            'usuario': {
+                'correo': correo,
+                'nombre': usuario.get('nombre', 'Usuario')
+            }
+        }
+    
+    def procesar_consulta_streaming(
+        self,
+        correo: str,
+        contexto: str,
+        mensaje_usuario: str,
+        historial_conversacion: Optional[List[Dict]] = None
+    ) -> Iterator[Dict]:
+        """
+        Procesa una consulta emitiendo la respuesta a medida que se genera
         
-        prompt_sistema = procesador.get_prompt_instructions(
-            usuario=usuario_data,
-            memoria=memoria_data,
-            datos_contexto=datos_contexto
-        )
+        La validación y la carga del contexto ocurren al pedir el primer
+        evento, así que los errores (usuario/contexto inválido) se lanzan
+        antes de que el llamador envíe cabeceras.
         
-        # 6. Construir mensajes para Gemini
-        mensajes = [
-            {'role': 'system', 'content': prompt_sistema}
-        ]
+        Args:
+            correo: Email del usuario
+            contexto: Tipo de contexto (General, Servicios, etc.)
+            mensaje_usuario: Mensaje del usuario
+            historial_conversacion: Historial previo de la conversación
         
-        # Agregar historial si existe
-        if historial_conversacion:
-            for msg in historial_conversacion[-5:]:  # Últimos 5 mensajes
-                mensajes.append({
-                    'role': msg.get('role', 'user'),
-                    'content': msg.get('content', '')
-                })
+        Yields:
+            Eventos {'tipo': 'inicio'|'fragmento'|'fin', ...}; el evento
+            'fin' trae la respuesta completa y las métricas del stream. Si
+            el LLM falla después de emitir fragmentos, el último evento es
+            {'tipo': 'error', ...} en lugar de 'fin' y la respuesta
+            incompleta no se guarda en caché
         
-        # Agregar mensaje actual del usuario
-        mensajes.append({
-            'role': 'user',
-            'content': mensaje_usuario
-        })
+        Raises:
+            UsuarioNoEncontradoError: Si el usuario no existe
+            ContextoInvalidoError: Si el contexto no es válido
+        """
+        inicio = time.monotonic()
+        con_herramientas = Config.AGENTE_MODO == 'herramientas'
+        clave = respuesta_cacheada = respuesta_directa = None
         
-        # 7. Generar respuesta con Gemini
-        respuesta_agente = self.gemini_service.generar_respuesta(mensajes)
+        prediccion = self._detectar_intencion(contexto, mensaje_usuario)
+        if self.respuestas_directas.aplica(prediccion, mensaje_usuario):
+            usuario = self._validar_consulta(correo, contexto)
+            respuesta_directa = self.respuestas_directas.responder(prediccion.intencion, correo, usuario, contexto)
+        elif con_herramientas:
+            usuario = self._validar_consulta(correo, contexto)
+        else:
+            mensajes, usuario, datos_contexto = self._construir_mensajes(
+                correo, contexto, mensaje_usuario, historial_conversacion
+            )
+            clave = self._clave_cache(contexto, mensaje_usuario, datos_contexto, historial_conversacion)
+            respuesta_cacheada = self.respuesta_cache.obtener(
+                clave, contexto, self.gemini_service.cliente_llm.modelo_preferido(prediccion.nivel == 'rapido')
+            )
         
-        # 8. Retornar resultado
-        return {
-            'respuesta': respuesta_agente,
+        yield {
+            'tipo': 'inicio',
             'contexto': contexto,
             'timestamp': datetime.now().isoformat(),
             'usuario': {
@@ -104,6 +172,73 @@ class AgenteService:
                 'nombre': usuario.get('nombre', 'Usuario')
             }
         }
+        
+        inicio_llm = time.monotonic()
+        primer_fragmento = None
+        fragmentos = []
+        uso: Dict = {}
+        
+        if respuesta_directa is not None:
+            textos = iter([respuesta_directa])
+        elif con_herramientas:
+            # Las rondas de herramientas no se transmiten: solo el texto final
+            respuesta, _ = self._responder_con_herramientas(
+                correo, contexto, usuario, mensaje_usuario, historial_conversacion
+            )
+            textos = iter([respuesta])
+        elif respuesta_cacheada is not None:
+            textos = iter([respuesta_cacheada])
+        else:
+            textos = self.gemini_service.generar_respuesta_streaming(
+                mensajes, uso, rapido=prediccion.nivel == 'rapido'
+            )
+        
+        try:
+            for texto in textos:
+                if primer_fragmento is None:
+                    primer_fragmento = time.monotonic()
+                fragmentos.append(texto)
+                yield {'tipo': 'fragmento', 'texto': texto}
+        except StreamInterrumpidoError:
+            registrar_metrica(
+                'StreamInterrumpido',
+                1,
+                unidad='Count',
+                dimensiones={'Contexto': contexto},
+                propiedades={'fragmentos': len(fragmentos)}
+            )
+            yield {
+                'tipo': 'error',
+                'mensaje': 'La respuesta se interrumpió. Intenta de nuevo en unos momentos.',
+                'intencion': prediccion.intencion
+            }
+            return
+        
+        if clave and respuesta_cacheada is None and uso:
+            self.respuesta_cache.guardar(clave, contexto, ''.join(fragmentos), uso['tokens_total'], uso['modelo'])
+        
+        fin = time.monotonic()
+        metricas = {
+            'ttft_ms': round(((primer_fragmento or fin) - inicio) * 1000, 1),
+            'ttft_llm_ms': round(((primer_fragmento or fin) - inicio_llm) * 1000, 1),
+            'duracion_ms': round((fin - inicio) * 1000, 1),
+            'fragmentos': len(fragmentos),
+            'desde_cache': respuesta_cacheada is not None,
+            'desde_plantilla': respuesta_directa is not None
+        }
+        registrar_metrica(
+            'TiempoPrimerToken',
+            metricas['ttft_ms'],
+            dimensiones={'Contexto': contexto},
+            propiedades=metricas
+        )
+        
+        yield {
+            'tipo': 'fin',
+            'respuesta': ''.join(fragmentos),
+            'intencion': prediccion.intencion,
+            'metricas': metricas
+        }
     
     def guardar_memoria_conversacion(
         self,
@@ -131,13 +266,19 @@ class AgenteService:
                 'fecha': datetime.now().isoformat(),
                 'resumen_conversacion': f"Usuario: {mensaje_usuario[:100]}... | Agente: {respuesta_agente[:100]}...",
                 'intencion_detectada': intencion_detectada or 'consulta_general',
+                'origen': 'agente',
                 'datos_extraidos': {
                     'mensaje_usuario': mensaje_usuario,
                     'respuesta_agente': respuesta_agente
                 }
             }
             
-            return self.memoria_dao.guardar_memoria(memoria)
+            if not self.memoria_dao.guardar_memoria(memoria):
+                return False
+            
+            # Invalida los snapshots de otros contenedores y actualiza los propios
+            self.snapshot_contexto.registrar_memoria(correo, memoria)
+            return True
         
         except Exception as e:
             print(f"Error guardando memoria: {str(e)}")
@@ -166,7 +307,7 @@ class AgenteService:
             
             # Obtener procesador de contexto
             procesador = ContextoFactory.get_contexto(contexto)
-            datos_contexto = procesador.build_context_data(correo)
+            datos_contexto = self.snapshot_contexto.obtener(correo, contexto, procesador, usuario)
             
             # Generar sugerencias según el contexto
             sugerencias = self._generar_sugerencias_para_contexto(
@@ -184,6 +325,255 @@ class AgenteService:
             print(f"Error obteniendo sugerencias: {str(e)}")
             return {'sugerencias': []}
     
+    def _construir_mensajes(
+        self,
+        correo: str,
+        contexto: str,
+        mensaje_usuario: str,
+        historial_conversacion: Optional[List[Dict]] = None
+    ) -> Tuple[List[Dict], Dict, Dict]:
+        """
+        Valida la consulta, carga el contexto y arma los mensajes para Gemini
+        
+        Returns:
+            Tupla (mensajes para Gemini, usuario, datos del contexto)
+        
+        Raises:
+            UsuarioNoEncontradoError: Si el usuario no existe
+            ContextoInvalidoError: Si el contexto no es válido
+        """
+        # 1-2. Validar contexto y usuario
+        usuario = self._validar_consulta(correo, contexto)
+        
+        # 3. Obtener procesador de contexto
+        procesador = ContextoFactory.get_contexto(contexto)
+        
+        # 4. Construir datos del contexto (o reutilizar el snapshot del turno
+        # anterior si las versiones del usuario no cambiaron)
+        datos_contexto = self.snapshot_contexto.obtener(correo, contexto, procesador, usuario)
+        
+        # 5. Construir prompt completo
+        usuario_data = datos_contexto.get('usuario', usuario)
+        memoria_data = datos_contexto.get('memoria', [])
+        
+        prompt_sistema = procesador.get_prompt_instructions(
+            usuario=usuario_data,
+            memoria=memoria_data,
+            datos_contexto=datos_contexto,
+            incluir_estatico=False
+        )
+        
+        # 6. Construir mensajes para Gemini. El prefijo estático va aparte
+        # y marcado con su contexto: GeminiService puede enviarlo como
+        # contenido cacheado y mandar inline solo la parte variable
+        mensajes = [
+            {
+                'role': 'system',
+                'content': procesador.get_prompt_estatico(extendido=Config.GEMINI_CACHE_CONTEXTO),
+                'cache': contexto
+            },
+            {'role': 'system', 'content': prompt_sistema}
+        ]
+        
+        mensajes.extend(self._mensajes_conversacion(mensaje_usuario, historial_conversacion))
+        
+        return mensajes, usuario, datos_contexto
+    
+    def _detectar_intencion(self, contexto: str, mensaje_usuario: str) -> Prediccion:
+        """Clasifica el mensaje localmente y registra la intención detectada"""
+        inicio = time.perf_counter()
+        prediccion = self.clasificador.clasificar(mensaje_usuario)
+        duracion_us = (time.perf_counter() - inicio) * 1_000_000
+        
+        registrar_metrica(
+            'IntencionDetectada',
+            1,
+            unidad='Count',
+            dimensiones={'Intencion': prediccion.intencion},
+            propiedades={
+                'contexto': contexto,
+                'confianza': prediccion.confianza,
+                'nivel': prediccion.nivel,
+                'plantilla': self.respuestas_directas.aplica(prediccion, mensaje_usuario),
+                'clasificacion_us': round(duracion_us)
+            }
+        )
+        return prediccion
+    
+    def _validar_consulta(self, correo: str, contexto: str) -> Dict:
+        """
+        Valida el contexto y que el usuario exista
+        
+        Returns:
+            Usuario
+        
+        Raises:
+            UsuarioNoEncontradoError: Si el usuario no existe
+            ContextoInvalidoError: Si el contexto no es válido
+        """
+        if contexto not in Config.CONTEXTOS_DISPONIBLES:
+            raise ContextoInvalidoError(
+                f"Contexto '{contexto}' no válido. "
+                f"Disponibles: {Config.CONTEXTOS_DISPONIBLES}"
+            )
+        
+        usuario = self.usuarios_dao.get_usuario(correo)
+        if not usuario:
+            raise UsuarioNoEncontradoError(f"Usuario con correo '{correo}' no encontrado")
+        
+        return usuario
+    
+    @staticmethod
+    def _mensajes_conversacion(
+        mensaje_usuario: str,
+        historial_conversacion: Optional[List[Dict]] = None
+    ) -> List[Dict]:
+        """Historial previo (últimos 5 mensajes) más el mensaje actual"""
+        mensajes = []
+        
+        # Agregar historial si existe
+        if historial_conversacion:
+            for msg in historial_conversacion[-5:]:  # Últimos 5 mensajes
+                mensajes.append({
+                    'role': msg.get('role', 'user'),
+                    'content': msg.get('content', '')
+                })
+        
+        # Agregar mensaje actual del usuario
+        mensajes.append({
+            'role': 'user',
+            'content': mensaje_usuario
+        })
+        
+        return mensajes
+    
+    def _procesar_con_herramientas(
+        self,
+        correo: str,
+        contexto: str,
+        mensaje_usuario: str,
+        historial_conversacion: Optional[List[Dict]] = None
+    ) -> Dict:
+        """
+        procesar_consulta en modo herramientas: sin precarga de tablas
+        
+        Returns:
+            Diccionario con la respuesta del agente y la traza de herramientas
+        """
+        usuario = self._validar_consulta(correo, contexto)
+        respuesta_agente, traza = self._responder_con_herramientas(
+            correo, contexto, usuario, mensaje_usuario, historial_conversacion
+        )
+        
+        return {
+            'respuesta': respuesta_agente,
+            'desde_cache': False,
+            'herramientas': traza,
+            'contexto': contexto,
+            'timestamp': datetime.now().isoformat(),
+            'usuario': {
+                'correo': correo,
+                'nombre': usuario.get('nombre', 'Usuario')
+            }
+        }
+    
+    def _responder_con_herramientas(
+        self,
+        correo: str,
+        contexto: str,
+        usuario: Dict,
+        mensaje_usuario: str,
+        historial_conversacion: Optional[List[Dict]] = None
+    ) -> Tuple[str, Dict]:
+        """
+        Bucle de function calling con tope de rondas
+        
+        El modelo recibe solo el prompt del contexto y las funciones de las
+        tablas que ese contexto permite. Cada ronda ejecuta en paralelo las
+        llamadas pedidas; al llegar a Config.MAX_RONDAS_HERRAMIENTAS se le
+        quitan las funciones para forzar una respuesta en texto.
+        
+        Returns:
+            Tupla (respuesta, traza {'rondas', 'llamadas', 'caracteres_prompt'})
+        """
+        procesador = ContextoFactory.get_contexto(contexto)
+        mensajes = [{'role': 'system', 'content': procesador.get_prompt_herramientas(usuario)}]
+        mensajes.extend(self._mensajes_conversacion(mensaje_usuario, historial_conversacion))
+        
+        contenidos = self.gemini_service.convertir_mensajes_a_contenidos(mensajes)
+        declaraciones = self.herramientas.declaraciones(procesador.get_tablas_requeridas())
+        llamadas: List[str] = []
+        rondas = 0
+        
+        while True:
+            disponibles = declaraciones if rondas < Config.MAX_RONDAS_HERRAMIENTAS else None
+            partes, _ = self.gemini_service.generar_con_herramientas(contenidos, disponibles)
+            pedidas = [parte['llamada'] for parte in partes if 'llamada' in parte]
+            
+            if not pedidas or not disponibles:
+                respuesta = ''.join(parte.get('texto', '') for parte in partes)
+                break
+            
+            rondas += 1
+            resultados, _ = ejecutar_en_paralelo(
+                {
+                    str(i): (lambda llamada=llamada: self.herramientas.ejecutar(
+                        llamada['nombre'], llamada['argumentos'], correo
+                    ))
+                    for i, llamada in enumerate(pedidas)
+                },
+                timeout=Config.TIMEOUT_LECTURAS_CONTEXTO
+            )
+            
+            contenidos.append({
+                'role': 'model',
+                'parts': [
+                    {'function_call': {'name': llamada['nombre'], 'args': llamada['argumentos']}}
+                    for llamada in pedidas
+                ]
+            })
+            contenidos.append({
+                'role': 'user',
+                'parts': [
+                    {'function_response': {
+                        'name': llamada['nombre'],
+                        'response': resultados.get(str(i), {'error': 'La consulta no respondió a tiempo'})
+                    }}
+                    for i, llamada in enumerate(pedidas)
+                ]
+            })
+            llamadas.extend(llamada['nombre'] for llamada in pedidas)
+        
+        traza = {
+            'rondas': rondas,
+            'llamadas': llamadas,
+            'caracteres_prompt': len(contenidos[0]['parts'][0]['text'])
+        }
+        if Config.LOG_DEBUG:
+            print(f"🛠️  Herramientas: {traza}")
+        registrar_metrica(
+            'LlamadasHerramientas',
+            len(llamadas),
+            unidad='Count',
+            dimensiones={'Contexto': contexto},
+            propiedades=traza
+        )
+        
+        return respuesta or self.gemini_service._generar_respuesta_fallback(), traza
+    
+    def _clave_cache(
+        self,
+        contexto: str,
+        mensaje_usuario: str,
+        datos_contexto: Dict,
+        historial_conversacion: Optional[List[Dict]]
+    ) -> Optional[str]:
+        """Clave de la caché de respuestas (None si la consulta no se cachea)"""
+        # Con historial de conversación la respuesta depende del diálogo previo
+        if historial_conversacion:
+            return None
+        return self.respuesta_cache.clave(contexto, mensaje_usuario, datos_contexto)
+    
     def _generar_sugerencias_para_contexto(
         self,
         contexto: str,
@@ -4,12 +4,9 @@ Servicio de autenticación y validación de tokens
 import base64
 import json
 import os
-import boto3
 from typing import Optional, Dict
 
-# Inicializar clientes
-cognito = boto3.client('cognito-idp', region_name=os.getenv('AWS_REGION', 'us-east-1'))
-dynamodb = boto3.resource('dynamodb', region_name=os.getenv('AWS_REGION', 'us-east-1'))
+from dao.base import DAOFactory
 
 # Configuración de Cognito
 USER_POOL_ID = os.getenv('USER_POOL_ID', 'us-east-1_CbDyhAcqE')
@@ -56,11 +53,8 @@ class AuthService:
             
             print(f"✅ Email extraído del token: {email}")
             
-            # 3. Buscar usuario en DynamoDB (igual que API-REGISTRO)
-            table_usuarios = dynamodb.Table(os.getenv('TABLE_USUARIOS', 'Usuarios'))
-            
-            response = table_usuarios.get_item(Key={'correo': email})
-            user_data = response.get('Item')
+            # 3. Buscar usuario en DynamoDB (compartido vía identity map de la request)
+            user_data = DAOFactory.get_dao('usuarios').get_usuario(email)
             
             if user_data:
                 print(f"✅ Usuario encontrado en DynamoDB: {email}")
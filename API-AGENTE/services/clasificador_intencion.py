@@ -0,0 +1,264 @@
+"""
+Clasificador local de intención del mensaje
+
+Naive Bayes multinomial sobre raíces de palabras y bigramas del mensaje
+normalizado: se entrena en milisegundos y clasifica en microsegundos, sin
+dependencias. Cada intención tiene un nivel que decide cómo se atiende:
+
+    - 'plantilla': se responde con datos de los DAOs, sin LLM
+    - 'rapido': se genera con Config.GEMINI_MODEL_RAPIDO
+    - 'principal': se genera con Config.GEMINI_MODEL
+
+El modelo por defecto se entrena con las frases semilla de este módulo.
+local/entrenar_intenciones.py lo reentrena sumando el corpus de la tabla
+de memoria y lo guarda en Config.INTENCION_MODELO_PATH.
+"""
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from config import Config
+from services.respuesta_cache import RespuestaCache
+
+INTENCION_DEFECTO = 'consulta_general'
+
+NIVELES: Dict[str, str] = {
+    'saludo': 'plantilla',
+    'agradecimiento': 'plantilla',
+    'despedida': 'plantilla',
+    'proxima_dosis': 'plantilla',
+    'consultar': 'rapido',
+    'registrar': 'rapido',
+    'pedir consejo': 'principal',
+    'quejarse': 'principal',
+    INTENCION_DEFECTO: 'principal'
+}
+
+# Frases semilla por intención (las de la memoria usan las mismas etiquetas)
+EJEMPLOS_SEMILLA: Dict[str, List[str]] = {
+    'saludo': [
+        'hola', 'buenos días', 'buenas tardes', 'buenas noches', 'hola qué tal',
+        'hey', 'holi', 'saludos', 'buen día', 'hola cómo estás', 'qué tal', 'hola asistente',
+        'hey, buenas', 'hola, buen día'
+    ],
+    'agradecimiento': [
+        'gracias', 'muchas gracias', 'mil gracias', 'te agradezco', 'gracias por la ayuda',
+        'genial gracias', 'perfecto, gracias', 'ok gracias', 'muy amable', 'excelente, gracias'
+    ],
+    'despedida': [
+        'adiós', 'chau', 'hasta luego', 'nos vemos', 'hasta mañana', 'bye',
+        'hasta pronto', 'eso es todo', 'nada más', 'chao', 'bueno, chau', 'chau, nos vemos',
+        'adiós, cuídate', 'bye bye', 'chao, hasta pronto'
+    ],
+    'proxima_dosis': [
+        '¿cuál es mi próxima dosis?', '¿cuándo me toca la siguiente pastilla?',
+        '¿a qué hora tomo mi medicamento?', '¿cada cuánto tomo el paracetamol?',
+        '¿cuándo tengo que tomar mis medicinas?', '¿me toca tomar algo?', 'siguiente toma',
+        '¿cada cuántas horas debo tomar la pastilla?', '¿cuándo es mi próxima toma?',
+        '¿qué medicamento me toca ahora?', 'horario de mis medicamentos', 'próxima dosis'
+    ],
+    'consultar': [
+        '¿cuántos pasos di esta semana?', '¿qué servicios hay?', '¿cómo va mi ritmo cardiaco?',
+        '¿cuántas horas dormí?', 'muéstrame mis recetas', '¿qué medicamentos tengo recetados?',
+        '¿cuál fue mi promedio de sueño?', '¿qué servicios de nutrición ofrecen?',
+        '¿tengo recetas registradas?', '¿cuánto caminé ayer?', '¿cuál es mi frecuencia cardiaca?',
+        '¿cómo estuvo mi actividad este mes?', 'dame mis estadísticas'
+    ],
+    'registrar': [
+        'quiero registrar mis pasos', 'anota que hoy dormí 7 horas', 'registra mi presión',
+        'hoy caminé 5000 pasos', 'quiero guardar un registro', 'agrega que tomé mi pastilla',
+        'apunta mi peso de hoy', 'registrar actividad', 'hoy hice ejercicio 30 minutos'
+    ],
+    'pedir consejo': [
+        '¿qué me recomiendas para dormir mejor?', '¿cómo puedo bajar el estrés?',
+        'consejos para hacer ejercicio', '¿qué debería comer?', '¿cómo mejoro mi salud?',
+        '¿me das un consejo?', '¿qué hago para tener más energía?', '¿cómo puedo caminar más?',
+        'tips para mejorar mi sueño', '¿debería hacer más ejercicio?',
+        '¿me toca tomar algo para el dolor?', '¿puedo tomar algo para la fiebre?',
+        '¿qué tomo si me duele la cabeza?'
+    ],
+    'quejarse': [
+        'me siento mal', 'estoy cansado todo el tiempo', 'me duele la cabeza',
+        'no puedo dormir', 'estoy muy estresado', 'la app no funciona', 'me siento fatal',
+        'tengo dolor', 'estoy harto', 'la pastilla me cae mal',
+        'gracias, pero sigo con fiebre', 'no quiero tomar mis medicamentos',
+        'hola, me duele el pecho', 'gracias, pero sigo mal', 'ya no quiero tomar la pastilla'
+    ]
+}
+
+_VACIAS = {
+    'el', 'la', 'los', 'las', 'un', 'una', 'de', 'del', 'y', 'o', 'a', 'en',
+    'que', 'mi', 'mis', 'me', 'por', 'para', 'con', 'es', 'lo', 'al', 'se', 'su'
+}
+
+
+class Prediccion(NamedTuple):
+    """Intención detectada y cómo atenderla"""
+    intencion: str
+    confianza: float
+    nivel: str
+    palabras: int
+
+
+class ClasificadorIntencion:
+    """Naive Bayes multinomial con suavizado aditivo (alfa bajo: frases cortas)"""
+
+    def __init__(self, alfa: float = 0.1):
+        self.alfa = alfa
+        self.documentos: Counter = Counter()
+        self.frecuencias: Dict[str, Counter] = {}
+        self._total_tokens: Dict[str, int] = {}
+        self._vocabulario: set = set()
+
+    @staticmethod
+    def caracteristicas(texto: str) -> List[str]:
+        """
+        Raíces (6 caracteres) de las palabras con contenido y bigramas
+
+        'medicamento' y 'medicamentos' comparten raíz; los bigramas
+        distinguen 'me toca' de 'me duele'.
+        """
+        palabras = RespuestaCache.normalizar_mensaje(texto).split()
+        raices = [p[:6] for p in palabras if p not in _VACIAS]
+        bigramas = [f"{a}_{b}" for a, b in zip(palabras, palabras[1:])]
+        return raices + bigramas
+
+    def entrenar(self, ejemplos: Iterable[Tuple[str, str]]) -> 'ClasificadorIntencion':
+        """
+        Acumula ejemplos (texto, intención); se puede llamar varias veces
+
+        Returns:
+            El mismo clasificador
+        """
+        for texto, intencion in ejemplos:
+            self.documentos[intencion] += 1
+            self.frecuencias.setdefault(intencion, Counter()).update(self.caracteristicas(texto))
+        self._preparar()
+        return self
+
+    def clasificar(self, mensaje: str) -> Prediccion:
+        """
+        Intención más probable del mensaje
+
+        Si ninguna supera Config.INTENCION_UMBRAL, o el mensaje no tiene
+        palabras conocidas, se devuelve la intención por defecto.
+
+        Args:
+            mensaje: Mensaje del usuario
+
+        Returns:
+            Prediccion con la confianza (probabilidad posterior)
+        """
+        rasgos = [r for r in self.caracteristicas(mensaje) if r in self._vocabulario]
+        palabras = len(mensaje.split())
+        if not rasgos or not self.documentos:
+            return Prediccion(INTENCION_DEFECTO, 0.0, NIVELES[INTENCION_DEFECTO], palabras)
+
+        total_documentos = sum(self.documentos.values())
+        vocabulario = len(self._vocabulario)
+        puntajes = {}
+        for intencion, frecuencias in self.frecuencias.items():
+            denominador = self._total_tokens[intencion] + self.alfa * vocabulario
+            puntajes[intencion] = math.log(self.documentos[intencion] / total_documentos) + sum(
+                math.log((frecuencias.get(r, 0) + self.alfa) / denominador) for r in rasgos
+            )
+
+        # Posterior normalizada (softmax de los log-puntajes)
+        maximo = max(puntajes.values())
+        exponenciales = {i: math.exp(p - maximo) for i, p in puntajes.items()}
+        suma = sum(exponenciales.values())
+        intencion = max(exponenciales, key=exponenciales.get)
+        confianza = exponenciales[intencion] / suma
+
+        if confianza < Config.INTENCION_UMBRAL:
+            return Prediccion(INTENCION_DEFECTO, round(confianza, 3), NIVELES[INTENCION_DEFECTO], palabras)
+        return Prediccion(intencion, round(confianza, 3), NIVELES.get(intencion, 'principal'), palabras)
+
+    @staticmethod
+    def ejemplos_desde_memoria(memorias: Iterable[Dict]) -> Iterator[Tuple[str, str]]:
+        """
+        Ejemplos de entrenamiento a partir de la tabla de memoria
+
+        Usa el mensaje original si está en datos_extraidos y, si no, el
+        resumen. Las memorias guardadas por el propio agente se omiten: su
+        etiqueta la puso este clasificador.
+        """
+        for memoria in memorias:
+            intencion = memoria.get('intencion_detectada')
+            if not intencion or intencion in (INTENCION_DEFECTO, 'no_detectada') or memoria.get('origen') == 'agente':
+                continue
+            datos = memoria.get('datos_extraidos') or {}
+            texto = datos.get('mensaje_usuario') or memoria.get('resumen_conversacion')
+            if texto:
+                yield texto, intencion
+
+    def a_dict(self) -> Dict:
+        """Modelo serializable a JSON"""
+        return {
+            'alfa': self.alfa,
+            'documentos': dict(self.documentos),
+            'frecuencias': {i: dict(f) for i, f in self.frecuencias.items()}
+        }
+
+    @classmethod
+    def desde_dict(cls, data: Dict) -> 'ClasificadorIntencion':
+        """Reconstruye un modelo guardado con a_dict"""
+        clasificador = cls(alfa=data.get('alfa', 0.1))
+        clasificador.documentos = Counter(data['documentos'])
+        clasificador.frecuencias = {i: Counter(f) for i, f in data['frecuencias'].items()}
+        clasificador._preparar()
+        return clasificador
+
+    def _preparar(self):
+        self._total_tokens = {i: sum(f.values()) for i, f in self.frecuencias.items()}
+        self._vocabulario = {r for f in self.frecuencias.values() for r in f}
+
+
+def ejemplos_semilla() -> Iterator[Tuple[str, str]]:
+    """Pares (texto, intención) de las frases semilla"""
+    for intencion, frases in EJEMPLOS_SEMILLA.items():
+        for frase in frases:
+            yield frase, intencion
+
+
+def vocabulario_semilla(intencion: str) -> FrozenSet[str]:
+    """Palabras normalizadas de las frases semilla de una intención"""
+    return _VOCABULARIOS_SEMILLA.get(intencion, frozenset())
+
+
+_VOCABULARIOS_SEMILLA: Dict[str, FrozenSet[str]] = {
+    intencion: frozenset(
+        palabra for frase in frases for palabra in RespuestaCache.normalizar_mensaje(frase).split()
+    )
+    for intencion, frases in EJEMPLOS_SEMILLA.items()
+}
+
+_clasificador: Optional[ClasificadorIntencion] = None
+_clasificador_lock = threading.Lock()
+
+
+def get_clasificador() -> ClasificadorIntencion:
+    """
+    Clasificador del contenedor (se carga una sola vez)
+
+    Usa el modelo entrenado en Config.INTENCION_MODELO_PATH si existe y,
+    si no, uno entrenado con las frases semilla.
+    """
+    global _clasificador
+    if _clasificador is None:
+        with _clasificador_lock:
+            if _clasificador is None:
+                inicio = time.perf_counter()
+                if os.path.exists(Config.INTENCION_MODELO_PATH):
+                    with open(Config.INTENCION_MODELO_PATH, encoding='utf-8') as archivo:
+                        _clasificador = ClasificadorIntencion.desde_dict(json.load(archivo))
+                    origen = Config.INTENCION_MODELO_PATH
+                else:
+                    _clasificador = ClasificadorIntencion().entrenar(ejemplos_semilla())
+                    origen = 'frases semilla'
+                print(f"🧭 Clasificador de intención listo ({origen}, {(time.perf_counter() - inicio) * 1000:.1f} ms)")
+    return _clasificador
@@ -0,0 +1,374 @@
+"""
+Cliente resiliente para las llamadas al LLM
+
+Envuelve cada llamada a Gemini con:
+    - plazo: ningún intento dura más de lo que le queda a la invocación
+      (utils/plazo.py, derivado de get_remaining_time_in_millis)
+    - reintentos con backoff exponencial y jitter completo, solo ante
+      errores transitorios (timeouts, conexión, 408/429/5xx)
+    - hedging opcional: si el intento supera el p95 observado se lanza una
+      segunda request igual y gana la primera que responda
+    - circuit breaker por modelo
+    - degradación a Config.GEMINI_MODEL_RAPIDO cuando queda poco plazo o el
+      circuito del modelo principal está abierto; las consultas simples
+      (según la intención detectada) lo prefieren desde el inicio
+
+`llamar(modelo, timeout)` recibe el nombre del modelo elegido y los
+segundos máximos del intento, y debe respetarlos (request_options).
+"""
+import contextvars
+import random
+import socket
+import threading
+import time
+import urllib.error
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from config import Config
+from utils.exceptions import LLMNoDisponibleError
+from utils.metricas import registrar_metrica
+from utils.plazo import Plazo
+
+CODIGOS_REINTENTABLES = {408, 429, 500, 502, 503, 504}
+
+_executor_coberturas: Optional[ThreadPoolExecutor] = None
+_executor_coberturas_lock = threading.Lock()
+
+
+def _get_executor_coberturas() -> ThreadPoolExecutor:
+    """
+    Pool de las requests con cobertura (se crea una sola vez)
+
+    Es propio y no el de utils/concurrencia.py: una llamada lenta al LLM no
+    debe ocupar los hilos con que se carga el contexto.
+    """
+    global _executor_coberturas
+    if _executor_coberturas is None:
+        with _executor_coberturas_lock:
+            if _executor_coberturas is None:
+                _executor_coberturas = ThreadPoolExecutor(
+                    max_workers=Config.LLM_HEDGING_WORKERS,
+                    thread_name_prefix='cobertura'
+                )
+    return _executor_coberturas
+
+
+def es_reintentable(error: Exception) -> bool:
+    """
+    Indica si un error del LLM es transitorio
+
+    Cubre los timeouts y errores de conexión, los HTTPError del cliente
+    REST y las excepciones de google.api_core (ambos exponen `.code` con
+    el status HTTP).
+    """
+    if isinstance(error, (TimeoutError, ConnectionError, socket.timeout)):
+        return True
+    codigo = getattr(error, 'code', None)
+    if isinstance(codigo, int):
+        return codigo in CODIGOS_REINTENTABLES
+    return isinstance(error, urllib.error.URLError)
+
+
+class CircuitBreaker:
+    """Circuito cerrado / abierto / semiabierto de un modelo"""
+
+    CERRADO = 'cerrado'
+    ABIERTO = 'abierto'
+    SEMIABIERTO = 'semiabierto'
+
+    def __init__(self, nombre: str):
+        self.nombre = nombre
+        self.estado = self.CERRADO
+        self.fallos_seguidos = 0
+        self.abierto_hasta = 0.0
+        self.aperturas = 0
+        self._sonda_en_curso = False
+        self._lock = threading.Lock()
+
+    def permite(self) -> bool:
+        """
+        Indica si se puede llamar al modelo
+
+        Pasada la espera, el circuito abierto deja pasar una única llamada
+        de prueba (semiabierto); su resultado lo cierra o lo vuelve a abrir.
+        """
+        with self._lock:
+            if self.estado == self.ABIERTO and time.monotonic() >= self.abierto_hasta:
+                self.estado = self.SEMIABIERTO
+                self._sonda_en_curso = False
+
+            if self.estado == self.CERRADO:
+                return True
+            if self.estado == self.SEMIABIERTO and not self._sonda_en_curso:
+                self._sonda_en_curso = True
+                return True
+            return False
+
+    def registrar(self, exito: bool):
+        """Registra el resultado de una llamada"""
+        with self._lock:
+            if exito:
+                self.estado = self.CERRADO
+                self.fallos_seguidos = 0
+                self._sonda_en_curso = False
+                return
+
+            self.fallos_seguidos += 1
+            if self.estado == self.SEMIABIERTO or self.fallos_seguidos >= Config.LLM_CIRCUITO_FALLOS:
+                self.estado = self.ABIERTO
+                self.abierto_hasta = time.monotonic() + Config.LLM_CIRCUITO_ESPERA
+                self._sonda_en_curso = False
+                self.aperturas += 1
+                print(f"🔌 Circuito de {self.nombre} abierto por {Config.LLM_CIRCUITO_ESPERA:.0f}s")
+
+    def liberar(self):
+        """
+        Cierra una llamada sin resultado que cuente (p. ej. un 400 del pedido)
+
+        No cambia el estado: si era la sonda del semiabierto, la siguiente
+        llamada puede volver a probar.
+        """
+        with self._lock:
+            self._sonda_en_curso = False
+
+
+class ClienteLLM:
+    """Ejecuta llamadas al LLM con plazo, reintentos, hedging y circuit breaker"""
+
+    def __init__(self):
+        self._circuitos: Dict[str, CircuitBreaker] = {}
+        self._latencias: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+        self.llamadas = 0
+        self.reintentos = 0
+        self.coberturas = 0
+        self.degradadas = 0
+        self.fallidas = 0
+
+    def ejecutar(
+        self,
+        operacion: str,
+        llamar: Callable[[str, float], Any],
+        descartar: Optional[Callable[[Any], None]] = None,
+        rapido: bool = False
+    ) -> Any:
+        """
+        Ejecuta `llamar` dentro del plazo de la invocación
+
+        Args:
+            operacion: Tipo de llamada ('generar', 'stream', 'herramientas');
+                cada una tiene su propia distribución de latencias
+            llamar: (modelo, timeout) -> resultado
+            descartar: Libera el resultado de una request de cobertura que
+                perdió (p. ej. cierra un stream)
+            rapido: Preferir el modelo rápido aunque sobre plazo
+
+        Returns:
+            Resultado de la primera llamada exitosa
+
+        Raises:
+            LLMNoDisponibleError: Si se agotó el plazo, los reintentos o
+                todos los circuitos están abiertos
+            Exception: El error original si no es transitorio
+        """
+        plazo = Plazo.actual()
+        inicio = time.monotonic()
+        intentos = 0
+
+        while True:
+            restante = plazo.restante()
+            if restante < Config.LLM_TIMEOUT_MINIMO:
+                self._fallo(operacion)
+                raise LLMNoDisponibleError(f"Plazo agotado tras {intentos} intentos ({restante:.1f}s restantes)")
+
+            modelo = self._elegir_modelo(restante, rapido)
+            if modelo is None:
+                self._fallo(operacion)
+                raise LLMNoDisponibleError("Circuito abierto para todos los modelos")
+
+            timeout = min(Config.LLM_TIMEOUT_INTENTO, restante)
+            intentos += 1
+            inicio_intento = time.monotonic()
+
+            try:
+                resultado, cubierto = self._intento(operacion, llamar, modelo, timeout, descartar)
+            except Exception as e:
+                # Un error no transitorio (400, prompt bloqueado) no habla de la salud del modelo
+                if not es_reintentable(e):
+                    self._circuito(modelo).liberar()
+                    self._fallo(operacion)
+                    raise
+                self._circuito(modelo).registrar(False)
+
+                print(f"⚠️  Intento {intentos} de '{operacion}' con {modelo} falló: {str(e)}")
+                if intentos > Config.LLM_MAX_REINTENTOS:
+                    self._fallo(operacion)
+                    raise LLMNoDisponibleError(f"Sin respuesta tras {intentos} intentos: {str(e)}") from e
+
+                # Backoff exponencial con jitter completo, sin pasarse del plazo
+                espera = random.uniform(0, min(Config.LLM_BACKOFF_MAX, Config.LLM_BACKOFF_BASE * 2 ** (intentos - 1)))
+                if plazo.restante() - espera < Config.LLM_TIMEOUT_MINIMO:
+                    self._fallo(operacion)
+                    raise LLMNoDisponibleError(f"Plazo insuficiente para reintentar: {str(e)}") from e
+                with self._lock:
+                    self.reintentos += 1
+                time.sleep(espera)
+                continue
+
+            self._circuito(modelo).registrar(True)
+            self._latencias_de(operacion, modelo).append(time.monotonic() - inicio_intento)
+            degradado = modelo != Config.GEMINI_MODEL and not rapido
+            with self._lock:
+                self.llamadas += 1
+                self.coberturas += int(cubierto)
+                self.degradadas += int(degradado)
+
+            registrar_metrica(
+                'LatenciaLLM',
+                round((time.monotonic() - inicio) * 1000, 1),
+                unidad='Milliseconds',
+                dimensiones={'Operacion': operacion},
+                propiedades={
+                    'modelo': modelo,
+                    'intentos': intentos,
+                    'cobertura': cubierto,
+                    'degradado': degradado,
+                    'nivel': 'rapido' if rapido else 'principal',
+                    'plazo_restante_s': round(plazo.restante(), 1)
+                }
+            )
+            return resultado
+
+    def estadisticas(self) -> Dict:
+        """Contadores, estado de los circuitos y p95 por operación"""
+        with self._lock:
+            return {
+                'llamadas': self.llamadas,
+                'reintentos': self.reintentos,
+                'coberturas': self.coberturas,
+                'degradadas': self.degradadas,
+                'fallidas': self.fallidas,
+                'circuitos': {nombre: c.estado for nombre, c in self._circuitos.items()},
+                'p95_ms': {
+                    f"{operacion}:{modelo}": round(self._percentil(muestras, 0.95) * 1000)
+                    for (operacion, modelo), muestras in self._latencias.items() if muestras
+                }
+            }
+
+    @staticmethod
+    def modelo_preferido(rapido: bool = False) -> str:
+        """Modelo que se intenta primero si el plazo y los circuitos lo permiten"""
+        if rapido and Config.GEMINI_MODEL_RAPIDO:
+            return Config.GEMINI_MODEL_RAPIDO
+        return Config.GEMINI_MODEL
+
+    def _elegir_modelo(self, restante: float, rapido: bool = False) -> Optional[str]:
+        """Modelo principal, o el rápido si se prefiere, queda poco plazo o el principal está caído"""
+        principal = Config.GEMINI_MODEL
+        rapido_modelo = Config.GEMINI_MODEL_RAPIDO if Config.GEMINI_MODEL_RAPIDO != principal else ''
+
+        orden = [principal, rapido_modelo]
+        if rapido_modelo and (rapido or restante < Config.LLM_UMBRAL_DEGRADAR):
+            orden.reverse()
+
+        for modelo in orden:
+            if modelo and self._circuito(modelo).permite():
+                return modelo
+        return None
+
+    def _intento(
+        self,
+        operacion: str,
+        llamar: Callable[[str, float], Any],
+        modelo: str,
+        timeout: float,
+        descartar: Optional[Callable[[Any], None]]
+    ) -> Tuple[Any, bool]:
+        """
+        Un intento, con request de cobertura si tarda más que el p95
+
+        Returns:
+            Tupla (resultado, True si ganó la request de cobertura)
+        """
+        umbral = self._umbral_cobertura(operacion, modelo)
+        if umbral is None or umbral >= timeout:
+            return llamar(modelo, timeout), False
+
+        executor = _get_executor_coberturas()
+        limite = time.monotonic() + timeout
+        principal = executor.submit(contextvars.copy_context().run, llamar, modelo, timeout)
+
+        terminados, _ = wait([principal], timeout=umbral)
+        if terminados:
+            return principal.result(), False
+
+        print(f"🔀 '{operacion}' superó el p95 ({umbral * 1000:.0f} ms), se lanza una request de cobertura")
+        cobertura = executor.submit(
+            contextvars.copy_context().run, llamar, modelo, max(0.0, limite - time.monotonic())
+        )
+
+        pendientes = {principal, cobertura}
+        error = None
+        while pendientes:
+            terminados, pendientes = wait(
+                pendientes,
+                timeout=max(0.0, limite - time.monotonic()),
+                return_when=FIRST_COMPLETED
+            )
+            if not terminados:
+                break
+            for future in terminados:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                for perdedora in pendientes:
+                    self._descartar_al_terminar(perdedora, descartar)
+                return future.result(), future is cobertura
+
+        for perdedora in pendientes:
+            self._descartar_al_terminar(perdedora, descartar)
+        if error is not None and not pendientes:
+            raise error
+        raise TimeoutError(f"Sin respuesta en {timeout:.1f}s")
+
+    @staticmethod
+    def _descartar_al_terminar(future: Future, descartar: Optional[Callable[[Any], None]]):
+        """Libera el resultado de una request que ya no se usará"""
+        if descartar is None:
+            return
+
+        def liberar(f: Future):
+            if not f.cancelled() and f.exception() is None:
+                descartar(f.result())
+
+        future.add_done_callback(liberar)
+
+    def _umbral_cobertura(self, operacion: str, modelo: str) -> Optional[float]:
+        """p95 de la operación, o None si el hedging está apagado o faltan muestras"""
+        if not Config.LLM_HEDGING:
+            return None
+        muestras = self._latencias_de(operacion, modelo)
+        if len(muestras) < Config.LLM_HEDGING_MIN_MUESTRAS:
+            return None
+        return self._percentil(muestras, 0.95)
+
+    @staticmethod
+    def _percentil(muestras: Deque[float], q: float) -> float:
+        ordenadas = sorted(muestras)
+        return ordenadas[int(q * (len(ordenadas) - 1))]
+
+    def _circuito(self, modelo: str) -> CircuitBreaker:
+        with self._lock:
+            return self._circuitos.setdefault(modelo, CircuitBreaker(modelo))
+
+    def _latencias_de(self, operacion: str, modelo: str) -> Deque[float]:
+        with self._lock:
+            return self._latencias.setdefault((operacion, modelo), deque(maxlen=200))
+
+    def _fallo(self, operacion: str):
+        with self._lock:
+            self.fallidas += 1
+        registrar_metrica('LLMNoDisponible', 1, unidad='Count', dimensiones={'Operacion': operacion})
@@ -0,0 +1,139 @@
+"""
+Caché explícita de Gemini para los prefijos estáticos de cada contexto
+
+Cada (modelo, contexto) tiene un contenido cacheado del lado del modelo
+con su prompt estático; las requests solo envían la parte variable. Los
+handles viven en el contenedor y se renuevan en segundo plano antes de
+vencer. Si crear o usar un handle falla, el llamador vuelve al prompt
+inline y no se reintenta hasta pasado Config.GEMINI_CACHE_REINTENTO.
+"""
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import Config
+from contextos.ensamblador_prompt import estimar_tokens
+from utils.concurrencia import get_executor
+
+
+class _Handle:
+    """Contenido cacheado vigente y el modelo ligado a él"""
+
+    def __init__(self, recurso: Any, modelo: Any, expira: float, huella: str):
+        self.recurso = recurso
+        self.modelo = modelo
+        self.expira = expira
+        self.huella = huella
+        self.renovando = False
+
+
+class CacheContextoGemini:
+    """Handles de contenido cacheado por (modelo, contexto)"""
+
+    def __init__(
+        self,
+        crear: Callable[[str, float], Tuple[Any, Any]],
+        renovar: Callable[[Any, float], None]
+    ):
+        """
+        Args:
+            crear: (texto, ttl) -> (recurso, modelo ligado al recurso)
+            renovar: (recurso, ttl) -> None; extiende el vencimiento
+        """
+        self._crear = crear
+        self._renovar = renovar
+        self._handles: Dict[Tuple[str, str], _Handle] = {}
+        self._fallos: Dict[Tuple[str, str], float] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        self.creados = 0
+        self.renovados = 0
+        self.fallos = 0
+
+    def obtener(self, contexto: str, texto: str) -> Optional[Any]:
+        """
+        Modelo ligado al contenido cacheado del contexto
+
+        Args:
+            contexto: Nombre del contexto
+            texto: Prefijo estático a cachear
+
+        Returns:
+            Modelo que genera sobre el contenido cacheado, o None si hay
+            que usar el prompt inline
+        """
+        clave = (Config.GEMINI_MODEL, contexto)
+        huella = hashlib.sha256(texto.encode('utf-8')).hexdigest()
+        ahora = time.time()
+
+        handle = self._handles.get(clave)
+        if handle is not None and handle.huella == huella and ahora < handle.expira:
+            if ahora > handle.expira - Config.GEMINI_CACHE_MARGEN:
+                self._renovar_en_segundo_plano(clave, handle)
+            return handle.modelo
+
+        if ahora < self._fallos.get(clave, 0):
+            return None
+        if estimar_tokens(texto) < Config.GEMINI_CACHE_MIN_TOKENS:
+            # La API rechaza contenidos cacheados por debajo del mínimo
+            return None
+
+        with self._lock_de(clave):
+            # Otro hilo pudo crearlo mientras se esperaba el lock
+            handle = self._handles.get(clave)
+            if handle is not None and handle.huella == huella and time.time() < handle.expira:
+                return handle.modelo
+
+            inicio = time.time()
+            try:
+                recurso, modelo = self._crear(texto, Config.GEMINI_CACHE_TTL)
+            except Exception as e:
+                print(f"⚠️  No se pudo crear la caché de contexto '{contexto}': {str(e)}")
+                self._fallos[clave] = time.time() + Config.GEMINI_CACHE_REINTENTO
+                self.fallos += 1
+                return None
+
+            self._handles[clave] = _Handle(recurso, modelo, inicio + Config.GEMINI_CACHE_TTL, huella)
+            self.creados += 1
+            print(f"🧊 Caché de contexto '{contexto}' creada ({Config.GEMINI_CACHE_TTL:.0f}s)")
+            return modelo
+
+    def invalidar(self, contexto: str):
+        """Descarta el handle (p. ej. si Gemini ya no lo reconoce)"""
+        clave = (Config.GEMINI_MODEL, contexto)
+        self._handles.pop(clave, None)
+        self._fallos[clave] = time.time() + Config.GEMINI_CACHE_REINTENTO
+
+    def estadisticas(self) -> Dict:
+        """Handles activos, creados, renovados y fallidos"""
+        return {
+            'activos': len(self._handles),
+            'creados': self.creados,
+            'renovados': self.renovados,
+            'fallos': self.fallos
+        }
+
+    def _lock_de(self, clave: Tuple[str, str]) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(clave, threading.Lock())
+
+    def _renovar_en_segundo_plano(self, clave: Tuple[str, str], handle: _Handle):
+        with self._lock:
+            if handle.renovando:
+                return
+            handle.renovando = True
+        get_executor().submit(self._renovar_handle, clave, handle)
+
+    def _renovar_handle(self, clave: Tuple[str, str], handle: _Handle):
+        inicio = time.time()
+        try:
+            self._renovar(handle.recurso, Config.GEMINI_CACHE_TTL)
+            handle.expira = inicio + Config.GEMINI_CACHE_TTL
+            self.renovados += 1
+        except Exception as e:
+            # El handle sigue sirviendo hasta vencer; luego se recrea
+            print(f"⚠️  No se pudo renovar la caché de contexto {clave[1]}: {str(e)}")
+        finally:
+            handle.renovando = False
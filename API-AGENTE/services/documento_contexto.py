@@ -0,0 +1,165 @@
+"""
+Documento de contexto materializado por usuario
+
+Un item por usuario en Config.TABLE_CONTEXTO_USUARIO con lo que leen los
+contextos del agente, para que cargar_lecturas resuelva con un GetItem:
+
+    - perfil: registro del usuario sin credenciales ni contadores
+    - recetas: las más recientes (Config.DOCUMENTO_MAX_RECETAS)
+    - memoria: las últimas conversaciones (Config.LIMITE_MEMORIA)
+    - historial: agregados diarios de los últimos
+      Config.DOCUMENTO_DIAS_HISTORIAL días (utils/agregados_historial.py;
+      de la tabla de agregados si está configurada) y los últimos registros
+      crudos
+
+Lo mantiene handlers/procesar_cambios.py desde los streams de las tablas
+de origen. Cada sección se recalcula completa desde su tabla con lecturas
+fuertes en lugar de aplicar el evento, así que procesar un evento dos
+veces o fuera de orden da el mismo documento. DocumentoContextoDAO
+descarta la escritura de una lectura más vieja que la guardada.
+
+Las secciones recetas, memoria e historial guardan además el contador
+version_<tipo> del usuario leído antes que la tabla: el contexto solo usa
+una sección si esa versión alcanza la del usuario actual (ver
+DocumentoContextoDAO.vigente) y, mientras el stream no la procesa, lee
+la tabla directamente.
+"""
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+
+from boto3.dynamodb.conditions import Key
+
+from config import Config
+from contextos.base_contexto import BaseContexto
+from contextos.estadisticas_contexto import EstadisticasContexto
+from contextos.recetas_contexto import RecetasContexto
+from dao.base import DAOFactory
+from dao.documento_contexto_dao import DocumentoContextoDAO
+from dao.usuarios_dao import UsuariosDAO
+from utils import agregados_historial
+
+# Tabla de origen -> sección del documento que se recalcula
+SECCION_POR_TABLA = {
+    Config.TABLE_USUARIOS: 'perfil',
+    Config.TABLE_RECETAS: 'recetas',
+    Config.TABLE_MEMORIA: 'memoria',
+    Config.TABLE_HISTORIAL: 'historial'
+}
+
+# Atributos del usuario que no van al perfil
+EXCLUIDOS_PERFIL = ('contrasena',)
+
+
+def atributos_perfil(usuario: Optional[Dict]) -> Optional[Dict]:
+    """Perfil del usuario tal como se guarda en el documento"""
+    if not usuario:
+        return None
+    return {
+        k: v for k, v in usuario.items()
+        if k not in EXCLUIDOS_PERFIL and not k.startswith('version_')
+    }
+
+
+class DocumentoContexto:
+    """Construye y guarda las secciones del documento de contexto"""
+
+    def __init__(self):
+        self.documento_dao: DocumentoContextoDAO = DAOFactory.get_dao('documento_contexto')
+        self.usuarios_dao = DAOFactory.get_dao('usuarios')
+        self.recetas_dao = DAOFactory.get_dao('recetas')
+        self.memoria_dao = DAOFactory.get_dao('memoria')
+        self.historial_dao = DAOFactory.get_dao('historial')
+        self.agregados_dao = DAOFactory.get_dao('historial_agregados') if Config.TABLE_HISTORIAL_AGREGADOS else None
+
+    @staticmethod
+    def activo() -> bool:
+        """Indica si el documento está configurado"""
+        return bool(Config.TABLE_CONTEXTO_USUARIO)
+
+    def actualizar(self, correo: str, secciones: Iterable[str]) -> Dict[str, bool]:
+        """
+        Recalcula secciones del documento desde las tablas de origen
+
+        El instante de la lectura se toma antes de leer; el usuario se lee
+        antes que las demás tablas para que su contador version_<tipo> no
+        sea posterior a los datos guardados.
+
+        Args:
+            correo: Email del usuario
+            secciones: Secciones a recalcular (DocumentoContextoDAO.SECCIONES)
+
+        Returns:
+            Diccionario sección -> True si se escribió, False si ya había
+            una lectura más reciente
+
+        Raises:
+            Exception: Si falla una lectura de origen (la sección no se toca)
+                o la escritura de una sección
+        """
+        leido_en = int(time.time() * 1000)
+        usuario = self.usuarios_dao.get_consistente(correo)
+
+        resultado = {}
+        for seccion in DocumentoContextoDAO.SECCIONES:
+            if seccion not in secciones:
+                continue
+            atributos = self._construir_seccion(seccion, correo, usuario)
+            if seccion in UsuariosDAO.TIPOS_VERSIONADOS:
+                atributos[f'{seccion}_version'] = UsuariosDAO.versiones(usuario, [seccion])[0]
+            resultado[seccion] = self.documento_dao.guardar_seccion(correo, seccion, atributos, leido_en)
+        return resultado
+
+    def reconstruir(self, correo: str) -> Dict[str, bool]:
+        """Recalcula todas las secciones del documento (backfill)"""
+        return self.actualizar(correo, DocumentoContextoDAO.SECCIONES)
+
+    def _construir_seccion(self, seccion: str, correo: str, usuario: Optional[Dict]) -> Dict:
+        """Atributos de una sección leídos de su tabla de origen"""
+        if seccion == 'perfil':
+            return {'perfil': atributos_perfil(usuario)}
+
+        if seccion == 'recetas':
+            return {'recetas': self.recetas_dao.query_consistente(
+                correo,
+                max_items=Config.DOCUMENTO_MAX_RECETAS,
+                projection=RecetasContexto.ATRIBUTOS['recetas']
+            )}
+
+        if seccion == 'memoria':
+            return {'memoria': self.memoria_dao.query_consistente(
+                correo,
+                max_items=Config.LIMITE_MEMORIA,
+                projection=BaseContexto.ATRIBUTOS['memoria']
+            )}
+
+        if seccion == 'historial':
+            hoy = date.today()
+            desde = (hoy - timedelta(days=Config.DOCUMENTO_DIAS_HISTORIAL)).isoformat()
+            if self.agregados_dao is None:
+                registros = self.historial_dao.query_consistente(
+                    correo,
+                    sort_key_condition=Key('fecha').gte(desde),
+                    projection=EstadisticasContexto.ATRIBUTOS['historial']
+                )
+                return {
+                    'historial_diario': agregados_historial.agregar_por_dia(registros),
+                    'historial_ultimos': registros[:Config.DOCUMENTO_LECTURAS_RECIENTES]
+                }
+
+            # Los agregados se escriben en la misma transacción que los registros
+            diarios = self.agregados_dao.get_diarios_consistente(correo, desde, hoy.isoformat())
+            return {
+                'historial_diario': [
+                    {k: v for k, v in diario.items() if k in ('dia', 'registros', *agregados_historial.METRICAS)}
+                    for diario in diarios
+                ],
+                'historial_ultimos': self.historial_dao.query_consistente(
+                    correo,
+                    sort_key_condition=Key('fecha').gte(desde),
+                    max_items=Config.DOCUMENTO_LECTURAS_RECIENTES,
+                    projection=EstadisticasContexto.ATRIBUTOS['historial']
+                )
+            }
+
+        raise ValueError(f"Sección '{seccion}' no existe")
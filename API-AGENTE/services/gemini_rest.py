@@ -0,0 +1,176 @@
+"""
+Cliente REST mínimo de la API de Gemini
+
+Implementa `generate_content(prompt, stream=...)` con la misma forma que
+`genai.GenerativeModel`, hablando directamente el protocolo REST
+(`:generateContent` y `:streamGenerateContent?alt=sse`). GeminiService lo
+usa cuando Config.GEMINI_BASE_URL está definido, lo que permite apuntar
+al stand-in local (local/gemini_stub_server.py) y probar sin red.
+"""
+import json
+import urllib.request
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional, Union
+
+
+class GeminiRestModel:
+    """Modelo Gemini sobre HTTP con la interfaz de GenerativeModel"""
+
+    def __init__(
+        self,
+        model_name: str,
+        base_url: str,
+        api_key: Optional[str] = None,
+        generation_config: Optional[Dict] = None,
+        safety_settings: Optional[List[Dict]] = None,
+        timeout: float = 60.0,
+        cached_content: Optional[str] = None
+    ):
+        """
+        Args:
+            model_name: Nombre del modelo (p. ej. 'gemini-2.0-flash')
+            base_url: Raíz de la API (p. ej. 'http://localhost:8765')
+            api_key: API key (se envía como x-goog-api-key)
+            generation_config: Parámetros de generación
+            safety_settings: Filtros de seguridad
+            timeout: Segundos máximos por lectura del socket
+            cached_content: Nombre de un contenido cacheado ('cachedContents/...')
+                que precede a cada request
+        """
+        self.model_name = model_name
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.generation_config = generation_config or {}
+        self.safety_settings = safety_settings or []
+        self.timeout = timeout
+        self.cached_content = cached_content
+
+    def generate_content(
+        self,
+        contents: Union[str, List[Dict]],
+        stream: bool = False,
+        tools: Optional[List[Dict]] = None,
+        request_options: Optional[Dict] = None
+    ):
+        """
+        Genera contenido a partir de un prompt o de una conversación
+
+        Args:
+            contents: Prompt de texto o lista de contenidos con partes
+                (text, function_call, function_response) como en el SDK
+            stream: True para recibir la respuesta por partes
+            tools: Herramientas [{'function_declarations': [...]}]
+            request_options: {'timeout': segundos} para esta request
+
+        Returns:
+            Objeto con `.text`, `.candidates` y `.usage_metadata`, o un
+            iterador de esos objetos si stream=True
+        """
+        timeout = (request_options or {}).get('timeout', self.timeout)
+        if stream:
+            return self._stream(contents, tools, timeout)
+
+        with self._post('generateContent', contents, tools, timeout) as response:
+            return self._a_respuesta(json.loads(response.read().decode('utf-8')))
+
+    def _stream(self, contents, tools, timeout: float) -> Iterator[SimpleNamespace]:
+        # El último evento trae finishReason; sin él la conexión se cortó
+        # (http.client trata el cierre a mitad de un body chunked como fin)
+        terminado = False
+        with self._post('streamGenerateContent?alt=sse', contents, tools, timeout) as response:
+            for linea in response:
+                linea = linea.decode('utf-8').strip()
+                if linea.startswith('data:'):
+                    data = json.loads(linea[5:].strip())
+                    terminado = any(c.get('finishReason') for c in data.get('candidates') or [])
+                    yield self._a_respuesta(data)
+        if not terminado:
+            raise ConnectionError('El stream de Gemini terminó sin finishReason')
+
+    def _post(self, metodo: str, contents, tools: Optional[List[Dict]] = None, timeout: Optional[float] = None):
+        if isinstance(contents, str):
+            contents = [{'role': 'user', 'parts': [{'text': contents}]}]
+        cuerpo = {
+            'contents': [
+                {'role': c.get('role', 'user'), 'parts': [_camel(parte) for parte in c['parts']]}
+                for c in contents
+            ],
+            'generationConfig': _camel(self.generation_config),
+            'safetySettings': self.safety_settings
+        }
+        if tools:
+            cuerpo['tools'] = [_camel(tool) for tool in tools]
+        if self.cached_content:
+            cuerpo['cachedContent'] = self.cached_content
+        return self._request('POST', f"models/{self.model_name}:{metodo}", cuerpo, timeout)
+
+    def crear_cache(self, texto: str, ttl: float) -> str:
+        """
+        Crea un contenido cacheado con `texto` como instrucción del sistema
+
+        Args:
+            texto: Prefijo estático
+            ttl: Segundos de vigencia
+
+        Returns:
+            Nombre del contenido ('cachedContents/...')
+        """
+        cuerpo = {
+            'model': f"models/{self.model_name}",
+            'systemInstruction': {'parts': [{'text': texto}]},
+            'ttl': f"{int(ttl)}s"
+        }
+        with self._request('POST', 'cachedContents', cuerpo) as response:
+            return json.loads(response.read().decode('utf-8'))['name']
+
+    def renovar_cache(self, nombre: str, ttl: float):
+        """Extiende la vigencia de un contenido cacheado"""
+        with self._request('PATCH', f"{nombre}?updateMask=ttl", {'ttl': f"{int(ttl)}s"}):
+            pass
+
+    def _request(self, metodo_http: str, ruta: str, cuerpo: Dict, timeout: Optional[float] = None):
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['x-goog-api-key'] = self.api_key
+
+        request = urllib.request.Request(
+            f"{self.base_url}/v1beta/{ruta}",
+            data=json.dumps(cuerpo).encode('utf-8'),
+            headers=headers,
+            method=metodo_http
+        )
+        return urllib.request.urlopen(request, timeout=timeout or self.timeout)
+
+    @staticmethod
+    def _a_respuesta(data: Dict) -> SimpleNamespace:
+        candidatos = data.get('candidates') or [{}]
+        partes = (candidatos[0].get('content') or {}).get('parts') or []
+        uso = data.get('usageMetadata') or {}
+        return SimpleNamespace(
+            text=''.join(parte.get('text', '') for parte in partes),
+            candidates=[SimpleNamespace(content=SimpleNamespace(parts=[
+                SimpleNamespace(
+                    text=parte.get('text', ''),
+                    function_call=SimpleNamespace(
+                        name=parte['functionCall'].get('name', ''),
+                        args=parte['functionCall'].get('args') or {}
+                    ) if 'functionCall' in parte else None
+                )
+                for parte in partes
+            ]))],
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=uso.get('promptTokenCount', 0),
+                cached_content_token_count=uso.get('cachedContentTokenCount', 0),
+                candidates_token_count=uso.get('candidatesTokenCount', 0),
+                total_token_count=uso.get('totalTokenCount', 0)
+            )
+        )
+
+
+def _camel(config: Dict) -> Dict:
+    """max_output_tokens -> maxOutputTokens (formato REST, solo primer nivel)"""
+    resultado = {}
+    for clave, valor in config.items():
+        primera, *resto = clave.split('_')
+        resultado[primera + ''.join(p.title() for p in resto)] = valor
+    return resultado
@@ -3,9 +3,16 @@ Servicio para interactuar con la API de Gemini (o Claude)
 """
 import os
 import json
-from typing import List, Dict, Optional
+from datetime import timedelta
+from itertools import chain
+from typing import Any, Callable, List, Dict, Optional, Tuple
 import google.generativeai as genai
 from config import Config
+from services.gemini_rest import GeminiRestModel
+from services.contexto_cacheado import CacheContextoGemini
+from services.cliente_llm import ClienteLLM, es_reintentable
+from utils.exceptions import StreamInterrumpidoError
+from utils.metricas import registrar_metrica
 
 class GeminiService:
     """Cliente para la API de Gemini"""
@@ -14,7 +21,8 @@ class GeminiService:
         """Inicializa el cliente de Gemini"""
         Config.validar_configuracion()
         
-        genai.configure(api_key=Config.GEMINI_API_KEY)
+        if not Config.GEMINI_BASE_URL:
+            genai.configure(api_key=Config.GEMINI_API_KEY)
         
         # Configuración del modelo
         self.generation_config = {
@@ -43,12 +51,47 @@ class GeminiService:
             }
         ]
         
-        self.model = genai.GenerativeModel(
-            model_name=Config.GEMINI_MODEL,
+        self.model = self._crear_modelo()
+        self._modelos: Dict[str, Any] = {Config.GEMINI_MODEL: self.model}
+        self.cache_contexto = CacheContextoGemini(
+            self._crear_contenido_cacheado,
+            self._renovar_contenido_cacheado
+        )
+        self.cliente_llm = ClienteLLM()
+    
+    def _crear_modelo(self, cached_content: Optional[str] = None, nombre: Optional[str] = None):
+        """
+        Crea el modelo con la configuración actual
+        
+        Si Config.GEMINI_BASE_URL está definido se usa el cliente REST contra
+        esa URL (p. ej. el stand-in local para pruebas sin red).
+        
+        Args:
+            cached_content: Contenido cacheado que precede a cada request
+            nombre: Modelo a usar (por defecto Config.GEMINI_MODEL)
+        """
+        if Config.GEMINI_BASE_URL:
+            return GeminiRestModel(
+                model_name=nombre or Config.GEMINI_MODEL,
+                base_url=Config.GEMINI_BASE_URL,
+                api_key=Config.GEMINI_API_KEY,
+                generation_config=self.generation_config,
+                safety_settings=self.safety_settings,
+                cached_content=cached_content
+            )
+        
+        return genai.GenerativeModel(
+            model_name=nombre or Config.GEMINI_MODEL,
             generation_config=self.generation_config,
             safety_settings=self.safety_settings
         )
     
+    def _modelo(self, nombre: str):
+        """Modelo por nombre (el principal o el rápido de degradación)"""
+        if nombre not in self._modelos:
+            self._modelos[nombre] = self._crear_modelo(nombre=nombre)
+        return self._modelos[nombre]
+    
     def generar_respuesta(self, mensajes: List[Dict]) -> str:
         """
         Genera una respuesta usando Gemini
@@ -59,45 +102,262 @@ class GeminiService:
         Returns:
             Respuesta generada por el modelo
         """
+        texto, _ = self.generar_respuesta_con_uso(mensajes)
+        return texto
+    
+    def generar_respuesta_con_uso(
+        self,
+        mensajes: List[Dict],
+        rapido: bool = False
+    ) -> Tuple[str, Optional[Dict]]:
+        """
+        Genera una respuesta e informa los tokens consumidos
+        
+        Args:
+            mensajes: Lista de mensajes
+            rapido: Preferir Config.GEMINI_MODEL_RAPIDO (consultas simples)
+        
+        Returns:
+            Tupla (texto, uso). `uso` trae los tokens y el 'modelo' que
+            respondió; es None si se devolvió la respuesta de fallback, de
+            modo que el llamador no la trate como válida
+        """
         try:
-            # Convertir formato de mensajes a formato Gemini
-            prompt_completo = self._convertir_mensajes_a_prompt(mensajes)
-            
-            # Generar respuesta
-            response = self.model.generate_content(prompt_completo)
+            # Generar respuesta (sobre el prefijo cacheado si lo hay) dentro
+            # del plazo de la invocación, con reintentos y degradación
+            nombre, response = self.cliente_llm.ejecutar(
+                'generar',
+                lambda nombre, timeout: (nombre, self._generar_con_prefijo(
+                    mensajes,
+                    nombre,
+                    lambda modelo, prompt: modelo.generate_content(prompt, request_options={'timeout': timeout})
+                )),
+                rapido=rapido
+            )
             
-            return response.text
+            uso = self._extraer_uso(response)
+            self._registrar_tokens_entrada(mensajes, uso)
+            uso['modelo'] = nombre
+            return response.text, uso
         
         except Exception as e:
             print(f"Error al generar respuesta: {str(e)}")
-            return self._generar_respuesta_fallback()
+            return self._generar_respuesta_fallback(), None
     
-    def generar_respuesta_streaming(self, mensajes: List[Dict]):
+    def generar_respuesta_streaming(
+        self,
+        mensajes: List[Dict],
+        uso: Optional[Dict] = None,
+        rapido: bool = False
+    ):
         """
         Genera respuesta en modo streaming para respuestas en tiempo real
         
         Args:
             mensajes: Lista de mensajes
+            uso: Diccionario que, si se pasa, se completa con los tokens
+                consumidos y el 'modelo' que respondió al terminar el stream
+                (queda vacío si hubo fallback)
+            rapido: Preferir Config.GEMINI_MODEL_RAPIDO (consultas simples)
         
         Yields:
-            Chunks de texto de la respuesta
+            Chunks de texto de la respuesta; la respuesta de fallback si
+            falló antes de emitir texto
+        
+        Raises:
+            StreamInterrumpidoError: Si falló después de emitir texto (la
+                respuesta quedó incompleta)
         """
+        emitido = False
         try:
-            prompt_completo = self._convertir_mensajes_a_prompt(mensajes)
-            
-            response = self.model.generate_content(
-                prompt_completo,
-                stream=True
+            # El primer fragmento se pide dentro de los reintentos: un handle
+            # de caché inválido o un timeout fallan ahí, antes de emitir texto
+            nombre, (primero, response) = self.cliente_llm.ejecutar(
+                'stream',
+                lambda nombre, timeout: (nombre, self._generar_con_prefijo(
+                    mensajes,
+                    nombre,
+                    lambda modelo, prompt: self._primer_fragmento(
+                        modelo.generate_content(prompt, stream=True, request_options={'timeout': timeout})
+                    )
+                )),
+                descartar=lambda resultado: self._cerrar_stream(resultado[1][1]),
+                rapido=rapido
             )
             
-            for chunk in response:
+            ultimo = None
+            for chunk in chain([primero] if primero is not None else [], response):
+                ultimo = chunk
                 if chunk.text:
+                    emitido = True
                     yield chunk.text
+            
+            # El último fragmento trae el uso acumulado de la respuesta
+            if ultimo is not None:
+                uso_final = self._extraer_uso(ultimo)
+                self._registrar_tokens_entrada(mensajes, uso_final)
+                if uso is not None:
+                    uso.update(uso_final, modelo=nombre)
         
         except Exception as e:
             print(f"Error en streaming: {str(e)}")
+            if uso is not None:
+                uso.clear()
+            if emitido:
+                raise StreamInterrumpidoError(str(e)) from e
             yield self._generar_respuesta_fallback()
     
+    def generar_con_herramientas(
+        self,
+        contenidos: List[Dict],
+        declaraciones: Optional[List[Dict]] = None
+    ) -> Tuple[List[Dict], Optional[Dict]]:
+        """
+        Un turno del modelo con function calling
+        
+        Args:
+            contenidos: Conversación en formato Gemini
+                [{'role': 'user'|'model', 'parts': [{'text'|'function_call'|'function_response': ...}]}]
+            declaraciones: function_declarations disponibles; None o vacío
+                obliga al modelo a responder con texto
+        
+        Returns:
+            Tupla (partes, uso). Cada parte es {'texto': str} o
+            {'llamada': {'nombre': str, 'argumentos': dict}}; `uso` es None
+            si hubo error y se devolvió el fallback
+        """
+        try:
+            kwargs = {}
+            if declaraciones:
+                kwargs['tools'] = [{'function_declarations': declaraciones}]
+            
+            response = self.cliente_llm.ejecutar(
+                'herramientas',
+                lambda nombre, timeout: self._modelo(nombre).generate_content(
+                    contenidos, request_options={'timeout': timeout}, **kwargs
+                )
+            )
+            return self._extraer_partes(response), self._extraer_uso(response)
+        
+        except Exception as e:
+            print(f"Error en turno con herramientas: {str(e)}")
+            return [{'texto': self._generar_respuesta_fallback()}], None
+    
+    def convertir_mensajes_a_contenidos(self, mensajes: List[Dict]) -> List[Dict]:
+        """Mensajes del agente -> primer turno de usuario en formato Gemini"""
+        return [{'role': 'user', 'parts': [{'text': self._convertir_mensajes_a_prompt(mensajes)}]}]
+    
+    @staticmethod
+    def _extraer_partes(response) -> List[Dict]:
+        """Texto y llamadas a función del primer candidato"""
+        candidatos = getattr(response, 'candidates', None) or []
+        if not candidatos:
+            return []
+        
+        partes = []
+        for parte in candidatos[0].content.parts:
+            llamada = getattr(parte, 'function_call', None)
+            # En los protos del SDK function_call existe siempre; vacío => nombre ''
+            if llamada is not None and getattr(llamada, 'name', ''):
+                partes.append({
+                    'llamada': {'nombre': llamada.name, 'argumentos': dict(llamada.args or {})}
+                })
+            elif getattr(parte, 'text', ''):
+                partes.append({'texto': parte.text})
+        return partes
+    
+    def _generar_con_prefijo(
+        self,
+        mensajes: List[Dict],
+        nombre: str,
+        llamar: Callable[[Any, str], Any]
+    ) -> Any:
+        """
+        Ejecuta `llamar(modelo, prompt)` sobre el contenido cacheado del contexto
+        
+        Si el primer mensaje es el prefijo estático ('cache': contexto), la
+        caché explícita está activa y `nombre` es el modelo principal, el
+        modelo es el ligado al contenido cacheado y el prompt lleva solo el
+        resto de mensajes. Si esa llamada falla por el handle se descarta y
+        se repite con el prompt inline; los errores transitorios se propagan
+        para que los reintente el cliente resiliente.
+        """
+        estatico = mensajes[0] if mensajes else {}
+        contexto = estatico.get('cache') if Config.GEMINI_CACHE_CONTEXTO else None
+        
+        # El contenido cacheado está ligado al modelo principal
+        if contexto and nombre == Config.GEMINI_MODEL:
+            modelo = self.cache_contexto.obtener(contexto, estatico['content'])
+            if modelo is not None:
+                try:
+                    return llamar(modelo, self._convertir_mensajes_a_prompt(mensajes[1:]))
+                except Exception as e:
+                    if es_reintentable(e):
+                        raise
+                    print(f"⚠️  Falló la generación con caché de contexto, se usa prompt inline: {str(e)}")
+                    self.cache_contexto.invalidar(contexto)
+        
+        return llamar(self._modelo(nombre), self._convertir_mensajes_a_prompt(mensajes))
+    
+    @staticmethod
+    def _primer_fragmento(response) -> Tuple[Any, Any]:
+        """(primer fragmento o None, iterador con el resto)"""
+        iterador = iter(response)
+        return next(iterador, None), iterador
+    
+    @staticmethod
+    def _cerrar_stream(response):
+        """Cierra un stream que ya no se va a consumir"""
+        cerrar = getattr(response, 'close', None)
+        if cerrar is not None:
+            cerrar()
+    
+    def _crear_contenido_cacheado(self, texto: str, ttl: float) -> Tuple[Any, Any]:
+        """Crea el contenido cacheado y el modelo que genera sobre él"""
+        if Config.GEMINI_BASE_URL:
+            nombre = self.model.crear_cache(texto, ttl)
+            return nombre, self._crear_modelo(cached_content=nombre)
+        
+        from google.generativeai import caching
+        cache = caching.CachedContent.create(
+            model=Config.GEMINI_MODEL,
+            system_instruction=texto,
+            ttl=timedelta(seconds=ttl)
+        )
+        modelo = genai.GenerativeModel.from_cached_content(
+            cached_content=cache,
+            generation_config=self.generation_config,
+            safety_settings=self.safety_settings
+        )
+        return cache, modelo
+    
+    def _renovar_contenido_cacheado(self, recurso: Any, ttl: float):
+        """Extiende la vigencia de un contenido cacheado"""
+        if Config.GEMINI_BASE_URL:
+            self.model.renovar_cache(recurso, ttl)
+        else:
+            recurso.update(ttl=timedelta(seconds=ttl))
+    
+    @staticmethod
+    def _registrar_tokens_entrada(mensajes: List[Dict], uso: Dict):
+        """Métricas de tokens de entrada servidos desde caché y enviados"""
+        contexto = (mensajes[0].get('cache') if mensajes else None) or 'Ninguno'
+        cacheados = uso.get('tokens_cacheados', 0)
+        no_cacheados = max(0, uso.get('tokens_prompt', 0) - cacheados)
+        for nombre, valor in (('TokensEntradaCacheados', cacheados), ('TokensEntradaNoCacheados', no_cacheados)):
+            registrar_metrica(nombre, valor, unidad='Count', dimensiones={'Contexto': contexto})
+    
+    @staticmethod
+    def _extraer_uso(response) -> Dict:
+        """Tokens de entrada/salida reportados por el modelo (0 si no los informa)"""
+        metadata = getattr(response, 'usage_metadata', None)
+        return {
+            'tokens_prompt': getattr(metadata, 'prompt_token_count', 0) or 0,
+            'tokens_cacheados': getattr(metadata, 'cached_content_token_count', 0) or 0,
+            'tokens_respuesta': getattr(metadata, 'candidates_token_count', 0) or 0,
+            'tokens_total': getattr(metadata, 'total_token_count', 0) or 0
+        }
+    
     def _convertir_mensajes_a_prompt(self, mensajes: List[Dict]) -> str:
         """
         Convierte lista de mensajes al formato de prompt de Gemini
@@ -114,7 +374,10 @@ class GeminiService:
             role = mensaje.get('role', 'user')
             content = mensaje.get('content', '')
             
-            if role == 'system':
+            if role == 'system' and prompt_parts and prompt_parts[-1].startswith("INSTRUCCIONES DEL SISTEMA:"):
+                # Prefijo estático y parte variable van bajo un mismo encabezado
+                prompt_parts[-1] += f"\n{content}\n"
+            elif role == 'system':
                 prompt_parts.append(f"INSTRUCCIONES DEL SISTEMA:\n{content}\n")
             elif role == 'user':
                 prompt_parts.append(f"Usuario: {content}\n")
@@ -143,9 +406,11 @@ class GeminiService:
         """
         if 0 <= temperatura <= 1:
             self.generation_config['temperature'] = temperatura
-            # Recrear el modelo con nueva configuración
-            self.model = genai.GenerativeModel(
-                model_name=Config.GEMINI_MODEL,
-                generation_config=self.generation_config,
-                safety_settings=self.safety_settings
+            # Recrear el modelo con nueva configuración; los modelos ligados a
+            # contenidos cacheados guardan la anterior, así que se descartan
+            self.model = self._crear_modelo()
+            self._modelos = {Config.GEMINI_MODEL: self.model}
+            self.cache_contexto = CacheContextoGemini(
+                self._crear_contenido_cacheado,
+                self._renovar_contenido_cacheado
             )
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""
+Herramientas (function calling) que el modelo puede invocar
+
+En modo 'herramientas' el agente no precarga las tablas del contexto: le
+declara a Gemini estas funciones y solo consulta DynamoDB cuando el modelo
+las pide. El correo nunca es un parámetro del modelo; se toma del token.
+"""
+import json
+from itertools import islice
+from typing import Any, Callable, Dict, List, NamedTuple
+
+from config import Config
+from contextos.base_contexto import BaseContexto
+from dao.base import DAOFactory
+from utils.formatters import CustomJSONEncoder
+
+
+class Herramienta(NamedTuple):
+    """Función expuesta al modelo y la tabla que lee"""
+    tabla: str
+    descripcion: str
+    parametros: Dict
+    ejecutar: Callable[..., Any]
+
+
+class HerramientasAgente:
+    """Registro y ejecución de las herramientas del agente"""
+
+    def __init__(self):
+        self.recetas_dao = DAOFactory.get_dao('recetas')
+        self.historial_dao = DAOFactory.get_dao('historial')
+        self.memoria_dao = DAOFactory.get_dao('memoria')
+        self.servicios_dao = DAOFactory.get_dao('servicios')
+
+        self.herramientas: Dict[str, Herramienta] = {
+            'get_recetas_usuario': Herramienta(
+                'recetas',
+                'Recetas médicas registradas del usuario (institución, medicamentos, dosis y frecuencia).',
+                {
+                    'type': 'object',
+                    'properties': {
+                        'limite': {'type': 'integer', 'description': 'Máximo de recetas a devolver'}
+                    }
+                },
+                self._recetas
+            ),
+            'get_historial_rango': Herramienta(
+                'historial',
+                'Registros de actividad y signos vitales (pasos, sueño, ritmo cardiaco) entre dos fechas, '
+                'del más reciente al más antiguo.',
+                {
+                    'type': 'object',
+                    'properties': {
+                        'fecha_inicio': {'type': 'string', 'description': 'Fecha inicial ISO (YYYY-MM-DD)'},
+                        'fecha_fin': {'type': 'string', 'description': 'Fecha final ISO (YYYY-MM-DD)'}
+                    },
+                    'required': ['fecha_inicio', 'fecha_fin']
+                },
+                self._historial
+            ),
+            'get_memoria_reciente': Herramienta(
+                'memoria',
+                'Resúmenes de las conversaciones anteriores del usuario con el asistente.',
+                {
+                    'type': 'object',
+                    'properties': {
+                        'limite': {'type': 'integer', 'description': 'Máximo de conversaciones a devolver'}
+                    }
+                },
+                self._memoria
+            ),
+            'get_todos_servicios': Herramienta(
+                'servicios',
+                'Catálogo de servicios de salud y bienestar disponibles (nombre, descripción, categoría).',
+                {'type': 'object', 'properties': {}},
+                self._servicios
+            )
+        }
+
+    def declaraciones(self, tablas: List[str]) -> List[Dict]:
+        """
+        Declaraciones de función para las tablas que permite un contexto
+
+        Args:
+            tablas: Tablas requeridas por el contexto (get_tablas_requeridas)
+
+        Returns:
+            Lista de function_declarations en formato Gemini
+        """
+        return [
+            {
+                'name': nombre,
+                'description': herramienta.descripcion,
+                'parameters': herramienta.parametros
+            }
+            for nombre, herramienta in self.herramientas.items()
+            if herramienta.tabla in tablas
+        ]
+
+    def ejecutar(self, nombre: str, argumentos: Dict, correo: str) -> Dict:
+        """
+        Ejecuta una llamada del modelo
+
+        Args:
+            nombre: Nombre de la función pedida
+            argumentos: Argumentos que envió el modelo
+            correo: Email del usuario autenticado
+
+        Returns:
+            Respuesta serializable {'resultado': ...} o {'error': ...}; un
+            error de la lectura (ClientError, DAO) se informa al modelo en
+            lugar de propagarse
+        """
+        herramienta = self.herramientas.get(nombre)
+        if herramienta is None:
+            return {'error': f"La función '{nombre}' no existe"}
+
+        try:
+            resultado = herramienta.ejecutar(correo, **(argumentos or {}))
+        except TypeError as e:
+            return {'error': f"Argumentos inválidos para '{nombre}': {str(e)}"}
+        except Exception as e:
+            print(f"Error ejecutando la herramienta {nombre}: {str(e)}")
+            return {'error': str(e)}
+
+        # El SDK convierte la respuesta a Struct: sin Decimal ni fechas
+        return {'resultado': json.loads(json.dumps(resultado, cls=CustomJSONEncoder))}
+
+    @staticmethod
+    def _limite(limite: Any) -> int:
+        """Acota el límite pedido por el modelo"""
+        try:
+            return max(1, min(int(limite), Config.LIMITE_ITEMS_HERRAMIENTA))
+        except (TypeError, ValueError):
+            return Config.LIMITE_ITEMS_HERRAMIENTA
+
+    def _recetas(self, correo: str, limite: Any = None) -> List[Dict]:
+        return self.recetas_dao.get_recetas_usuario(
+            correo,
+            atributos=['institucion', 'fecha', 'recetas'],
+            limite=self._limite(limite)
+        )
+
+    def _historial(self, correo: str, fecha_inicio: str, fecha_fin: str) -> List[Dict]:
+        # Sort key ISO: el día final completo queda incluido
+        registros = self.historial_dao.iter_historial_rango(
+            correo,
+            str(fecha_inicio)[:10],
+            str(fecha_fin)[:10] + 'T23:59:59',
+            page_size=Config.LIMITE_ITEMS_HERRAMIENTA
+        )
+        return list(islice(registros, Config.LIMITE_ITEMS_HERRAMIENTA))
+
+    def _memoria(self, correo: str, limite: Any = None) -> List[Dict]:
+        return self.memoria_dao.get_memoria_reciente(
+            correo,
+            limite=self._limite(limite or BaseContexto.LIMITES['memoria']),
+            atributos=BaseContexto.ATRIBUTOS['memoria']
+        )
+
+    def _servicios(self, correo: str) -> List[Dict]:
+        return self.servicios_dao.get_todos_servicios(atributos=['nombre', 'descripcion', 'categoria'])
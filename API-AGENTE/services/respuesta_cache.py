@@ -0,0 +1,199 @@
+"""
+Caché de respuestas del LLM
+
+La clave es un hash de (contexto, modelo, mensaje normalizado, digest de los
+datos del contexto). El modelo es el que generó la respuesta: se busca con
+el que se intentará primero (principal o rápido según la intención) y se
+guarda con el que respondió, así una respuesta degradada al modelo rápido
+no se sirve a una consulta que espera el principal. Como el digest cubre los datos que ve el prompt, un
+cambio en historial, recetas, servicios o memoria del usuario produce otra
+clave: la invalidación es automática y vale entre contenedores y servicios
+sin eventos adicionales. La memoria que guarda el propio agente tras cada
+respuesta ('origen': 'agente') se excluye del digest; si no, ninguna
+pregunta repetida acertaría.
+
+Dos capas:
+    - local: CatalogCache del contenedor (LRU + TTL)
+    - compartida: tabla DynamoDB con TTL (opcional, Config.TABLE_CACHE_RESPUESTAS)
+"""
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+from typing import Dict, Optional
+
+from config import Config
+from dao.base import DAOFactory
+from dao.catalog_cache import CatalogCache
+from utils.metricas import registrar_metrica
+
+
+def _valor_canonico(obj):
+    """default de json.dumps para el digest: series del historial como registros, lo demás como str"""
+    if hasattr(obj, 'a_registros'):
+        return obj.a_registros()
+    return str(obj)
+
+
+class RespuestaCache:
+    """Caché de dos capas para respuestas generadas"""
+
+    def __init__(self):
+        self.local = CatalogCache(
+            'respuestas_llm',
+            ttl=Config.CACHE_TTL_RESPUESTAS,
+            max_entradas=Config.CACHE_MAX_RESPUESTAS
+        )
+        self.compartida = DAOFactory.get_dao('cache_respuestas') if Config.TABLE_CACHE_RESPUESTAS else None
+
+        self._lock = threading.Lock()
+        self.hits_local = 0
+        self.hits_compartida = 0
+        self.misses = 0
+        self.tokens_ahorrados = 0
+
+    @staticmethod
+    def aplica(contexto: str) -> bool:
+        """Indica si las respuestas de un contexto se cachean"""
+        return contexto in Config.CACHE_RESPUESTAS_CONTEXTOS
+
+    @staticmethod
+    def normalizar_mensaje(mensaje: str) -> str:
+        """
+        Normaliza el mensaje para que variantes triviales compartan clave
+
+        Minúsculas, sin tildes, sin signos de puntuación y con espacios
+        colapsados: '¿Qué servicios hay?' == 'que servicios hay'.
+        """
+        texto = unicodedata.normalize('NFKD', mensaje.lower())
+        texto = ''.join(c for c in texto if not unicodedata.combining(c))
+        texto = re.sub(r'[^\w\s]', ' ', texto)
+        return ' '.join(texto.split())
+
+    @staticmethod
+    def digest_contexto(datos_contexto: Dict) -> str:
+        """
+        Digest estable de los datos que se renderizan en el prompt
+
+        Args:
+            datos_contexto: Resultado de build_context_data
+
+        Returns:
+            sha256 hex del JSON canónico (sin la memoria del agente)
+        """
+        datos = dict(datos_contexto)
+        if datos.get('usuario'):
+            # Los contadores version_* cambian con cada memoria del agente
+            datos['usuario'] = {
+                k: v for k, v in datos['usuario'].items() if not k.startswith('version_')
+            }
+        if 'memoria' in datos:
+            datos['memoria'] = [
+                m for m in datos['memoria'] or []
+                if m.get('origen') != 'agente'
+            ]
+        canonico = json.dumps(datos, sort_keys=True, default=_valor_canonico, ensure_ascii=False)
+        return hashlib.sha256(canonico.encode('utf-8')).hexdigest()
+
+    def clave(self, contexto: str, mensaje: str, datos_contexto: Dict) -> Optional[str]:
+        """
+        Clave de contenido de una consulta, sin el modelo
+
+        obtener y guardar le agregan el modelo (ver clave_con_modelo).
+
+        Returns:
+            Clave hex, o None si la consulta no debe cachearse (contexto no
+            cacheable o datos parciales por lecturas fallidas)
+        """
+        if not self.aplica(contexto) or datos_contexto.get('lecturas_incompletas'):
+            return None
+
+        partes = [
+            contexto,
+            self.normalizar_mensaje(mensaje),
+            self.digest_contexto(datos_contexto)
+        ]
+        return hashlib.sha256('\x1f'.join(partes).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def clave_con_modelo(clave: str, modelo: str) -> str:
+        """Clave de una respuesta generada por `modelo`"""
+        return hashlib.sha256(f"{clave}\x1f{modelo}".encode('utf-8')).hexdigest()
+
+    def obtener(self, clave: Optional[str], contexto: str, modelo: str) -> Optional[str]:
+        """
+        Busca una respuesta en la capa local y luego en la compartida
+
+        Args:
+            clave: Clave de contenido (None = sin caché)
+            contexto: Contexto de la consulta (dimensión de la métrica)
+            modelo: Modelo con que se generaría la respuesta
+
+        Returns:
+            Texto de la respuesta o None si no hay
+        """
+        if clave is None:
+            return None
+        clave = self.clave_con_modelo(clave, modelo)
+
+        entrada = self.local.consultar(clave)
+        capa = 'local'
+
+        if entrada is None and self.compartida is not None:
+            item = self.compartida.get_respuesta(clave)
+            if item:
+                entrada = {'respuesta': item['respuesta'], 'tokens': int(item.get('tokens', 0))}
+                self.local.guardar(clave, entrada)
+                capa = 'compartida'
+
+        with self._lock:
+            if entrada is None:
+                self.misses += 1
+                return None
+            if capa == 'local':
+                self.hits_local += 1
+            else:
+                self.hits_compartida += 1
+            self.tokens_ahorrados += entrada['tokens']
+
+        registrar_metrica(
+            'TokensAhorrados',
+            entrada['tokens'],
+            unidad='Count',
+            dimensiones={'Contexto': contexto},
+            propiedades={'capa': capa}
+        )
+        return entrada['respuesta']
+
+    def guardar(self, clave: Optional[str], contexto: str, respuesta: str, tokens: int, modelo: str):
+        """
+        Publica una respuesta generada en ambas capas
+
+        Args:
+            clave: Clave de contenido (None = no se guarda)
+            contexto: Contexto de la consulta
+            respuesta: Texto generado
+            tokens: Tokens totales que costó generarla
+            modelo: Modelo que la generó (uso['modelo'])
+        """
+        if clave is None or not respuesta:
+            return
+        clave = self.clave_con_modelo(clave, modelo)
+
+        self.local.guardar(clave, {'respuesta': respuesta, 'tokens': tokens})
+        if self.compartida is not None:
+            self.compartida.guardar_respuesta(clave, contexto, respuesta, tokens, Config.CACHE_TTL_RESPUESTAS)
+
+    def estadisticas(self) -> Dict:
+        """Aciertos por capa, tasa de aciertos y tokens ahorrados"""
+        with self._lock:
+            hits = self.hits_local + self.hits_compartida
+            total = hits + self.misses
+            return {
+                'hits_local': self.hits_local,
+                'hits_compartida': self.hits_compartida,
+                'misses': self.misses,
+                'hit_rate': round(hits / total, 3) if total else 0.0,
+                'tokens_ahorrados': self.tokens_ahorrados
+            }
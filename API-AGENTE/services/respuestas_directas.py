@@ -0,0 +1,150 @@
+"""
+Respuestas sin LLM para las intenciones deterministas
+
+Saludos, agradecimientos, despedidas y la consulta de próxima dosis se
+responden con plantillas y datos de los DAOs: no dependen del modelo y
+así no pagan su latencia.
+"""
+from typing import Callable, Dict, List
+
+from config import Config
+from dao.base import DAOFactory
+from services.clasificador_intencion import Prediccion, vocabulario_semilla
+from services.respuesta_cache import RespuestaCache
+
+# Qué puede pedir el usuario en cada contexto (para el saludo)
+SUGERENCIAS: Dict[str, str] = {
+    'General': 'Puedo ayudarte con tus recetas, tu actividad reciente o los servicios disponibles.',
+    'Servicios': 'Puedo contarte qué servicios de salud y bienestar hay disponibles para ti.',
+    'Estadisticas': 'Puedo revisar contigo tus pasos, tu sueño y tu ritmo cardiaco recientes.',
+    'Recetas': 'Puedo ayudarte a revisar tus recetas y la frecuencia de tus medicamentos.'
+}
+
+MAX_MEDICAMENTOS = 10
+
+# Negaciones y síntomas (normalizados): el mensaje pide algo más que la plantilla
+TERMINOS_ALERTA = frozenset({
+    'no', 'nunca', 'tampoco', 'ni', 'sin', 'pero', 'sigo', 'todavia', 'aun',
+    'dolor', 'duele', 'duelen', 'dolores', 'fiebre', 'mal', 'mareo', 'mareos', 'mareado', 'mareada',
+    'nauseas', 'vomito', 'vomitos', 'tos', 'sangre', 'sangrado', 'alergia', 'reaccion',
+    'sintoma', 'sintomas', 'pecho', 'respirar', 'ahogo', 'desmayo', 'urgencia', 'emergencia',
+    'hinchazon', 'picazon', 'ardor', 'infeccion', 'presion', 'grave', 'peor'
+})
+
+
+class RespuestasDirectas:
+    """Plantillas por intención"""
+
+    def __init__(self):
+        self.recetas_dao = DAOFactory.get_dao('recetas')
+        self.plantillas: Dict[str, Callable[[str, str, str], str]] = {
+            'saludo': self._saludo,
+            'agradecimiento': self._agradecimiento,
+            'despedida': self._despedida,
+            'proxima_dosis': self._proxima_dosis
+        }
+
+    def aplica(self, prediccion: Prediccion, mensaje: str) -> bool:
+        """
+        Indica si la predicción se responde con plantilla
+
+        Además del nivel se exige confianza alta, un mensaje corto y que
+        todas sus palabras estén en las frases semilla de la intención, sin
+        negaciones ni síntomas: 'hola, ¿cuántos pasos di?' no es solo un
+        saludo y 'gracias, pero sigo con fiebre' no es un agradecimiento.
+
+        Args:
+            prediccion: Resultado del clasificador
+            mensaje: Mensaje del usuario
+        """
+        if not (
+            Config.INTENCION_RESPUESTAS_DIRECTAS
+            and prediccion.intencion in self.plantillas
+            and prediccion.confianza >= Config.INTENCION_UMBRAL_PLANTILLA
+            and prediccion.palabras <= Config.INTENCION_MAX_PALABRAS_PLANTILLA
+        ):
+            return False
+        palabras = set(RespuestaCache.normalizar_mensaje(mensaje).split())
+        return (
+            bool(palabras)
+            and palabras <= vocabulario_semilla(prediccion.intencion)
+            and not palabras & TERMINOS_ALERTA
+        )
+
+    def responder(self, intencion: str, correo: str, usuario: Dict, contexto: str) -> str:
+        """
+        Respuesta de plantilla
+
+        Args:
+            intencion: Intención con plantilla (ver aplica)
+            correo: Email del usuario
+            usuario: Registro del usuario
+            contexto: Contexto de la consulta
+
+        Returns:
+            Texto de la respuesta
+        """
+        nombre = (usuario.get('nombre') or '').split(' ')[0] or 'Usuario'
+        return self.plantillas[intencion](correo, nombre, contexto)
+
+    def _saludo(self, correo: str, nombre: str, contexto: str) -> str:
+        return (
+            f"¡Hola, {nombre}! 👋 Soy tu asistente de salud. "
+            f"{SUGERENCIAS.get(contexto, SUGERENCIAS['General'])} ¿Qué te gustaría revisar?"
+        )
+
+    def _agradecimiento(self, correo: str, nombre: str, contexto: str) -> str:
+        return f"¡Con gusto, {nombre}! Si necesitas algo más sobre tu salud, aquí estoy."
+
+    def _despedida(self, correo: str, nombre: str, contexto: str) -> str:
+        return f"¡Hasta pronto, {nombre}! Cuídate mucho y recuerda seguir las indicaciones de tu médico."
+
+    def _proxima_dosis(self, correo: str, nombre: str, contexto: str) -> str:
+        recetas = self.recetas_dao.get_recetas_usuario(correo, atributos=['recetas'])
+        lineas = self._lineas_medicamentos(recetas)
+
+        if not lineas:
+            return (
+                f"{nombre}, no encuentro recetas registradas a tu nombre. Si tienes una receta "
+                "nueva, regístrala en la app y te ayudaré a recordar tus tomas."
+            )
+
+        omitidos = len(lineas) - MAX_MEDICAMENTOS
+        texto = f"{nombre}, según tus recetas registradas estas son las frecuencias de tus medicamentos:\n"
+        texto += "\n".join(lineas[:MAX_MEDICAMENTOS])
+        if omitidos > 0:
+            texto += f"\n• …y {omitidos} más en tus recetas"
+        texto += (
+            "\n\nNo tengo registrada la hora de tu última toma, así que cuenta el intervalo desde ella. "
+            "Ante cualquier duda sobre tu tratamiento, consulta a tu médico."
+        )
+        return texto
+
+    @staticmethod
+    def _lineas_medicamentos(recetas: List[Dict]) -> List[str]:
+        """Una línea por medicamento (el primero si se repite entre recetas)"""
+        lineas = []
+        vistos = set()
+        for receta in recetas:
+            for med in receta.get('recetas') or []:
+                producto = med.get('producto')
+                if not producto or producto.lower() in vistos:
+                    continue
+                vistos.add(producto.lower())
+                dosis = f" {med['dosis']}" if med.get('dosis') else ''
+                lineas.append(f"• {producto}{dosis}: {RespuestasDirectas._frecuencia(med)}")
+        return lineas
+
+    @staticmethod
+    def _frecuencia(med: Dict) -> str:
+        """'una vez al día', 'cada 8 horas', ..."""
+        valor = med.get('frecuencia_valor')
+        unidad = med.get('frecuencia_unidad', '')
+        if valor is None:
+            return 'frecuencia no especificada'
+        valor = int(valor)
+        if unidad == 'dia':
+            return 'una vez al día' if valor == 1 else f"cada {valor} días"
+        if unidad == 'horas' and valor == 1:
+            return 'cada hora'
+        return f"cada {valor} {unidad}"
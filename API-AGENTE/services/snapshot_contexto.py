@@ -0,0 +1,140 @@
+"""
+Snapshot de los datos de contexto por (usuario, contexto)
+
+En una sesión de chat los mensajes seguidos reconstruyen el mismo
+resultado de build_context_data. El snapshot lo guarda en el contenedor
+bajo la clave (correo, contexto, versiones), donde las versiones son los
+contadores version_historial / version_memoria / version_recetas del
+registro del usuario que afectan al contexto:
+
+    - quien escribe esas tablas (agregar_historial, agregar_memoria,
+      API-RECETAS) incrementa el contador después de escribir, así que un
+      cambio hecho desde cualquier contenedor o servicio cambia la clave
+    - el registro del usuario ya se lee en cada request (AuthService,
+      identity map): comparar versiones no cuesta lecturas adicionales
+    - la memoria que guarda el propio agente se aplica write-through al
+      snapshot, y el turno siguiente sigue sin leer DynamoDB
+
+El TTL (Config.CACHE_TTL_CONTEXTO) acota lo que no tiene versión
+(servicios) y no se renueva con el write-through.
+"""
+import copy
+import threading
+from typing import Dict, Hashable, Tuple
+
+from config import Config
+from contextos.base_contexto import BaseContexto, ContextoFactory
+from dao.base import DAOFactory
+from dao.catalog_cache import CatalogCache
+from dao.usuarios_dao import UsuariosDAO
+from utils.metricas import registrar_metrica
+
+
+class SnapshotContexto:
+    """Caché de build_context_data invalidada por versión del usuario"""
+
+    def __init__(self):
+        self.cache = CatalogCache(
+            'contexto_usuario',
+            ttl=Config.CACHE_TTL_CONTEXTO,
+            max_entradas=Config.CACHE_MAX_CONTEXTOS
+        )
+        self.usuarios_dao = DAOFactory.get_dao('usuarios')
+
+        self._lock = threading.Lock()
+        self.escrituras_aplicadas = 0
+
+    @staticmethod
+    def activo() -> bool:
+        """Indica si los snapshots están habilitados"""
+        return Config.CACHE_TTL_CONTEXTO > 0
+
+    @staticmethod
+    def tipos_versionados(procesador: BaseContexto) -> Tuple[str, ...]:
+        """Contadores del usuario que invalidan los datos del contexto"""
+        tablas = procesador.get_tablas_requeridas()
+        return tuple(tipo for tipo in UsuariosDAO.TIPOS_VERSIONADOS if tipo in tablas)
+
+    def clave(self, correo: str, contexto: str, procesador: BaseContexto, usuario: Dict) -> Hashable:
+        """Clave del snapshot con las versiones actuales del usuario"""
+        tipos = self.tipos_versionados(procesador)
+        return (correo, contexto, tipos, UsuariosDAO.versiones(usuario, tipos))
+
+    def obtener(self, correo: str, contexto: str, procesador: BaseContexto, usuario: Dict) -> Dict:
+        """
+        Datos del contexto desde el snapshot o recién construidos
+
+        Args:
+            correo: Email del usuario
+            contexto: Nombre del contexto
+            procesador: Instancia del contexto
+            usuario: Registro del usuario leído en esta request (trae las versiones)
+
+        Returns:
+            Resultado de build_context_data (copia profunda: modificarlo no
+            cambia el snapshot)
+        """
+        if not self.activo():
+            return procesador.build_context_data(correo)
+
+        clave = self.clave(correo, contexto, procesador, usuario)
+        datos = self.cache.consultar(clave)
+        desde_snapshot = datos is not None
+
+        if not desde_snapshot:
+            datos = procesador.build_context_data(correo)
+            # Un contexto parcial (lecturas fallidas) no se reutiliza
+            if not datos.get('lecturas_incompletas'):
+                self.cache.guardar(clave, datos)
+
+        registrar_metrica(
+            'SnapshotContexto',
+            1,
+            unidad='Count',
+            dimensiones={'Contexto': contexto},
+            propiedades={'resultado': 'hit' if desde_snapshot else 'miss'}
+        )
+        # El usuario se toma siempre de la request (el perfil no tiene versión)
+        copia = copy.deepcopy({campo: valor for campo, valor in datos.items() if campo != 'usuario'})
+        return {**copia, 'usuario': usuario}
+
+    def registrar_memoria(self, correo: str, memoria: Dict) -> bool:
+        """
+        Incrementa version_memoria y aplica la memoria a los snapshots
+
+        Solo se actualizan los snapshots construidos con la versión
+        inmediatamente anterior; si otro contenedor escribió memoria entre
+        medias, el snapshot no coincide y se reconstruye.
+
+        Args:
+            correo: Email del usuario
+            memoria: Registro de memoria ya guardado
+
+        Returns:
+            True si algún snapshot se actualizó
+        """
+        usuario = self.usuarios_dao.incrementar_version(correo, 'memoria')
+        if usuario is None or not self.activo():
+            return False
+
+        anterior = {**usuario, 'version_memoria': UsuariosDAO.versiones(usuario, ['memoria'])[0] - 1}
+        aplicadas = 0
+        for contexto in Config.CONTEXTOS_DISPONIBLES:
+            procesador = ContextoFactory.get_contexto(contexto)
+            if 'memoria' not in self.tipos_versionados(procesador):
+                continue
+            if self.cache.reemplazar(
+                self.clave(correo, contexto, procesador, anterior),
+                self.clave(correo, contexto, procesador, usuario),
+                lambda datos: procesador.agregar_memoria(datos, memoria)
+            ):
+                aplicadas += 1
+
+        with self._lock:
+            self.escrituras_aplicadas += aplicadas
+        return aplicadas > 0
+
+    def estadisticas(self) -> Dict:
+        """Contadores del snapshot"""
+        with self._lock:
+            return {**self.cache.estadisticas(), 'escrituras_aplicadas': self.escrituras_aplicadas}
@@ -0,0 +1,25 @@
+// Eventos de DynamoDB Streams de procesarCambios (documento de contexto).
+//
+// Se crea un evento por cada STREAM_ARN_* definida; sin ninguna, la
+// función se despliega sin eventos y el documento no se mantiene. Los ARN
+// los imprime DataGenerator/create_tables.py al activar los streams.
+const VARIABLES = [
+  'STREAM_ARN_USUARIOS',
+  'STREAM_ARN_RECETAS',
+  'STREAM_ARN_MEMORIA_CONTEXTUAL',
+  'STREAM_ARN_HISTORIAL_MEDICO',
+];
+
+module.exports = () =>
+  VARIABLES.filter((variable) => process.env[variable]).map((variable) => ({
+    stream: {
+      type: 'dynamodb',
+      arn: process.env[variable],
+      batchSize: 100,
+      maximumBatchingWindowInSeconds: 1,
+      startingPosition: 'LATEST',
+      functionResponseType: 'ReportBatchItemFailures',
+      bisectBatchOnFunctionError: true,
+      maximumRetryAttempts: 10,
+    },
+  }));
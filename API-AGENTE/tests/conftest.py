@@ -0,0 +1,78 @@
+"""
+Configuración común de las pruebas
+
+Las pruebas corren sin red: DynamoDB con moto y el LLM con funciones
+locales o con el stub de local/gemini_stub_server.py.
+"""
+import os
+import sys
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+os.environ.setdefault('GEMINI_API_KEY', 'testing')
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, 'local'))
+
+import threading
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from config import Config
+from dao.base import DAOFactory
+
+
+@pytest.fixture
+def dynamodb(monkeypatch):
+    """
+    DynamoDB de moto con todas las tablas de Config.TABLA_CLAVES vacías
+
+    Los DAOs se crean de nuevo en cada prueba (DAOFactory vacío).
+    """
+    with mock_aws():
+        recurso = boto3.resource('dynamodb')
+        for nombre, (hash_key, range_key) in Config.TABLA_CLAVES.items():
+            esquema = [{'AttributeName': hash_key, 'KeyType': 'HASH'}]
+            atributos = [{'AttributeName': hash_key, 'AttributeType': 'S'}]
+            if range_key:
+                esquema.append({'AttributeName': range_key, 'KeyType': 'RANGE'})
+                atributos.append({'AttributeName': range_key, 'AttributeType': 'S'})
+            recurso.create_table(
+                TableName=nombre,
+                KeySchema=esquema,
+                AttributeDefinitions=atributos,
+                BillingMode='PAY_PER_REQUEST'
+            )
+        monkeypatch.setattr(DAOFactory, '_instances', {})
+        yield recurso
+
+
+@pytest.fixture
+def gemini_stub(monkeypatch):
+    """
+    Levanta local/gemini_stub_server.py en un puerto libre
+
+    Devuelve una función que recibe las opciones de crear_servidor, inicia
+    el stub y apunta Config.GEMINI_BASE_URL a él.
+    """
+    from gemini_stub_server import crear_servidor
+
+    servidores = []
+
+    def iniciar(**opciones):
+        opciones.setdefault('ttft_ms', 0)
+        opciones.setdefault('chunk_ms', 0)
+        servidor = crear_servidor(0, **opciones)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        servidores.append(servidor)
+        monkeypatch.setattr(Config, 'GEMINI_BASE_URL', f"http://127.0.0.1:{servidor.server_address[1]}")
+        return servidor
+
+    yield iniciar
+    for servidor in servidores:
+        servidor.shutdown()
+        servidor.server_close()
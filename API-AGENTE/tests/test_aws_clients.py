@@ -0,0 +1,35 @@
+"""
+Pruebas de los clientes y recursos boto3 por contenedor (utils/aws_clients.py)
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+from dao.base import DAOFactory
+from utils.aws_clients import AWSClientFactory
+
+
+def test_recurso_por_hilo_y_cliente_compartido(dynamodb):
+    historial = DAOFactory.get_dao('historial')
+
+    def en_un_hilo():
+        recurso = AWSClientFactory.get_resource('dynamodb')
+        assert AWSClientFactory.get_resource('dynamodb') is recurso
+        assert historial.table is historial.table
+        return recurso, historial.table, AWSClientFactory.get_client('dynamodb')
+
+    principal = en_un_hilo()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        trabajador = executor.submit(en_un_hilo).result()
+        otra_vez = executor.submit(en_un_hilo).result()
+    assert all(a is b for a, b in zip(otra_vez, trabajador))
+
+    assert trabajador[0] is not principal[0]
+    assert trabajador[1] is not principal[1]
+    assert trabajador[1].name == principal[1].name == Config.TABLE_HISTORIAL
+    assert trabajador[2] is principal[2]
+
+
+def test_reset_recrea_el_recurso_del_hilo():
+    antes = AWSClientFactory.get_resource('dynamodb')
+    AWSClientFactory.reset()
+    assert AWSClientFactory.get_resource('dynamodb') is not antes
@@ -0,0 +1,256 @@
+"""
+Pruebas del cliente resiliente del LLM (services/cliente_llm.py)
+
+Las llamadas son funciones locales (modelo, timeout) -> resultado, salvo
+las de GeminiService, que van al stub de Gemini.
+"""
+import threading
+import time
+
+import pytest
+
+from config import Config
+from services.cliente_llm import CircuitBreaker, ClienteLLM
+from services.gemini_service import GeminiService
+from utils.exceptions import LLMNoDisponibleError
+from utils.plazo import Plazo
+
+MENSAJE = [{'role': 'user', 'content': '¿qué me recomiendas para dormir mejor?'}]
+
+
+class ErrorHTTP(Exception):
+    """Error con status HTTP, como los del cliente REST y google.api_core"""
+
+    def __init__(self, code: int):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+@pytest.fixture(autouse=True)
+def configuracion(monkeypatch):
+    monkeypatch.setattr(Config, 'GEMINI_MODEL', 'principal')
+    monkeypatch.setattr(Config, 'GEMINI_MODEL_RAPIDO', 'rapido')
+    monkeypatch.setattr(Config, 'LLM_TIMEOUT_MINIMO', 0.1)
+    monkeypatch.setattr(Config, 'LLM_UMBRAL_DEGRADAR', 0.0)
+    monkeypatch.setattr(Config, 'LLM_BACKOFF_BASE', 0.001)
+    monkeypatch.setattr(Config, 'LLM_BACKOFF_MAX', 0.001)
+    monkeypatch.setattr(Config, 'LLM_MAX_REINTENTOS', 2)
+    monkeypatch.setattr(Config, 'LLM_HEDGING', False)
+
+
+def llamadas_que(*resultados):
+    """llamar(modelo, timeout) que devuelve o lanza cada resultado en orden"""
+    pendientes = list(resultados)
+    recibidas = []
+
+    def llamar(modelo, timeout):
+        recibidas.append((modelo, timeout))
+        resultado = pendientes.pop(0)
+        if isinstance(resultado, Exception):
+            raise resultado
+        return resultado
+
+    return llamar, recibidas
+
+
+def test_plazo_agotado_no_llama(monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_TIMEOUT_MINIMO', 1.5)
+    llamar, recibidas = llamadas_que('ok')
+
+    with Plazo(1.0), pytest.raises(LLMNoDisponibleError, match='Plazo agotado'):
+        ClienteLLM().ejecutar('generar', llamar)
+
+    assert recibidas == []
+
+
+def test_timeout_del_intento_no_supera_el_plazo():
+    llamar, recibidas = llamadas_que('ok')
+
+    with Plazo(3.0):
+        assert ClienteLLM().ejecutar('generar', llamar) == 'ok'
+
+    (modelo, timeout), = recibidas
+    assert modelo == 'principal'
+    assert 2.5 < timeout <= 3.0
+
+
+def test_plazo_desde_el_context_de_lambda(monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_RESERVA_SEGUNDOS', 2)
+
+    class Contexto:
+        def get_remaining_time_in_millis(self):
+            return 10000
+
+    assert 7.5 < Plazo.desde_contexto(Contexto()).restante() <= 8.0
+    assert Plazo.desde_contexto(None).restante() <= Config.LLM_PLAZO_DEFECTO
+
+
+def test_reintenta_errores_transitorios():
+    llamar, recibidas = llamadas_que(ErrorHTTP(503), TimeoutError(), 'ok')
+    cliente = ClienteLLM()
+
+    assert cliente.ejecutar('generar', llamar) == 'ok'
+
+    assert len(recibidas) == 3
+    assert cliente.estadisticas()['reintentos'] == 2
+
+
+def test_no_reintenta_errores_del_pedido():
+    llamar, recibidas = llamadas_que(ErrorHTTP(400), 'ok')
+    cliente = ClienteLLM()
+
+    with pytest.raises(ErrorHTTP):
+        cliente.ejecutar('generar', llamar)
+
+    assert len(recibidas) == 1
+    assert cliente.estadisticas()['circuitos']['principal'] == CircuitBreaker.CERRADO
+
+
+def test_agota_los_reintentos():
+    llamar, recibidas = llamadas_que(*[ErrorHTTP(503)] * 3)
+    cliente = ClienteLLM()
+
+    with pytest.raises(LLMNoDisponibleError, match='Sin respuesta tras 3 intentos'):
+        cliente.ejecutar('generar', llamar)
+
+    assert len(recibidas) == 3
+    assert cliente.estadisticas()['fallidas'] == 1
+
+
+def test_cobertura_gana_a_la_request_lenta(monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_HEDGING', True)
+    monkeypatch.setattr(Config, 'LLM_HEDGING_MIN_MUESTRAS', 3)
+    cliente = ClienteLLM()
+    for _ in range(3):
+        cliente.ejecutar('generar', lambda modelo, timeout: 'rapida')
+
+    lenta_liberada = threading.Event()
+    llamadas = []
+
+    def llamar(modelo, timeout):
+        llamadas.append(modelo)
+        if len(llamadas) == 1:
+            time.sleep(0.3)
+            return 'lenta'
+        return 'cobertura'
+
+    def descartar(resultado):
+        assert resultado == 'lenta'
+        lenta_liberada.set()
+
+    assert cliente.ejecutar('generar', llamar, descartar=descartar) == 'cobertura'
+    assert cliente.estadisticas()['coberturas'] == 1
+    assert lenta_liberada.wait(2)
+
+
+def test_sin_muestras_no_hay_cobertura(monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_HEDGING', True)
+    monkeypatch.setattr(Config, 'LLM_HEDGING_MIN_MUESTRAS', 3)
+    llamar, recibidas = llamadas_que('ok')
+    cliente = ClienteLLM()
+
+    assert cliente.ejecutar('generar', llamar) == 'ok'
+    assert len(recibidas) == 1
+    assert cliente.estadisticas()['coberturas'] == 0
+
+
+def test_circuito_abierto_degrada_al_modelo_rapido(monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_CIRCUITO_FALLOS', 2)
+    monkeypatch.setattr(Config, 'LLM_MAX_REINTENTOS', 5)
+    cliente = ClienteLLM()
+    modelos = []
+
+    def llamar(modelo, timeout):
+        modelos.append(modelo)
+        if modelo == 'principal':
+            raise ErrorHTTP(503)
+        return modelo
+
+    assert cliente.ejecutar('generar', llamar) == 'rapido'
+    assert modelos == ['principal', 'principal', 'rapido']
+
+    # Con el circuito abierto, la siguiente llamada ni intenta el principal
+    modelos.clear()
+    assert cliente.ejecutar('generar', llamar) == 'rapido'
+    assert modelos == ['rapido']
+
+    estadisticas = cliente.estadisticas()
+    assert estadisticas['circuitos'] == {'principal': CircuitBreaker.ABIERTO, 'rapido': CircuitBreaker.CERRADO}
+    assert estadisticas['degradadas'] == 2
+
+
+def test_circuito_semiabierto_deja_pasar_una_sonda(monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_CIRCUITO_FALLOS', 1)
+    monkeypatch.setattr(Config, 'LLM_CIRCUITO_ESPERA', 0.05)
+    circuito = CircuitBreaker('principal')
+
+    circuito.registrar(False)
+    assert not circuito.permite()
+
+    time.sleep(0.06)
+    assert circuito.permite()
+    assert not circuito.permite()
+
+    circuito.registrar(True)
+    assert circuito.estado == CircuitBreaker.CERRADO
+    assert circuito.permite()
+
+
+def test_error_del_pedido_no_cierra_el_semiabierto(monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_CIRCUITO_FALLOS', 1)
+    monkeypatch.setattr(Config, 'LLM_CIRCUITO_ESPERA', 0.05)
+    monkeypatch.setattr(Config, 'GEMINI_MODEL_RAPIDO', 'principal')
+    cliente = ClienteLLM()
+    cliente._circuito('principal').registrar(False)
+    time.sleep(0.06)
+
+    # La sonda termina en un 400: el circuito sigue semiabierto y la
+    # siguiente llamada vuelve a probar
+    with pytest.raises(ErrorHTTP):
+        cliente.ejecutar('generar', llamadas_que(ErrorHTTP(400))[0])
+    circuito = cliente._circuito('principal')
+    assert circuito.estado == CircuitBreaker.SEMIABIERTO
+    assert circuito.permite()
+
+
+def test_cobertura_no_usa_el_pool_de_lecturas(monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_HEDGING', True)
+    monkeypatch.setattr(Config, 'LLM_HEDGING_MIN_MUESTRAS', 3)
+    cliente = ClienteLLM()
+    for _ in range(3):
+        cliente.ejecutar('generar', lambda modelo, timeout: 'rapida')
+
+    hilos = []
+
+    def llamar(modelo, timeout):
+        hilos.append(threading.current_thread().name)
+        time.sleep(0.2 if len(hilos) == 1 else 0)
+        return 'ok'
+
+    assert cliente.ejecutar('generar', llamar) == 'ok'
+    assert len(hilos) == 2
+    assert all(hilo.startswith('cobertura') for hilo in hilos)
+
+
+def test_gemini_caido_devuelve_fallback(gemini_stub):
+    gemini_stub(tasa_error=1.0)
+    servicio = GeminiService()
+
+    texto, uso = servicio.generar_respuesta_con_uso(MENSAJE)
+
+    assert texto == servicio._generar_respuesta_fallback()
+    assert uso is None
+    estadisticas = servicio.cliente_llm.estadisticas()
+    assert estadisticas['reintentos'] == Config.LLM_MAX_REINTENTOS
+    assert estadisticas['fallidas'] == 1
+
+
+def test_gemini_responde_por_el_cliente(gemini_stub):
+    gemini_stub(respuesta='duerme a la misma hora')
+    servicio = GeminiService()
+
+    texto, uso = servicio.generar_respuesta_con_uso(MENSAJE)
+
+    assert texto.strip() == 'duerme a la misma hora'
+    assert uso['tokens_total'] > 0
+    assert servicio.cliente_llm.estadisticas()['llamadas'] == 1
@@ -0,0 +1,60 @@
+"""
+Pruebas de la codificación de lecturas de alta frecuencia (utils/codec_lecturas.py)
+"""
+import random
+
+import pytest
+
+from utils import codec_lecturas
+
+
+def paseo(cantidad: int, cada: int = 60, semilla: int = 7):
+    aleatorio = random.Random(semilla)
+    segundos, valores, valor = [], [], 75
+    for i in range(cantidad):
+        valor = min(150, max(50, valor + aleatorio.randint(-3, 3)))
+        segundos.append(i * cada)
+        valores.append(valor)
+    return segundos, valores
+
+
+@pytest.mark.parametrize('segundos, valores', [
+    ([], []),
+    ([0], [0]),
+    ([5, 6, 3600], [72, 40, 72]),
+    ([0, 1, 86399], [-5, 2 ** 40, -(2 ** 40)]),
+    paseo(60),
+    paseo(1440)
+])
+def test_ida_y_vuelta(segundos, valores):
+    assert codec_lecturas.decodificar(codec_lecturas.codificar(segundos, valores)) == (segundos, valores)
+
+
+def test_bloque_grande_se_comprime():
+    segundos, valores = paseo(1440)
+    bloque = codec_lecturas.codificar(segundos, valores)
+    assert bloque[0] == codec_lecturas.FORMATO_ZLIB
+    assert len(bloque) < 2 * len(valores)
+
+
+def test_bloque_chico_queda_plano():
+    assert codec_lecturas.codificar([0], [72])[0] == codec_lecturas.FORMATO_PLANO
+
+
+def test_agregar_al_final_equivale_a_codificar_todo():
+    segundos, valores = paseo(120)
+    bloque = codec_lecturas.codificar(segundos[:70], valores[:70])
+
+    bloque = codec_lecturas.agregar_al_final(bloque, segundos[69], valores[69], segundos[70:], valores[70:])
+
+    assert codec_lecturas.decodificar(bloque) == (segundos, valores)
+
+
+def test_agregar_a_un_bloque_vacio():
+    bloque = codec_lecturas.agregar_al_final(b'', 0, 0, [10, 20], [70, 71])
+    assert codec_lecturas.decodificar(bloque) == ([10, 20], [70, 71])
+
+
+def test_formato_desconocido():
+    with pytest.raises(ValueError, match='Formato de bloque desconocido'):
+        codec_lecturas.decodificar(bytes((9, 1, 2)))
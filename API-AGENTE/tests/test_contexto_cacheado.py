@@ -0,0 +1,185 @@
+"""
+Pruebas de la caché explícita de prefijos de Gemini (services/contexto_cacheado.py)
+"""
+import threading
+import time
+
+import pytest
+
+from config import Config
+from services.contexto_cacheado import CacheContextoGemini
+from services.gemini_service import GeminiService
+
+PREFIJO = 'Eres un asistente médico. ' * 50
+
+
+class Gemini:
+    """crear/renovar de cachedContents locales"""
+
+    def __init__(self, fallar_creacion: bool = False, fallar_renovacion: bool = False):
+        self.fallar_creacion = fallar_creacion
+        self.fallar_renovacion = fallar_renovacion
+        self.creados = []
+        self.renovados = []
+        self.renovado = threading.Event()
+
+    def crear(self, texto, ttl):
+        if self.fallar_creacion:
+            raise RuntimeError('cachedContents no disponible')
+        self.creados.append(texto)
+        nombre = f"cachedContents/{len(self.creados)}"
+        return nombre, f"modelo sobre {nombre}"
+
+    def renovar(self, recurso, ttl):
+        try:
+            if self.fallar_renovacion:
+                raise RuntimeError('no se pudo extender el TTL')
+            self.renovados.append(recurso)
+        finally:
+            self.renovado.set()
+
+
+@pytest.fixture(autouse=True)
+def configuracion(monkeypatch):
+    monkeypatch.setattr(Config, 'GEMINI_CACHE_TTL', 3600)
+    monkeypatch.setattr(Config, 'GEMINI_CACHE_MARGEN', 300)
+    monkeypatch.setattr(Config, 'GEMINI_CACHE_MIN_TOKENS', 100)
+    monkeypatch.setattr(Config, 'GEMINI_CACHE_REINTENTO', 300)
+
+
+def test_crea_una_vez_y_reutiliza():
+    gemini = Gemini()
+    cache = CacheContextoGemini(gemini.crear, gemini.renovar)
+
+    assert cache.obtener('General', PREFIJO) == 'modelo sobre cachedContents/1'
+    assert cache.obtener('General', PREFIJO) == 'modelo sobre cachedContents/1'
+    assert cache.obtener('Recetas', PREFIJO) == 'modelo sobre cachedContents/2'
+
+    assert len(gemini.creados) == 2
+    assert cache.estadisticas() == {'activos': 2, 'creados': 2, 'renovados': 0, 'fallos': 0}
+
+
+def test_prefijo_distinto_recrea_el_contenido():
+    gemini = Gemini()
+    cache = CacheContextoGemini(gemini.crear, gemini.renovar)
+
+    cache.obtener('General', PREFIJO)
+    assert cache.obtener('General', PREFIJO + 'Nueva regla.') == 'modelo sobre cachedContents/2'
+
+
+def test_prefijo_corto_no_se_cachea():
+    gemini = Gemini()
+    cache = CacheContextoGemini(gemini.crear, gemini.renovar)
+
+    assert cache.obtener('General', 'Eres un asistente.') is None
+    assert gemini.creados == []
+
+
+def test_renueva_antes_de_vencer(monkeypatch):
+    monkeypatch.setattr(Config, 'GEMINI_CACHE_TTL', 10)
+    monkeypatch.setattr(Config, 'GEMINI_CACHE_MARGEN', 9.5)
+    gemini = Gemini()
+    cache = CacheContextoGemini(gemini.crear, gemini.renovar)
+    cache.obtener('General', PREFIJO)
+    time.sleep(0.6)
+
+    # Dentro del margen: responde con el handle vigente y renueva aparte
+    assert cache.obtener('General', PREFIJO) == 'modelo sobre cachedContents/1'
+    assert gemini.renovado.wait(2)
+    assert gemini.renovados == ['cachedContents/1']
+    assert cache.estadisticas()['renovados'] == 1
+    assert len(gemini.creados) == 1
+
+
+def test_renovacion_fallida_conserva_el_handle(monkeypatch):
+    monkeypatch.setattr(Config, 'GEMINI_CACHE_TTL', 10)
+    monkeypatch.setattr(Config, 'GEMINI_CACHE_MARGEN', 9.5)
+    gemini = Gemini(fallar_renovacion=True)
+    cache = CacheContextoGemini(gemini.crear, gemini.renovar)
+    cache.obtener('General', PREFIJO)
+    time.sleep(0.6)
+
+    assert cache.obtener('General', PREFIJO) == 'modelo sobre cachedContents/1'
+    assert gemini.renovado.wait(2)
+    assert cache.obtener('General', PREFIJO) == 'modelo sobre cachedContents/1'
+    assert cache.estadisticas()['renovados'] == 0
+
+
+def test_fallo_al_crear_espera_antes_de_reintentar(monkeypatch):
+    gemini = Gemini(fallar_creacion=True)
+    cache = CacheContextoGemini(gemini.crear, gemini.renovar)
+
+    assert cache.obtener('General', PREFIJO) is None
+    gemini.fallar_creacion = False
+    # Dentro de GEMINI_CACHE_REINTENTO ni se intenta: prompt inline
+    assert cache.obtener('General', PREFIJO) is None
+    assert gemini.creados == []
+    assert cache.estadisticas()['fallos'] == 1
+
+    monkeypatch.setattr(Config, 'GEMINI_CACHE_REINTENTO', 0.05)
+    cache._fallos.clear()
+    cache.obtener('General', PREFIJO)
+    cache.invalidar('General')
+    assert cache.obtener('General', PREFIJO) is None
+    time.sleep(0.06)
+    assert cache.obtener('General', PREFIJO) == 'modelo sobre cachedContents/2'
+
+
+class GeminiConCache(GeminiService):
+    """GeminiService con la caché de prefijos reemplazada por una local"""
+
+    def __init__(self):
+        super().__init__()
+        self.gemini = Gemini()
+        self.cache_contexto = CacheContextoGemini(self.gemini.crear, self.gemini.renovar)
+
+
+@pytest.fixture
+def servicio(monkeypatch):
+    monkeypatch.setattr(Config, 'GEMINI_CACHE_CONTEXTO', True)
+    return GeminiConCache()
+
+
+MENSAJES = [
+    {'role': 'system', 'content': PREFIJO, 'cache': 'General'},
+    {'role': 'user', 'content': '¿cómo dormir mejor?'}
+]
+
+
+def test_modelo_principal_usa_el_contenido_cacheado(servicio):
+    usados = []
+    servicio._generar_con_prefijo(
+        MENSAJES, Config.GEMINI_MODEL, lambda modelo, prompt: usados.append((modelo, prompt))
+    )
+
+    (modelo, prompt), = usados
+    assert modelo == 'modelo sobre cachedContents/1'
+    assert 'Eres un asistente médico' not in prompt
+    assert '¿cómo dormir mejor?' in prompt
+
+
+def test_modelo_rapido_no_usa_la_cache(servicio, monkeypatch):
+    monkeypatch.setattr(Config, 'GEMINI_MODEL_RAPIDO', 'gemini-rapido')
+    usados = []
+    servicio._generar_con_prefijo(
+        MENSAJES, 'gemini-rapido', lambda modelo, prompt: usados.append((modelo, prompt))
+    )
+
+    (modelo, prompt), = usados
+    assert modelo is servicio._modelo('gemini-rapido')
+    assert 'Eres un asistente médico' in prompt
+    assert servicio.gemini.creados == []
+
+
+def test_error_con_la_cache_vuelve_al_prompt_inline(servicio):
+    usados = []
+
+    def llamar(modelo, prompt):
+        usados.append(modelo)
+        if modelo == 'modelo sobre cachedContents/1':
+            raise ValueError('cachedContent no encontrado')
+        return 'ok'
+
+    assert servicio._generar_con_prefijo(MENSAJES, Config.GEMINI_MODEL, llamar) == 'ok'
+    assert usados == ['modelo sobre cachedContents/1', servicio.model]
+    assert servicio.cache_contexto.estadisticas()['activos'] == 0
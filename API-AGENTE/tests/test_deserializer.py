@@ -0,0 +1,66 @@
+"""
+Pruebas del deserializador del formato wire de DynamoDB (dao/deserializer.py)
+"""
+from decimal import Decimal
+
+import pytest
+
+from config import Config
+from dao.base import BaseDAO
+from dao.deserializer import deserializar_item, deserializar_valor, numero_entero_o_float
+from dao.low_level import LowLevelTable
+
+CORREO = 'ana@example.com'
+
+
+@pytest.mark.parametrize('texto', ['5', '72', '-7', '72.5', '1E+2', '0'])
+def test_numero_como_el_recurso(texto):
+    # El recurso devuelve Decimal y BaseDAO._decimal_to_float lo pasa a float
+    esperado = BaseDAO._decimal_to_float(Decimal(texto))
+    valor = deserializar_valor({'N': texto})
+    assert valor == esperado
+    assert type(valor) is float
+
+
+@pytest.mark.parametrize('texto, esperado', [('5', 5), ('72.5', 72.5), ('1E+2', 100), ('-0.25', -0.25)])
+def test_numero_entero_o_float(texto, esperado):
+    valor = numero_entero_o_float(texto)
+    assert valor == esperado
+    assert type(valor) is type(esperado)
+
+
+def test_item_anidado():
+    item = {
+        'correo': {'S': 'ana@example.com'},
+        'wearables': {'M': {'pasos': {'N': '8000'}, 'horas_de_sueno': {'N': '7'}}},
+        'medicamentos': {'L': [{'S': 'paracetamol'}, {'NULL': True}]},
+        'activo': {'BOOL': True},
+        'dosis': {'NS': ['1', '0.5']}
+    }
+    assert deserializar_item(item) == {
+        'correo': 'ana@example.com',
+        'wearables': {'pasos': 8000.0, 'horas_de_sueno': 7.0},
+        'medicamentos': ['paracetamol', None],
+        'activo': True,
+        'dosis': [1.0, 0.5]
+    }
+    assert deserializar_item(item, numero_entero_o_float)['wearables'] == {'pasos': 8000, 'horas_de_sueno': 7}
+
+
+def test_bajo_nivel_devuelve_los_tipos_del_recurso(dynamodb):
+    tabla = dynamodb.Table(Config.TABLE_HISTORIAL)
+    tabla.put_item(Item={
+        'correo': CORREO,
+        'fecha': '2024-11-23T08:00:00',
+        'wearables': {'pasos': Decimal('5.0'), 'ritmo_cardiaco': Decimal('72'), 'horas_de_sueno': Decimal('7.5')}
+    })
+    clave = {'correo': CORREO, 'fecha': '2024-11-23T08:00:00'}
+
+    # DynamoDB devuelve 5.0 como '5' (moto lo deja como '5.0'): ver test_numero_como_el_recurso
+    por_recurso = BaseDAO._decimal_to_float(tabla.get_item(Key=clave)['Item'])
+    por_cliente = LowLevelTable(Config.TABLE_HISTORIAL).get_item(Key=clave)['Item']
+
+    assert por_cliente == por_recurso
+    assert {k: type(v) for k, v in por_cliente['wearables'].items()} == {
+        k: type(v) for k, v in por_recurso['wearables'].items()
+    }
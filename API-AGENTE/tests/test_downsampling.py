@@ -0,0 +1,48 @@
+"""
+Pruebas de la reducción de series para gráficos (utils/downsampling.py)
+"""
+import math
+
+import pytest
+
+from utils.downsampling import lttb
+
+
+@pytest.mark.parametrize('n, umbral', [(0, 10), (5, 10), (10, 10), (10, 2)])
+def test_serie_corta_se_devuelve_entera(n, umbral):
+    x = list(range(n))
+    assert lttb(x, x, umbral) == list(range(n))
+
+
+@pytest.mark.parametrize('n, umbral', [(11, 10), (100, 3), (1000, 200), (1001, 7)])
+def test_cantidad_y_extremos(n, umbral):
+    x = list(range(n))
+    y = [math.sin(i / 10) for i in x]
+
+    indices = lttb(x, y, umbral)
+
+    assert len(indices) == umbral
+    assert indices[0] == 0 and indices[-1] == n - 1
+    assert indices == sorted(set(indices))
+
+
+def test_conserva_los_picos():
+    x = list(range(1000))
+    y = [70.0] * 1000
+    y[333], y[777] = 180.0, 20.0
+
+    indices = lttb(x, y, 20)
+
+    assert 333 in indices and 777 in indices
+
+
+def test_abscisas_irregulares():
+    # Los grupos son por cantidad de puntos; el área usa las abscisas reales
+    x = list(range(50)) + [10000] + list(range(20000, 20050))
+    y = [float(i % 7) for i in range(len(x))]
+    y[50] = 100.0
+
+    indices = lttb(x, y, 10)
+
+    assert len(indices) == 10
+    assert 50 in indices
@@ -0,0 +1,60 @@
+"""
+Pruebas del ensamblado del prompt con presupuesto de tokens (contextos/ensamblador_prompt.py)
+"""
+from contextos.ensamblador_prompt import EnsambladorPrompt, Seccion, estimar_tokens
+
+
+def items(cantidad: int, palabras: int = 10):
+    return [' '.join(f"item{i}" for _ in range(palabras)) for i in range(cantidad)]
+
+
+def test_estimar_tokens():
+    assert estimar_tokens('') == 0
+    assert estimar_tokens('hola, ¿cómo estás?') == 7
+    assert estimar_tokens('paracetamol') == 3
+
+
+def test_sin_exceso_incluye_todo():
+    prompt, reporte = EnsambladorPrompt(1000).ensamblar([
+        Seccion('sistema', ['Eres un asistente.'], fija=True),
+        Seccion('memoria', ['uno', 'dos'], encabezado='MEMORIA:')
+    ])
+
+    assert prompt == 'Eres un asistente.\n\nMEMORIA:\nuno\ndos'
+    assert reporte['omitidos'] == {}
+    assert reporte['tokens_total'] == estimar_tokens(prompt)
+
+
+def test_presupuesto_propio_de_la_seccion():
+    prompt, reporte = EnsambladorPrompt(1000).ensamblar([
+        Seccion('recetas', items(10), presupuesto=35, resumen=lambda n: f"(+{n} recetas)")
+    ])
+
+    assert reporte['tokens_secciones']['recetas'] <= 35
+    omitidos = reporte['omitidos']['recetas']
+    assert 0 < omitidos < 10
+    assert prompt.endswith(f"(+{omitidos} recetas)")
+
+
+def test_exceso_global_recorta_primero_la_menos_prioritaria():
+    fija = Seccion('sistema', items(20), fija=True)
+    importante = Seccion('usuario', items(3), prioridad=0)
+    prescindible = Seccion('servicios', items(10), prioridad=9)
+
+    _, reporte = EnsambladorPrompt(60).ensamblar([fija, importante, prescindible])
+
+    tokens = reporte['tokens_secciones']
+    assert tokens['sistema'] == sum(estimar_tokens(item) for item in fija.items)
+    assert tokens['usuario'] + tokens['servicios'] <= 60
+    assert 'usuario' not in reporte['omitidos']
+    assert reporte['omitidos']['servicios'] > 0
+
+
+def test_item_que_no_cabe_se_corta():
+    prompt, reporte = EnsambladorPrompt(1000).ensamblar([
+        Seccion('historial', [' '.join(['pasos'] * 100)], presupuesto=20)
+    ])
+
+    assert prompt.endswith('…')
+    assert reporte['tokens_secciones']['historial'] <= 20
+    assert reporte['omitidos'] == {}
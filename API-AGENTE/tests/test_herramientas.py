@@ -0,0 +1,51 @@
+"""
+Pruebas de las herramientas del agente (services/herramientas.py)
+"""
+import pytest
+from botocore.exceptions import ClientError
+
+from services.herramientas import HerramientasAgente
+from utils.concurrencia import ejecutar_en_paralelo
+
+CORREO = 'ana@example.com'
+
+
+@pytest.fixture
+def herramientas(dynamodb):
+    return HerramientasAgente()
+
+
+def falla_dynamodb(*args, **kwargs):
+    raise ClientError(
+        {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'Rate exceeded'}},
+        'Query'
+    )
+
+
+def test_devuelve_el_resultado(herramientas):
+    assert herramientas.ejecutar('get_recetas_usuario', {}, CORREO) == {'resultado': []}
+
+
+def test_argumentos_invalidos(herramientas):
+    respuesta = herramientas.ejecutar('get_recetas_usuario', {'otro': 1}, CORREO)
+    assert respuesta['error'].startswith("Argumentos inválidos para 'get_recetas_usuario'")
+
+
+def test_error_del_dao_se_informa_al_modelo(herramientas, monkeypatch):
+    monkeypatch.setattr(herramientas.recetas_dao, 'get_recetas_usuario', falla_dynamodb)
+
+    respuesta = herramientas.ejecutar('get_recetas_usuario', {}, CORREO)
+
+    assert 'ProvisionedThroughputExceededException' in respuesta['error']
+
+
+def test_error_del_dao_no_cuenta_como_timeout(herramientas, monkeypatch):
+    monkeypatch.setattr(herramientas.recetas_dao, 'get_recetas_usuario', falla_dynamodb)
+
+    resultados, fallidas = ejecutar_en_paralelo(
+        {'0': lambda: herramientas.ejecutar('get_recetas_usuario', {}, CORREO)},
+        timeout=5
+    )
+
+    assert not fallidas
+    assert 'Rate exceeded' in resultados['0']['error']
@@ -0,0 +1,68 @@
+"""
+Pruebas de las lecturas de alta frecuencia (dao/historial_lecturas_dao.py
+y handlers/agregar_lecturas.py)
+"""
+import json
+
+import pytest
+
+from config import Config
+from dao.base import DAOFactory
+from dao.historial_lecturas_dao import fecha_iso, segundos_epoca
+from dao.identity_map import IdentityMap
+from handlers import agregar_lecturas
+from services.auth_service import AuthService
+from utils import agregados_historial
+
+CORREO = 'ana@example.com'
+
+
+@pytest.fixture
+def historial(dynamodb, monkeypatch):
+    monkeypatch.setattr(Config, 'TABLE_HISTORIAL_LECTURAS', 'historial_lecturas')
+    monkeypatch.setattr(Config, 'LECTURAS_BLOQUE', 'hora')
+    return DAOFactory.get_dao('historial')
+
+
+@pytest.mark.parametrize('fecha', [
+    '2024-11-23T23:30:00',
+    '2024-11-23T23:30:00Z',
+    '2024-11-23T23:30:00-05:00',
+    '2024-11-23T23:30:00+09:00'
+])
+def test_segundos_epoca_usa_la_hora_local(fecha):
+    assert fecha_iso(segundos_epoca(fecha)) == '2024-11-23T23:30:00'
+
+
+def test_lecturas_con_zona_caen_en_el_dia_de_agregar_por_dia(historial):
+    lecturas = [['2024-11-23T23:30:00-05:00', 72], ['2024-11-23T23:45:00Z', 75]]
+
+    assert historial.agregar_lecturas(CORREO, 'fc', lecturas) == []
+
+    bloques = DAOFactory.get_dao('historial_lecturas').query_by_partition(CORREO)
+    assert [bloque['bloque'] for bloque in bloques] == ['fc#2024-11-23T23']
+    assert list(historial.iter_lecturas(CORREO, 'fc', '2024-11-23', '2024-11-23')) == [
+        ('2024-11-23T23:30:00', 72.0),
+        ('2024-11-23T23:45:00', 75.0)
+    ]
+    dias = agregados_historial.agregar_por_dia(
+        {'fecha': fecha, 'wearables': {'ritmo_cardiaco': valor}} for fecha, valor in lecturas
+    )
+    assert [dia['dia'] for dia in dias] == ['2024-11-23']
+
+
+def test_handler_usa_una_unidad_de_trabajo(historial, monkeypatch):
+    mapas = []
+
+    def usuario_del_token(event):
+        mapas.append(IdentityMap.actual())
+        return {'correo': CORREO}
+
+    monkeypatch.setattr(AuthService, 'get_user_from_token', staticmethod(usuario_del_token))
+    evento = {'body': json.dumps({'fc': [['2024-11-23T08:01:00', 72]]})}
+
+    respuesta = agregar_lecturas.handler(evento, None)
+
+    assert respuesta['statusCode'] == 200
+    assert mapas and mapas[0] is not None
+    assert IdentityMap.actual() is None
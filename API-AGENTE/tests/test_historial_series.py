@@ -0,0 +1,69 @@
+"""
+Pruebas de la serie columnar del historial (dao/historial_series.py)
+"""
+import warnings
+
+import pytest
+
+from dao.historial_series import HistorialSeries
+from utils import agregados_historial
+
+CORREO = 'ana@example.com'
+
+
+def registro(fecha: str, pasos: int, fc: int) -> dict:
+    return {
+        'correo': CORREO,
+        'fecha': fecha,
+        'sensores': {'pasos': pasos, 'horas_de_sueno': 7},
+        'wearables': {'ritmo_cardiaco': fc}
+    }
+
+
+REGISTROS = [
+    registro('2024-11-23T08:00:00', 1000, 70),
+    # 23:30 en Lima es 04:30 UTC del día siguiente: sigue siendo del 23
+    registro('2024-11-23T23:30:00-05:00', 500, 90),
+    registro('2024-11-24T00:15:00Z', 200, 60),
+    registro('2024-11-24T10:00:00+01:00', 3000, 80),
+]
+
+
+def test_diarios_agrupa_por_dia_local_como_agregar_por_dia():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        serie = HistorialSeries.desde_registros(CORREO, REGISTROS)
+    diarios = serie.diarios()
+    assert [d['dia'] for d in diarios] == ['2024-11-24', '2024-11-23']
+    assert diarios == agregados_historial.agregar_por_dia(REGISTROS)
+
+
+def test_desde_paginas_ignora_la_zona_horaria():
+    pagina = [
+        {'fecha': {'S': r['fecha']}, 'sensores': {'M': {'pasos': {'N': str(r['sensores']['pasos'])}}}}
+        for r in REGISTROS
+    ]
+    serie = HistorialSeries.desde_paginas(CORREO, [pagina])
+    assert [r['fecha'][:19] for r in serie.a_registros()] == [
+        '2024-11-24T10:00:00', '2024-11-24T00:15:00', '2024-11-23T23:30:00', '2024-11-23T08:00:00'
+    ]
+
+
+@pytest.mark.parametrize('desde, hasta, cantidad', [
+    ('2024-11-23', '2024-11-23', 2),
+    ('2024-11-23T23:00:00-05:00', '2024-11-24T00:30:00Z', 2),
+    ('2024-11-24', None, 2),
+])
+def test_entre_usa_la_hora_local(desde, hasta, cantidad):
+    assert len(HistorialSeries.desde_registros(CORREO, REGISTROS).entre(desde, hasta)) == cantidad
+
+
+@pytest.mark.parametrize('fecha, esperada', [
+    ('2024-11-23T23:30:00-05:00', '2024-11-23T23:30:00'),
+    ('2024-11-23T23:30:00.250Z', '2024-11-23T23:30:00.250'),
+    ('2024-11-23T08:00:00+0530', '2024-11-23T08:00:00'),
+    ('2024-11-23T08:00:00', '2024-11-23T08:00:00'),
+    ('2024-11-23', '2024-11-23'),
+])
+def test_hora_local(fecha, esperada):
+    assert agregados_historial.hora_local(fecha) == esperada
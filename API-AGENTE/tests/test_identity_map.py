@@ -0,0 +1,74 @@
+"""
+Pruebas del identity map y de DAOFactory.batch_get
+"""
+from config import Config
+from contextos.recetas_contexto import RecetasContexto
+from dao.base import DAOFactory
+from dao.batch_loader import BatchLoader
+from dao.identity_map import AUSENTE, IdentityMap
+from services.documento_contexto import DocumentoContexto
+
+CORREO = 'ana@example.com'
+
+
+def contar_lotes(monkeypatch):
+    lotes = []
+    cargar = BatchLoader.cargar
+
+    def contando(self, claves_por_tabla):
+        lotes.append({tabla: len(claves) for tabla, claves in claves_por_tabla.items()})
+        return cargar(self, claves_por_tabla)
+
+    monkeypatch.setattr(BatchLoader, 'cargar', contando)
+    return lotes
+
+
+def test_buscar_no_carga():
+    identity_map = IdentityMap()
+    clave = {'correo': CORREO}
+    assert identity_map.buscar('usuarios', clave) is AUSENTE
+    identity_map.publicar('usuarios', clave, None)
+    assert identity_map.buscar('usuarios', clave) is None
+    identity_map.invalidar('usuarios', clave)
+    assert identity_map.buscar('usuarios', clave) is AUSENTE
+
+
+def test_batch_get_sirve_del_mapa_y_publica(dynamodb, monkeypatch):
+    usuarios = dynamodb.Table(Config.TABLE_USUARIOS)
+    usuarios.put_item(Item={'correo': CORREO, 'nombre': 'Ana'})
+    usuarios.put_item(Item={'correo': 'luis@example.com', 'nombre': 'Luis'})
+    lotes = contar_lotes(monkeypatch)
+    dao = DAOFactory.get_dao('usuarios')
+
+    with DAOFactory.unidad_de_trabajo() as identity_map:
+        dao.get_by_key(CORREO)
+        registros = DAOFactory.batch_get({'usuarios': [(CORREO, None), ('luis@example.com', None), ('x@y.z', None)]})
+        assert [r and r['nombre'] for r in registros['usuarios']] == ['Ana', 'Luis', None]
+        assert lotes == [{Config.TABLE_USUARIOS: 2}]
+        assert dao.get_by_key('luis@example.com')['nombre'] == 'Luis'
+        assert identity_map.reporte()['lecturas_desde_mapa'] == 2
+
+
+def test_batch_get_relee_una_clave_invalidada(dynamodb):
+    dao = DAOFactory.get_dao('usuarios')
+    dynamodb.Table(Config.TABLE_USUARIOS).put_item(Item={'correo': CORREO, 'nombre': 'Ana'})
+
+    with DAOFactory.unidad_de_trabajo():
+        dao.get_by_key(CORREO)
+        dao.put_item({'correo': CORREO, 'nombre': 'Ana María'})
+        assert DAOFactory.batch_get({'usuarios': [(CORREO, None)]})['usuarios'][0]['nombre'] == 'Ana María'
+
+
+def test_documento_y_usuario_en_un_batch(dynamodb, monkeypatch):
+    monkeypatch.setattr(Config, 'TABLE_CONTEXTO_USUARIO', 'contexto_usuario')
+    dynamodb.Table(Config.TABLE_USUARIOS).put_item(Item={'correo': CORREO, 'nombre': 'Ana'})
+    dynamodb.Table(Config.TABLE_RECETAS).put_item(Item={'correo': CORREO, 'receta_id': 'r1', 'recetas': []})
+    DocumentoContexto().reconstruir(CORREO)
+    lotes = contar_lotes(monkeypatch)
+
+    contexto = RecetasContexto()
+    with DAOFactory.unidad_de_trabajo():
+        datos = contexto.cargar_lecturas(CORREO)
+
+    assert [r['receta_id'] for r in datos['recetas']] == ['r1']
+    assert lotes == [{'contexto_usuario': 1, Config.TABLE_USUARIOS: 1}]
@@ -0,0 +1,127 @@
+"""
+Pruebas de la paginación de los DAOs (BaseDAO.iter_query_pages / iter_scan_pages)
+"""
+import json
+
+import pytest
+from botocore.exceptions import ClientError
+
+from config import Config
+from dao.base import DAOFactory
+from handlers import listar_historial
+from services.auth_service import AuthService
+
+CORREO = 'ana@example.com'
+
+
+@pytest.fixture
+def historial(dynamodb):
+    tabla = dynamodb.Table(Config.TABLE_HISTORIAL)
+    for hora in range(10):
+        tabla.put_item(Item={'correo': CORREO, 'fecha': f"2024-11-23T{hora:02d}:00:00", 'wearables': {'pasos': 100}})
+    return DAOFactory.get_dao('historial')
+
+
+def falla_en_la_pagina(tabla, monkeypatch, pagina: int, operacion: str = 'query'):
+    original = getattr(tabla, operacion)
+    llamadas = []
+
+    def leer(**params):
+        llamadas.append(params)
+        if len(llamadas) == pagina:
+            raise ClientError(
+                {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'Rate exceeded'}},
+                operacion.capitalize()
+            )
+        return original(**params)
+
+    monkeypatch.setattr(tabla, operacion, leer)
+
+
+def test_recorre_todas_las_paginas(historial):
+    paginas = list(historial.iter_query_pages(CORREO, page_size=3))
+    assert [len(items) for items, _ in paginas] == [3, 3, 3, 1]
+    assert paginas[-1][1] is None
+
+
+def test_cursor_reanuda_donde_quedo(historial):
+    (primera, cursor), = list(historial.iter_query_pages(CORREO, page_size=4, max_items=4))
+    resto = list(historial.iter_query(CORREO, cursor=cursor))
+    assert len(primera) + len(resto) == 10
+    assert primera[-1]['fecha'] > resto[0]['fecha']
+
+
+def test_error_a_mitad_de_camino_se_propaga(historial, monkeypatch):
+    falla_en_la_pagina(historial.lecturas, monkeypatch, pagina=2)
+
+    leidos = []
+    with pytest.raises(ClientError):
+        for registro in historial.iter_query(CORREO, page_size=3):
+            leidos.append(registro)
+    assert len(leidos) == 3
+
+    falla_en_la_pagina(historial.lecturas, monkeypatch, pagina=1)
+    with pytest.raises(ClientError):
+        historial.get_historial_rango(CORREO, '2024-11-23', '2024-11-24')
+
+
+def test_error_en_el_scan_se_propaga(historial, monkeypatch):
+    falla_en_la_pagina(historial.lecturas, monkeypatch, pagina=2, operacion='scan')
+
+    with pytest.raises(ClientError):
+        list(historial.iter_scan(page_size=3))
+
+
+def test_error_en_las_series_se_propaga(historial, monkeypatch):
+    assert len(historial.get_series(CORREO, '2024-11-23', page_size=3).fechas) == 10
+    falla_en_la_pagina(historial._lecturas_wire, monkeypatch, pagina=2, operacion='query_wire')
+
+    with pytest.raises(ClientError):
+        historial.get_series(CORREO, '2024-11-23', page_size=3)
+
+
+def test_cursor_modificado_o_de_otro_usuario_no_se_acepta(historial, monkeypatch):
+    monkeypatch.setattr(Config, 'CURSOR_SECRETO', 'secreto')
+    (_, cursor), = list(historial.iter_query_pages(CORREO, page_size=4, max_items=4))
+    datos, firma = cursor.split('.')
+
+    with pytest.raises(ValueError):
+        list(historial.iter_query(CORREO, cursor=f"{datos[:-2]}AA.{firma}"))
+    with pytest.raises(ValueError):
+        list(historial.iter_query('otro@example.com', cursor=cursor))
+    with pytest.raises(ValueError):
+        list(historial.iter_scan(cursor=cursor))
+
+    monkeypatch.setattr(Config, 'CURSOR_SECRETO', 'otro secreto')
+    with pytest.raises(ValueError):
+        list(historial.iter_query(CORREO, cursor=cursor))
+
+
+def test_handler_devuelve_el_cursor_de_la_siguiente_pagina(historial, monkeypatch):
+    monkeypatch.setattr(AuthService, 'get_user_from_token', staticmethod(lambda event: {'correo': CORREO}))
+    consulta = {'desde': '2024-11-23', 'hasta': '2024-11-23', 'limite': '4'}
+
+    fechas = []
+    siguiente = None
+    while True:
+        parametros = {**consulta, 'cursor': siguiente} if siguiente else consulta
+        respuesta = listar_historial.handler({'queryStringParameters': parametros}, None)
+        assert respuesta['statusCode'] == 200
+        cuerpo = json.loads(respuesta['body'])
+        fechas += [registro['fecha'] for registro in cuerpo['registros']]
+        siguiente = cuerpo['siguiente']
+        if not siguiente:
+            break
+
+    assert fechas == sorted(fechas, reverse=True) and len(fechas) == 10
+
+    parametros = {**consulta, 'cursor': 'no-es-un-cursor'}
+    assert listar_historial.handler({'queryStringParameters': parametros}, None)['statusCode'] == 400
+
+
+def test_error_en_un_segmento_del_scan_paralelo_se_propaga(historial, monkeypatch):
+    assert len(list(historial.iter_parallel_scan(total_segments=4))) == 10
+    falla_en_la_pagina(historial.tabla_cliente(), monkeypatch, pagina=2, operacion='scan')
+
+    with pytest.raises(ClientError):
+        list(historial.iter_parallel_scan(total_segments=4))
@@ -0,0 +1,50 @@
+"""
+Pruebas del handler de streams del documento de contexto (handlers/procesar_cambios.py)
+"""
+import pytest
+from botocore.exceptions import ClientError
+
+from config import Config
+from dao.base import DAOFactory
+from handlers import procesar_cambios
+
+CORREO = 'ana@example.com'
+
+
+@pytest.fixture
+def documento(dynamodb, monkeypatch):
+    monkeypatch.setattr(Config, 'TABLE_CONTEXTO_USUARIO', 'contexto_usuario')
+    monkeypatch.setattr(procesar_cambios, 'documento_contexto', None)
+    dynamodb.Table(Config.TABLE_USUARIOS).put_item(Item={'correo': CORREO, 'nombre': 'Ana'})
+    return DAOFactory.get_dao('documento_contexto')
+
+
+def evento_usuario(secuencia: str = '100') -> dict:
+    return {'Records': [{
+        'eventName': 'MODIFY',
+        'eventSourceARN': f'arn:aws:dynamodb:us-east-1:1:table/{Config.TABLE_USUARIOS}/stream/x',
+        'dynamodb': {'Keys': {'correo': {'S': CORREO}}, 'SequenceNumber': secuencia}
+    }]}
+
+
+def test_escribe_la_seccion(documento):
+    assert procesar_cambios.handler(evento_usuario(), None) == {'batchItemFailures': []}
+    assert documento.get_by_key(CORREO)['perfil']['nombre'] == 'Ana'
+
+
+def test_lectura_mas_vieja_se_descarta(documento):
+    assert documento.guardar_seccion(CORREO, 'perfil', {'perfil': {'nombre': 'Ana'}}, 2000)
+    assert not documento.guardar_seccion(CORREO, 'perfil', {'perfil': {'nombre': 'Vieja'}}, 1000)
+    assert documento.get_by_key(CORREO)['perfil']['nombre'] == 'Ana'
+
+
+def test_escritura_fallida_reintenta_el_registro(documento, monkeypatch):
+    def update_item(**kwargs):
+        raise ClientError(
+            {'Error': {'Code': 'ProvisionedThroughputExceededException', 'Message': 'throttled'}},
+            'UpdateItem'
+        )
+
+    monkeypatch.setattr(documento.table, 'update_item', update_item)
+    resultado = procesar_cambios.handler(evento_usuario('100'), None)
+    assert resultado == {'batchItemFailures': [{'itemIdentifier': '100'}]}
@@ -0,0 +1,47 @@
+"""
+Pruebas de la caché de respuestas del LLM (services/respuesta_cache.py)
+"""
+import pytest
+
+from config import Config
+from services.cliente_llm import CircuitBreaker
+from services.gemini_service import GeminiService
+from services.respuesta_cache import RespuestaCache
+
+MENSAJE = [{'role': 'user', 'content': '¿qué servicios hay?'}]
+DATOS = {'usuario': {'correo': 'ana@example.com'}, 'servicios': [{'nombre': 'Cardiología'}]}
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(Config, 'TABLE_CACHE_RESPUESTAS', '')
+    monkeypatch.setattr(Config, 'GEMINI_MODEL', 'principal')
+    monkeypatch.setattr(Config, 'GEMINI_MODEL_RAPIDO', 'rapido')
+    return RespuestaCache()
+
+
+def test_la_respuesta_se_sirve_solo_para_el_modelo_que_la_genero(cache):
+    clave = cache.clave('Servicios', '¿Qué servicios hay?', DATOS)
+    cache.guardar(clave, 'Servicios', 'Hay cardiología.', 120, 'rapido')
+
+    assert cache.obtener(clave, 'Servicios', 'principal') is None
+    assert cache.obtener(clave, 'Servicios', 'rapido') == 'Hay cardiología.'
+    assert cache.obtener(cache.clave('Servicios', 'que servicios hay', DATOS), 'Servicios', 'rapido') == 'Hay cardiología.'
+
+
+def test_uso_informa_el_modelo_que_respondio(cache, gemini_stub, monkeypatch):
+    gemini_stub(respuesta='Hay cardiología.')
+    monkeypatch.setattr(Config, 'LLM_CIRCUITO_FALLOS', 1)
+    servicio = GeminiService()
+
+    assert servicio.generar_respuesta_con_uso(MENSAJE)[1]['modelo'] == 'principal'
+    assert servicio.generar_respuesta_con_uso(MENSAJE, rapido=True)[1]['modelo'] == 'rapido'
+
+    # Con el circuito del principal abierto la respuesta es degradada
+    servicio.cliente_llm._circuito('principal').registrar(False)
+    assert servicio.cliente_llm._circuito('principal').estado == CircuitBreaker.ABIERTO
+    assert servicio.generar_respuesta_con_uso(MENSAJE)[1]['modelo'] == 'rapido'
+
+    uso = {}
+    assert ''.join(servicio.generar_respuesta_streaming(MENSAJE, uso)).strip() == 'Hay cardiología.'
+    assert uso['modelo'] == 'rapido'
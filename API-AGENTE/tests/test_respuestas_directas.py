@@ -0,0 +1,40 @@
+"""
+Pruebas de las respuestas con plantilla (services/respuestas_directas.py)
+"""
+import pytest
+
+from services.clasificador_intencion import ClasificadorIntencion, ejemplos_semilla
+from services.respuestas_directas import RespuestasDirectas
+
+
+@pytest.fixture(scope='module')
+def clasificador():
+    return ClasificadorIntencion().entrenar(ejemplos_semilla())
+
+
+@pytest.fixture(scope='module')
+def respuestas():
+    return RespuestasDirectas()
+
+
+@pytest.mark.parametrize('mensaje', [
+    'gracias, pero sigo con fiebre',
+    'no quiero tomar mis medicamentos',
+    '¿me toca tomar algo para el dolor?',
+    'hola, me duele el pecho',
+    'gracias doctor',
+])
+def test_mensajes_medicos_van_al_llm(clasificador, respuestas, mensaje):
+    assert not respuestas.aplica(clasificador.clasificar(mensaje), mensaje)
+
+
+@pytest.mark.parametrize('mensaje, intencion', [
+    ('¡Hola!', 'saludo'),
+    ('muchas gracias', 'agradecimiento'),
+    ('chau, nos vemos', 'despedida'),
+    ('¿Cuál es mi próxima dosis?', 'proxima_dosis'),
+])
+def test_mensajes_triviales_usan_plantilla(clasificador, respuestas, mensaje, intencion):
+    prediccion = clasificador.clasificar(mensaje)
+    assert prediccion.intencion == intencion
+    assert respuestas.aplica(prediccion, mensaje)
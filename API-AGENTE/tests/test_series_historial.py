@@ -0,0 +1,71 @@
+"""
+Pruebas de la fuente de las series para gráficos (handlers/series_historial.py)
+"""
+import json
+
+import pytest
+
+from config import Config
+from dao.base import DAOFactory
+from handlers import series_historial
+from services.auth_service import AuthService
+from utils import codec_lecturas
+
+CORREO = 'ana@example.com'
+
+
+@pytest.fixture
+def pedir(dynamodb, monkeypatch):
+    monkeypatch.setattr(Config, 'TABLE_HISTORIAL_AGREGADOS', '')
+    monkeypatch.setattr(Config, 'TABLE_HISTORIAL_LECTURAS', '')
+    monkeypatch.setattr(AuthService, 'get_user_from_token', staticmethod(lambda event: {'correo': CORREO}))
+
+    def pedir(**parametros):
+        respuesta = series_historial.handler({'queryStringParameters': parametros}, None)
+        return respuesta['statusCode'], json.loads(respuesta['body'])
+
+    return pedir
+
+
+def test_sin_agregados_ni_lecturas_rechaza_rangos_largos(pedir, monkeypatch):
+    monkeypatch.setattr(Config, 'SERIES_DIAS_SIN_AGREGADOS', 92)
+    leidos = []
+    monkeypatch.setattr(
+        DAOFactory.get_dao('historial'), 'get_series',
+        lambda *args, **kwargs: leidos.append(args)
+    )
+
+    estado, _ = pedir(desde='2024-01-01', hasta='2024-12-31', metricas='fc')
+
+    assert estado == 400
+    assert leidos == []
+
+
+def test_sin_agregados_usa_los_totales_de_los_bloques(pedir, monkeypatch):
+    monkeypatch.setattr(Config, 'TABLE_HISTORIAL_LECTURAS', 'historial_lecturas')
+    monkeypatch.setattr(Config, 'LECTURAS_BLOQUE', 'hora')
+    historial = DAOFactory.get_dao('historial')
+    lecturas = [
+        [f"2024-{mes:02d}-{dia:02d}T{hora:02d}:30:00", 60 + dia + hora]
+        for mes in (1, 6) for dia in (1, 2) for hora in (8, 20)
+    ]
+    assert historial.agregar_lecturas(CORREO, 'fc', lecturas) == []
+
+    registros = []
+    monkeypatch.setattr(historial, 'get_historial_rango', lambda *args: registros.append(args))
+    monkeypatch.setattr(historial, 'get_series', lambda *args, **kwargs: registros.append(args))
+    decodificados = []
+    original = codec_lecturas.decodificar
+    monkeypatch.setattr(codec_lecturas, 'decodificar', lambda datos: decodificados.append(datos) or original(datos))
+
+    estado, cuerpo = pedir(desde='2024-01-01', hasta='2024-12-31', metricas='fc')
+
+    assert estado == 200
+    assert cuerpo['fuente'] == 'dia'
+    assert registros == [] and decodificados == []
+    assert cuerpo['series']['fc'] == [
+        {'fecha': '2024-01-01', 'valor': 75.0, 'min': 69.0, 'max': 81.0},
+        {'fecha': '2024-01-02', 'valor': 76.0, 'min': 70.0, 'max': 82.0},
+        {'fecha': '2024-06-01', 'valor': 75.0, 'min': 69.0, 'max': 81.0},
+        {'fecha': '2024-06-02', 'valor': 76.0, 'min': 70.0, 'max': 82.0}
+    ]
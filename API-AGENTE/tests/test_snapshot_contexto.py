@@ -0,0 +1,115 @@
+"""
+Pruebas del snapshot de datos de contexto (services/snapshot_contexto.py)
+"""
+import pytest
+
+from config import Config
+from contextos.base_contexto import ContextoFactory
+from contextos.general_contexto import GeneralContexto
+from dao.base import DAOFactory
+from services.snapshot_contexto import SnapshotContexto
+
+CORREO = 'ana@example.com'
+
+
+@pytest.fixture
+def construcciones(dynamodb, monkeypatch):
+    """Cuenta las veces que GeneralContexto lee DynamoDB"""
+    dynamodb.Table(Config.TABLE_USUARIOS).put_item(Item={'correo': CORREO, 'nombre': 'Ana'})
+    dynamodb.Table(Config.TABLE_MEMORIA).put_item(Item={
+        'correo': CORREO, 'context_id': '2024-11-22T10:00:00', 'fecha': '2024-11-22',
+        'resumen_conversacion': 'Preguntó por su receta'
+    })
+    llamadas = []
+    original = GeneralContexto.build_context_data
+
+    def contar(self, correo):
+        llamadas.append(correo)
+        return original(self, correo)
+
+    monkeypatch.setattr(GeneralContexto, 'build_context_data', contar)
+    monkeypatch.setattr(Config, 'CACHE_TTL_CONTEXTO', 60)
+    return llamadas
+
+
+def usuario_actual():
+    return DAOFactory.get_dao('usuarios').get_consistente(CORREO)
+
+
+def obtener(snapshot):
+    return snapshot.obtener(CORREO, 'General', ContextoFactory.get_contexto('General'), usuario_actual())
+
+
+def test_turno_siguiente_usa_el_snapshot(construcciones):
+    snapshot = SnapshotContexto()
+
+    primero = obtener(snapshot)
+    segundo = obtener(snapshot)
+
+    assert len(construcciones) == 1
+    assert segundo == primero
+    assert [m['resumen_conversacion'] for m in segundo['memoria']] == ['Preguntó por su receta']
+
+
+def test_modificar_lo_devuelto_no_cambia_el_snapshot(construcciones):
+    snapshot = SnapshotContexto()
+
+    primero = obtener(snapshot)
+    primero['memoria'][0]['resumen_conversacion'] = 'modificado'
+    primero['memoria'].append({'resumen_conversacion': 'agregado'})
+
+    segundo = obtener(snapshot)
+    assert len(construcciones) == 1
+    assert [m['resumen_conversacion'] for m in segundo['memoria']] == ['Preguntó por su receta']
+
+
+def test_nueva_version_invalida_el_snapshot(construcciones):
+    snapshot = SnapshotContexto()
+    obtener(snapshot)
+
+    DAOFactory.get_dao('usuarios').incrementar_version(CORREO, 'historial')
+    obtener(snapshot)
+
+    assert len(construcciones) == 2
+
+
+def test_memoria_del_agente_se_aplica_al_snapshot(construcciones):
+    snapshot = SnapshotContexto()
+    obtener(snapshot)
+    memoria = {
+        'correo': CORREO, 'context_id': '2024-11-23T09:00:00', 'fecha': '2024-11-23',
+        'resumen_conversacion': 'Pidió consejos para dormir', 'origen': 'agente'
+    }
+
+    assert snapshot.registrar_memoria(CORREO, memoria)
+    datos = obtener(snapshot)
+
+    assert len(construcciones) == 1
+    assert [m['resumen_conversacion'] for m in datos['memoria']] == [
+        'Pidió consejos para dormir', 'Preguntó por su receta'
+    ]
+    assert datos['usuario']['version_memoria'] == 1
+
+
+def test_contexto_parcial_no_se_guarda(construcciones, monkeypatch):
+    original = GeneralContexto.build_context_data
+    monkeypatch.setattr(
+        GeneralContexto, 'build_context_data',
+        lambda self, correo: {**original(self, correo), 'lecturas_incompletas': ['recetas']}
+    )
+    snapshot = SnapshotContexto()
+
+    obtener(snapshot)
+    obtener(snapshot)
+
+    assert len(construcciones) == 2
+
+
+def test_desactivado_siempre_construye(construcciones, monkeypatch):
+    monkeypatch.setattr(Config, 'CACHE_TTL_CONTEXTO', 0)
+    snapshot = SnapshotContexto()
+
+    obtener(snapshot)
+    obtener(snapshot)
+
+    assert len(construcciones) == 2
@@ -0,0 +1,63 @@
+"""
+Pruebas del streaming de respuestas contra el stub de Gemini
+"""
+import pytest
+
+from config import Config
+from handlers import agente_stream
+from services.agente_service import AgenteService
+from services.gemini_service import GeminiService
+from utils.exceptions import StreamInterrumpidoError
+
+CORREO = 'ana@example.com'
+MENSAJE = [{'role': 'user', 'content': '¿qué me recomiendas para dormir mejor?'}]
+
+
+@pytest.fixture(autouse=True)
+def sin_reintentos(monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_MAX_REINTENTOS', 0)
+
+
+def test_stream_completo(gemini_stub):
+    gemini_stub(respuesta='uno dos tres cuatro cinco', palabras_por_chunk=2)
+    uso = {}
+    textos = list(GeminiService().generar_respuesta_streaming(MENSAJE, uso))
+    assert ''.join(textos).split() == ['uno', 'dos', 'tres', 'cuatro', 'cinco']
+    assert uso['tokens_total'] > 0
+
+
+def test_falla_antes_de_emitir_devuelve_fallback(gemini_stub):
+    gemini_stub(tasa_error=1.0)
+    servicio = GeminiService()
+    uso = {}
+    assert list(servicio.generar_respuesta_streaming(MENSAJE, uso)) == [servicio._generar_respuesta_fallback()]
+    assert uso == {}
+
+
+def test_falla_despues_de_emitir_no_agrega_fallback(gemini_stub):
+    gemini_stub(respuesta='uno dos tres cuatro cinco', palabras_por_chunk=1, cortar_tras=2)
+    servicio = GeminiService()
+    textos = []
+    with pytest.raises(StreamInterrumpidoError):
+        for texto in servicio.generar_respuesta_streaming(MENSAJE, {}):
+            textos.append(texto)
+    assert ''.join(textos).split() == ['uno', 'dos']
+
+
+def test_stream_interrumpido_no_guarda_memoria(dynamodb, gemini_stub, monkeypatch):
+    gemini_stub(respuesta='uno dos tres cuatro cinco', palabras_por_chunk=1, cortar_tras=2)
+    dynamodb.Table(Config.TABLE_USUARIOS).put_item(Item={'correo': CORREO, 'nombre': 'Ana'})
+    agente = AgenteService()
+    guardadas = []
+    monkeypatch.setattr(agente, 'guardar_memoria_conversacion', lambda **kwargs: guardadas.append(kwargs))
+    monkeypatch.setattr(agente_stream, 'get_agente_service', lambda: agente)
+    monkeypatch.setattr(agente.respuesta_cache, 'guardar', lambda *args: pytest.fail('no debe cachear'))
+
+    eventos = agente.procesar_consulta_streaming(CORREO, 'General', MENSAJE[0]['content'])
+    enviados = []
+    consulta = {'correo': CORREO, 'mensaje': MENSAJE[0]['content'], 'contexto': 'General'}
+    assert agente_stream.transmitir(consulta, eventos, 'ndjson', enviados.append, lambda: None)
+
+    tipos = [linea.split(b'"tipo": "')[1].split(b'"')[0].decode() for linea in enviados]
+    assert tipos == ['inicio', 'fragmento', 'fragmento', 'error']
+    assert guardadas == []
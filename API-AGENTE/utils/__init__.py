@@ -18,6 +18,12 @@ from .validators import (
     validar_email,
     validar_fecha_iso
 )
+from .concurrencia import (
+    get_executor,
+    ejecutar_en_paralelo
+)
+from .aws_clients import AWSClientFactory
+from .metricas import registrar_metrica
 
 __all__ = [
     # Exceptions
@@ -33,5 +39,12 @@ __all__ = [
     # Validators
     'validar_request_agente',
     'validar_email',
-    'validar_fecha_iso'
+    'validar_fecha_iso',
+    # Concurrencia
+    'get_executor',
+    'ejecutar_en_paralelo',
+    # Clientes AWS
+    'AWSClientFactory',
+    # Métricas
+    'registrar_metrica'
 ]
@@ -0,0 +1,253 @@
+"""
+=== utils/agregados_historial.py ===
+Agregados del historial médico por día, semana y mes
+
+Un agregado resume los registros de un día por métrica: cantidad, suma,
+mínimo, máximo y suma de cuadrados. Se combinan sin perder exactitud, así
+que las estadísticas de cualquier ventana (promedio, extremos, desviación)
+salen de sumar agregados en lugar de recorrer registros crudos.
+
+Los usan EstadisticasContexto, el documento de contexto por usuario
+(services/documento_contexto.py) y los agregados persistidos por día,
+semana ISO y mes (dao/historial_agregados_dao.py).
+
+Las fechas se toman como hora local tal como se registraron: el día de un
+registro es el prefijo YYYY-MM-DD de su fecha y una zona horaria al final
+('Z', '-05:00') no lo convierte a UTC (ver hora_local).
+"""
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+# Métricas agregadas (ver valores_registro)
+METRICAS = ('pasos', 'sueno', 'fc')
+
+# Granularidad -> prefijo del periodo ('D#2024-11-23', 'S#2024-W47', 'M#2024-11')
+GRANULARIDADES = {'dia': 'D', 'semana': 'S', 'mes': 'M'}
+
+
+def hora_local(fecha: str) -> str:
+    """
+    Fecha ISO sin su zona horaria: '2024-11-23T23:30:00-05:00' -> '2024-11-23T23:30:00'
+
+    Es la regla de agregar_por_dia (el día es el prefijo de la fecha tal
+    como se registró); quien convierta fechas a instantes la usa para no
+    mover un registro de día al pasarlo a UTC.
+    """
+    dia, separador, hora = fecha.partition('T')
+    if not separador:
+        return fecha
+    for indice, caracter in enumerate(hora):
+        if caracter in '+-Zz':
+            return f"{dia}T{hora[:indice]}"
+    return fecha
+
+
+def periodo(granularidad: str, dia: str) -> str:
+    """
+    Periodo de una granularidad que contiene al día
+
+    Args:
+        granularidad: 'dia', 'semana' (ISO) o 'mes'
+        dia: Fecha ISO (YYYY-MM-DD)
+    """
+    if granularidad == 'dia':
+        return f"D#{dia}"
+    if granularidad == 'semana':
+        anio, semana, _ = date.fromisoformat(dia).isocalendar()
+        return f"S#{anio:04d}-W{semana:02d}"
+    if granularidad == 'mes':
+        return f"M#{dia[:7]}"
+    raise ValueError(f"Granularidad '{granularidad}' no existe")
+
+
+def inicio_periodo(periodo: str) -> str:
+    """
+    Primer día (ISO) de un periodo ('D#2024-11-23', 'S#2024-W47', 'M#2024-11')
+    """
+    prefijo, valor = periodo[0], periodo[2:]
+    if prefijo == 'S':
+        anio, semana = valor.split('-W')
+        return date.fromisocalendar(int(anio), int(semana), 1).isoformat()
+    if prefijo == 'M':
+        return f"{valor}-01"
+    return valor
+
+
+def valores_registro(registro: Dict) -> Dict[str, float]:
+    """
+    Valores de las métricas de un registro
+
+    Los valores ausentes o en cero se omiten (un wearable sin sincronizar
+    reporta 0 pasos).
+    """
+    wearables = registro.get('wearables') or {}
+    sensores = registro.get('sensores') or {}
+    valores = {
+        'pasos': wearables.get('pasos') or sensores.get('pasos'),
+        'sueno': wearables.get('horas_de_sueno') or sensores.get('horas_de_sueno'),
+        'fc': wearables.get('ritmo_cardiaco')
+    }
+    return {metrica: float(valor) for metrica, valor in valores.items() if valor}
+
+
+def acumular(resumen: Optional[Dict], valor: float) -> Dict:
+    """Suma un valor al resumen de una métrica (n, suma, min, max, cuadrados)"""
+    if not resumen:
+        return {'n': 1, 'suma': valor, 'min': valor, 'max': valor, 'cuadrados': valor * valor}
+    return {
+        'n': resumen['n'] + 1,
+        'suma': resumen['suma'] + valor,
+        'min': min(resumen['min'], valor),
+        'max': max(resumen['max'], valor),
+        'cuadrados': resumen['cuadrados'] + valor * valor
+    }
+
+
+def combinar_resumen(a: Optional[Dict], b: Optional[Dict]) -> Optional[Dict]:
+    """Combina los resúmenes de una métrica de dos agregados"""
+    if not a:
+        return b
+    if not b:
+        return a
+    return {
+        'n': a['n'] + b['n'],
+        'suma': a['suma'] + b['suma'],
+        'min': min(a['min'], b['min']),
+        'max': max(a['max'], b['max']),
+        'cuadrados': a['cuadrados'] + b['cuadrados']
+    }
+
+
+def sumar_registro(agregado: Optional[Dict], registro: Dict) -> Dict:
+    """Copia del agregado con un registro más"""
+    nuevo = dict(agregado or {})
+    nuevo['registros'] = int(nuevo.get('registros', 0)) + 1
+    for metrica, valor in valores_registro(registro).items():
+        nuevo[metrica] = acumular(nuevo.get(metrica), valor)
+    return nuevo
+
+
+def combinar(agregados: Iterable[Dict]) -> Dict:
+    """Un solo agregado {'registros', 'pasos', 'sueno', 'fc'} con la suma de varios"""
+    total: Dict = {'registros': 0}
+    for agregado in agregados:
+        total['registros'] += int(agregado.get('registros', 0))
+        for metrica in METRICAS:
+            resumen = combinar_resumen(total.get(metrica), agregado.get(metrica))
+            if resumen:
+                total[metrica] = resumen
+    return total
+
+
+def agrupar(diarios: Iterable[Dict], granularidad: str) -> List[Dict]:
+    """
+    Agregados semanales o mensuales a partir de los diarios
+
+    Returns:
+        Agregados {'periodo', 'registros', ...} ordenados por periodo descendente
+    """
+    grupos: Dict[str, List[Dict]] = {}
+    for diario in diarios:
+        grupos.setdefault(periodo(granularidad, diario['dia']), []).append(diario)
+    return [
+        {'periodo': clave, **combinar(grupo)}
+        for clave, grupo in sorted(grupos.items(), reverse=True)
+    ]
+
+
+def agregar_por_dia(registros: Iterable[Dict]) -> List[Dict]:
+    """
+    Agrega registros crudos por día
+
+    Args:
+        registros: Registros del historial (con 'fecha' ISO)
+
+    Returns:
+        Agregados {'dia', 'registros', 'pasos', 'sueno', 'fc'} ordenados por
+        día descendente
+    """
+    dias: Dict[str, Dict] = {}
+    for registro in registros:
+        dia = str(registro.get('fecha', ''))[:10]
+        if not dia:
+            continue
+        dias[dia] = sumar_registro(dias.get(dia, {'dia': dia}), registro)
+    return sorted(dias.values(), key=lambda a: a['dia'], reverse=True)
+
+
+def en_ventana(
+    agregados: Iterable[Dict],
+    dias: int,
+    hoy: Optional[date] = None,
+    hasta_dias: int = 0
+) -> List[Dict]:
+    """
+    Agregados diarios de una ventana que termina `hasta_dias` días atrás
+
+    Con hasta_dias=0 son los últimos `dias` días; con hasta_dias=7 y
+    dias=14, la semana anterior a la última.
+    """
+    hoy = hoy or date.today()
+    desde = (hoy - timedelta(days=dias)).isoformat()
+    if not hasta_dias:
+        return [a for a in agregados if a.get('dia', '') >= desde]
+    hasta = (hoy - timedelta(days=hasta_dias)).isoformat()
+    return [a for a in agregados if desde <= a.get('dia', '') < hasta]
+
+
+def estadisticas(agregados: Iterable[Dict]) -> Dict:
+    """
+    Estadísticas de una ventana a partir de sus agregados
+
+    Returns:
+        Diccionario con total_registros, <metrica>_promedio/_max/_min de
+        pasos y sueño y fc_promedio (vacío si no hay registros)
+    """
+    total = 0
+    resumenes: Dict[str, Optional[Dict]] = {metrica: None for metrica in METRICAS}
+    for agregado in agregados:
+        total += int(agregado.get('registros', 0))
+        for metrica in METRICAS:
+            resumenes[metrica] = combinar_resumen(resumenes[metrica], agregado.get(metrica))
+
+    if not total:
+        return {}
+
+    def promedio(metrica: str) -> Optional[float]:
+        resumen = resumenes[metrica]
+        return resumen['suma'] / resumen['n'] if resumen else None
+
+    pasos, sueno = resumenes['pasos'], resumenes['sueno']
+    return {
+        'total_registros': total,
+        'pasos_promedio': promedio('pasos') or 0,
+        'pasos_max': pasos['max'] if pasos else 0,
+        'pasos_min': pasos['min'] if pasos else 0,
+        'sueno_promedio': promedio('sueno') or 0,
+        'sueno_max': sueno['max'] if sueno else 0,
+        'sueno_min': sueno['min'] if sueno else 0,
+        'fc_promedio': promedio('fc')
+    }
+
+
+def comparar_semanas(diarios: List[Dict], hoy: Optional[date] = None) -> Dict:
+    """
+    Compara los últimos 7 días (hoy incluido) con los 7 anteriores
+
+    Args:
+        diarios: Agregados diarios que cubran al menos 14 días
+
+    Returns:
+        {'actual': estadisticas, 'anterior': estadisticas, 'variacion':
+        {'<metrica>_promedio': cambio relativo}} (vacío si falta una semana)
+    """
+    actual = estadisticas(en_ventana(diarios, 6, hoy))
+    anterior = estadisticas(en_ventana(diarios, 13, hoy, hasta_dias=6))
+    if not actual or not anterior:
+        return {}
+
+    variacion = {}
+    for clave in ('pasos_promedio', 'sueno_promedio', 'fc_promedio'):
+        if actual.get(clave) and anterior.get(clave):
+            variacion[clave] = (actual[clave] - anterior[clave]) / anterior[clave]
+    return {'actual': actual, 'anterior': anterior, 'variacion': variacion}
@@ -0,0 +1,142 @@
+"""
+=== utils/aws_clients.py ===
+Sesión y clientes boto3 compartidos por contenedor
+
+Todos los DAOs y servicios obtienen sus clientes de aquí: una sola
+sesión, un pool de conexiones dimensionado para las lecturas
+concurrentes y clientes creados recién en el primer uso, de modo que los
+que una función no usa no cuestan nada en el cold start.
+
+Los clientes son thread-safe y se comparten entre hilos; los recursos no,
+así que cada hilo (el de la invocación y los del pool de
+utils/concurrencia.py) tiene el suyo.
+"""
+import threading
+import time
+from typing import Dict, Tuple
+
+import boto3
+from botocore.config import Config as BotoConfig
+
+from config import Config
+
+
+class AWSClientFactory:
+    """Factory de clientes/recursos boto3 con configuración afinada"""
+
+    _session = None
+    _clients: Dict[str, object] = {}
+    _locales = threading.local()
+    _generacion = 0
+    _recursos_creados = 0
+    _tiempos_ms: Dict[str, float] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_botocore_config(cls) -> BotoConfig:
+        """
+        Configuración de red común a todos los clientes
+
+        Returns:
+            botocore Config con pool, keep-alive, timeouts y reintentos adaptativos
+        """
+        return BotoConfig(
+            max_pool_connections=Config.AWS_MAX_POOL_CONNECTIONS,
+            tcp_keepalive=True,
+            connect_timeout=Config.AWS_CONNECT_TIMEOUT,
+            read_timeout=Config.AWS_READ_TIMEOUT,
+            retries={
+                'mode': 'adaptive',
+                'max_attempts': Config.AWS_MAX_INTENTOS
+            }
+        )
+
+    @classmethod
+    def get_session(cls) -> boto3.session.Session:
+        """Sesión boto3 del contenedor (se crea una sola vez)"""
+        if cls._session is None:
+            with cls._lock:
+                if cls._session is None:
+                    inicio = time.perf_counter()
+                    cls._session = boto3.session.Session()
+                    cls._tiempos_ms['session'] = (time.perf_counter() - inicio) * 1000
+        return cls._session
+
+    @classmethod
+    def get_client(cls, service_name: str):
+        """
+        Obtiene un cliente de bajo nivel compartido
+
+        Args:
+            service_name: Servicio AWS ('dynamodb', 'cognito-idp', ...)
+
+        Returns:
+            Cliente boto3 (thread-safe)
+        """
+        cliente = cls._clients.get(service_name)
+        if cliente is None:
+            session = cls.get_session()
+            with cls._lock:
+                cliente = cls._clients.get(service_name)
+                if cliente is None:
+                    inicio = time.perf_counter()
+                    cliente = session.client(service_name, config=cls.get_botocore_config())
+                    cls._clients[service_name] = cliente
+                    cls._tiempos_ms[f"client:{service_name}"] = (time.perf_counter() - inicio) * 1000
+        return cliente
+
+    @classmethod
+    def get_resource(cls, service_name: str):
+        """
+        Obtiene el recurso boto3 del hilo actual
+
+        Los recursos boto3 no son thread-safe: cada hilo crea el suyo en el
+        primer uso y lo reutiliza en las invocaciones siguientes.
+
+        Args:
+            service_name: Servicio AWS ('dynamodb', 's3')
+
+        Returns:
+            Recurso boto3 con la misma configuración de red
+        """
+        locales = cls._locales
+        if getattr(locales, 'generacion', None) != cls._generacion:
+            locales.recursos = {}
+            locales.generacion = cls._generacion
+
+        recurso = locales.recursos.get(service_name)
+        if recurso is None:
+            session = cls.get_session()
+            # La sesión tampoco es thread-safe al crear recursos
+            with cls._lock:
+                inicio = time.perf_counter()
+                recurso = session.resource(service_name, config=cls.get_botocore_config())
+                cls._recursos_creados += 1
+                cls._tiempos_ms.setdefault(f"resource:{service_name}", (time.perf_counter() - inicio) * 1000)
+            locales.recursos[service_name] = recurso
+        return recurso
+
+    @classmethod
+    def tiempos_inicializacion(cls) -> Dict[str, float]:
+        """Milisegundos que tomó crear la sesión y cada cliente/recurso"""
+        with cls._lock:
+            return {nombre: round(ms, 1) for nombre, ms in cls._tiempos_ms.items()}
+
+    @classmethod
+    def reset(cls) -> Tuple[int, int]:
+        """
+        Descarta sesión, clientes y recursos (para pruebas locales)
+
+        Los recursos de cada hilo se recrean en su siguiente get_resource.
+
+        Returns:
+            Tupla (clientes descartados, recursos descartados)
+        """
+        with cls._lock:
+            descartados = (len(cls._clients), cls._recursos_creados)
+            cls._session = None
+            cls._clients = {}
+            cls._generacion += 1
+            cls._recursos_creados = 0
+            cls._tiempos_ms = {}
+        return descartados
@@ -0,0 +1,124 @@
+"""
+Codificación compacta de lecturas de alta frecuencia
+
+Un bloque guarda las lecturas de un intervalo fijo (una hora o un día) de
+una métrica como pares (segundo desde el inicio del bloque, valor escalado
+a entero). Cada par se guarda como diferencia con el anterior en varints:
+el segundo sin signo (van en orden creciente) y el valor en zigzag (puede
+bajar). Una lectura por minuto de ritmo cardíaco ocupa así unos 2 bytes,
+y el resultado se comprime con zlib cuando eso lo achica.
+
+Como los pares van intercalados, agregar lecturas posteriores a la última
+no requiere decodificar las anteriores: basta conocer la última lectura
+(ver agregar_al_final).
+"""
+import zlib
+from typing import List, Sequence, Tuple
+
+# Primer byte del bloque
+FORMATO_PLANO = 0
+FORMATO_ZLIB = 1
+
+
+def codificar(segundos: Sequence[int], valores: Sequence[int]) -> bytes:
+    """
+    Codifica las lecturas de un bloque
+
+    Args:
+        segundos: Segundos desde el inicio del bloque, estrictamente crecientes
+        valores: Valores escalados a entero, uno por segundo
+
+    Returns:
+        Bloque codificado (formato + payload)
+    """
+    return _empaquetar(_pares(segundos, valores, 0, 0))
+
+
+def agregar_al_final(
+    bloque: bytes,
+    ultimo_segundo: int,
+    ultimo_valor: int,
+    segundos: Sequence[int],
+    valores: Sequence[int]
+) -> bytes:
+    """
+    Agrega lecturas posteriores a la última sin decodificar las anteriores
+
+    Args:
+        bloque: Bloque codificado existente
+        ultimo_segundo: Segundo de la última lectura del bloque
+        ultimo_valor: Valor escalado de la última lectura del bloque
+        segundos: Segundos nuevos, crecientes y mayores que ultimo_segundo
+        valores: Valores escalados nuevos
+    """
+    return _empaquetar(_desempaquetar(bloque) + _pares(segundos, valores, ultimo_segundo, ultimo_valor))
+
+
+def decodificar(bloque: bytes) -> Tuple[List[int], List[int]]:
+    """
+    Decodifica un bloque
+
+    Returns:
+        Tupla (segundos, valores escalados)
+    """
+    datos = _desempaquetar(bloque)
+    segundos: List[int] = []
+    valores: List[int] = []
+    segundo = valor = 0
+    posicion, fin = 0, len(datos)
+    while posicion < fin:
+        delta, posicion = _leer_varint(datos, posicion)
+        segundo += delta
+        zigzag, posicion = _leer_varint(datos, posicion)
+        valor += (zigzag >> 1) ^ -(zigzag & 1)
+        segundos.append(segundo)
+        valores.append(valor)
+    return segundos, valores
+
+
+def _pares(segundos: Sequence[int], valores: Sequence[int], segundo: int, valor: int) -> bytearray:
+    """Pares (delta de segundo, delta zigzag de valor) como varints"""
+    salida = bytearray()
+    for s, v in zip(segundos, valores):
+        _escribir_varint(salida, s - segundo)
+        delta = v - valor
+        _escribir_varint(salida, delta * 2 if delta >= 0 else -delta * 2 - 1)
+        segundo, valor = s, v
+    return salida
+
+
+def _escribir_varint(salida: bytearray, numero: int):
+    """Varint LEB128 sin signo"""
+    while numero > 0x7F:
+        salida.append((numero & 0x7F) | 0x80)
+        numero >>= 7
+    salida.append(numero)
+
+
+def _leer_varint(datos: bytes, posicion: int) -> Tuple[int, int]:
+    """Lee un varint y devuelve (número, posición siguiente)"""
+    numero = desplazamiento = 0
+    while True:
+        byte = datos[posicion]
+        posicion += 1
+        numero |= (byte & 0x7F) << desplazamiento
+        if byte < 0x80:
+            return numero, posicion
+        desplazamiento += 7
+
+
+def _empaquetar(datos: bytes) -> bytes:
+    comprimido = zlib.compress(bytes(datos), 6)
+    if len(comprimido) < len(datos):
+        return bytes((FORMATO_ZLIB,)) + comprimido
+    return bytes((FORMATO_PLANO,)) + bytes(datos)
+
+
+def _desempaquetar(bloque: bytes) -> bytes:
+    if not bloque:
+        return b''
+    if bloque[0] == FORMATO_ZLIB:
+        return zlib.decompress(bloque[1:])
+    if bloque[0] == FORMATO_PLANO:
+        return bloque[1:]
+    raise ValueError(f"Formato de bloque desconocido: {bloque[0]}")
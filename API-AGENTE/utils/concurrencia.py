@@ -0,0 +1,87 @@
+"""
+=== utils/concurrencia.py ===
+Pool de hilos compartido para lecturas concurrentes
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Obtiene el pool de hilos del contenedor (se crea una sola vez)
+
+    Returns:
+        ThreadPoolExecutor compartido entre invocaciones Lambda
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config.MAX_LECTURAS_CONCURRENTES,
+                    thread_name_prefix='lectura'
+                )
+    return _executor
+
+
+def ejecutar_en_paralelo(
+    tareas: Dict[str, Callable[[], Any]],
+    timeout: Optional[float] = None
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Ejecuta varias funciones en el pool compartido y espera a todas
+
+    Las tareas que fallan o no terminan antes del timeout no interrumpen
+    a las demás: se reportan como fallidas y no aparecen en los resultados.
+    Cada tarea corre con una copia del contexto del llamador, de modo que
+    ven el mismo identity map de la request.
+
+    Args:
+        tareas: Diccionario nombre -> función sin argumentos
+        timeout: Segundos máximos de espera para el conjunto
+
+    Returns:
+        Tupla (resultados por nombre, nombres de tareas fallidas)
+    """
+    if not tareas:
+        return {}, []
+
+    executor = get_executor()
+    inicio = time.monotonic()
+    futures = {
+        executor.submit(contextvars.copy_context().run, funcion): nombre
+        for nombre, funcion in tareas.items()
+    }
+
+    terminados, pendientes = wait(futures, timeout=timeout)
+
+    resultados = {}
+    fallidas = []
+
+    for future in terminados:
+        nombre = futures[future]
+        try:
+            resultados[nombre] = future.result()
+        except Exception as e:
+            print(f"⚠️  Lectura '{nombre}' falló: {str(e)}")
+            fallidas.append(nombre)
+
+    for future in pendientes:
+        nombre = futures[future]
+        future.cancel()
+        print(f"⚠️  Lectura '{nombre}' excedió el timeout de {timeout}s")
+        fallidas.append(nombre)
+
+    duracion_ms = (time.monotonic() - inicio) * 1000
+    if Config.LOG_DEBUG:
+        print(f"⏱️  {len(tareas)} lecturas concurrentes en {duracion_ms:.0f} ms")
+
+    return resultados, fallidas
@@ -0,0 +1,57 @@
+"""
+Reducción de series para gráficos
+
+Largest-Triangle-Three-Buckets (Steinarsson, 2013): conserva el primer y
+el último punto y, de cada uno de los umbral - 2 grupos intermedios, el
+punto que forma el triángulo de mayor área con el elegido en el grupo
+anterior y el promedio del grupo siguiente. A diferencia de promediar o
+tomar uno de cada k, mantiene los picos y la forma de la curva con una
+cantidad fija de puntos.
+"""
+from typing import List, Sequence
+
+
+def lttb(x: Sequence[float], y: Sequence[float], umbral: int) -> List[int]:
+    """
+    Índices de los puntos que conserva LTTB
+
+    Args:
+        x: Abscisas en orden creciente
+        y: Ordenadas, una por abscisa
+        umbral: Cantidad máxima de puntos (al menos 3)
+
+    Returns:
+        Índices crecientes; todos si la serie ya tiene umbral puntos o menos
+    """
+    n = len(x)
+    if umbral >= n or umbral < 3:
+        return list(range(n))
+
+    tamano = (n - 2) / (umbral - 2)
+    elegidos = [0]
+    anterior = 0
+    for grupo in range(umbral - 2):
+        inicio = int(grupo * tamano) + 1
+        fin = int((grupo + 1) * tamano) + 1
+
+        # Promedio del grupo siguiente (el último punto para el último grupo)
+        siguiente_inicio = fin
+        siguiente_fin = min(int((grupo + 2) * tamano) + 1, n)
+        if siguiente_inicio >= siguiente_fin:
+            siguiente_inicio, siguiente_fin = n - 1, n
+        cantidad = siguiente_fin - siguiente_inicio
+        x_promedio = sum(x[siguiente_inicio:siguiente_fin]) / cantidad
+        y_promedio = sum(y[siguiente_inicio:siguiente_fin]) / cantidad
+
+        xa, ya = x[anterior], y[anterior]
+        mejor, mejor_area = inicio, -1.0
+        for i in range(inicio, fin):
+            # Doble del área del triángulo (el factor no cambia el máximo)
+            area = abs((xa - x_promedio) * (y[i] - ya) - (xa - x[i]) * (y_promedio - ya))
+            if area > mejor_area:
+                mejor, mejor_area = i, area
+        elegidos.append(mejor)
+        anterior = mejor
+
+    elegidos.append(n - 1)
+    return elegidos
@@ -0,0 +1,386 @@
+"""
+=== utils/estadisticas_historial.py ===
+Estadísticas vectorizadas del historial médico (NumPy)
+
+Los registros crudos o los agregados diarios de uno o varios usuarios se
+pasan a columnas y se reducen a una matriz usuario × día × métrica con el
+promedio diario. Sobre esa matriz, sin recorrer registros en Python:
+
+    - percentiles de los promedios diarios
+    - promedio móvil de 7 días
+    - tendencia (pendiente de mínimos cuadrados, unidades por día)
+    - perfil por día de la semana
+    - días sin registros
+
+Las métricas y los valores que se omiten son los de
+utils/agregados_historial.py. Lo usan EstadisticasContexto, el endpoint
+GET /historial/estadisticas y local/estadisticas_lote.py.
+"""
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from utils import agregados_historial
+
+METRICAS = agregados_historial.METRICAS
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+DIAS_SEMANA = ('lunes', 'martes', 'miercoles', 'jueves', 'viernes', 'sabado', 'domingo')
+
+# 1970-01-01 fue jueves: (dia_epoch + 3) % 7 da 0 = lunes
+_DESFASE_LUNES = 3
+
+
+class Columnas(NamedTuple):
+    """
+    Filas del historial en formato columnar
+
+    Cada fila es un registro crudo o un agregado diario; 'sumas' y
+    'conteos' (filas × métricas) suman el valor y la cantidad de valores
+    de cada métrica, así las dos fuentes se combinan igual.
+    """
+    correos: List[str]       # índice de usuario -> correo
+    usuario: np.ndarray      # int32
+    dia: np.ndarray          # int32, días desde 1970-01-01
+    registros: np.ndarray    # float64, registros que representa la fila
+    sumas: np.ndarray        # float64 (filas, métricas)
+    conteos: np.ndarray      # float64 (filas, métricas)
+
+
+class MatrizDiaria(NamedTuple):
+    """Promedios diarios de un rango de días contiguo"""
+    correos: List[str]
+    inicio: int              # día (desde 1970-01-01) de la columna 0
+    promedios: np.ndarray    # float64 (usuarios, días, métricas), NaN sin dato
+    registros: np.ndarray    # float64 (usuarios, días)
+
+
+class Analisis(NamedTuple):
+    """Resultados vectorizados de analizar() (usuarios en el eje 0)"""
+    matriz: MatrizDiaria
+    percentiles: np.ndarray      # (usuarios, len(PERCENTILES), métricas)
+    media_movil: np.ndarray      # (usuarios, días, métricas)
+    tendencia: np.ndarray        # (usuarios, métricas), unidades por día
+    perfil_semanal: np.ndarray   # (usuarios, 7, métricas)
+    promedio: np.ndarray         # (usuarios, métricas), de los promedios diarios
+
+
+def dia_epoch(fecha: str) -> int:
+    """Días desde 1970-01-01 de una fecha ISO"""
+    return int(np.datetime64(fecha[:10], 'D').astype(np.int64))
+
+
+def fecha_iso(dia: int) -> str:
+    """Fecha ISO de un día desde 1970-01-01"""
+    return str(np.datetime64(int(dia), 'D'))
+
+
+def columnas_registros(registros: Iterable[Dict]) -> Columnas:
+    """
+    Columnas a partir de registros crudos (con 'correo' y 'fecha')
+
+    Es el único recorrido en Python: extrae los valores de cada registro.
+    """
+    indices: Dict[str, int] = {}
+    usuarios, fechas, valores = [], [], []
+    for registro in registros:
+        fecha = str(registro.get('fecha', ''))[:10]
+        if not fecha:
+            continue
+        correo = registro.get('correo', '')
+        usuarios.append(indices.setdefault(correo, len(indices)))
+        fechas.append(fecha)
+        del_registro = agregados_historial.valores_registro(registro)
+        valores.append([del_registro.get(metrica, np.nan) for metrica in METRICAS])
+
+    valores_np = np.array(valores, dtype=np.float64).reshape(len(valores), len(METRICAS))
+    presentes = ~np.isnan(valores_np)
+    return Columnas(
+        correos=list(indices),
+        usuario=np.array(usuarios, dtype=np.int32),
+        dia=np.array(fechas, dtype='datetime64[D]').astype(np.int32),
+        registros=np.ones(len(usuarios), dtype=np.float64),
+        sumas=np.where(presentes, valores_np, 0.0),
+        conteos=presentes.astype(np.float64)
+    )
+
+
+def columnas_diarios(diarios: Iterable[Dict], correo: Optional[str] = None) -> Columnas:
+    """
+    Columnas a partir de agregados diarios ('dia' y resúmenes por métrica)
+
+    Args:
+        diarios: Agregados diarios; con 'correo' si son de varios usuarios
+        correo: Usuario de los agregados que no traen 'correo'
+    """
+    indices: Dict[str, int] = {}
+    usuarios, fechas, registros, sumas, conteos = [], [], [], [], []
+    for diario in diarios:
+        usuarios.append(indices.setdefault(diario.get('correo', correo), len(indices)))
+        fechas.append(diario['dia'])
+        registros.append(float(diario.get('registros', 0)))
+        resumenes = [diario.get(metrica) or {} for metrica in METRICAS]
+        sumas.append([float(r.get('suma', 0)) for r in resumenes])
+        conteos.append([float(r.get('n', 0)) for r in resumenes])
+
+    return Columnas(
+        correos=list(indices) or [correo],
+        usuario=np.array(usuarios, dtype=np.int32),
+        dia=np.array(fechas, dtype='datetime64[D]').astype(np.int32),
+        registros=np.array(registros, dtype=np.float64),
+        sumas=np.array(sumas, dtype=np.float64).reshape(len(fechas), len(METRICAS)),
+        conteos=np.array(conteos, dtype=np.float64).reshape(len(fechas), len(METRICAS))
+    )
+
+
+def columnas_arrays(
+    correos: List[str],
+    usuario: np.ndarray,
+    dia: np.ndarray,
+    valores: np.ndarray
+) -> Columnas:
+    """
+    Columnas a partir de arrays ya armados (lotes, benchmarks)
+
+    Args:
+        correos: índice de usuario -> correo
+        usuario: Índice de usuario por fila
+        dia: Día desde 1970-01-01 por fila
+        valores: (filas, métricas) con NaN donde falta el valor
+    """
+    presentes = ~np.isnan(valores)
+    return Columnas(
+        correos=correos,
+        usuario=np.asarray(usuario, dtype=np.int32),
+        dia=np.asarray(dia, dtype=np.int32),
+        registros=np.ones(len(usuario), dtype=np.float64),
+        sumas=np.where(presentes, valores, 0.0),
+        conteos=presentes.astype(np.float64)
+    )
+
+
+def matriz_diaria(columnas: Columnas, desde: Optional[int] = None, hasta: Optional[int] = None) -> MatrizDiaria:
+    """
+    Promedio diario de cada métrica por usuario
+
+    Args:
+        columnas: Filas del historial
+        desde: Primer día (desde 1970-01-01; default: el menor de las filas)
+        hasta: Último día, inclusive (default: el mayor de las filas)
+
+    Returns:
+        MatrizDiaria; los días sin valores quedan en NaN
+    """
+    usuarios = len(columnas.correos)
+    if desde is None:
+        desde = int(columnas.dia.min()) if len(columnas.dia) else 0
+    if hasta is None:
+        hasta = int(columnas.dia.max()) if len(columnas.dia) else desde - 1
+    dias = max(hasta - desde + 1, 0)
+    tamano = usuarios * dias
+
+    dentro = (columnas.dia >= desde) & (columnas.dia <= hasta)
+    clave = columnas.usuario[dentro].astype(np.int64) * dias + (columnas.dia[dentro] - desde)
+
+    def por_celda(pesos: np.ndarray) -> np.ndarray:
+        return np.bincount(clave, weights=pesos, minlength=tamano).reshape(usuarios, dias)
+
+    sumas = np.stack([por_celda(columnas.sumas[dentro, m]) for m in range(len(METRICAS))], axis=-1)
+    conteos = np.stack([por_celda(columnas.conteos[dentro, m]) for m in range(len(METRICAS))], axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        promedios = np.where(conteos > 0, sumas / conteos, np.nan)
+
+    return MatrizDiaria(
+        correos=columnas.correos,
+        inicio=desde,
+        promedios=promedios,
+        registros=por_celda(columnas.registros[dentro])
+    )
+
+
+def percentiles(matriz: MatrizDiaria, qs: Sequence[float] = PERCENTILES) -> np.ndarray:
+    """
+    Percentiles de los promedios diarios (interpolación lineal, como np.percentile)
+
+    Ordena una vez por usuario y métrica en lugar de np.nanpercentile, que
+    con NaN recorre cada serie por separado.
+
+    Returns:
+        (usuarios, len(qs), métricas); NaN si el usuario no tiene valores
+    """
+    ordenados = np.sort(matriz.promedios, axis=1)  # NaN al final
+    validos = (~np.isnan(matriz.promedios)).sum(axis=1)  # (usuarios, métricas)
+    ultimo = max(ordenados.shape[1] - 1, 0)
+
+    resultado = np.full((ordenados.shape[0], len(qs), ordenados.shape[2]), np.nan)
+    if not ordenados.shape[1]:
+        return resultado
+    for i, q in enumerate(qs):
+        posicion = np.maximum(validos - 1, 0) * (q / 100.0)
+        abajo = np.floor(posicion).astype(np.int64)
+        arriba = np.minimum(abajo + 1, np.maximum(validos - 1, 0))
+        fraccion = posicion - abajo
+        v_abajo = np.take_along_axis(ordenados, np.minimum(abajo, ultimo)[:, None, :], axis=1)[:, 0, :]
+        v_arriba = np.take_along_axis(ordenados, np.minimum(arriba, ultimo)[:, None, :], axis=1)[:, 0, :]
+        resultado[:, i, :] = np.where(validos > 0, v_abajo + (v_arriba - v_abajo) * fraccion, np.nan)
+    return resultado
+
+
+def media_movil(matriz: MatrizDiaria, ventana: int = 7) -> np.ndarray:
+    """
+    Promedio de los promedios diarios de los últimos `ventana` días
+
+    Los días sin dato no cuentan; NaN si la ventana no tiene ninguno.
+
+    Returns:
+        (usuarios, días, métricas)
+    """
+    validos = ~np.isnan(matriz.promedios)
+    sumas = np.cumsum(np.where(validos, matriz.promedios, 0.0), axis=1)
+    conteos = np.cumsum(validos, axis=1, dtype=np.float64)
+    if ventana < sumas.shape[1]:
+        sumas[:, ventana:] = sumas[:, ventana:] - sumas[:, :-ventana]
+        conteos[:, ventana:] = conteos[:, ventana:] - conteos[:, :-ventana]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(conteos > 0, sumas / conteos, np.nan)
+
+
+def tendencia(matriz: MatrizDiaria) -> np.ndarray:
+    """
+    Pendiente de mínimos cuadrados de los promedios diarios contra el día
+
+    Returns:
+        (usuarios, métricas) en unidades por día; NaN con menos de 2 días
+    """
+    validos = (~np.isnan(matriz.promedios)).astype(np.float64)
+    x = np.arange(matriz.promedios.shape[1], dtype=np.float64)
+    y = np.where(validos > 0, matriz.promedios, 0.0)
+    n = validos.sum(axis=1)
+    sx = np.einsum('udm,d->um', validos, x)
+    sy = y.sum(axis=1)
+    sxx = np.einsum('udm,d->um', validos, x * x)
+    sxy = np.einsum('udm,d->um', y, x)
+    denominador = n * sxx - sx * sx
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(denominador > 0, (n * sxy - sx * sy) / denominador, np.nan)
+
+
+def perfil_semanal(matriz: MatrizDiaria) -> np.ndarray:
+    """
+    Promedio de los promedios diarios por día de la semana
+
+    Returns:
+        (usuarios, 7, métricas), lunes primero
+    """
+    dias_semana = (matriz.inicio + np.arange(matriz.promedios.shape[1]) + _DESFASE_LUNES) % 7
+    validos = ~np.isnan(matriz.promedios)
+    valores = np.where(validos, matriz.promedios, 0.0)
+    perfil = np.full((matriz.promedios.shape[0], 7, matriz.promedios.shape[2]), np.nan)
+    for dia_semana in range(7):
+        columnas = dias_semana == dia_semana
+        conteo = validos[:, columnas].sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            perfil[:, dia_semana, :] = np.where(conteo > 0, valores[:, columnas].sum(axis=1) / conteo, np.nan)
+    return perfil
+
+
+def analizar(matriz: MatrizDiaria, ventana: int = 7) -> Analisis:
+    """Todas las estadísticas de la matriz"""
+    validos = ~np.isnan(matriz.promedios)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        promedio = np.where(
+            validos.any(axis=1),
+            np.where(validos, matriz.promedios, 0.0).sum(axis=1) / validos.sum(axis=1),
+            np.nan
+        )
+    return Analisis(
+        matriz=matriz,
+        percentiles=percentiles(matriz),
+        media_movil=media_movil(matriz, ventana),
+        tendencia=tendencia(matriz),
+        perfil_semanal=perfil_semanal(matriz),
+        promedio=promedio
+    )
+
+
+def _numero(valor: float, decimales: int = 4) -> Optional[float]:
+    """float de Python redondeado, None en lugar de NaN (serializable a JSON)"""
+    valor = float(valor)
+    return None if np.isnan(valor) else round(valor, decimales)
+
+
+def como_dict(analisis: Analisis, usuario: int = 0, serie: bool = True) -> Dict:
+    """
+    Resultados de un usuario en tipos de Python
+
+    Args:
+        analisis: Resultado de analizar()
+        usuario: Índice del usuario
+        serie: Incluir el promedio móvil día por día
+
+    Returns:
+        {'correo', 'desde', 'hasta', 'dias', 'dias_con_registros',
+        'dias_sin_registros': [fechas], 'metricas': {métrica: {...}}}
+    """
+    matriz = analisis.matriz
+    dias = matriz.promedios.shape[1]
+    sin_registros = np.flatnonzero(matriz.registros[usuario] == 0) + matriz.inicio
+
+    metricas = {}
+    for m, metrica in enumerate(METRICAS):
+        detalle = {
+            'promedio_diario': _numero(analisis.promedio[usuario, m]),
+            'percentiles': {
+                f"p{q}": _numero(analisis.percentiles[usuario, i, m])
+                for i, q in enumerate(PERCENTILES)
+            },
+            'tendencia_diaria': _numero(analisis.tendencia[usuario, m], 6),
+            'perfil_semanal': {
+                nombre: _numero(analisis.perfil_semanal[usuario, d, m])
+                for d, nombre in enumerate(DIAS_SEMANA)
+            },
+            'media_movil_7d_actual': _numero(analisis.media_movil[usuario, -1, m]) if dias else None
+        }
+        if serie:
+            detalle['media_movil_7d'] = [_numero(v) for v in analisis.media_movil[usuario, :, m]]
+        metricas[metrica] = detalle
+
+    return {
+        'correo': matriz.correos[usuario],
+        'desde': fecha_iso(matriz.inicio),
+        'hasta': fecha_iso(matriz.inicio + dias - 1),
+        'dias': dias,
+        'dias_con_registros': int(dias - len(sin_registros)),
+        'dias_sin_registros': [fecha_iso(dia) for dia in sin_registros],
+        'metricas': metricas
+    }
+
+
+def resumen_diarios(
+    correo: str,
+    diarios: Iterable[Dict],
+    dias: int = 30,
+    hoy: Optional[date] = None,
+    serie: bool = False
+) -> Dict:
+    """
+    Análisis de los últimos `dias` días de un usuario desde sus agregados diarios
+
+    La ventana es la de agregados_historial.en_ventana (desde hoy - dias,
+    hoy incluido), así los días sin registros al inicio y al final cuentan.
+
+    Returns:
+        como_dict() del usuario, o vacío si no hay registros en la ventana
+    """
+    hoy = hoy or date.today()
+    columnas = columnas_diarios(diarios, correo)
+    matriz = matriz_diaria(
+        columnas,
+        desde=dia_epoch((hoy - timedelta(days=dias)).isoformat()),
+        hasta=dia_epoch(hoy.isoformat())
+    )
+    if not matriz.registros.any():
+        return {}
+    return como_dict(analizar(matriz), 0, serie=serie)
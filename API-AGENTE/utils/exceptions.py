@@ -21,3 +21,11 @@ class DatosFaltantesError(AgenteBaseError):
 class ConfiguracionInvalidaError(AgenteBaseError):
     """Error en la configuración del servicio"""
     pass
+
+class LLMNoDisponibleError(AgenteBaseError):
+    """El modelo no respondió dentro del plazo o su circuito está abierto"""
+    pass
+
+class StreamInterrumpidoError(AgenteBaseError):
+    """El stream del LLM falló después de emitir parte de la respuesta"""
+    pass
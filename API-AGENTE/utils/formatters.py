@@ -76,6 +76,9 @@ class CustomJSONEncoder(json.JSONEncoder):
             return obj.isoformat()
         if isinstance(obj, bytes):
             return obj.decode('utf-8')
+        if hasattr(obj, 'a_registros'):
+            # dao.historial_series.HistorialSeries (sin importar NumPy aquí)
+            return obj.a_registros()
         return super().default(obj)
 
 
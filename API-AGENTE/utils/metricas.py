@@ -0,0 +1,46 @@
+"""
+=== utils/metricas.py ===
+Métricas de CloudWatch vía Embedded Metric Format (EMF)
+
+Cada métrica se imprime como una línea JSON en el log de la función;
+CloudWatch la extrae como métrica sin llamadas adicionales a la API.
+"""
+import json
+import time
+from typing import Dict, Optional
+
+NAMESPACE = 'RimacAgente'
+
+
+def registrar_metrica(
+    nombre: str,
+    valor: float,
+    unidad: str = 'Milliseconds',
+    dimensiones: Optional[Dict[str, str]] = None,
+    propiedades: Optional[Dict] = None
+):
+    """
+    Emite una métrica en formato EMF
+
+    Args:
+        nombre: Nombre de la métrica (p. ej. 'TiempoPrimerToken')
+        valor: Valor numérico
+        unidad: Unidad CloudWatch ('Milliseconds', 'Count', 'Percent'...)
+        dimensiones: Dimensiones de la métrica (p. ej. {'Contexto': 'General'})
+        propiedades: Campos extra que quedan en el log pero no son dimensiones
+    """
+    dimensiones = dimensiones or {}
+    registro = {
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': NAMESPACE,
+                'Dimensions': [list(dimensiones.keys())],
+                'Metrics': [{'Name': nombre, 'Unit': unidad}]
+            }]
+        },
+        nombre: valor,
+        **dimensiones,
+        **(propiedades or {})
+    }
+    print(json.dumps(registro, ensure_ascii=False, default=str))
@@ -0,0 +1,66 @@
+"""
+=== utils/plazo.py ===
+Plazo (deadline) de la invocación en curso
+
+El handler lo abre con el `context` de Lambda; los clientes que esperan
+a servicios externos (Gemini) lo consultan para no pasarse del timeout de
+la función. Vive en un ContextVar, como el identity map, así que las
+tareas del pool que copian el contexto ven el mismo plazo.
+"""
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from config import Config
+
+_plazo_actual: ContextVar[Optional['Plazo']] = ContextVar('plazo', default=None)
+
+
+class Plazo:
+    """Instante límite (reloj monotónico) para terminar la invocación"""
+
+    def __init__(self, segundos: float):
+        """
+        Args:
+            segundos: Tiempo disponible a partir de ahora
+        """
+        self.limite = time.monotonic() + segundos
+        self._token = None
+
+    @classmethod
+    def desde_contexto(cls, context: Any) -> 'Plazo':
+        """
+        Plazo a partir del context de Lambda
+
+        Se descuenta Config.LLM_RESERVA_SEGUNDOS para guardar la memoria y
+        responder después de la última llamada. Sin context (servidor local,
+        pruebas) se usa Config.LLM_PLAZO_DEFECTO.
+
+        Args:
+            context: Context de la invocación Lambda (o None)
+
+        Returns:
+            Plazo de la invocación
+        """
+        restante_ms = getattr(context, 'get_remaining_time_in_millis', None)
+        if restante_ms is None:
+            return cls(Config.LLM_PLAZO_DEFECTO)
+        return cls(max(0.0, restante_ms() / 1000 - Config.LLM_RESERVA_SEGUNDOS))
+
+    @staticmethod
+    def actual() -> 'Plazo':
+        """Plazo de la invocación en curso (uno por defecto si no hay)"""
+        plazo = _plazo_actual.get()
+        return plazo if plazo is not None else Plazo(Config.LLM_PLAZO_DEFECTO)
+
+    def restante(self) -> float:
+        """Segundos que quedan (0 si ya venció)"""
+        return max(0.0, self.limite - time.monotonic())
+
+    def __enter__(self) -> 'Plazo':
+        self._token = _plazo_actual.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _plazo_actual.reset(self._token)
+        return False
@@ -2,7 +2,7 @@
 === utils/validators.py ===
 Validadores de datos
 """
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from config import Config
 
 def validar_request_agente(body: Dict) -> Optional[List[str]]:
@@ -80,3 +80,55 @@ def validar_fecha_iso(fecha: str) -> bool:
         return True
     except (ValueError, AttributeError):
         return False
+
+
+# Campos numéricos admitidos por fuente (DataGenerator/schemas-validation/historial_medico.json)
+CAMPOS_HISTORIAL = {
+    'sensores': ('pasos', 'horas_de_sueno'),
+    'wearables': ('pasos', 'ritmo_cardiaco', 'horas_de_sueno')
+}
+
+
+def validar_registro_historial(registro: Any) -> Optional[List[str]]:
+    """
+    Valida un registro del historial médico para la ingesta en lote
+    
+    Args:
+        registro: Objeto con 'fecha' (ISO 8601) y 'sensores' y/o 'wearables'
+            con valores numéricos no negativos
+    
+    Returns:
+        Lista de errores o None si es válido
+    """
+    if not isinstance(registro, dict):
+        return ["El registro debe ser un objeto"]
+    
+    errores = []
+    
+    desconocidos = set(registro) - {'correo', 'fecha'} - set(CAMPOS_HISTORIAL)
+    if desconocidos:
+        errores.append(f"Campos no admitidos: {sorted(desconocidos)}")
+    
+    fecha = registro.get('fecha')
+    if not fecha:
+        errores.append("El campo 'fecha' es requerido")
+    elif not isinstance(fecha, str) or not validar_fecha_iso(fecha):
+        errores.append("El campo 'fecha' debe ser una fecha ISO 8601")
+    
+    for fuente, campos in CAMPOS_HISTORIAL.items():
+        valores = registro.get(fuente)
+        if valores is None:
+            continue
+        if not isinstance(valores, dict):
+            errores.append(f"El campo '{fuente}' debe ser un objeto")
+            continue
+        for campo, valor in valores.items():
+            if campo not in campos:
+                errores.append(f"'{fuente}.{campo}' no es un campo admitido")
+            elif isinstance(valor, bool) or not isinstance(valor, (int, float)) or not 0 <= valor < float('inf'):
+                errores.append(f"'{fuente}.{campo}' debe ser un número no negativo")
+    
+    if not registro.get('sensores') and not registro.get('wearables'):
+        errores.append("Se requiere al menos 'sensores' o 'wearables'")
+    
+    return errores if errores else None
@@ -1,25 +1,13 @@
 import os
 import json
-import boto3
 import base64
 from botocore.exceptions import ClientError
-from decimal import Decimal
 
-def convert_decimal(obj):
-    if isinstance(obj, Decimal):
-        if obj % 1 == 0:
-            return int(obj)
-        else:
-            return float(obj)
-    if isinstance(obj, list):
-        return [convert_decimal(i) for i in obj]
-    if isinstance(obj, dict):
-        return {k: convert_decimal(v) for k, v in obj.items()}
-    return obj
+from aws_clients import get_client
+from deserializer import deserializar_item, numero_entero_o_float, serializar_valor
+from versiones import incrementar_version_recetas
 
-dynamodb = boto3.resource('dynamodb')
 TABLE_RECETAS = os.environ.get('TABLE_RECETAS', 'Recetas')
-table_recetas = dynamodb.Table(TABLE_RECETAS)
 
 def _response(status_code, body):
     return {
@@ -77,57 +65,41 @@ def lambda_handler(event, context):
         except:
             return _response(400, {"message": "Body JSON inválido"})
         
-        # Verificar que la receta existe
+        # Preparar atributos a actualizar
+        update_expression = []
+        expression_attribute_values = {}
+        expression_attribute_names = {}
+        
+        # Campos permitidos para actualizar
+        allowed_fields = ['paciente', 'institucion', 'recetas']
+        
+        for field in allowed_fields:
+            if field in body:
+                update_expression.append(f"#{field} = :{field}")
+                expression_attribute_names[f"#{field}"] = field
+                expression_attribute_values[f":{field}"] = serializar_valor(body[field])
+        
+        if not update_expression:
+            return _response(400, {"message": "No hay campos para actualizar"})
+        
+        # Actualizar en DynamoDB solo si la receta existe y devolver el item
+        # resultante en la misma llamada
         try:
-            response = table_recetas.get_item(
-                Key={
-                    'correo': user_email,
-                    'receta_id': receta_id
-                }
-            )
-            
-            if 'Item' not in response:
-                return _response(404, {"message": "Receta no encontrada"})
-            
-            current_item = response['Item']
-            
-            # Preparar atributos a actualizar
-            update_expression = []
-            expression_attribute_values = {}
-            expression_attribute_names = {}
-            
-            # Campos permitidos para actualizar
-            allowed_fields = ['paciente', 'institucion', 'recetas']
-            
-            for field in allowed_fields:
-                if field in body:
-                    update_expression.append(f"#{field} = :{field}")
-                    expression_attribute_names[f"#{field}"] = field
-                    expression_attribute_values[f":{field}"] = body[field]
-            
-            if not update_expression:
-                return _response(400, {"message": "No hay campos para actualizar"})
-            
-            # Actualizar en DynamoDB
-            table_recetas.update_item(
+            response = get_client('dynamodb').update_item(
+                TableName=TABLE_RECETAS,
                 Key={
-                    'correo': user_email,
-                    'receta_id': receta_id
+                    'correo': {'S': user_email},
+                    'receta_id': {'S': receta_id}
                 },
                 UpdateExpression="SET " + ", ".join(update_expression),
+                ConditionExpression="attribute_exists(receta_id)",
                 ExpressionAttributeNames=expression_attribute_names,
-                ExpressionAttributeValues=expression_attribute_values
+                ExpressionAttributeValues=expression_attribute_values,
+                ReturnValues="ALL_NEW"
             )
             
-            # Obtener item actualizado
-            updated_response = table_recetas.get_item(
-                Key={
-                    'correo': user_email,
-                    'receta_id': receta_id
-                }
-            )
-            
-            item = convert_decimal(updated_response['Item'])
+            item = deserializar_item(response['Attributes'], numero_entero_o_float)
+            incrementar_version_recetas(user_email)
 
             return _response(200, {
                 "message": "Receta actualizada exitosamente",
@@ -135,6 +107,8 @@ def lambda_handler(event, context):
             })
             
         except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return _response(404, {"message": "Receta no encontrada"})
             return _response(500, {"message": f"Error al actualizar receta: {str(e)}"})
     
     except Exception as e:
@@ -0,0 +1,112 @@
+"""
+Deserializador rápido del formato wire de DynamoDB
+
+Copia de API-AGENTE/dao/deserializer.py (cada servicio se despliega por
+separado); mantener ambas versiones sincronizadas.
+
+Convierte los AttributeValue del cliente de bajo nivel directamente a
+int/float/str/... en una sola pasada, sin pasar por Decimal. Los handlers
+de este servicio usan numero_entero_o_float: los enteros salen como int,
+como con el convert_decimal que reemplaza.
+"""
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional
+
+from boto3.dynamodb.types import TypeSerializer
+
+_serializer = TypeSerializer()
+
+
+def numero_float(texto: str) -> float:
+    """
+    `N` de DynamoDB como float, igual que BaseDAO._decimal_to_float
+
+    DynamoDB normaliza los números ('5.0' se guarda y se lee como '5'), así
+    que el texto no dice si el valor se escribió como float: todos pasan a
+    float para que el modo bajo nivel devuelva los mismos tipos que el recurso.
+    """
+    return float(texto)
+
+
+def numero_entero_o_float(texto: str):
+    """`N` de DynamoDB como int si es entero y si no float (como Decimal % 1 == 0)"""
+    if '.' in texto or 'e' in texto or 'E' in texto:
+        decimal = Decimal(texto)
+        return int(decimal) if decimal % 1 == 0 else float(decimal)
+    return int(texto)
+
+
+def deserializar_valor(
+    attribute_value: Dict[str, Any],
+    numero: Callable[[str], Any] = numero_float
+) -> Any:
+    """
+    Convierte un AttributeValue a su valor Python
+
+    Args:
+        attribute_value: Diccionario de un solo tipo, p. ej. {'N': '42'}
+        numero: Conversión de los `N` (numero_float o numero_entero_o_float)
+
+    Returns:
+        Valor nativo (str, float o int, bool, None, dict, list, bytes)
+    """
+    for tipo, valor in attribute_value.items():
+        if tipo == 'S':
+            return valor
+        if tipo == 'N':
+            return numero(valor)
+        if tipo == 'M':
+            return {k: deserializar_valor(v, numero) for k, v in valor.items()}
+        if tipo == 'L':
+            return [deserializar_valor(v, numero) for v in valor]
+        if tipo == 'BOOL':
+            return valor
+        if tipo == 'NULL':
+            return None
+        if tipo == 'SS' or tipo == 'BS':
+            return list(valor)
+        if tipo == 'NS':
+            return [numero(v) for v in valor]
+        if tipo == 'B':
+            return valor
+        raise TypeError(f"Tipo DynamoDB no soportado: {tipo}")
+    return None
+
+
+def deserializar_item(
+    item: Optional[Dict[str, Dict]],
+    numero: Callable[[str], Any] = numero_float
+) -> Optional[Dict]:
+    """
+    Convierte un item en formato wire a diccionario Python
+
+    Args:
+        item: Item tal como lo devuelve el cliente de bajo nivel
+        numero: Conversión de los `N` (numero_float o numero_entero_o_float)
+
+    Returns:
+        Diccionario con tipos nativos (o None)
+    """
+    if item is None:
+        return None
+    return {k: deserializar_valor(v, numero) for k, v in item.items()}
+
+
+def serializar_valor(valor: Any) -> Dict[str, Any]:
+    """
+    Convierte un valor Python a AttributeValue
+
+    A diferencia de TypeSerializer acepta float (vía Decimal), como llegan
+    desde json.loads.
+    """
+    return _serializer.serialize(_float_a_decimal(valor))
+
+
+def _float_a_decimal(valor: Any) -> Any:
+    if isinstance(valor, float):
+        return Decimal(str(valor))
+    if isinstance(valor, dict):
+        return {k: _float_a_decimal(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_float_a_decimal(v) for v in valor]
+    return valor
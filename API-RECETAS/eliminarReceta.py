@@ -1,14 +1,13 @@
 import os
 import json
-import boto3
 import base64
 from botocore.exceptions import ClientError
 
-dynamodb = boto3.resource('dynamodb')
-s3 = boto3.client('s3')
+from aws_clients import get_client, get_table
+from versiones import incrementar_version_recetas
+
 TABLE_RECETAS = os.environ.get('TABLE_RECETAS', 'Recetas')
 S3_BUCKET = os.environ.get('S3_BUCKET_RECETAS')
-table_recetas = dynamodb.Table(TABLE_RECETAS)
 
 def _response(status_code, body):
     return {
@@ -63,7 +62,7 @@ def lambda_handler(event, context):
         # Eliminar de DynamoDB
         try:
             # Primero obtener la receta para saber si tiene imagen en S3
-            response = table_recetas.get_item(
+            response = get_table(TABLE_RECETAS).get_item(
                 Key={
                     'correo': user_email,
                     'receta_id': receta_id
@@ -80,17 +79,18 @@ def lambda_handler(event, context):
                 try:
                     # Extraer key del S3 desde la URL
                     s3_key = f"recetas/{user_email}/{receta_id}.jpg"
-                    s3.delete_object(Bucket=S3_BUCKET, Key=s3_key)
+                    get_client('s3').delete_object(Bucket=S3_BUCKET, Key=s3_key)
                 except Exception as s3_error:
                     print(f"Error al eliminar imagen de S3: {s3_error}")
             
             # Eliminar de DynamoDB
-            table_recetas.delete_item(
+            get_table(TABLE_RECETAS).delete_item(
                 Key={
                     'correo': user_email,
                     'receta_id': receta_id
                 }
             )
+            incrementar_version_recetas(user_email)
             
             return _response(200, {
                 "message": "Receta eliminada exitosamente",
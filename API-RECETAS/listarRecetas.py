@@ -1,26 +1,12 @@
 import os
 import json
-import boto3
 import base64
 from botocore.exceptions import ClientError
-from decimal import Decimal
 
-def convert_decimal(obj):
-    if isinstance(obj, Decimal):
-        # si es entero devuelve int, si no float
-        if obj % 1 == 0:
-            return int(obj)
-        else:
-            return float(obj)
-    if isinstance(obj, list):
-        return [convert_decimal(i) for i in obj]
-    if isinstance(obj, dict):
-        return {k: convert_decimal(v) for k, v in obj.items()}
-    return obj
+from aws_clients import get_client
+from deserializer import deserializar_item, numero_entero_o_float
 
-dynamodb = boto3.resource('dynamodb')
 TABLE_RECETAS = os.environ.get('TABLE_RECETAS', 'Recetas')
-table_recetas = dynamodb.Table(TABLE_RECETAS)
 
 def _response(status_code, body):
     return {
@@ -66,15 +52,15 @@ def lambda_handler(event, context):
         
         # Listar todas las recetas del usuario
         try:
-            response = table_recetas.query(
+            response = get_client('dynamodb').query(
+                TableName=TABLE_RECETAS,
                 KeyConditionExpression='correo = :email',
                 ExpressionAttributeValues={
-                    ':email': user_email
+                    ':email': {'S': user_email}
                 }
             )
             
-            recetas = response.get('Items', [])
-            recetas = convert_decimal(recetas)
+            recetas = [deserializar_item(item, numero_entero_o_float) for item in response.get('Items', [])]
 
             return _response(200, {
                 "message": "Recetas obtenidas exitosamente",
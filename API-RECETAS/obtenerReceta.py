@@ -1,25 +1,12 @@
 import os
 import json
-import boto3
 import base64
 from botocore.exceptions import ClientError
-from decimal import Decimal
 
-def convert_decimal(obj):
-    if isinstance(obj, Decimal):
-        if obj % 1 == 0:
-            return int(obj)
-        else:
-            return float(obj)
-    if isinstance(obj, list):
-        return [convert_decimal(i) for i in obj]
-    if isinstance(obj, dict):
-        return {k: convert_decimal(v) for k, v in obj.items()}
-    return obj
+from aws_clients import get_client
+from deserializer import deserializar_item, numero_entero_o_float
 
-dynamodb = boto3.resource('dynamodb')
 TABLE_RECETAS = os.environ.get('TABLE_RECETAS', 'Recetas')
-table_recetas = dynamodb.Table(TABLE_RECETAS)
 
 def _response(status_code, body):
     return {
@@ -75,17 +62,18 @@ def lambda_handler(event, context):
         
         # Obtener la receta de DynamoDB
         try:
-            response = table_recetas.get_item(
+            response = get_client('dynamodb').get_item(
+                TableName=TABLE_RECETAS,
                 Key={
-                    'correo': user_email,
-                    'receta_id': receta_id
+                    'correo': {'S': user_email},
+                    'receta_id': {'S': receta_id}
                 }
             )
             
             if 'Item' not in response:
                 return _response(404, {"message": "Receta no encontrada"})
             
-            item = convert_decimal(response['Item'])
+            item = deserializar_item(response['Item'], numero_entero_o_float)
 
             return _response(200, {
                 "message": "Receta obtenida exitosamente",
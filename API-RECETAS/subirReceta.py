@@ -1,7 +1,6 @@
 import os
 import json
 import base64
-import boto3
 import re
 import time
 import uuid
@@ -11,16 +10,14 @@ import cgi
 # ===============================
 # 0. Configuración y Clientes AWS
 # ===============================
-dynamodb = boto3.resource('dynamodb')
-s3 = boto3.client('s3')
-lambda_client = boto3.client('lambda', region_name='us-east-1')
+# Los clientes se crean en el primer uso (ver aws_clients.py)
+from aws_clients import get_client, get_table
+from versiones import incrementar_version_recetas
 
 TABLE_RECETAS = os.environ.get('TABLE_RECETAS', 'Recetas')
 S3_BUCKET = os.environ.get('S3_BUCKET_RECETAS')
 CALENDAR_LAMBDA_NAME = os.environ.get('CALENDAR_LAMBDA_NAME', 'api-calendar-dev-scheduleTreatment')
 
-table_recetas = dynamodb.Table(TABLE_RECETAS)
-
 # ===============================
 # 1. Inicializar cliente Gemini
 # ===============================
@@ -168,7 +165,7 @@ def schedule_calendar_notifications(medicamentos, user_email, auth_header):
                 cal_payload['frecuencia'] = 1
             
             # Invocar Lambda de calendario (asíncrono)
-            response = lambda_client.invoke(
+            response = get_client('lambda', region_name='us-east-1').invoke(
                 FunctionName=CALENDAR_LAMBDA_NAME,
                 InvocationType='Event',  # Invocación asíncrona
                 Payload=json.dumps({
@@ -326,13 +323,13 @@ def lambda_handler(event, context):
         
         if S3_BUCKET:
             try:
-                s3.put_object(
+                get_client('s3').put_object(
                     Bucket=S3_BUCKET,
                     Key=s3_key,
                     Body=image_bytes,
                     ContentType='image/jpeg'
                 )
-                url_receta_firmada = s3.generate_presigned_url(
+                url_receta_firmada = get_client('s3').generate_presigned_url(
                     ClientMethod='get_object',
                     Params={'Bucket': S3_BUCKET, 'Key': s3_key},
                     ExpiresIn=86400  # 24h
@@ -359,11 +356,13 @@ def lambda_handler(event, context):
             item['url_firmada'] = url_receta_firmada
         
         try:
-            table_recetas.put_item(Item=item)
+            get_table(TABLE_RECETAS).put_item(Item=item)
             print(f"✅ Receta guardada en DynamoDB: {receta_id}")
         except Exception as e:
             return _response(500, {"message": f"Error al guardar en BD: {str(e)}"})
         
+        incrementar_version_recetas(user_email)
+        
         # ===============================
         # 3g. Programar notificaciones en Google Calendar
         # ===============================
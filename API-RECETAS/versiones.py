@@ -0,0 +1,40 @@
+"""
+Contador de versión de las recetas del usuario
+
+Cada escritura de recetas incrementa `version_recetas` en el registro del
+usuario. API-AGENTE guarda snapshots de los datos de contexto por usuario y
+los descarta cuando cambia ese contador (ver
+API-AGENTE/services/snapshot_contexto.py).
+"""
+import os
+
+from botocore.exceptions import ClientError
+
+from aws_clients import get_client
+
+TABLE_USUARIOS = os.environ.get('TABLE_USUARIOS', 'usuarios')
+
+
+def incrementar_version_recetas(user_email):
+    """
+    Incrementa version_recetas del usuario (ADD atómico)
+
+    Se llama después de escribir la receta. Un fallo no invalida la
+    escritura: los snapshots del agente vencen igual por TTL.
+    """
+    try:
+        get_client('dynamodb').update_item(
+            TableName=TABLE_USUARIOS,
+            Key={'correo': {'S': user_email}},
+            UpdateExpression="ADD version_recetas :uno",
+            ConditionExpression="attribute_exists(correo)",
+            ExpressionAttributeValues={':uno': {'N': '1'}}
+        )
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            print(f"⚠️ Error incrementando version_recetas: {e}")
+        return False
+    except Exception as e:
+        print(f"⚠️ Error incrementando version_recetas: {e}")
+        return False
@@ -1,12 +1,11 @@
 import json
-import boto3
 import os
 import base64
 from botocore.exceptions import ClientError
 
-dynamodb = boto3.resource('dynamodb')
+from aws_clients import get_table
+
 TABLE_USUARIOS = os.environ.get('TABLE_USUARIOS')
-table = dynamodb.Table(TABLE_USUARIOS)
 
 def build_response(status_code, body):
     return {
@@ -66,7 +65,7 @@ def activar_modo_familiar(event, context):
         
         # Verificar que el usuario existe
         try:
-            response = table.get_item(Key={'correo': correo})
+            response = get_table(TABLE_USUARIOS).get_item(Key={'correo': correo})
         except ClientError as e:
             return build_response(500, {
                 "error": f"Error al consultar DynamoDB: {str(e)}"
@@ -88,7 +87,7 @@ def activar_modo_familiar(event, context):
         
         # Actualizar rol a TUTOR
         try:
-            table.update_item(
+            get_table(TABLE_USUARIOS).update_item(
                 Key={'correo': correo},
                 UpdateExpression='SET rol = :nuevo_rol',
                 ExpressionAttributeValues={':nuevo_rol': 'TUTOR'},
@@ -1,18 +1,15 @@
 import json
-import boto3
 import os
 import uuid
 import base64
 from datetime import datetime
 from botocore.exceptions import ClientError
 
-dynamodb = boto3.resource('dynamodb')
+from aws_clients import get_table
+
 TABLE_USUARIOS = os.environ.get('TABLE_USUARIOS')
 TABLE_DEPENDIENTES = os.environ.get('TABLE_DEPENDIENTES')
 
-users_table = dynamodb.Table(TABLE_USUARIOS)
-dependientes_table = dynamodb.Table(TABLE_DEPENDIENTES)
-
 def build_response(status_code, body):
     return {
         "statusCode": status_code,
@@ -124,7 +121,7 @@ def agregar_dependiente(event, context):
         
         # Verificar que el tutor existe y tiene rol TUTOR
         try:
-            response = users_table.get_item(Key={'correo': correo_tutor})
+            response = get_table(TABLE_USUARIOS).get_item(Key={'correo': correo_tutor})
         except ClientError as e:
             return build_response(500, {
                 "error": f"Error al consultar tutor: {str(e)}"
@@ -156,7 +153,7 @@ def agregar_dependiente(event, context):
         
         # Guardar en DynamoDB
         try:
-            dependientes_table.put_item(Item=dependiente)
+            get_table(TABLE_DEPENDIENTES).put_item(Item=dependiente)
         except ClientError as e:
             return build_response(500, {
                 "error": f"Error al guardar dependiente: {str(e)}"
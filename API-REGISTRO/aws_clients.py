@@ -0,0 +1,59 @@
+"""
+Clientes boto3 compartidos y perezosos del servicio
+
+Versión reducida de API-AGENTE/utils/aws_clients.py (cada servicio se
+despliega por separado). Los clientes se crean en el primer uso, así que
+una función solo paga al arrancar por los que realmente usa.
+"""
+import os
+import threading
+
+import boto3
+from botocore.config import Config
+
+BOTO_CONFIG = Config(
+    max_pool_connections=int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '10')),
+    tcp_keepalive=True,
+    connect_timeout=float(os.environ.get('AWS_CONNECT_TIMEOUT', '2')),
+    read_timeout=float(os.environ.get('AWS_READ_TIMEOUT', '5')),
+    retries={
+        'mode': 'adaptive',
+        'max_attempts': int(os.environ.get('AWS_MAX_INTENTOS', '3'))
+    }
+)
+
+_session = None
+_clients = {}
+_resources = {}
+_lock = threading.Lock()
+
+
+def _get_session():
+    global _session
+    if _session is None:
+        _session = boto3.session.Session()
+    return _session
+
+
+def get_client(service_name, **kwargs):
+    """Cliente boto3 compartido (se crea una sola vez por contenedor)"""
+    clave = (service_name, tuple(sorted(kwargs.items())))
+    if clave not in _clients:
+        with _lock:
+            if clave not in _clients:
+                _clients[clave] = _get_session().client(service_name, config=BOTO_CONFIG, **kwargs)
+    return _clients[clave]
+
+
+def get_resource(service_name):
+    """Recurso boto3 compartido (se crea una sola vez por contenedor)"""
+    if service_name not in _resources:
+        with _lock:
+            if service_name not in _resources:
+                _resources[service_name] = _get_session().resource(service_name, config=BOTO_CONFIG)
+    return _resources[service_name]
+
+
+def get_table(table_name):
+    """Tabla DynamoDB sobre el recurso compartido"""
+    return get_resource('dynamodb').Table(table_name)
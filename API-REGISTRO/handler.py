@@ -1,18 +1,15 @@
 import json
-import boto3
 import os
 import time
 import re
 from datetime import datetime
 from botocore.exceptions import ClientError
 
-cognito = boto3.client('cognito-idp')
-dynamodb = boto3.resource('dynamodb')
+from aws_clients import get_client, get_table
 
 CLIENT_ID = os.environ.get('CLIENT_ID')
 USER_POOL_ID = os.environ.get('USER_POOL_ID') # Necesario para confirmar
 TABLE_USUARIOS = os.environ.get('TABLE_USUARIOS')
-table = dynamodb.Table(TABLE_USUARIOS)
 
 def build_response(status_code, body):
     return {
@@ -53,7 +50,7 @@ def register(event, context):
 
         # 2. Crear usuario en Cognito
         try:
-            cognito.sign_up(
+            get_client('cognito-idp').sign_up(
                 ClientId=CLIENT_ID,
                 Username=correo,
                 Password=contrasena,
@@ -66,7 +63,7 @@ def register(event, context):
 
         # 3. Auto-Confirmar usuario (Sin código de email)
         try:
-            cognito.admin_confirm_sign_up(
+            get_client('cognito-idp').admin_confirm_sign_up(
                 UserPoolId=USER_POOL_ID,
                 Username=correo
             )
@@ -81,10 +78,10 @@ def register(event, context):
             'sexo': sexo,
             'rol': rol
         }
-        table.put_item(Item=usuario)
+        get_table(TABLE_USUARIOS).put_item(Item=usuario)
 
         # 5. Obtener Token inmediatamente (Login automático)
-        auth_resp = cognito.initiate_auth(
+        auth_resp = get_client('cognito-idp').initiate_auth(
             ClientId=CLIENT_ID,
             AuthFlow='USER_PASSWORD_AUTH',
             AuthParameters={
@@ -118,14 +115,14 @@ def login(event, context):
         if not correo or not contrasena:
             return build_response(400, {"error": "Campos requeridos: correo, contrasena"})
 
-        auth_resp = cognito.initiate_auth(
+        auth_resp = get_client('cognito-idp').initiate_auth(
             ClientId=CLIENT_ID,
             AuthFlow='USER_PASSWORD_AUTH',
             AuthParameters={'USERNAME': correo, 'PASSWORD': contrasena}
         )
         
         # Recuperar datos de usuario de DynamoDB
-        db_resp = table.get_item(Key={'correo': correo})
+        db_resp = get_table(TABLE_USUARIOS).get_item(Key={'correo': correo})
         user_data = db_resp.get('Item', {})
         
         tokens = auth_resp['AuthenticationResult']
@@ -1,16 +1,13 @@
 import json
-import boto3
 import os
 import base64
 from botocore.exceptions import ClientError
 
-dynamodb = boto3.resource('dynamodb')
+from aws_clients import get_table
+
 TABLE_USUARIOS = os.environ.get('TABLE_USUARIOS')
 TABLE_DEPENDIENTES = os.environ.get('TABLE_DEPENDIENTES')
 
-users_table = dynamodb.Table(TABLE_USUARIOS)
-dependientes_table = dynamodb.Table(TABLE_DEPENDIENTES)
-
 def build_response(status_code, body):
     return {
         "statusCode": status_code,
@@ -68,7 +65,7 @@ def listar_dependientes(event, context):
         
         # Verificar que el usuario existe y tiene rol TUTOR
         try:
-            response = users_table.get_item(Key={'correo': correo_tutor})
+            response = get_table(TABLE_USUARIOS).get_item(Key={'correo': correo_tutor})
         except ClientError as e:
             return build_response(500, {
                 "error": f"Error al consultar usuario: {str(e)}"
@@ -88,7 +85,7 @@ def listar_dependientes(event, context):
         
         # Consultar dependientes del tutor
         try:
-            response = dependientes_table.query(
+            response = get_table(TABLE_DEPENDIENTES).query(
                 KeyConditionExpression='correo_tutor = :correo',
                 ExpressionAttributeValues={
                     ':correo': correo_tutor
@@ -26,6 +26,9 @@ TABLE_MEMORIA_CONTEXTUAL = os.getenv('TABLE_MEMORIA_CONTEXTUAL', 'MemoriaContext
 TABLE_HISTORIAL_MEDICO = os.getenv('TABLE_HISTORIAL_MEDICO', 'HistorialMedico')
 TABLE_USUARIOS_DEPENDIENTES = os.getenv('TABLE_USUARIOS_DEPENDIENTES', 'UsuariosDependientes')
 TABLE_REGLAS = os.getenv('TABLE_REGLAS', 'TablaReglas')
+
+# Segmentos del scan paralelo para limpiar tablas
+SCAN_TOTAL_SEGMENTS = int(os.getenv('SCAN_TOTAL_SEGMENTS', '0')) or max(2, (os.cpu_count() or 1) * 2)
 # Carpeta con los datos JSON
 DATA_DIR = "example-data"
 
@@ -105,38 +108,51 @@ def load_json_file(filename):
         return None
 
 def delete_all_items_from_table(table_name, pk_name, sk_name=None):
-    """Elimina todos los items de una tabla"""
+    """Elimina todos los items de una tabla (un scan por segmento en paralelo)"""
     try:
         table = dynamodb.Table(table_name)
         
-        print(f"   🗑️  Escaneando items en '{table_name}'...")
-        response = table.scan()
-        items = response.get('Items', [])
+        # Solo se leen los atributos clave
+        expression_names = {'#pk': pk_name}
+        projection = '#pk'
+        if sk_name:
+            expression_names['#sk'] = sk_name
+            projection += ', #sk'
         
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            items.extend(response.get('Items', []))
+        def delete_segment(segment):
+            """Recorre un segmento y borra sus items; un error se propaga"""
+            params = {
+                'ProjectionExpression': projection,
+                'ExpressionAttributeNames': expression_names,
+                'Segment': segment,
+                'TotalSegments': SCAN_TOTAL_SEGMENTS
+            }
+            deleted = 0
+            with table.batch_writer() as batch_writer:
+                while True:
+                    response = table.scan(**params)
+                    for item in response.get('Items', []):
+                        # Construir key correctamente
+                        key = {pk_name: item[pk_name]}
+                        if sk_name and sk_name in item:
+                            key[sk_name] = item[sk_name]
+                        batch_writer.delete_item(Key=key)
+                        deleted += 1
+                    if 'LastEvaluatedKey' not in response:
+                        return deleted
+                    params['ExclusiveStartKey'] = response['LastEvaluatedKey']
         
-        if not items:
-            print(f"   ℹ️  La tabla '{table_name}' ya está vacía")
-            return True
+        print(f"   🗑️  Escaneando y eliminando items de '{table_name}' ({SCAN_TOTAL_SEGMENTS} segmentos)...")
         
-        print(f"   🗑️  Eliminando {len(items)} items de '{table_name}'...")
+        with ThreadPoolExecutor(max_workers=SCAN_TOTAL_SEGMENTS) as executor:
+            futures = [executor.submit(delete_segment, segment) for segment in range(SCAN_TOTAL_SEGMENTS)]
+            deleted = sum(future.result() for future in as_completed(futures))
         
-        # Eliminar en lotes
-        batch_size = 25
-        for i in range(0, len(items), batch_size):
-            batch = items[i:i + batch_size]
-            
-            with table.batch_writer() as batch_writer:
-                for item in batch:
-                    # Construir key correctamente
-                    key = {pk_name: item[pk_name]}
-                    if sk_name and sk_name in item:
-                        key[sk_name] = item[sk_name]
-                    batch_writer.delete_item(Key=key)
+        if not deleted:
+            print(f"   ℹ️  La tabla '{table_name}' ya está vacía")
+            return True
         
-        print(f"   ✅ {len(items)} items eliminados")
+        print(f"   ✅ {deleted} items eliminados")
         return True
         
     except Exception as e:
@@ -18,7 +18,11 @@ SCHEMA_MAPPING = {
     "memoria_contextual.json": os.getenv('TABLE_MEMORIA_CONTEXTUAL', 'MemoriaContextual'),
     "historial_medico.json": os.getenv('TABLE_HISTORIAL_MEDICO', 'HistorialMedico'),
     "usuarios_dependientes.json": os.getenv('TABLE_USUARIOS_DEPENDIENTES', 'UsuariosDependientes'),
-    "reglas.json": os.getenv('TABLE_REGLAS', 'TablaReglas')
+    "reglas.json": os.getenv('TABLE_REGLAS', 'TablaReglas'),
+    "cache_respuestas.json": os.getenv('TABLE_CACHE_RESPUESTAS') or 'CacheRespuestas',
+    "contexto_usuario.json": os.getenv('TABLE_CONTEXTO_USUARIO') or 'ContextoUsuario',
+    "historial_agregados.json": os.getenv('TABLE_HISTORIAL_AGREGADOS') or 'HistorialAgregados',
+    "historial_lecturas.json": os.getenv('TABLE_HISTORIAL_LECTURAS') or 'HistorialLecturas'
 }
 
 # Definición de tablas sin esquema (creación directa)
@@ -132,6 +136,51 @@ def recreate_table(table_name, key_schema, attribute_definitions):
         print(f"   ❌ Error al recrear tabla: {str(e)}")
         return False
 
+def enable_ttl(table_name, ttl_attribute):
+    """Activa el TTL de DynamoDB sobre el atributo indicado (si hay uno)"""
+    if not ttl_attribute:
+        return True
+    try:
+        response = dynamodb.describe_time_to_live(TableName=table_name)
+        estado = response['TimeToLiveDescription']
+        if estado.get('TimeToLiveStatus') in ('ENABLED', 'ENABLING') and estado.get('AttributeName') == ttl_attribute:
+            return True
+        dynamodb.update_time_to_live(
+            TableName=table_name,
+            TimeToLiveSpecification={'Enabled': True, 'AttributeName': ttl_attribute}
+        )
+        print(f"   ⏳ TTL activado sobre '{ttl_attribute}'")
+        return True
+    except Exception as e:
+        print(f"   ❌ Error al activar TTL: {str(e)}")
+        return False
+
+def enable_stream(table_name, stream_view_type):
+    """Activa el stream de DynamoDB de la tabla (si el esquema lo pide)"""
+    if not stream_view_type:
+        return True
+    try:
+        response = dynamodb.describe_table(TableName=table_name)
+        actual = response['Table'].get('StreamSpecification') or {}
+        if actual.get('StreamEnabled') and actual.get('StreamViewType') == stream_view_type:
+            print(f"   🌊 Stream: {response['Table']['LatestStreamArn']}")
+            return True
+        if actual.get('StreamEnabled'):
+            print(f"   ⚠️  Stream activo con vista {actual.get('StreamViewType')}; se esperaba {stream_view_type}")
+            return False
+        dynamodb.update_table(
+            TableName=table_name,
+            StreamSpecification={'StreamEnabled': True, 'StreamViewType': stream_view_type}
+        )
+        waiter = dynamodb.get_waiter('table_exists')
+        waiter.wait(TableName=table_name)
+        arn = dynamodb.describe_table(TableName=table_name)['Table']['LatestStreamArn']
+        print(f"   🌊 Stream activado ({stream_view_type}): {arn}")
+        return True
+    except Exception as e:
+        print(f"   ❌ Error al activar stream: {str(e)}")
+        return False
+
 def create_table_from_schema(filename, table_name):
     """Crear tabla desde archivo de esquema JSON"""
     filepath = os.path.join(SCHEMAS_DIR, filename)
@@ -152,6 +201,8 @@ def create_table_from_schema(filename, table_name):
         return False
 
     x_dynamodb = schema["x-dynamodb"]
+    ttl_attribute = x_dynamodb.get("ttl_attribute")
+    stream_view_type = x_dynamodb.get("stream_view_type")
     pk_name = x_dynamodb["partition_key"]
     pk_type = "S"
     if "properties" in schema and pk_name in schema["properties"]:
@@ -197,10 +248,12 @@ def create_table_from_schema(filename, table_name):
             # Verificar si la estructura es correcta
             if verify_table_structure(table_name, key_schema):
                 print(f"   ✅ La tabla '{table_name}' ya existe con la estructura correcta")
-                return True
+                return enable_ttl(table_name, ttl_attribute) and enable_stream(table_name, stream_view_type)
             else:
                 print(f"   ⚠️  La tabla '{table_name}' existe pero con estructura incorrecta")
-                return recreate_table(table_name, key_schema, attribute_definitions)
+                return (recreate_table(table_name, key_schema, attribute_definitions)
+                        and enable_ttl(table_name, ttl_attribute)
+                        and enable_stream(table_name, stream_view_type))
         else:
             print(f"   🔨 Creando tabla '{table_name}'...")
             dynamodb.create_table(
@@ -212,7 +265,7 @@ def create_table_from_schema(filename, table_name):
             waiter = dynamodb.get_waiter('table_exists')
             waiter.wait(TableName=table_name)
             print(f"   ✅ Tabla '{table_name}' creada exitosamente")
-            return True
+            return enable_ttl(table_name, ttl_attribute) and enable_stream(table_name, stream_view_type)
     except Exception as e:
         print(f"   ❌ Error: {str(e)}")
         return False